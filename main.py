@@ -12,7 +12,6 @@ import sys
 import time
 from typing import Optional, Dict, Any
 from types import SimpleNamespace
-from datetime import datetime, timezone
 
 from fastapi import FastAPI, HTTPException
 import uvicorn
@@ -25,6 +24,7 @@ from swarm_intelligence.core.models import (
 from swarm_intelligence.core.enums import RiskLevel
 from swarm_intelligence.core.swarm import SwarmOrchestrator
 from swarm_intelligence.coordinators.swarm_run_coordinator import SwarmRunCoordinator
+from swarm_intelligence.coordinators.alert_intake import AlertIntakeQueue, IntakeRejected
 from swarm_intelligence.controllers.swarm_execution_controller import SwarmExecutionController
 from swarm_intelligence.controllers.swarm_retry_controller import SwarmRetryController
 from swarm_intelligence.controllers.swarm_decision_controller import SwarmDecisionController
@@ -33,6 +33,11 @@ from swarm_intelligence.policy.retry_policy import ExponentialBackoffPolicy
 from swarm_intelligence.services.confidence_service import ConfidenceService
 from swarm_intelligence.replay import ReplayEngine
 from swarm_intelligence.registry import get_registry, load_all_agents, create_agent
+from src.metrics import init_metrics
+from src.rules.online_trend import StreamingTrendDetector
+from src.tools.embedding_client import EmbeddingClient
+from src.tools.prometheus_queries import PrometheusClient
+from src.tools.prometheus_range_cache import get_default_range_cache
 
 
 def setup_logging(log_level: str = "INFO") -> None:
@@ -220,12 +225,23 @@ async def main():
         retry_controller = SwarmRetryController()
         decision_controller = SwarmDecisionController()
         
+        # MONITOR decisions follow the alert series through the range cache
+        # instead of re-running the swarm on a timer
+        trend_detector = None
+        if config.swarm.streaming_trends:
+            trend_detector = StreamingTrendDetector(
+                client=PrometheusClient(base_url=config.prometheus.url),
+                range_cache=get_default_range_cache(),
+            )
+            logger.info(f"✓ Streaming trend detector enabled for MONITOR decisions ({config.prometheus.url})")
+        
         # Initialize the main coordinator
         coordinator = SwarmRunCoordinator(
             execution_controller,
             retry_controller,
             decision_controller,
-            confidence_service
+            confidence_service,
+            trend_detector=trend_detector,
         )
         
         # Define operational domain
@@ -252,171 +268,191 @@ async def main():
         # Create FastAPI app for alert listener
         app = FastAPI(title="Strands Alert Receiver")
         
-        # Store execution state
-        class ExecutionState:
-            def __init__(self):
-                self.is_processing = False
-                self.last_execution = None
-        
-        state = ExecutionState()
-        
-        async def process_alert(alert_data: Dict[str, Any]) -> str:
-            """Process alert and execute swarm."""
-            if state.is_processing:
-                raise HTTPException(status_code=429, detail="Alert processing already in progress")
-            
-            state.is_processing = True
-            try:
-                # Extract alert info from AlertManager webhook
-                primary_alert = alert_data.get("alerts", [{}])[0]
-                labels = primary_alert.get("labels", {})
-                annotations = primary_alert.get("annotations", {})
-                alert_name = labels.get("alertname", "unknown")
-
-                alert_id = f"alert-{int(datetime.now(timezone.utc).timestamp() * 1000)}"
+        async def process_alert(alert_data: Dict[str, Any], primary_alert: Dict[str, Any], alert_id: str) -> str:
+            """Process a single alert of a webhook payload and execute the swarm."""
+            labels = primary_alert.get("labels", {})
+            annotations = primary_alert.get("annotations", {})
+            alert_name = labels.get("alertname", "unknown")
 
-                # Build Alert for core models: core.Alert expects `alert_id` and `data`
-                flattened = {}
-                # Flatten labels and annotations into top-level keys for compatibility
-                if isinstance(labels, dict):
-                    flattened.update(labels)
-                if isinstance(annotations, dict):
-                    # prefix annotation keys to avoid collision if needed
-                    flattened.update(annotations)
-                flattened["generatorURL"] = primary_alert.get("generatorURL") or primary_alert.get("generator_url")
-                flattened["alertname"] = labels.get("alertname", alert_name)
+            # Build Alert for core models: core.Alert expects `alert_id` and `data`
+            flattened = {}
+            # Flatten labels and annotations into top-level keys for compatibility
+            if isinstance(labels, dict):
+                flattened.update(labels)
+            if isinstance(annotations, dict):
+                # prefix annotation keys to avoid collision if needed
+                flattened.update(annotations)
+            flattened["generatorURL"] = primary_alert.get("generatorURL") or primary_alert.get("generator_url")
+            flattened["alertname"] = labels.get("alertname", alert_name)
 
-                # Use a lightweight object to avoid pydantic constructor issues at webhook time
-                alert = SimpleNamespace(alert_id=alert_id, data=flattened)
+            # Use a lightweight object to avoid pydantic constructor issues at webhook time
+            alert = SimpleNamespace(alert_id=alert_id, data=flattened)
 
-                run_id = f"run-{alert_id}"
-                
-                logger.info(f"\n🚨 RECEIVED ALERT: {alert_name} ({alert_id})")
-                logger.info(f"📋 Total steps: 8 | Mandatory: 5\n")
-                
-                # Define retry policies
-                fast_policy = ExponentialBackoffPolicy(max_attempts=2, base_delay=0.1)
-                moderate_policy = ExponentialBackoffPolicy(max_attempts=2, base_delay=0.2)
-                slow_policy = ExponentialBackoffPolicy(max_attempts=3, base_delay=0.5)
+            run_id = f"run-{alert_id}"
+            
+            logger.info(f"\n🚨 RECEIVED ALERT: {alert_name} ({alert_id})")
+            logger.info(f"📋 Total steps: 8 | Mandatory: 5\n")
+            
+            # Define retry policies
+            fast_policy = ExponentialBackoffPolicy(max_attempts=2, base_delay=0.1)
+            moderate_policy = ExponentialBackoffPolicy(max_attempts=2, base_delay=0.2)
+            slow_policy = ExponentialBackoffPolicy(max_attempts=3, base_delay=0.5)
 
-                # primary_alert/labels/annotations already extracted above
-                alert_signature = f"{labels.get('alertname', 'unknown')}|{labels.get('service', labels.get('job', 'unknown'))}|{labels.get('severity', 'unknown')}"
-                known_procedure = neo4j.find_procedure_by_signature(alert_signature)
+            # primary_alert/labels/annotations already extracted above
+            alert_signature = f"{labels.get('alertname', 'unknown')}|{labels.get('service', labels.get('job', 'unknown'))}|{labels.get('severity', 'unknown')}"
+            # Neo4j driver calls are blocking; keep them off the event loop so
+            # concurrent intake workers can overlap their swarm runs.
+            known_procedure = await asyncio.to_thread(neo4j.find_procedure_by_signature, alert_signature)
 
-                common_params = {
-                    "alert": {"alertname": alert_name, "raw_data": alert_data},
-                    "service_name": labels.get("service", labels.get("job", "unknown")),
-                    "namespace": labels.get("namespace", "default"),
-                    "instance": labels.get("instance", "unknown"),
-                    "severity": labels.get("severity", "unknown"),
-                    "summary": annotations.get("summary", ""),
-                    "description": annotations.get("description", ""),
-                    "context": f"{annotations.get('summary', '')} {annotations.get('description', '')}",
-                    "logs": annotations.get("description", ""),
-                    "metrics": ["cpu", "memory", "request_rate", "latency", "error_rate"],
-                    "lookback_minutes": int(labels.get("lookback_minutes", 60)) if str(labels.get("lookback_minutes", "")).isdigit() else 60,
-                    "alert_count": len(alert_data.get("alerts", [])),
-                    "known_procedure": known_procedure,
-                    "decision_candidates": [
-                        {
-                            "severity": labels.get("severity", "medium"),
-                            "service": labels.get("service", labels.get("job", "unknown")),
-                            "issue_type": "cpu" if "cpu" in (annotations.get("summary", "") + annotations.get("description", "")).lower() else "error",
-                            "reason": annotations.get("summary", "Alertmanager signal"),
-                            "known_procedure": known_procedure.get("description", "") if isinstance(known_procedure, dict) else "",
-                        }
-                    ],
-                    "network_info": {
-                        "open_ports": [int(p) for p in labels.get("open_ports", "").split(",") if p.strip().isdigit()]
-                    },
-                }
+            common_params = {
+                "alert": {"alertname": alert_name, "raw_data": alert_data},
+                "service_name": labels.get("service", labels.get("job", "unknown")),
+                "namespace": labels.get("namespace", "default"),
+                "instance": labels.get("instance", "unknown"),
+                "severity": labels.get("severity", "unknown"),
+                "summary": annotations.get("summary", ""),
+                "description": annotations.get("description", ""),
+                "context": f"{annotations.get('summary', '')} {annotations.get('description', '')}",
+                "logs": annotations.get("description", ""),
+                "metrics": ["cpu", "memory", "request_rate", "latency", "error_rate"],
+                "lookback_minutes": int(labels.get("lookback_minutes", 60)) if str(labels.get("lookback_minutes", "")).isdigit() else 60,
+                "alert_count": len(alert_data.get("alerts", [])),
+                "known_procedure": known_procedure,
+                "decision_candidates": [
+                    {
+                        "severity": labels.get("severity", "medium"),
+                        "service": labels.get("service", labels.get("job", "unknown")),
+                        "issue_type": "cpu" if "cpu" in (annotations.get("summary", "") + annotations.get("description", "")).lower() else "error",
+                        "reason": annotations.get("summary", "Alertmanager signal"),
+                        "known_procedure": known_procedure.get("description", "") if isinstance(known_procedure, dict) else "",
+                    }
+                ],
+                "network_info": {
+                    "open_ports": [int(p) for p in labels.get("open_ports", "").split(",") if p.strip().isdigit()]
+                },
+            }
 
-                if known_procedure:
-                    logger.info(f"♻️ Reusing known procedure for pattern {alert_signature}: {known_procedure.get('description', 'n/a')}")
+            if known_procedure:
+                logger.info(f"♻️ Reusing known procedure for pattern {alert_signature}: {known_procedure.get('description', 'n/a')}")
 
-                plan = SwarmPlan(
-                    objective=f"Incident Response: {alert_name} on {labels.get('instance', 'unknown')}",
-                    steps=[
-                        SwarmStep(agent_id="loganalysis", mandatory=True, retry_policy=fast_policy, parameters=common_params),
-                        SwarmStep(agent_id="networkscanner", mandatory=True, retry_policy=slow_policy, parameters=common_params),
-                        SwarmStep(agent_id="threatintel", mandatory=True, retry_policy=moderate_policy, parameters=common_params),
-                        SwarmStep(agent_id="correlator", mandatory=True, retry_policy=moderate_policy, parameters=common_params),
-                        SwarmStep(agent_id="loginspector", mandatory=False, retry_policy=slow_policy, parameters=common_params),
-                        SwarmStep(agent_id="metricsanalyzer", mandatory=False, retry_policy=fast_policy, parameters=common_params),
-                        SwarmStep(agent_id="alertcorrelator", mandatory=False, retry_policy=fast_policy, parameters=common_params),
-                        SwarmStep(agent_id="recommender", mandatory=True, retry_policy=moderate_policy, parameters=common_params),
-                    ]
-                )
-                
-                # Execute swarm plan
-                swarm_run, all_retry_attempts, all_retry_decisions = await coordinator.aexecute_plan(
-                    default_domain,
-                    plan,
-                    alert,
-                    run_id,
-                    human_hook=expert_human_review,
-                    max_retry_rounds=config.swarm.max_retry_rounds,
-                    max_runtime_seconds=config.swarm.max_runtime_seconds,
-                    max_total_attempts=config.swarm.max_total_attempts,
-                    use_llm_fallback=config.swarm.use_llm_fallback,
-                    llm_fallback_threshold=config.swarm.llm_fallback_threshold,
-                )
-                
-                # Persist results
-                neo4j.save_swarm_run(swarm_run, alert, all_retry_attempts, all_retry_decisions)
-                logger.info("Swarm run persisted to Neo4j")
-                
-                # Handle human override if present
-                decision = swarm_run.final_decision
-                if decision and decision.human_decision:
-                    outcome = OperationalOutcome(status="success")
-                    neo4j.save_human_override(decision, decision.human_decision, outcome)
-                    logger.info("Human override persisted")
-                
-                # Replay for audit trail
-                if config.environment != "production":
-                    try:
-                        logger.info("--- Initiating Deterministic Replay ---")
-                        replay_engine = ReplayEngine(neo4j)
-                        report = await replay_engine.replay_decision(run_id, coordinator)
-                        logger.info(f"Replay Report ({report.report_id}) generated and saved")
-                    except Exception as replay_error:
-                        logger.warning(f"Replay failed (non-fatal): {replay_error}")
-                
-                logger.info("Swarm execution completed successfully")
-                state.last_execution = {"run_id": run_id, "alert": alert_name, "timestamp": datetime.now(timezone.utc).isoformat()}
-                return run_id
-                
-            finally:
-                state.is_processing = False
+            plan = SwarmPlan(
+                objective=f"Incident Response: {alert_name} on {labels.get('instance', 'unknown')}",
+                steps=[
+                    SwarmStep(agent_id="loganalysis", mandatory=True, retry_policy=fast_policy, parameters=common_params),
+                    SwarmStep(agent_id="networkscanner", mandatory=True, retry_policy=slow_policy, parameters=common_params),
+                    SwarmStep(agent_id="threatintel", mandatory=True, retry_policy=moderate_policy, parameters=common_params),
+                    SwarmStep(agent_id="correlator", mandatory=True, retry_policy=moderate_policy, parameters=common_params),
+                    SwarmStep(agent_id="loginspector", mandatory=False, retry_policy=slow_policy, parameters=common_params),
+                    SwarmStep(agent_id="metricsanalyzer", mandatory=False, retry_policy=fast_policy, parameters=common_params),
+                    SwarmStep(agent_id="alertcorrelator", mandatory=False, retry_policy=fast_policy, parameters=common_params),
+                    SwarmStep(agent_id="recommender", mandatory=True, retry_policy=moderate_policy, parameters=common_params),
+                ]
+            )
+            
+            # Execute swarm plan
+            swarm_run, all_retry_attempts, all_retry_decisions = await coordinator.aexecute_plan(
+                default_domain,
+                plan,
+                alert,
+                run_id,
+                human_hook=expert_human_review,
+                max_retry_rounds=config.swarm.max_retry_rounds,
+                max_runtime_seconds=config.swarm.max_runtime_seconds,
+                max_total_attempts=config.swarm.max_total_attempts,
+                use_llm_fallback=config.swarm.use_llm_fallback,
+                llm_fallback_threshold=config.swarm.llm_fallback_threshold,
+            )
+            
+            # Persist results
+            await asyncio.to_thread(neo4j.save_swarm_run, swarm_run, alert, all_retry_attempts, all_retry_decisions)
+            logger.info("Swarm run persisted to Neo4j")
+            
+            # Handle human override if present
+            decision = swarm_run.final_decision
+            if decision and decision.human_decision:
+                outcome = OperationalOutcome(status="success")
+                await asyncio.to_thread(neo4j.save_human_override, decision, decision.human_decision, outcome)
+                logger.info("Human override persisted")
+            
+            # Replay for audit trail
+            if config.environment != "production":
+                try:
+                    logger.info("--- Initiating Deterministic Replay ---")
+                    replay_engine = ReplayEngine(neo4j)
+                    report = await replay_engine.replay_decision(run_id, coordinator)
+                    logger.info(f"Replay Report ({report.report_id}) generated and saved")
+                except Exception as replay_error:
+                    logger.warning(f"Replay failed (non-fatal): {replay_error}")
+            
+            logger.info("Swarm execution completed successfully")
+            return run_id
+        
+        # Every alert of a webhook payload is queued and consumed by a pool of
+        # concurrent swarm workers; backpressure is applied on queue depth.
+        intake = AlertIntakeQueue(
+            process_alert,
+            max_workers=config.swarm.intake_workers,
+            max_queue_size=config.swarm.intake_queue_size,
+            enqueue_timeout_seconds=config.swarm.intake_enqueue_timeout_seconds,
+        )
         
-        @app.post("/api/v1/alerts")
+        @app.on_event("startup")
+        async def start_intake():
+            await intake.start()
+        
+        @app.on_event("startup")
+        async def warmup_embeddings():
+            # Load embedding weights once up front instead of on the first alert.
+            try:
+                await asyncio.to_thread(EmbeddingClient().warmup)
+            except Exception as e:
+                logger.warning(f"Embedding model warm-up skipped: {e}")
+        
+        @app.on_event("shutdown")
+        async def stop_intake():
+            await intake.stop(drain=False)
+        
+        @app.post("/api/v1/alerts", status_code=202)
         async def receive_alert(data: Dict[str, Any]):
             """Webhook endpoint for AlertManager alerts."""
             logger.debug(f"Received webhook: {json.dumps(data)}")
             try:
-                run_id = await process_alert(data)
-                return {"status": "processing", "run_id": run_id}
-            except HTTPException:
-                raise
+                alert_ids = await intake.submit(data)
+            except IntakeRejected as e:
+                logger.warning(f"Alert intake rejected webhook: {e}")
+                raise HTTPException(
+                    status_code=503,
+                    detail=str(e),
+                    headers={"Retry-After": str(e.retry_after_seconds)},
+                )
             except Exception as e:
-                logger.error(f"Error processing alert: {e}", exc_info=True)
+                logger.error(f"Error enqueuing alert: {e}", exc_info=True)
                 raise HTTPException(status_code=500, detail=str(e))
+            return {
+                "status": "queued",
+                "run_ids": [f"run-{alert_id}" for alert_id in alert_ids],
+                "queue_depth": intake.depth,
+            }
         
         @app.get("/api/v1/health")
         async def health_check():
             """Health check endpoint."""
+            stats = intake.get_stats()
             return {
                 "status": "healthy",
                 "neo4j": neo4j is not None,
-                "processing": state.is_processing,
-                "last_execution": state.last_execution
+                "processing": stats["active_workers"] > 0,
+                "intake": stats,
+                "last_execution": stats["last_execution"]
             }
         
+        init_metrics(app)
+        
         # Start server
         logger.info(f"\n✅ Alert listener started on 0.0.0.0:8080")
         logger.info(f"   Webhook: POST http://localhost:8080/api/v1/alerts")
-        logger.info(f"   Health:  GET  http://localhost:8080/api/v1/health\n")
+        logger.info(f"   Health:  GET  http://localhost:8080/api/v1/health")
+        logger.info(f"   Metrics: GET  http://localhost:8080/metrics\n")
         
         config_uvicorn = uvicorn.Config(
             app=app,
@@ -10,8 +10,16 @@ from typing import Optional, Dict, List, Any
 import importlib
 import os
 import json
+import time
 import uvicorn
 
+# Optional shared LLM response cache (only when running inside the repo)
+try:
+    from src.llm.response_cache import get_default_cache, make_cache_key
+except Exception:  # pragma: no cover - standalone deployment without src/
+    get_default_cache = None
+    make_cache_key = None
+
 # Constants
 AIOHTTP_MISSING = "aiohttp is required but not installed"
 
@@ -167,8 +175,34 @@ class PrometheusAnalyzer:
 
         return metrics
 
-    async def analyze_with_llm(self, metrics_summary: Dict) -> Dict:
-        """Usar LLM para analisar métricas e gerar insights"""
+    async def analyze_with_llm(self, metrics_summary: Dict, use_cache: bool = True) -> Dict:
+        """Usar LLM para analisar métricas e gerar insights.
+
+        Análises bem-sucedidas são cacheadas por prompt normalizado; passe
+        `use_cache=False` para forçar uma nova chamada ao Ollama.
+        """
+        cache = get_default_cache() if (use_cache and get_default_cache is not None) else None
+        if cache is None:
+            return await self._analyze_with_llm_uncached(metrics_summary)
+
+        prompt = self._prepare_analysis_prompt(metrics_summary)
+        primary_model = os.getenv("OLLAMA_MODEL", "ministral-3:3b")
+        key = make_cache_key("ollama", primary_model, 0.7, prompt)
+        cached = cache.get(key)
+        if cached is not None:
+            result = json.loads(cached)
+            result.update({"timestamp": datetime.now().isoformat(), "cached": True})
+            return result
+
+        started = time.perf_counter()
+        result = await self._analyze_with_llm_uncached(metrics_summary)
+        # Respostas de um modelo de OLLAMA_FALLBACK_MODELS não entram sob a chave do primário
+        if result.get("status") == "success" and result.get("model") == primary_model:
+            cache.put(key, json.dumps(result, default=str), time.perf_counter() - started)
+        return result
+
+    async def _analyze_with_llm_uncached(self, metrics_summary: Dict) -> Dict:
+        """Chamada ao Ollama com fallback de modelos e retries."""
         try:
             await self._ensure_session()
             aiohttp_mod = _get_aiohttp()
@@ -1,37 +1,79 @@
 """
 Mock Knowledge Graph Builder for semantic graph operations.
 Provides basic graph building and querying without external graph libraries.
+
+`self.graph` keeps its original shape (entity id -> {"type", "properties"},
+plus a "relationships" list), and is backed by secondary indexes maintained
+on every write:
+
+- entity ids by type and by (property, value), so `query` starts from the
+  smallest matching id set instead of scanning the graph;
+- an inverted token index over string properties (lowercased and tokenized
+  once, on insert), so `semantic_search` only visits entities containing the
+  query tokens;
+- outgoing and incoming adjacency lists for relationship traversal.
 """
 
+import heapq
 import logging
-from typing import Dict, Any, List, Optional
+import math
+import re
+from collections import defaultdict, deque
+from typing import Dict, Any, Hashable, Iterable, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+_TOKEN = re.compile(r"\w+")
+# Ordered id sets: dict keys keep insertion order and give O(1) add/remove
+IdSet = Dict[str, None]
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def _index_key(key: str, value: Any) -> Optional[Tuple[str, Hashable]]:
+    """(property, value) index key, or None for unhashable values."""
+    try:
+        hash(value)
+    except TypeError:
+        return None
+    return (key, value)
+
 
 class GraphBuilder:
     """Mock Knowledge Graph builder for semantic retrieval."""
-    
+
     def __init__(self):
         """Initialize the graph builder."""
         self.graph = {}
+        self._by_type: Dict[str, IdSet] = defaultdict(dict)
+        self._by_property: Dict[Tuple[str, Hashable], IdSet] = defaultdict(dict)
+        # token -> {entity id: number of string properties containing it}
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._outgoing: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._incoming: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
         logger.info("Initialized GraphBuilder (mock)")
-    
+
     def add_entity(self, entity_id: str, entity_type: str, properties: Dict[str, Any]) -> None:
         """
         Add an entity to the knowledge graph.
-        
+
         Args:
             entity_id: Unique identifier for the entity
             entity_type: Type/category of the entity
             properties: Entity properties/attributes
         """
+        if entity_id in self.graph and entity_id != "relationships":
+            self._unindex(entity_id)
+
         self.graph[entity_id] = {
             "type": entity_type,
             "properties": properties
         }
+        self._index(entity_id, entity_type, properties)
         logger.debug(f"Added entity {entity_id} ({entity_type})")
-    
+
     def add_relationship(
         self,
         source_id: str,
@@ -41,7 +83,7 @@ class GraphBuilder:
     ) -> None:
         """
         Add a relationship between two entities.
-        
+
         Args:
             source_id: Source entity ID
             target_id: Target entity ID
@@ -50,15 +92,18 @@ class GraphBuilder:
         """
         if "relationships" not in self.graph:
             self.graph["relationships"] = []
-        
-        self.graph["relationships"].append({
+
+        relationship = {
             "source": source_id,
             "target": target_id,
             "type": relationship_type,
             "properties": properties or {}
-        })
+        }
+        self.graph["relationships"].append(relationship)
+        self._outgoing[source_id].append(relationship)
+        self._incoming[target_id].append(relationship)
         logger.debug(f"Added relationship {source_id} -[{relationship_type}]-> {target_id}")
-    
+
     def query(
         self,
         entity_type: str,
@@ -67,40 +112,49 @@ class GraphBuilder:
     ) -> List[Dict[str, Any]]:
         """
         Query entities in the knowledge graph.
-        
+
         Args:
             entity_type: Type of entities to query
             query_properties: Optional properties to filter by
             limit: Maximum number of results
-            
+
         Returns:
             List of matching entities
         """
         results = []
         query_properties = query_properties or {}
-        
-        for entity_id, entity_data in self.graph.items():
-            if isinstance(entity_data, dict) and entity_data.get("type") == entity_type:
-                # Simple property matching
-                match = True
-                for key, value in query_properties.items():
-                    if entity_data.get("properties", {}).get(key) != value:
-                        match = False
-                        break
-                
-                if match:
-                    results.append({
-                        "id": entity_id,
-                        "type": entity_type,
-                        **entity_data.get("properties", {})
-                    })
-                    
-                if len(results) >= limit:
-                    break
-        
+
+        # Start from the smallest indexed id set; the remaining predicates are
+        # checked per candidate. None also matches a missing property, and
+        # unhashable values are not indexed, so neither can narrow the set.
+        candidates: IdSet = self._by_type.get(entity_type, {})
+        for key, value in query_properties.items():
+            index_key = _index_key(key, value) if value is not None else None
+            if index_key is None:
+                continue
+            ids = self._by_property.get(index_key, {})
+            if len(ids) < len(candidates):
+                candidates = ids
+
+        for entity_id in candidates:
+            entity_data = self.graph[entity_id]
+            if entity_data.get("type") != entity_type:
+                continue
+            properties = entity_data.get("properties", {})
+            if any(properties.get(key) != value for key, value in query_properties.items()):
+                continue
+
+            results.append({
+                "id": entity_id,
+                "type": entity_type,
+                **properties
+            })
+            if len(results) >= limit:
+                break
+
         logger.debug(f"Query returned {len(results)} results for type {entity_type}")
         return results
-    
+
     def semantic_search(
         self,
         query_text: str,
@@ -109,43 +163,150 @@ class GraphBuilder:
     ) -> List[Dict[str, Any]]:
         """
         Perform semantic search in the knowledge graph.
-        
+
+        Entities must contain every query token in their string properties.
+        The score sums, over query tokens, the number of string properties
+        containing the token weighted by the token's IDF, so rare tokens
+        (service names, error codes) dominate common ones.
+
         Args:
             query_text: Text to search for
             entity_type: Optional entity type to filter by
             limit: Maximum number of results
-            
+
         Returns:
-            List of matching entities
+            List of matching entities, best first
         """
+        terms = list(dict.fromkeys(_tokens(query_text)))
+        postings = [self._postings.get(term, {}) for term in terms]
+        if not terms or any(not p for p in postings):
+            return []
+
+        # Intersect from the rarest token
+        order = sorted(range(len(terms)), key=lambda i: len(postings[i]))
+        rarest, rest = postings[order[0]], [postings[i] for i in order[1:]]
+        type_ids = self._by_type.get(entity_type, {}) if entity_type else None
+        n_entities = max(1, sum(len(ids) for ids in self._by_type.values()))
+        idf = [math.log(1.0 + n_entities / len(p)) for p in postings]
+
+        def scored() -> Iterable[Tuple[float, str]]:
+            for entity_id in rarest:
+                if type_ids is not None and entity_id not in type_ids:
+                    continue
+                if all(entity_id in p for p in rest):
+                    yield sum(w * p[entity_id] for w, p in zip(idf, postings)), entity_id
+
+        # nlargest is stable: ties keep insertion order
+        best = heapq.nlargest(limit, scored(), key=lambda item: item[0])
         results = []
-        query_lower = query_text.lower()
-        
-        for entity_id, entity_data in self.graph.items():
-            if not isinstance(entity_data, dict):
-                continue
-                
-            # Filter by entity type if specified
-            if entity_type and entity_data.get("type") != entity_type:
+        for score, entity_id in best:
+            entity_data = self.graph[entity_id]
+            results.append({
+                "id": entity_id,
+                "type": entity_data.get("type"),
+                "score": score,
+                **entity_data.get("properties", {})
+            })
+
+        logger.debug(f"Semantic search returned {len(results)} results")
+        return results
+
+    def get_relationships(
+        self,
+        entity_id: str,
+        relationship_type: Optional[str] = None,
+        direction: str = "out"
+    ) -> List[Dict[str, Any]]:
+        """
+        Relationships of an entity from the adjacency lists.
+
+        Args:
+            entity_id: Entity whose relationships to return
+            relationship_type: Optional relationship type to filter by
+            direction: "out" (entity is the source), "in" (target) or "both"
+
+        Returns:
+            List of relationship dicts as stored in the graph
+        """
+        if direction not in ("out", "in", "both"):
+            raise ValueError(f"direction must be 'out', 'in' or 'both', got {direction!r}")
+        edges: List[Dict[str, Any]] = []
+        if direction in ("out", "both"):
+            edges.extend(self._outgoing.get(entity_id, []))
+        if direction in ("in", "both"):
+            edges.extend(self._incoming.get(entity_id, []))
+        if relationship_type is not None:
+            edges = [edge for edge in edges if edge["type"] == relationship_type]
+        return edges
+
+    def neighbors(
+        self,
+        entity_id: str,
+        relationship_type: Optional[str] = None,
+        direction: str = "out",
+        max_depth: int = 1
+    ) -> Dict[str, int]:
+        """
+        Entities reachable within max_depth hops (breadth-first).
+
+        Args:
+            entity_id: Start entity
+            relationship_type: Optional relationship type to follow
+            direction: "out", "in" or "both"
+            max_depth: Maximum number of hops
+
+        Returns:
+            Mapping of reachable entity id -> hop distance, nearest first
+        """
+        depths: Dict[str, int] = {}
+        frontier = deque([(entity_id, 0)])
+        visited = {entity_id}
+        while frontier:
+            current, depth = frontier.popleft()
+            if depth >= max_depth:
                 continue
-            
-            # Simple text matching in properties
-            properties = entity_data.get("properties", {})
-            match_score = 0
-            
-            for value in properties.values():
-                if isinstance(value, str) and query_lower in value.lower():
-                    match_score += 1
-            
-            if match_score > 0:
-                results.append({
-                    "id": entity_id,
-                    "type": entity_data.get("type"),
-                    "score": match_score,
-                    **properties
-                })
-        
-        # Sort by score and limit results
-        results.sort(key=lambda x: x.get("score", 0), reverse=True)
-        logger.debug(f"Semantic search returned {len(results[:limit])} results")
-        return results[:limit]
+            for edge in self.get_relationships(current, relationship_type, direction):
+                other = edge["target"] if edge["source"] == current else edge["source"]
+                if other not in visited:
+                    visited.add(other)
+                    depths[other] = depth + 1
+                    frontier.append((other, depth + 1))
+        return depths
+
+    def _index(self, entity_id: str, entity_type: str, properties: Dict[str, Any]) -> None:
+        self._by_type[entity_type][entity_id] = None
+        for key, value in properties.items():
+            index_key = _index_key(key, value)
+            if index_key is not None:
+                self._by_property[index_key][entity_id] = None
+        for token, count in self._token_counts(properties).items():
+            self._postings[token][entity_id] = count
+
+    def _unindex(self, entity_id: str) -> None:
+        entity_data = self.graph[entity_id]
+        properties = entity_data.get("properties", {})
+        self._discard(self._by_type, entity_data.get("type"), entity_id)
+        for key, value in properties.items():
+            index_key = _index_key(key, value)
+            if index_key is not None:
+                self._discard(self._by_property, index_key, entity_id)
+        for token in self._token_counts(properties):
+            self._discard(self._postings, token, entity_id)
+
+    @staticmethod
+    def _token_counts(properties: Dict[str, Any]) -> Dict[str, int]:
+        """Number of string properties containing each token."""
+        counts: Dict[str, int] = defaultdict(int)
+        for value in properties.values():
+            if isinstance(value, str):
+                for token in set(_tokens(value)):
+                    counts[token] += 1
+        return counts
+
+    @staticmethod
+    def _discard(index: Dict[Any, Dict[str, Any]], key: Any, entity_id: str) -> None:
+        ids = index.get(key)
+        if ids is not None:
+            ids.pop(entity_id, None)
+            if not ids:
+                del index[key]
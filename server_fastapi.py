@@ -5,7 +5,7 @@ from uuid import UUID
 from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.responses import HTMLResponse, Response, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import random
@@ -80,7 +80,6 @@ if config.api.enable_cors:
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
-        allow_origins=["*"],
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
@@ -98,6 +97,44 @@ try:
 except Exception as e:
     logger.warning(f"Could not mount static files: {e}")
 
+# --- Pagination helpers for /api/incidents and /api/decisions ---
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def _page_filters(
+    status: Optional[str],
+    severity: Optional[str],
+    service: Optional[str],
+    since: Optional[str],
+    until: Optional[str]
+) -> Dict[str, Any]:
+    """Validate list filters and map them onto repository keyword arguments."""
+    filters: Dict[str, Any] = {"status": status, "severity": severity, "service": service}
+    for name, value, key in (("since", since, "created_after"), ("until", until, "created_before")):
+        if value is None:
+            continue
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid '{name}' timestamp: {value}")
+        # created_at is stored as UTC ISO text and compared as a string, so
+        # the bound must be UTC too; naive input is taken as UTC
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        filters[key] = parsed.astimezone(timezone.utc).isoformat()
+    return filters
+
+
+def _project(items: List[Dict[str, Any]], fields: Optional[str]) -> List[Dict[str, Any]]:
+    """Apply a `fields=a,b,c` projection; unknown field names are ignored."""
+    if not fields:
+        return items
+    wanted = [f.strip() for f in fields.split(",") if f.strip()]
+    return [{k: item[k] for k in wanted if k in item} for item in items]
+
+
 # Global references for demo
 # Global references for demo
 repo = None
@@ -183,12 +220,30 @@ async def metrics():
 
 
 @app.get("/api/decisions")
-async def api_decisions():
-    """Return pending decisions as JSON for the dashboard frontend."""
+async def api_decisions(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    severity: Optional[str] = None,
+    service: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """
+    Return one page of decisions as JSON for the dashboard frontend.
+
+    Pages are keyset-paginated on (created_at, decision_id), newest first;
+    the cursor for the next page is returned in the X-Next-Cursor header.
+    """
     if not repo:
         return []
+    filters = _page_filters(status, severity, service, since, until)
     try:
-        decisions = repo.get_pending_decisions()
+        decisions, next_cursor = repo.get_decisions_page(limit=limit, cursor=cursor, **filters)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         # Ensure created_at is JSON-serializable (string)
         processed = []
         for d in decisions:
@@ -202,7 +257,9 @@ async def api_decisions():
             except Exception:
                 item['created_at'] = str(ca)
             processed.append(item)
-        return processed
+        return _project(processed, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching decisions for API: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch decisions")
@@ -217,16 +274,8 @@ async def get_incident_details(incident_id: str):
         raise HTTPException(status_code=503, detail="Repository not available")
     
     try:
-        # Get all incidents and find the one matching incident_id
         # Note: incident_id here is actually the decision_id from DecisionCandidate
-        all_incidents = repo.get_all_incidents()
-        
-        # Find matching incident by decision_id
-        matching_incident = None
-        for inc in all_incidents:
-            if inc["decision_id"] == incident_id:
-                matching_incident = dict(inc)  # Make a copy
-                break
+        matching_incident = repo.get_incident(incident_id)
         
         if matching_incident is None:
             # Return basic structure as fallback
@@ -305,16 +354,32 @@ async def get_incident_details(incident_id: str):
 
 
 @app.get("/api/incidents")
-async def list_incidents():
+async def list_incidents(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    severity: Optional[str] = None,
+    service: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    fields: Optional[str] = None
+):
     """
-    List all incidents (DecisionCandidate nodes) with execution count.
+    List one page of incidents (DecisionCandidate nodes) with execution count.
     Used by frontend incident selector dropdown.
+
+    Pages are keyset-paginated on (created_at, decision_id), newest first;
+    the cursor for the next page is returned in the X-Next-Cursor header.
     """
     if not repo:
         raise HTTPException(status_code=503, detail="Repository not available")
     
+    filters = _page_filters(status, severity, service, since, until)
     try:
-        incidents = repo.get_all_incidents()
+        incidents, next_cursor = repo.get_incidents_page(limit=limit, cursor=cursor, **filters)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         # Transform the response to use "id" instead of "decision_id" for frontend compatibility
         # Also serialize DateTime objects
         transformed_incidents = []
@@ -337,7 +402,9 @@ async def list_incidents():
                 "decision_summary": inc.get("full_summary", ""),
                 "execution_count": inc.get("execution_count", 0)
             })
-        return transformed_incidents
+        return _project(transformed_incidents, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing incidents: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch incidents")
@@ -570,12 +637,30 @@ async def metrics():
 
 
 @app.get("/api/decisions")
-async def api_decisions():
-    """Return pending decisions as JSON for the dashboard frontend."""
+async def api_decisions(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    severity: Optional[str] = None,
+    service: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """
+    Return one page of decisions as JSON for the dashboard frontend.
+
+    Pages are keyset-paginated on (created_at, decision_id), newest first;
+    the cursor for the next page is returned in the X-Next-Cursor header.
+    """
     if not repo:
         return []
+    filters = _page_filters(status, severity, service, since, until)
     try:
-        decisions = repo.get_pending_decisions()
+        decisions, next_cursor = repo.get_decisions_page(limit=limit, cursor=cursor, **filters)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         # Ensure created_at is JSON-serializable (string)
         processed = []
         for d in decisions:
@@ -589,7 +674,9 @@ async def api_decisions():
             except Exception:
                 item['created_at'] = str(ca)
             processed.append(item)
-        return processed
+        return _project(processed, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching decisions for API: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch decisions")
@@ -604,16 +691,8 @@ async def get_incident_details(incident_id: str):
         raise HTTPException(status_code=503, detail="Repository not available")
     
     try:
-        # Get all incidents and find the one matching incident_id
         # Note: incident_id here is actually the decision_id from DecisionCandidate
-        all_incidents = repo.get_all_incidents()
-        
-        # Find matching incident by decision_id
-        matching_incident = None
-        for inc in all_incidents:
-            if inc["decision_id"] == incident_id:
-                matching_incident = dict(inc)  # Make a copy
-                break
+        matching_incident = repo.get_incident(incident_id)
         
         if matching_incident is None:
             # Return basic structure as fallback
@@ -692,16 +771,32 @@ async def get_incident_details(incident_id: str):
 
 
 @app.get("/api/incidents")
-async def list_incidents():
+async def list_incidents(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    severity: Optional[str] = None,
+    service: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    fields: Optional[str] = None
+):
     """
-    List all incidents (DecisionCandidate nodes) with execution count.
+    List one page of incidents (DecisionCandidate nodes) with execution count.
     Used by frontend incident selector dropdown.
+
+    Pages are keyset-paginated on (created_at, decision_id), newest first;
+    the cursor for the next page is returned in the X-Next-Cursor header.
     """
     if not repo:
         raise HTTPException(status_code=503, detail="Repository not available")
     
+    filters = _page_filters(status, severity, service, since, until)
     try:
-        incidents = repo.get_all_incidents()
+        incidents, next_cursor = repo.get_incidents_page(limit=limit, cursor=cursor, **filters)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         # Transform the response to use "id" instead of "decision_id" for frontend compatibility
         # Also serialize DateTime objects
         transformed_incidents = []
@@ -724,7 +819,9 @@ async def list_incidents():
                 "decision_summary": inc.get("full_summary", ""),
                 "execution_count": inc.get("execution_count", 0)
             })
-        return transformed_incidents
+        return _project(transformed_incidents, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing incidents: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch incidents")
@@ -2,20 +2,112 @@
 Log Inspector Agent - Strands Agent Wrapper
 
 Interacts with Kubernetes to fetch and analyze logs from pods.
+
+Pod logs are fetched concurrently by a bounded thread pool (the Kubernetes
+client is synchronous) and streamed line by line into the error-block
+parser, with per-pod byte and line caps. Collection stops early once
+`max_error_blocks` blocks have been found across all pods.
+
+Error blocks are then collapsed into log templates (see
+src/utils/log_templates.py), so the same stack trace from N pods becomes one
+evidence entry with a count, the affected pods and a single exemplar. Each
+service keeps its template miner across runs, which keeps template ids
+stable and marks errors already seen in earlier runs as recurring.
 """
 
+import asyncio
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from kubernetes import client, config
 from kubernetes.client.rest import ApiException
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 from tenacity import retry, stop_after_attempt, wait_fixed
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
 
 from src.models.alert import NormalizedAlert
 from src.models.swarm import SwarmResult, EvidenceItem, EvidenceType
+from src.utils.log_templates import LogTemplate, LogTemplateMiner
 
 logger = logging.getLogger(__name__)
 
+ERROR_KEYWORDS = ("ERROR", "CRITICAL", "Exception", "Panic", "Traceback")
+
+# Per-pod log read failures: API errors and transport errors mid-stream
+# (urllib3 ProtocolError/ReadTimeoutError, socket errors)
+_LOG_READ_ERRORS = (ApiException, Urllib3HTTPError, OSError)
+
+
+class _ErrorBlockParser:
+    """
+    Line-at-a-time parser for keyword lines and their multi-line stack traces.
+
+    `feed` returns an error block once the line after it shows it is complete;
+    `finish` returns the block still open at the end of the log.
+    """
+
+    def __init__(self):
+        self._block: Optional[List[str]] = None
+
+    def feed(self, line: str) -> Optional[str]:
+        completed = None
+        if self._block is not None:
+            if self._is_continuation(line):
+                self._block.append(line)
+                return None
+            completed = "\n".join(self._block)
+            self._block = None
+
+        # Check if line contains a keyword AND is not part of an existing stack trace context
+        # (Simple heuristic: usually keywords start the line or follow a timestamp)
+        if any(keyword in line for keyword in ERROR_KEYWORDS):
+            self._block = [line]
+        return completed
+
+    def finish(self) -> Optional[str]:
+        block, self._block = self._block, None
+        return "\n".join(block) if block is not None else None
+
+    @staticmethod
+    def _is_continuation(line: str) -> bool:
+        stripped = line.strip()
+
+        # Heuristic: A new log entry usually starts with a timestamp (202X-...) or a log level (INFO, DEBUG, WARN, ERROR)
+        # If it doesn't start with these, assume it's part of the previous error (stack trace, multi-line message)
+        is_new_log_entry = (
+            stripped.startswith(("202", "INFO", "DEBUG", "WARN", "WARNING")) or
+            (stripped.startswith("ERROR") and "at " not in stripped) or # ERROR could be start of new error, unless it's inside a stack trace (rare)
+            stripped.startswith("CRITICAL")
+        )
+
+        # Special case: If the line is indented, it's definitely a continuation (stack trace)
+        is_indented = line.startswith((' ', '\t'))
+
+        return is_indented or not is_new_log_entry
+
+
+class _ErrorCollector:
+    """Error-block budget shared by the pod readers of one collection."""
+
+    def __init__(self, max_blocks: int):
+        self._remaining = max_blocks
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self._remaining <= 0
+
+    def add(self, errors: List[str], block: str) -> bool:
+        """Append `block` if budget remains; False once collection should stop."""
+        with self._lock:
+            if self._remaining <= 0:
+                return False
+            self._remaining -= 1
+            errors.append(block)
+            return self._remaining > 0
+
 
 class LogInspectorAgent:
     """
@@ -25,10 +117,32 @@ class LogInspectorAgent:
     AGENT_NAME = "LogInspectorAgent"
     agent_id = "log_inspector"
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: int = 8,
+        max_bytes_per_pod: int = 2 * 1024 * 1024,
+        max_lines_per_pod: int = 20_000,
+        max_error_blocks: int = 100,
+        max_cached_services: int = 256,
+    ):
         """
         Initialize Log Inspector agent.
+
+        Args:
+            max_workers: Pods whose logs are read concurrently.
+            max_bytes_per_pod: Log bytes read per pod before giving up on the rest.
+            max_lines_per_pod: Log lines read per pod before giving up on the rest.
+            max_error_blocks: Error blocks collected across all pods before stopping.
+            max_cached_services: Services whose log templates are kept across runs.
         """
+        self.max_workers = max(1, max_workers)
+        self.max_bytes_per_pod = max_bytes_per_pod
+        self.max_lines_per_pod = max_lines_per_pod
+        self.max_error_blocks = max_error_blocks
+        self.max_cached_services = max(1, max_cached_services)
+        self._template_miners: "OrderedDict[str, LogTemplateMiner]" = OrderedDict()
+        self._template_lock = threading.Lock()
+
         try:
             # Try to load in-cluster configuration
             config.load_incluster_config()
@@ -59,23 +173,140 @@ class LogInspectorAgent:
                 "suggested_action": "Verify the deployment status and check for scaling issues."
             }
 
-        all_errors = []
-        for pod in pods:
-            try:
-                logs = self.v1.read_namespaced_pod_log(
-                    name=pod.metadata.name,
-                    namespace=namespace,
-                    since_seconds=since_seconds,
-                    _preload_content=True,
-                ).decode("utf-8")
-                errors = self._parse_logs(logs)
-                if errors:
-                    all_errors.append({"pod": pod.metadata.name, "errors": errors})
-            except ApiException as e:
-                logger.error(f"Error reading logs for pod {pod.metadata.name}: {e}")
-                all_errors.append({"pod": pod.metadata.name, "errors": [f"Could not retrieve logs: {e}"]})
-
-        return self._format_analysis(service_name, all_errors, len(pods))
+        collector = _ErrorCollector(self.max_error_blocks)
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(pods)), thread_name_prefix="pod-logs"
+        ) as pool:
+            results = list(pool.map(
+                lambda pod: self._collect_pod_errors(pod.metadata.name, namespace, since_seconds, collector),
+                pods,
+            ))
+
+        all_errors = [result for result in results if result is not None]
+        templates = self._mine_templates(f"{namespace}/{service_name}", all_errors)
+        return self._format_analysis(service_name, templates, len(pods))
+
+    def _mine_templates(self, cache_key: str, all_errors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Collapse per-pod error blocks into templates, most frequent first.
+
+        Args:
+            cache_key: Namespace-qualified service name owning the miner.
+            all_errors: Per-pod results from `_collect_pod_errors`.
+
+        Returns:
+            One entry per template seen in this run, with its run-local count,
+            affected pods, first exemplar and whether it predates this run.
+        """
+        with self._template_lock:
+            miner = self._template_miners.get(cache_key)
+            if miner is None:
+                miner = self._template_miners[cache_key] = LogTemplateMiner()
+                while len(self._template_miners) > self.max_cached_services:
+                    self._template_miners.popitem(last=False)
+            else:
+                self._template_miners.move_to_end(cache_key)
+
+            known_below = miner.next_id
+            seen: Dict[int, Dict[str, Any]] = {}
+            for error_info in all_errors:
+                for block in error_info["errors"]:
+                    template: LogTemplate = miner.add(block)
+                    entry = seen.get(template.template_id)
+                    if entry is None:
+                        entry = seen[template.template_id] = {
+                            "template": template, "count": 0, "pods": [], "exemplar": block,
+                        }
+                    entry["count"] += 1
+                    if error_info["pod"] not in entry["pods"]:
+                        entry["pods"].append(error_info["pod"])
+
+            # Render after the whole run: later blocks may have generalized a template
+            templates = [
+                {
+                    "template_id": template_id,
+                    "template": entry["template"].template,
+                    "count": entry["count"],
+                    "pods": entry["pods"],
+                    "exemplar": entry["exemplar"],
+                    "recurring": template_id < known_below,
+                }
+                for template_id, entry in seen.items()
+            ]
+
+        templates.sort(key=lambda t: -t["count"])
+        return templates
+
+    def _collect_pod_errors(
+        self, pod_name: str, namespace: str, since_seconds: int, collector: _ErrorCollector
+    ) -> Optional[Dict[str, Any]]:
+        """Stream one pod's log through the parser; None if it has no errors."""
+        if collector.done:
+            return None
+
+        try:
+            response = self.v1.read_namespaced_pod_log(
+                name=pod_name,
+                namespace=namespace,
+                since_seconds=since_seconds,
+                _preload_content=False,
+            )
+        except _LOG_READ_ERRORS as e:
+            logger.error(f"Error reading logs for pod {pod_name}: {e}")
+            return {"pod": pod_name, "errors": [f"Could not retrieve logs: {e}"]}
+
+        parser = _ErrorBlockParser()
+        errors: List[str] = []
+        try:
+            for line in self._iter_log_lines(response):
+                block = parser.feed(line)
+                if block is not None and not collector.add(errors, block):
+                    break
+            else:
+                block = parser.finish()
+                if block is not None:
+                    collector.add(errors, block)
+        except _LOG_READ_ERRORS as e:
+            logger.error(f"Error reading logs for pod {pod_name}: {e}")
+            errors.append(f"Could not retrieve logs: {e}")
+        finally:
+            # Close before releasing: an early stop leaves unread bytes on the socket
+            if hasattr(response, "release_conn"):
+                response.close()
+                response.release_conn()
+
+        return {"pod": pod_name, "errors": errors} if errors else None
+
+    def _iter_log_lines(self, response: Any) -> Iterator[str]:
+        """
+        Yield decoded log lines, stopping at the per-pod byte and line caps.
+
+        Accepts a streaming urllib3 response or an already-loaded body.
+        """
+        if isinstance(response, (bytes, str)):
+            chunks: Iterable[bytes] = [response.encode("utf-8") if isinstance(response, str) else response]
+        else:
+            chunks = response.stream(64 * 1024)
+
+        budget = self.max_bytes_per_pod
+        lines = 0
+        pending = b""
+        for chunk in chunks:
+            if len(chunk) >= budget:
+                chunk = chunk[:budget]
+            budget -= len(chunk)
+            pending += chunk
+            *complete, pending = pending.split(b"\n")
+            for raw in complete:
+                yield raw.decode("utf-8", errors="replace")
+                lines += 1
+                if lines >= self.max_lines_per_pod:
+                    return
+            if budget <= 0:
+                logger.debug(f"Pod log truncated at {self.max_bytes_per_pod} bytes")
+                break
+        # Trailing segment after the last newline, like str.split
+        yield pending.decode("utf-8", errors="replace")
 
     @retry(stop=stop_after_attempt(3), wait=wait_fixed(2))
     def _find_pods_by_service(self, service_name: str, namespace: str) -> List[Any]:
@@ -119,48 +350,11 @@ class LogInspectorAgent:
         Returns:
             A list of strings, where each string is an error block or a stack trace.
         """
-        keywords = ["ERROR", "CRITICAL", "Exception", "Panic", "Traceback"]
-        lines = logs.split('\n')
-        errors = []
-        
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            # Check if line contains a keyword AND is not part of an existing stack trace context
-            # (Simple heuristic: usually keywords start the line or follow a timestamp)
-            if any(keyword in line for keyword in keywords):
-                # Found an error start. Capture it.
-                error_block = [line]
-                i += 1
-                
-                # Capture subsequent lines until we hit a new log entry
-                while i < len(lines):
-                    next_line = lines[i]
-                    stripped = next_line.strip()
-                    
-                    # Heuristic: A new log entry usually starts with a timestamp (202X-...) or a log level (INFO, DEBUG, WARN, ERROR)
-                    # If it doesn't start with these, assume it's part of the previous error (stack trace, multi-line message)
-                    is_new_log_entry = (
-                        stripped.startswith(("202", "INFO", "DEBUG", "WARN", "WARNING")) or
-                        (stripped.startswith("ERROR") and "at " not in stripped) or # ERROR could be start of new error, unless it's inside a stack trace (rare)
-                        stripped.startswith("CRITICAL")
-                    )
-                    
-                    # Special case: If the line is indented, it's definitely a continuation (stack trace)
-                    is_indented = next_line.startswith((' ', '\t'))
-                    
-                    if is_indented or not is_new_log_entry:
-                        error_block.append(next_line)
-                        i += 1
-                    else:
-                        break
-                
-                errors.append("\n".join(error_block))
-                # Continue the outer loop from the current i, skipping the increment below
-                continue
-
-            i += 1
-                
+        parser = _ErrorBlockParser()
+        errors = [block for block in map(parser.feed, logs.split('\n')) if block is not None]
+        block = parser.finish()
+        if block is not None:
+            errors.append(block)
         return errors
 
     async def analyze(self, alert: NormalizedAlert) -> SwarmResult:
@@ -175,21 +369,23 @@ class LogInspectorAgent:
         """
         logger.info(f"[{self.agent_id}] Analyzing logs for {alert.service}...")
         
-        # Call the synchronous method (or refactor to async if k8s client supports it)
-        # For now, we wrap the result in SwarmResult
-        analysis = self.get_pod_logs(alert.service)
+        # The Kubernetes client is synchronous: collect in a worker thread so
+        # the event loop is not blocked by the per-pod log reads
+        analysis = await asyncio.to_thread(self.get_pod_logs, alert.service)
         
-        # Convert dictionary evidence to EvidenceItem objects
+        # One EvidenceItem per log template rather than per pod
         evidence_items = []
         for ev in analysis.get("evidence", []):
-            # Create a description from the log snippets
-            snippets = "\n".join(ev.get("log_snippets", []))
+            pods = ev.get("pods", [])
+            recurring = " (recurring)" if ev.get("recurring") else ""
             evidence_items.append(EvidenceItem(
                 type=EvidenceType.LOG,
-                description=f"Logs from pod {ev.get('pod_name')}:\n{snippets[:500]}...", # Truncate for brevity
-                source_url=f"kubectl logs {ev.get('pod_name')}",
+                description=(
+                    f"Log template #{ev.get('template_id')}{recurring}: {ev.get('count')}x "
+                    f"in {len(pods)} pod(s) {pods[:5]}:\n{ev.get('exemplar', '')[:500]}"  # Truncate for brevity
+                ),
+                source_url=f"kubectl logs {pods[0]}",
                 timestamp=datetime.now(timezone.utc),
-                metadata={"pod": ev.get("pod_name"), "full_logs": snippets}
             ))
             
         return SwarmResult(
@@ -200,36 +396,30 @@ class LogInspectorAgent:
             suggested_actions=[analysis.get("suggested_action", "Check logs manually.")]
         )
 
-    def _format_analysis(self, service_name: str, all_errors: List[Dict[str, Any]], total_pods: int) -> Dict[str, Any]:
+    def _format_analysis(self, service_name: str, templates: List[Dict[str, Any]], total_pods: int) -> Dict[str, Any]:
         """
         Formats the analysis into a dictionary (internal helper).
         """
-        if not all_errors:
+        if not templates:
             return {
                 "hypothesis": f"No critical errors found in the logs for service '{service_name}'.",
                 "evidence": [],
                 "suggested_action": "No immediate action required. Continue monitoring."
             }
 
-        error_pods_count = len(all_errors)
+        error_pods = list(dict.fromkeys(pod for t in templates for pod in t["pods"]))
         hypothesis = (
-            f"Errors detected in {error_pods_count} of {total_pods} pods for the service '{service_name}'."
+            f"Errors detected in {len(error_pods)} of {total_pods} pods for the service '{service_name}'."
         )
 
-        evidence = []
-        for error_info in all_errors:
-            evidence.append({
-                "pod_name": error_info['pod'],
-                "errors": error_info['errors']
-            })
-
         suggested_action = (
-            f"Investigate the health of the affected pods: {[e['pod'] for e in all_errors]}. "
+            f"Investigate the health of the affected pods: {error_pods}. "
             "Consider restarting the deployment if the errors persist."
         )
 
         return {
             "hypothesis": hypothesis,
-            "evidence": evidence,
+            "evidence": templates,
             "suggested_action": suggested_action
         }
+
@@ -18,6 +18,7 @@ from src.models.metric_trend import MetricTrend
 from src.models.decision import Decision, DecisionState, HumanValidationStatus, SemanticEvidence
 from src.rules.decision_rules import RuleEngine, RuleResult
 from src.providers.github_models import GitHubModels, MissingTokenError
+from src.llm.response_cache import get_default_cache
 from src.services.semantic_recovery_service import SemanticRecoveryService
 
 logger = logging.getLogger(__name__)
@@ -64,6 +65,8 @@ class DecisionEngine:
         self._llm_threshold = llm_fallback_threshold
         self._llm_enabled = llm_enabled
         self._semantic_recovery = SemanticRecoveryService(threshold=llm_fallback_threshold)
+        # Created on first LLM fallback and reused, so its HTTP connections are pooled
+        self._llm_provider: Optional[GitHubModels] = None
     
     async def decide(
         self,
@@ -195,7 +198,9 @@ class DecisionEngine:
 
         # Try to call GitHubModels provider; if not available, fall back to simulated reply
         try:
-            gh = GitHubModels()
+            if self._llm_provider is None:
+                self._llm_provider = GitHubModels(response_cache=get_default_cache())
+            gh = self._llm_provider
             # Use provider stream API to get assistant text
             messages = [
                 {"role": "system", "content": system_prompt},
@@ -204,7 +209,7 @@ class DecisionEngine:
 
             assistant_text = ""
             async for ev in gh.stream(messages):
-                # collect deltas (provider yields a single event in current impl)
+                # collect streamed deltas
                 cb = ev.get("contentBlockDelta", {})
                 delta = cb.get("delta", {})
                 text = delta.get("text") if isinstance(delta, dict) else None
@@ -8,6 +8,7 @@ permitindo que o sistema aprenda e evolua com o tempo.
 import logging
 import uuid
 import os
+import time
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone
 import json
@@ -26,6 +27,7 @@ except ImportError:
         logger.warning("Could not import HTTPModel from root. LLM generation may fail.")
         HTTPModel = None
 
+from src.llm.response_cache import get_default_cache, make_cache_key
 from src.core.neo4j_playbook_store import (
     Neo4jPlaybookStore, Playbook, PlaybookStatus, PlaybookSource
 )
@@ -52,6 +54,7 @@ class PlaybookGeneratorAgent:
         self.playbook_store = playbook_store
         self.endpoint = endpoint or os.environ.get("AGENT_MODEL_ENDPOINT", "http://localhost:8000/generate")
         self.llm_agent = None
+        self.response_cache = get_default_cache()
         self._initialize_llm()
     
     def _initialize_llm(self):
@@ -213,17 +216,30 @@ Generate a practical, executable playbook that an SRE can follow step-by-step.
 """
         return prompt
     
-    def _call_llm(self, prompt: str) -> Optional[Dict[str, Any]]:
+    def _call_llm(self, prompt: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
         """
         Chama LLM para gerar playbook via strands-agents.
+        
+        Respostas que viram JSON válido são cacheadas por prompt normalizado
+        (ver src.llm.response_cache); `use_cache=False` força nova geração.
         """
         try:
             if not self.llm_agent:
                 logger.error("LLM agent not initialized")
                 return None
             
-            logger.info("Calling LLM to generate playbook...")
-            response_text = self.llm_agent.think(prompt)
+            cache = self.response_cache if use_cache else None
+            cache_key = make_cache_key("strands_agent", self.endpoint, None, prompt)
+            response_text = cache.get(cache_key) if cache else None
+            elapsed = 0.0
+            
+            if response_text is None:
+                logger.info("Calling LLM to generate playbook...")
+                started = time.perf_counter()
+                response_text = self.llm_agent.think(prompt)
+                elapsed = time.perf_counter() - started
+            else:
+                cache = None  # cache hit, nothing to store
             
             if not response_text:
                 logger.warning("LLM returned empty response")
@@ -237,7 +253,10 @@ Generate a practical, executable playbook that an SRE can follow step-by-step.
                 cleaned_text = cleaned_text.split("```")[1].split("```")[0].strip()
 
             try:
-                return json.loads(cleaned_text)
+                playbook_data = json.loads(cleaned_text)
+                if cache:
+                    cache.put(cache_key, response_text, elapsed)
+                return playbook_data
             except json.JSONDecodeError as e:
                 logger.error(f"Failed to parse LLM response as JSON: {e}")
                 logger.debug(f"Raw response: {response_text}")
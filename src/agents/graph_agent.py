@@ -5,14 +5,24 @@ Manages semantic search over past decisions and maintains
 a knowledge graph of alert-decision relationships.
 
 Constitution Principle III: Provide semantic evidence from similar cases.
+
+Similar-decision search is hybrid: decision summaries are also kept in a
+local BM25 index, whose ranking is fused with the vector ranking by
+reciprocal-rank fusion so that exact service, metric and error tokens are
+not lost to dense similarity.
 """
 
+import asyncio
+import hashlib
 import logging
 import os
-from typing import TYPE_CHECKING, List, Optional, Any
+import random
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Tuple
 from uuid import UUID
 from datetime import datetime, timezone
 
+import numpy as np
+
 try:
     from qdrant_client import QdrantClient
     from qdrant_client.models import Distance, VectorParams, PointStruct
@@ -43,6 +53,9 @@ else:
 
 from src.models.decision import Decision, SemanticEvidence
 from src.models.cluster import AlertCluster
+from src.tools.embedding_batcher import EmbeddingBatcher
+from src.utils.vector_index import InMemoryVectorIndex
+from src.utils.bm25_index import BM25Index, reciprocal_rank_fusion
 
 logger = logging.getLogger(__name__)
 
@@ -60,6 +73,7 @@ class GraphAgent:
     AGENT_NAME = "GraphAgent"
     COLLECTION_NAME = "alert_decisions"
     VECTOR_SIZE = 384  # Default for sentence-transformers/all-MiniLM-L6-v2
+    CANDIDATES_PER_RESULT = 4  # Each retriever's depth before fusion, per requested result
     
     def __init__(
         self,
@@ -70,10 +84,17 @@ class GraphAgent:
         enable_neo4j: bool = False,
         neo4j_uri: Optional[str] = None,
         neo4j_user: Optional[str] = None,
-        neo4j_password: Optional[str] = None
+        neo4j_password: Optional[str] = None,
+        quantize_memory_store: bool = False,
+        lexical_index_path: Optional[str] = None
     ):
         """
         Initialize graph agent.
+
+        quantize_memory_store keeps the in-memory fallback as int8 codes
+        (~4x smaller, approximate scores) for large offline stores.
+        lexical_index_path (or DECISION_BM25_PATH) persists the BM25 index
+        of decision summaries; it is saved on close().
         """
         self._collection_name = collection_name
         self.enable_qdrant = enable_qdrant and QDRANT_AVAILABLE
@@ -95,8 +116,19 @@ class GraphAgent:
             logger.warning(f"[{self.AGENT_NAME}] Failed to load embedding model, falling back to dummy: {e}")
             self._model = None
 
+        # Micro-batches concurrent async embed calls into one forward pass
+        self._batcher = EmbeddingBatcher(self._encode_batch) if self._model else None
+
         # In-memory fallback for offline mode
-        self._memory_store: List[dict] = []
+        self._memory_store = InMemoryVectorIndex(
+            dim=self.VECTOR_SIZE, quantize=quantize_memory_store
+        )
+
+        # Lexical side of hybrid search
+        self._lexical_index_path = lexical_index_path or os.getenv("DECISION_BM25_PATH") or None
+        self._lexical_index = (
+            BM25Index.load(self._lexical_index_path) if self._lexical_index_path else BM25Index()
+        )
         
         # Initialize Qdrant
         if self.enable_qdrant and not self._client:
@@ -298,19 +330,25 @@ class GraphAgent:
             except Exception as e:
                 logger.error(f"[{self.AGENT_NAME}] Failed to store in Qdrant: {e}")
         
-        # 3. Always store in memory as fallback
-        self._memory_store.append({
-            "id": str(decision.decision_id),
-            "vector": embedding,
-            "payload": {
-                "service": cluster.primary_service,
-                "severity": cluster.primary_severity,
-                "decision_state": decision.decision_state.value,
-                "confidence": decision.confidence,
-                "summary": summary,
-                "created_at": decision.created_at.isoformat()
-            }
-        })
+        # 3. Lexical index for hybrid search
+        self._lexical_index.add(str(decision.decision_id), summary, {"summary": summary})
+
+        # 4. Always store in memory as fallback
+        try:
+            self._memory_store.add(
+                str(decision.decision_id),
+                embedding,
+                {
+                    "service": cluster.primary_service,
+                    "severity": cluster.primary_severity,
+                    "decision_state": decision.decision_state.value,
+                    "confidence": decision.confidence,
+                    "summary": summary,
+                    "created_at": decision.created_at.isoformat()
+                }
+            )
+        except ValueError as e:
+            logger.error(f"[{self.AGENT_NAME}] Failed to store in memory: {e}")
         
         return True
 
@@ -323,40 +361,132 @@ class GraphAgent:
         """
         Find past decisions semantically similar to the current cluster.
         """
-        # Generate query text from cluster context
-        symptoms = [a.description for a in cluster.alerts[:3]]
-        query_text = f"Service: {cluster.primary_service} | Severity: {cluster.primary_severity} | Symptoms: {' | '.join(symptoms)}"
+        query_text = self._build_query_text(cluster)
         query_embedding = self._generate_embedding(query_text)
-        
+        return self._search_similar(query_embedding, top_k, min_similarity, query_text)
+
+    async def afind_similar_decisions(
+        self,
+        cluster: AlertCluster,
+        top_k: int = 3,
+        min_similarity: float = 0.7
+    ) -> List[SemanticEvidence]:
+        """
+        Async variant of find_similar_decisions for callers on the event loop.
+
+        The query embedding is micro-batched with concurrent callers and the
+        vector search runs in a worker thread, so the loop is never blocked.
+        """
+        query_text = self._build_query_text(cluster)
+        query_embedding = await self._agenerate_embedding(query_text)
+        return await asyncio.to_thread(self._search_similar, query_embedding, top_k, min_similarity, query_text)
+
+    def _build_query_text(self, cluster: AlertCluster) -> str:
+        """Generate query text from cluster context."""
+        symptoms = [a.description for a in cluster.alerts[:3]]
+        return f"Service: {cluster.primary_service} | Severity: {cluster.primary_severity} | Symptoms: {' | '.join(symptoms)}"
+
+    def _search_similar(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        min_similarity: float,
+        query_text: Optional[str] = None
+    ) -> List[SemanticEvidence]:
+        """
+        Hybrid search: vector hits fused with BM25 hits on the query text.
+
+        Every returned decision still has cosine similarity >= min_similarity;
+        lexical matches outside the vector top-k are scored by cosine before
+        being admitted, and fusion only decides their order.
+        """
+        lexical = self._lexical_index.search(query_text, top_k * self.CANDIDATES_PER_RESULT) if query_text else []
+        depth = top_k * self.CANDIDATES_PER_RESULT if lexical else top_k
+        dense = self._dense_hits(query_embedding, depth, min_similarity)
+        if not lexical:
+            return self._to_evidence(dense[:top_k])
+
+        known: Dict[str, Tuple[float, str]] = {item_id: (score, summary) for item_id, score, summary in dense}
+        missing = [item_id for item_id, _, _ in lexical if item_id not in known]
+        summaries = {item_id: payload.get("summary", "") for item_id, _, payload in lexical}
+        for item_id, score in self._score_ids(query_embedding, missing).items():
+            if score >= min_similarity:
+                known[item_id] = (score, summaries[item_id])
+
+        fused = reciprocal_rank_fusion(
+            [item_id for item_id, _, _ in dense],
+            [item_id for item_id, _, _ in lexical if item_id in known],
+        )[:top_k]
+        evidence = self._to_evidence([(item_id, *known[item_id]) for item_id, _ in fused])
+        logger.debug(f"[{self.AGENT_NAME}] Hybrid search fused {len(dense)} vector and {len(lexical)} lexical hits")
+        return evidence
+
+    def _dense_hits(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        min_similarity: float
+    ) -> List[Tuple[str, float, str]]:
+        """(id, cosine, summary) from Qdrant when enabled, falling back to the in-memory store."""
         # Search in Qdrant if enabled
         if self.enable_qdrant and self._client:
             try:
                 results = self._client.search(
                     collection_name=self._collection_name,
                     query_vector=query_embedding,
-                    limit=top_k,
+                    limit=limit,
                     score_threshold=min_similarity
                 )
-                
-                evidence = [
-                    SemanticEvidence(
-                        decision_id=UUID(str(res.id)),
-                        similarity=res.score,
-                        summary=res.payload.get("summary", ""),
-                        metadata=res.payload
-                    )
-                    for res in results
-                ]
-                
-                logger.info(f"[{self.AGENT_NAME}] Found {len(evidence)} similar decisions in Qdrant")
-                return evidence
+                logger.info(f"[{self.AGENT_NAME}] Found {len(results)} similar decisions in Qdrant")
+                return [(str(res.id), res.score, (res.payload or {}).get("summary", "")) for res in results]
             except Exception as e:
                 logger.error(f"[{self.AGENT_NAME}] Failed to search Qdrant: {e}")
         
-        # Fallback: search in memory (naive cosine similarity)
-        evidence = self._search_memory(query_embedding, top_k, min_similarity)
-        logger.debug(f"[{self.AGENT_NAME}] Found {len(evidence)} similar decisions in memory")
-        return evidence
+        # Fallback: search in memory
+        try:
+            hits = self._memory_store.search(query_embedding, limit, min_similarity)
+        except ValueError as e:
+            logger.error(f"[{self.AGENT_NAME}] In-memory search failed: {e}")
+            return []
+        logger.debug(f"[{self.AGENT_NAME}] Found {len(hits)} similar decisions in memory")
+        return [(item_id, similarity, payload.get("summary", "")) for item_id, similarity, payload in hits]
+
+    def _score_ids(self, query_embedding: List[float], item_ids: List[str]) -> Dict[str, float]:
+        """Cosine similarity of the query to specific decisions."""
+        if not item_ids:
+            return {}
+        if self.enable_qdrant and self._client:
+            try:
+                records = self._client.retrieve(
+                    collection_name=self._collection_name,
+                    ids=item_ids,
+                    with_vectors=True
+                )
+                q = np.asarray(query_embedding, dtype=np.float32)
+                q_norm = float(np.linalg.norm(q)) or 1.0
+                scores = {}
+                for record in records:
+                    v = np.asarray(record.vector, dtype=np.float32)
+                    scores[str(record.id)] = float(v @ q) / ((float(np.linalg.norm(v)) or 1.0) * q_norm)
+                return scores
+            except Exception as e:
+                logger.error(f"[{self.AGENT_NAME}] Failed to retrieve vectors from Qdrant: {e}")
+        try:
+            return self._memory_store.score_ids(query_embedding, item_ids)
+        except ValueError as e:
+            logger.error(f"[{self.AGENT_NAME}] In-memory scoring failed: {e}")
+            return {}
+
+    @staticmethod
+    def _to_evidence(hits: List[Tuple[str, float, str]]) -> List[SemanticEvidence]:
+        return [
+            SemanticEvidence(
+                decision_id=UUID(item_id),
+                similarity_score=min(1.0, max(0.0, similarity)),
+                summary=summary
+            )
+            for item_id, similarity, summary in hits
+        ]
 
     def _generate_summary(self, decision: Decision, cluster: AlertCluster) -> str:
         """
@@ -396,12 +526,28 @@ class GraphAgent:
             except Exception as e:
                 logger.error(f"[{self.AGENT_NAME}] Embedding generation failed: {e}")
         
-        # Fallback to dummy embedding if model is not available
-        import hashlib
+        return self._fallback_embedding(text)
+
+    async def _agenerate_embedding(self, text: str) -> List[float]:
+        """Async embedding through the micro-batcher (falls back like the sync path)."""
+        batcher = getattr(self, '_batcher', None)
+        if batcher:
+            try:
+                return await batcher.embed(text)
+            except Exception as e:
+                logger.error(f"[{self.AGENT_NAME}] Embedding generation failed: {e}")
+        
+        return self._fallback_embedding(text)
+
+    def _encode_batch(self, texts: List[str]) -> List[List[float]]:
+        """Single forward pass over a batch of texts (runs in a worker thread)."""
+        return self._model.encode(texts).tolist()
+
+    def _fallback_embedding(self, text: str) -> List[float]:
+        """Deterministic dummy embedding used when the model is not available."""
         hash_val = int(hashlib.md5(text.encode()).hexdigest(), 16)
-        import random
-        random.seed(hash_val)
-        return [random.random() for _ in range(self.VECTOR_SIZE)]
+        rng = random.Random(hash_val)
+        return [rng.random() for _ in range(self.VECTOR_SIZE)]
 
     def _search_memory(
         self,
@@ -409,36 +555,14 @@ class GraphAgent:
         top_k: int,
         min_similarity: float
     ) -> List[SemanticEvidence]:
-        """Search in-memory store using cosine similarity."""
-        if not self._memory_store:
+        """Search in-memory store using vectorized cosine similarity."""
+        try:
+            hits = self._memory_store.search(query_embedding, top_k, min_similarity)
+        except ValueError as e:
+            logger.error(f"[{self.AGENT_NAME}] In-memory search failed: {e}")
             return []
         
-        import math
-        
-        def cosine_similarity(v1: List[float], v2: List[float]) -> float:
-            dot_product = sum(a * b for a, b in zip(v1, v2))
-            mag1 = math.sqrt(sum(a * a for a in v1))
-            mag2 = math.sqrt(sum(a * a for a in v2))
-            if mag1 == 0 or mag2 == 0:
-                return 0
-            return dot_product / (mag1 * mag2)
-            
-        results = []
-        for item in self._memory_store:
-            sim = cosine_similarity(query_embedding, item["vector"])
-            if sim >= min_similarity:
-                results.append(
-                    SemanticEvidence(
-                        decision_id=UUID(item["id"]),
-                        similarity=sim,
-                        summary=item["payload"].get("summary", ""),
-                        metadata=item["payload"]
-                    )
-                )
-        
-        # Sort by similarity and return top_k
-        results.sort(key=lambda x: x.similarity, reverse=True)
-        return results[:top_k]
+        return self._to_evidence([(item_id, similarity, payload.get("summary", "")) for item_id, similarity, payload in hits])
 
     def get_service_history(self, service_name: str, limit: int = 10) -> List[dict]:
         """Retrieve recent decisions for a service from Neo4j."""
@@ -488,7 +612,12 @@ class GraphAgent:
             return []
     
     def close(self):
-        """Close connections to databases."""
+        """Close connections to databases and persist the lexical index."""
+        if self._lexical_index_path:
+            try:
+                self._lexical_index.save(self._lexical_index_path)
+            except OSError as e:
+                logger.error(f"[{self.AGENT_NAME}] Failed to persist BM25 index: {e}")
         if self._neo4j_driver:
             self._neo4j_driver.close()
             logger.info(f"[{self.AGENT_NAME}] Closed Neo4j connection")
@@ -160,7 +160,7 @@ class ReportAgent:
                     "metric": name,
                     "state": trend.trend_state.value,
                     "confidence": trend.confidence,
-                    "data_points": len(trend.data_points),
+                    "data_points": len(trend.series),
                 }
                 for name, trend in trends.items()
             ],
@@ -5,10 +5,9 @@ Resolve os problemas de thread-safety e multi-instância (Kubernetes).
 """
 
 import logging
-import json
 import hashlib
 import os
-from typing import Optional, Tuple, Dict
+from typing import Optional, Tuple, Dict, List
 from datetime import datetime, timezone
 from enum import Enum
 
@@ -30,21 +29,25 @@ class DistributedEventDeduplicator:
     1. Thread-safe e Async-safe (Redis é atômico).
     2. Funciona em múltiplas instâncias (Kubernetes).
     3. TTL nativo do Redis.
-    4. Lock distribuído para evitar re-execuções.
+    4. Check/registro/contagem em um único round trip (MULTI/EXEC sobre um
+       hash por assinatura), sem lock separado.
     """
     
     def __init__(
         self, 
         redis_url: Optional[str] = None,
         ttl_minutes: int = 30,
-        prefix: str = "strads:dedup:"
+        prefix: str = "strads:dedup:",
+        redis_client=None
     ):
         self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
         self.ttl_minutes = ttl_minutes
         self.prefix = prefix
-        self._redis = None
+        self._redis = redis_client
         
-        if REDIS_AVAILABLE:
+        if redis_client is not None:
+            logger.info("[DISTRIBUTED_DEDUP] Using injected Redis client")
+        elif REDIS_AVAILABLE:
             try:
                 self._redis = redis.from_url(self.redis_url, decode_responses=True)
                 self._redis.ping()
@@ -85,38 +88,87 @@ class DistributedEventDeduplicator:
     ) -> Tuple[DeduplicationAction, Optional[str]]:
         """
         Verifica duplicata usando Redis de forma atômica.
+
+        Um único MULTI/EXEC incrementa o contador, renova o TTL e lê o
+        execution_id. O primeiro evento de uma assinatura (contador == 1)
+        reivindica a chave e recebe NEW_EXECUTION; eventos concorrentes em
+        outras instâncias já veem o contador > 1, então não é preciso lock.
         """
         if not self._redis:
             logger.error("[DISTRIBUTED_DEDUP] Redis not available, skipping dedup")
             return DeduplicationAction.NEW_EXECUTION, None
 
         dedup_key = self.generate_deduplication_key(source_id, event_type, source_system, severity)
-        
-        # Tenta obter dados da execução existente
-        existing_data = self._redis.get(dedup_key)
-        
-        if existing_data:
-            try:
-                data = json.loads(existing_data)
-                execution_id = data.get("execution_id")
-                
-                # Atualiza contagem e last_seen de forma atômica (opcionalmente)
-                data["event_count"] = data.get("event_count", 1) + 1
-                data["last_seen"] = datetime.now(timezone.utc).isoformat()
-                
-                # Salva de volta com o mesmo TTL restante ou renova
-                self._redis.setex(
-                    dedup_key, 
-                    self.ttl_minutes * 60, 
-                    json.dumps(data)
-                )
-                
-                logger.info(f"[DISTRIBUTED_DEDUP] Duplicate detected: {dedup_key} -> {execution_id}")
-                return DeduplicationAction.UPDATE_EXISTING, execution_id
-            except Exception as e:
-                logger.error(f"[DISTRIBUTED_DEDUP] Error parsing existing data: {e}")
-        
-        return DeduplicationAction.NEW_EXECUTION, None
+
+        try:
+            pipe = self._redis.pipeline(transaction=True)
+            self._queue_check(pipe, dedup_key, source_id)
+            return self._parse_check(dedup_key, pipe.execute())
+        except Exception as e:
+            logger.error(f"[DISTRIBUTED_DEDUP] Error checking {dedup_key}: {e}")
+            return DeduplicationAction.NEW_EXECUTION, None
+
+    def check_duplicates_batch(
+        self,
+        events: List[Dict]
+    ) -> List[Tuple[DeduplicationAction, Optional[str]]]:
+        """
+        Verifica todos os eventos de um payload de webhook em um round trip.
+
+        Cada item de `events` aceita as chaves source_id, event_type,
+        source_system e severity (mesmos argumentos de `check_duplicate`).
+        Eventos repetidos dentro do mesmo payload também são deduplicados:
+        apenas o primeiro recebe NEW_EXECUTION.
+        """
+        if not events:
+            return []
+        if not self._redis:
+            logger.error("[DISTRIBUTED_DEDUP] Redis not available, skipping dedup")
+            return [(DeduplicationAction.NEW_EXECUTION, None) for _ in events]
+
+        keys = [
+            self.generate_deduplication_key(
+                event["source_id"],
+                event.get("event_type"),
+                event.get("source_system"),
+                event.get("severity")
+            )
+            for event in events
+        ]
+
+        try:
+            pipe = self._redis.pipeline(transaction=True)
+            for dedup_key, event in zip(keys, events):
+                self._queue_check(pipe, dedup_key, event["source_id"])
+            replies = pipe.execute()
+        except Exception as e:
+            logger.error(f"[DISTRIBUTED_DEDUP] Error checking batch of {len(events)} events: {e}")
+            return [(DeduplicationAction.NEW_EXECUTION, None) for _ in events]
+
+        step = len(replies) // len(events)
+        return [
+            self._parse_check(dedup_key, replies[i * step:(i + 1) * step])
+            for i, dedup_key in enumerate(keys)
+        ]
+
+    def _queue_check(self, pipe, dedup_key: str, source_id: str) -> None:
+        now = datetime.now(timezone.utc).isoformat()
+        pipe.hincrby(dedup_key, "event_count", 1)
+        pipe.hsetnx(dedup_key, "first_seen", now)
+        pipe.hset(dedup_key, mapping={"last_seen": now, "source_id": source_id})
+        pipe.expire(dedup_key, self.ttl_minutes * 60)
+        pipe.hget(dedup_key, "execution_id")
+
+    def _parse_check(self, dedup_key: str, replies: List) -> Tuple[DeduplicationAction, Optional[str]]:
+        event_count, execution_id = int(replies[0]), replies[-1]
+        if event_count == 1:
+            return DeduplicationAction.NEW_EXECUTION, None
+
+        logger.info(
+            f"[DISTRIBUTED_DEDUP] Duplicate detected: {dedup_key} -> {execution_id} "
+            f"(occurrences={event_count})"
+        )
+        return DeduplicationAction.UPDATE_EXISTING, execution_id
 
     def register_execution(
         self,
@@ -129,33 +181,39 @@ class DistributedEventDeduplicator:
     ) -> bool:
         """
         Registra uma nova execução no Redis com TTL.
+
+        Preserva o contador e o first_seen gravados por `check_duplicate`.
         """
         if not self._redis:
             return False
 
         dedup_key = self.generate_deduplication_key(source_id, event_type, source_system, severity)
-        
-        data = {
-            "execution_id": execution_id,
-            "first_seen": datetime.now(timezone.utc).isoformat(),
-            "last_seen": datetime.now(timezone.utc).isoformat(),
-            "event_count": 1,
-            "source_id": source_id
-        }
-        
+        now = datetime.now(timezone.utc).isoformat()
+
         try:
-            # SETEX define valor e expiração atomicamente
-            self._redis.setex(
-                dedup_key,
-                self.ttl_minutes * 60,
-                json.dumps(data)
-            )
+            # HSET + EXPIRE em uma única transação
+            pipe = self._redis.pipeline(transaction=True)
+            pipe.hset(dedup_key, mapping={
+                "execution_id": execution_id,
+                "last_seen": now,
+                "source_id": source_id
+            })
+            pipe.hsetnx(dedup_key, "first_seen", now)
+            pipe.hsetnx(dedup_key, "event_count", 1)
+            pipe.expire(dedup_key, self.ttl_minutes * 60)
+            pipe.execute()
             logger.info(f"[DISTRIBUTED_DEDUP] Registered execution: {dedup_key} -> {execution_id}")
             return True
         except Exception as e:
             logger.error(f"[DISTRIBUTED_DEDUP] Failed to register execution: {e}")
             return False
 
+    def get_entry(self, source_id: str, **key_parts) -> Dict[str, str]:
+        """Retorna o hash de deduplicação de uma assinatura (vazio se ausente)."""
+        if not self._redis:
+            return {}
+        return self._redis.hgetall(self.generate_deduplication_key(source_id, **key_parts))
+
     def acquire_lock(self, lock_name: str, timeout: int = 10) -> bool:
         """
         Implementa um lock distribuído simples (SETNX).
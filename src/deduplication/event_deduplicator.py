@@ -6,10 +6,18 @@ Se um evento com mesmo ID de origem foi processado nos últimos X minutos,
 apenas atualiza o grafo existente em vez de iniciar um novo swarm.
 
 Padrão: Cache Pattern + Time-Window Deduplication
-Resiliência: Thread-safe, async-safe, TTL automático
+Resiliência: Thread-safe (ThreadSafeEventDeduplicator), async-safe, TTL automático
+
+O cache é um OrderedDict mantido em ordem de last_seen: toda inserção ou
+atualização move a entrada para o fim. Como o TTL é o mesmo para todas as
+entradas, as expiradas ficam sempre no início, então a expiração e a evicção
+LRU custam O(1) amortizado por evento em vez de varrer o cache inteiro.
 """
 
 import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Optional, Dict, Tuple
 from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass, field
@@ -53,6 +61,12 @@ class DeduplicationEntry:
         return datetime.now(timezone.utc) > expiry
 
 
+@lru_cache(maxsize=65536)
+def _hash_key_string(key_string: str) -> str:
+    """sha256 truncado da key string; memoizado porque alertas re-disparam."""
+    return hashlib.sha256(key_string.encode()).hexdigest()[:16]
+
+
 class EventDeduplicator:
     """Deduplicador de eventos com cache e TTL.
     
@@ -61,6 +75,9 @@ class EventDeduplicator:
     2. Verificar se evento foi visto nos últimos X minutos
     3. Retornar ação apropriada (NEW, UPDATE, SKIP)
     4. Manter cache com limpeza automática
+    
+    Não é thread-safe; use ThreadSafeEventDeduplicator quando a instância é
+    compartilhada entre threads.
     """
     
     def __init__(self, ttl_minutes: int = 30, max_cache_size: int = 10000):
@@ -72,7 +89,8 @@ class EventDeduplicator:
         """
         self.ttl_minutes = ttl_minutes
         self.max_cache_size = max_cache_size
-        self.cache: Dict[str, DeduplicationEntry] = {}
+        # Ordenado por last_seen (mais antigo primeiro)
+        self.cache: "OrderedDict[str, DeduplicationEntry]" = OrderedDict()
         self.logger = logging.getLogger("event_deduplicator")
     
     def generate_deduplication_key(self,
@@ -107,8 +125,7 @@ class EventDeduplicator:
         key_string = "|".join(key_parts)
         
         # Gerar hash
-        hash_obj = hashlib.sha256(key_string.encode())
-        hash_hex = hash_obj.hexdigest()[:16]
+        hash_hex = _hash_key_string(key_string)
         
         dedup_key = f"dedup_{hash_hex}"
         
@@ -152,23 +169,25 @@ class EventDeduplicator:
         # Gerar dedup key
         dedup_key = self.generate_deduplication_key(source_id, event_type, source_system)
         
+        now = datetime.now(timezone.utc)
+        ttl = timedelta(minutes=self.ttl_minutes)
+        
         # Limpar cache expirado
-        self._cleanup_expired_entries()
+        self._cleanup_expired_entries(now, ttl)
         
         # Verificar se existe no cache
-        if dedup_key in self.cache:
-            entry = self.cache[dedup_key]
-            
+        entry = self.cache.get(dedup_key)
+        if entry is not None:
             # Verificar se ainda está dentro do TTL
-            if not entry.is_expired(self.ttl_minutes):
+            if now - entry.last_seen <= ttl:
                 # Evento duplicado - atualizar entrada
-                entry.last_seen = datetime.now(timezone.utc)
+                entry.last_seen = now
                 entry.event_count += 1
+                self.cache.move_to_end(dedup_key)
                 
                 self.logger.info(
-                    f"Evento duplicado detectado: {dedup_key} | "
-                    f"occurrences={entry.event_count} | "
-                    f"original_exec={entry.execution_id}"
+                    "Evento duplicado detectado: %s | occurrences=%d | original_exec=%s",
+                    dedup_key, entry.event_count, entry.execution_id
                 )
                 
                 return (DeduplicationAction.UPDATE_EXISTING, entry.execution_id)
@@ -209,16 +228,17 @@ class EventDeduplicator:
             original_event=event_data,
         )
         
-        # Adicionar ao cache
+        # Adicionar ao cache (fim = mais recente)
         self.cache[dedup_key] = entry
+        self.cache.move_to_end(dedup_key)
         
         # Verificar limite de cache
-        if len(self.cache) > self.max_cache_size:
+        while len(self.cache) > self.max_cache_size:
             self._evict_oldest_entry()
         
         self.logger.info(
-            f"Execução registrada: {dedup_key} → {execution_id} | "
-            f"cache_size={len(self.cache)}"
+            "Execução registrada: %s → %s | cache_size=%d",
+            dedup_key, execution_id, len(self.cache)
         )
         
         return dedup_key
@@ -254,31 +274,39 @@ class EventDeduplicator:
         entry.last_seen = datetime.now(timezone.utc)
         entry.event_count += 1
         entry.original_event = event_data
+        self.cache.move_to_end(dedup_key)
         
         self.logger.info(f"Entrada atualizada: {dedup_key} | count={entry.event_count}")
         
         return True
     
-    def _cleanup_expired_entries(self):
-        """Remove entradas expiradas do cache."""
-        expired_keys = [
-            key for key, entry in self.cache.items()
-            if entry.is_expired(self.ttl_minutes)
-        ]
-        
-        for key in expired_keys:
+    def _cleanup_expired_entries(self, now: Optional[datetime] = None, ttl: Optional[timedelta] = None):
+        """Remove entradas expiradas do início do cache.
+        
+        Para na primeira entrada válida, então o custo é proporcional ao
+        número de entradas removidas. Entradas expiradas fora de ordem (ex.:
+        last_seen alterado externamente) são descartadas no lookup.
+        """
+        now = now or datetime.now(timezone.utc)
+        ttl = ttl or timedelta(minutes=self.ttl_minutes)
+        removed = 0
+        
+        while self.cache:
+            key, entry = next(iter(self.cache.items()))
+            if now - entry.last_seen <= ttl:
+                break
             del self.cache[key]
+            removed += 1
         
-        if expired_keys:
-            self.logger.debug(f"Limpeza de cache: {len(expired_keys)} entradas removidas")
+        if removed:
+            self.logger.debug(f"Limpeza de cache: {removed} entradas removidas")
     
     def _evict_oldest_entry(self):
-        """Remove entrada mais antiga do cache."""
+        """Remove a entrada menos recentemente vista (LRU) do cache."""
         if not self.cache:
             return
         
-        oldest_key = min(self.cache.keys(), key=lambda k: self.cache[k].last_seen)
-        del self.cache[oldest_key]
+        oldest_key, _ = self.cache.popitem(last=False)
         
         self.logger.debug(f"Evicção de cache: {oldest_key} removida")
     
@@ -309,6 +337,63 @@ class EventDeduplicator:
         self.logger.info("Cache de deduplicação limpo")
 
 
+class ThreadSafeEventDeduplicator(EventDeduplicator):
+    """EventDeduplicator compartilhável entre threads.
+    
+    Cada operação pública roda sob um único lock; como todas são O(1)
+    amortizado, a seção crítica é curta. `check_and_register` faz a
+    verificação e o registro de forma atômica, evitando que duas threads
+    iniciem swarms para o mesmo evento.
+    """
+    
+    def __init__(self, ttl_minutes: int = 30, max_cache_size: int = 10000):
+        super().__init__(ttl_minutes=ttl_minutes, max_cache_size=max_cache_size)
+        self._lock = threading.RLock()
+    
+    def check_duplicate(self, *args, **kwargs) -> Tuple[DeduplicationAction, Optional[str]]:
+        with self._lock:
+            return super().check_duplicate(*args, **kwargs)
+    
+    def register_execution(self, *args, **kwargs) -> str:
+        with self._lock:
+            return super().register_execution(*args, **kwargs)
+    
+    def check_and_register(self,
+                           source_id: str,
+                           execution_id: str,
+                           event_data: Dict,
+                           event_type: Optional[str] = None,
+                           source_system: Optional[str] = None) -> Tuple[DeduplicationAction, Optional[str]]:
+        """Verifica e, se o evento for novo, registra `execution_id` atomicamente.
+        
+        Returns:
+            Tupla (ação, execution_id_original); para eventos novos o
+            execution_id retornado é o recém-registrado.
+        """
+        with self._lock:
+            action, original = super().check_duplicate(source_id, event_data, event_type, source_system)
+            if action == DeduplicationAction.NEW_EXECUTION:
+                super().register_execution(source_id, execution_id, event_data, event_type, source_system)
+                return action, execution_id
+            return action, original
+    
+    def get_entry(self, dedup_key: str) -> Optional[DeduplicationEntry]:
+        with self._lock:
+            return super().get_entry(dedup_key)
+    
+    def update_entry(self, dedup_key: str, event_data: Dict) -> bool:
+        with self._lock:
+            return super().update_entry(dedup_key, event_data)
+    
+    def get_cache_stats(self) -> Dict:
+        with self._lock:
+            return super().get_cache_stats()
+    
+    def clear_cache(self):
+        with self._lock:
+            super().clear_cache()
+
+
 class DeduplicationPolicy(BaseModel):
     """Política de deduplicação."""
     
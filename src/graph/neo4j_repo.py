@@ -5,16 +5,34 @@ Handles persistence of Agents, Alerts, Decisions and their relationships.
 """
 
 import os
+import json
+import base64
 import logging
 import uuid
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from neo4j import GraphDatabase, Driver
 
 from src.models.alert import Alert
 
 logger = logging.getLogger(__name__)
 
+
+def encode_cursor(created_at: Any, decision_id: str) -> str:
+    """Opaque keyset cursor for the (created_at, decision_id) sort key."""
+    raw = json.dumps([str(created_at), decision_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Inverse of `encode_cursor`. Raises ValueError on a malformed cursor."""
+    try:
+        created_at, decision_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    return str(created_at), str(decision_id)
+
+
 class Neo4jRepository:
     """Repository for interacting with Neo4j graph database."""
 
@@ -22,6 +40,7 @@ class Neo4jRepository:
         self.uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
         self.user = os.getenv("NEO4J_USER", "neo4j")
         self.password = os.getenv("NEO4J_PASSWORD", "strads123")
+        self.batch_chunk_size = int(os.getenv("NEO4J_BATCH_CHUNK_SIZE", "500"))
         self._driver: Optional[Driver] = None
 
     def connect(self):
@@ -30,6 +49,7 @@ class Neo4jRepository:
             try:
                 self._driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password))
                 self.verify_connectivity()
+                self.ensure_schema()
                 logger.info("Connected to Neo4j at %s", self.uri)
             except Exception as e:
                 logger.error("Failed to connect to Neo4j: %s", e)
@@ -40,6 +60,28 @@ class Neo4jRepository:
         if self._driver:
             self._driver.verify_connectivity()
 
+    def ensure_schema(self):
+        """
+        Create the constraints and indexes the read paths rely on.
+
+        The uniqueness constraint on DecisionCandidate.decision_id also gives
+        `get_incident` an index-backed point lookup instead of a label scan.
+        """
+        statements = [
+            "CREATE CONSTRAINT decision_candidate_id_unique IF NOT EXISTS "
+            "FOR (d:DecisionCandidate) REQUIRE d.decision_id IS UNIQUE",
+            "CREATE INDEX decision_candidate_created_at IF NOT EXISTS "
+            "FOR (d:DecisionCandidate) ON (d.created_at)",
+            "CREATE INDEX decision_candidate_status IF NOT EXISTS "
+            "FOR (d:DecisionCandidate) ON (d.status)",
+        ]
+        with self._driver.session() as session:
+            for statement in statements:
+                try:
+                    session.run(statement)
+                except Exception as e:
+                    logger.warning("Could not apply Neo4j schema statement (%s): %s", statement, e)
+
     def close(self):
         """Close the driver."""
         if self._driver:
@@ -398,23 +440,200 @@ class Neo4jRepository:
             with self._driver.session() as session:
                 result = session.run(query)
                 for record in result:
-                    summary = record["summary"] or ""
-                    incidents.append({
-                        "decision_id": record["decision_id"],
-                        "summary": summary[:100] + "..." if len(summary) > 100 else summary,
-                        "full_summary": summary,
-                        "status": record["status"],
-                        "created_at": record["created_at"],
-                        "risk": record["risk"],
-                        "service": record["service"],
-                        "severity": record["severity"],
-                        "execution_count": record["execution_count"] or 0
-                    })
+                    incidents.append(self._incident_from_record(record))
         except Exception as e:
             logger.error(f"Error fetching all incidents: {e}")
         
         return incidents
 
+    def get_incident(self, decision_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a single incident (DecisionCandidate) by decision_id.
+
+        Uses the decision_id uniqueness constraint created in `ensure_schema`,
+        so the lookup is an index seek rather than a scan of the whole history.
+        Returns the same shape as the items of `get_all_incidents`, or None.
+        """
+        query = """
+        MATCH (d:DecisionCandidate {decision_id: $decision_id})
+        OPTIONAL MATCH (a:Alert)-[:HAS_CANDIDATE]->(d)
+        OPTIONAL MATCH (d)-[:EXECUTED_BY]->(e:AgentExecution)
+        RETURN 
+            d.decision_id as decision_id,
+            d.summary as summary,
+            d.status as status,
+            d.created_at as created_at,
+            d.risk as risk,
+            a.service as service,
+            a.severity as severity,
+            count(e) as execution_count
+        LIMIT 1
+        """
+
+        try:
+            with self._driver.session() as session:
+                record = session.run(query, decision_id=decision_id).single()
+                if record:
+                    return self._incident_from_record(record)
+        except Exception as e:
+            logger.error(f"Error fetching incident {decision_id}: {e}")
+
+        return None
+
+    def get_incidents_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        severity: Optional[str] = None,
+        service: Optional[str] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Keyset-paginated, filtered variant of `get_all_incidents`.
+
+        Incidents are ordered by (created_at, decision_id) descending; the
+        returned cursor is passed back to fetch the next page and is None on
+        the last page. Execution counts are only aggregated for the page.
+        """
+        records, next_cursor = self._decision_page(
+            """
+            OPTIONAL MATCH (d)-[:EXECUTED_BY]->(e:AgentExecution)
+            WITH d, a, count(e) as execution_count
+            RETURN 
+                d.decision_id as decision_id,
+                d.summary as summary,
+                d.status as status,
+                d.created_at as created_at,
+                d.risk as risk,
+                a.service as service,
+                a.severity as severity,
+                execution_count
+            """,
+            limit, cursor, status, severity, service, created_after, created_before
+        )
+        return [self._incident_from_record(record) for record in records], next_cursor
+
+    def get_decisions_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        severity: Optional[str] = None,
+        service: Optional[str] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Keyset-paginated, filtered variant of `get_pending_decisions`.
+
+        Same ordering and cursor semantics as `get_incidents_page`.
+        """
+        records, next_cursor = self._decision_page(
+            """
+            RETURN d, a.service as service, a.severity as severity,
+                d.created_at as created_at, d.decision_id as decision_id
+            """,
+            limit, cursor, status, severity, service, created_after, created_before
+        )
+        decisions = []
+        for record in records:
+            d = record["d"]
+            decisions.append({
+                "decision_id": d["decision_id"],
+                "summary": d["summary"],
+                "primary_hypothesis": d["primary_hypothesis"],
+                "risk_assessment": d["risk"],
+                "automation_level": d["automation"],
+                "created_at": d["created_at"],
+                "status": d["status"],
+                "service": record["service"],
+                "severity": record["severity"]
+            })
+        return decisions, next_cursor
+
+    def _decision_page(
+        self,
+        return_clause: str,
+        limit: int,
+        cursor: Optional[str],
+        status: Optional[str],
+        severity: Optional[str],
+        service: Optional[str],
+        created_after: Optional[str],
+        created_before: Optional[str]
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        Run one page of a DecisionCandidate listing. `return_clause` must
+        project `created_at` and `decision_id` (used to build the cursor).
+
+        Only the filters that are set end up in the WHERE clauses, so the
+        planner can use the created_at/status indexes. One extra row is
+        fetched to know whether a next page exists.
+        """
+        params: Dict[str, Any] = {"limit": limit + 1}
+        candidate_filters = []
+        alert_filters = []
+
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            candidate_filters.append(
+                "(d.created_at < $cursor_created_at OR "
+                "(d.created_at = $cursor_created_at AND d.decision_id < $cursor_id))"
+            )
+            params.update(cursor_created_at=cursor_created_at, cursor_id=cursor_id)
+        if status:
+            candidate_filters.append("d.status = $status")
+            params["status"] = status
+        if created_after:
+            candidate_filters.append("d.created_at >= $created_after")
+            params["created_after"] = created_after
+        if created_before:
+            candidate_filters.append("d.created_at < $created_before")
+            params["created_before"] = created_before
+        if severity:
+            alert_filters.append("a.severity = $severity")
+            params["severity"] = severity
+        if service:
+            alert_filters.append("a.service = $service")
+            params["service"] = service
+
+        query = "MATCH (d:DecisionCandidate)\n"
+        if candidate_filters:
+            query += "WHERE " + " AND ".join(candidate_filters) + "\n"
+        query += "OPTIONAL MATCH (a:Alert)-[:HAS_CANDIDATE]->(d)\n"
+        if alert_filters:
+            query += "WITH d, a\nWHERE " + " AND ".join(alert_filters) + "\n"
+        # One row per candidate, so several Alerts can't take several page slots
+        query += "WITH d, head(collect(a)) AS a\n"
+        query += "ORDER BY d.created_at DESC, d.decision_id DESC\nLIMIT $limit\n"
+        query += return_clause + "\nORDER BY d.created_at DESC, d.decision_id DESC"
+
+        with self._driver.session() as session:
+            records = list(session.run(query, params))
+
+        next_cursor = None
+        if len(records) > limit:
+            records = records[:limit]
+            next_cursor = encode_cursor(records[-1]["created_at"], records[-1]["decision_id"])
+        return records, next_cursor
+
+    @staticmethod
+    def _incident_from_record(record: Any) -> Dict[str, Any]:
+        summary = record["summary"] or ""
+        return {
+            "decision_id": record["decision_id"],
+            "summary": summary[:100] + "..." if len(summary) > 100 else summary,
+            "full_summary": summary,
+            "status": record["status"],
+            "created_at": record["created_at"],
+            "risk": record["risk"],
+            "service": record["service"],
+            "severity": record["severity"],
+            "execution_count": record["execution_count"] or 0
+        }
+
     def save_agent_execution(self, decision_id: str, execution_data: Dict[str, Any]) -> Optional[str]:
         """
         Persiste uma execução de agente associada a uma decisão.
@@ -439,19 +658,7 @@ class Neo4jRepository:
         RETURN e.execution_id as execution_id
         """
         
-        params = {
-            "decision_id": decision_id,
-            "execution_id": execution_data.get("execution_id", str(uuid.uuid4())),
-            "agent_id": execution_data.get("agent_id", "unknown"),
-            "agent_name": execution_data.get("agent_name", execution_data.get("agent_id", "unknown")),
-            "agent_version": execution_data.get("agent_version", "1.0"),
-            "logic_hash": execution_data.get("logic_hash", "undefined"),
-            "step_id": execution_data.get("step_id", ""),
-            "status": execution_data.get("status", "completed"),
-            "confidence": execution_data.get("confidence", 0.5),
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "error": execution_data.get("error")
-        }
+        params = {"decision_id": decision_id, **self._agent_execution_row(execution_data)}
         
         try:
             with self._driver.session() as session:
@@ -464,14 +671,73 @@ class Neo4jRepository:
         
         return None
 
-    def save_agent_executions_batch(self, decision_id: str, executions: List[Dict[str, Any]]) -> List[str]:
+    @staticmethod
+    def _agent_execution_row(execution_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Normaliza um execution_data nas propriedades do nó AgentExecution."""
+        return {
+            "execution_id": execution_data.get("execution_id", str(uuid.uuid4())),
+            "agent_id": execution_data.get("agent_id", "unknown"),
+            "agent_name": execution_data.get("agent_name", execution_data.get("agent_id", "unknown")),
+            "agent_version": execution_data.get("agent_version", "1.0"),
+            "logic_hash": execution_data.get("logic_hash", "undefined"),
+            "step_id": execution_data.get("step_id", ""),
+            "status": execution_data.get("status", "completed"),
+            "confidence": execution_data.get("confidence", 0.5),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "error": execution_data.get("error")
+        }
+
+    def save_agent_executions_batch(
+        self,
+        decision_id: str,
+        executions: List[Dict[str, Any]],
+        chunk_size: Optional[int] = None
+    ) -> List[str]:
         """
         Persiste múltiplas execuções de agentes em batch.
+
+        Todas as linhas são gravadas numa única transação gerenciada
+        (`execute_write`), com um `UNWIND $rows` por chunk de `chunk_size`
+        linhas, em vez de uma sessão e um round trip por execução. Os
+        execution_ids são gerados antes da transação, então um retry do
+        driver não duplica nós.
+        """
+        if not executions:
+            return []
+
+        chunk_size = max(1, chunk_size or self.batch_chunk_size)
+        rows = [self._agent_execution_row(execution_data) for execution_data in executions]
+
+        query = """
+        MATCH (d:DecisionCandidate {decision_id: $decision_id})
+        UNWIND $rows AS row
+        CREATE (e:AgentExecution {
+            execution_id: row.execution_id,
+            agent_id: row.agent_id,
+            agent_name: row.agent_name,
+            agent_version: row.agent_version,
+            logic_hash: row.logic_hash,
+            step_id: row.step_id,
+            status: row.status,
+            confidence: row.confidence,
+            timestamp: row.timestamp,
+            error: row.error
+        })
+        CREATE (d)-[:EXECUTED_BY]->(e)
+        RETURN e.execution_id as execution_id
         """
-        execution_ids = []
-        for execution_data in executions:
-            exec_id = self.save_agent_execution(decision_id, execution_data)
-            if exec_id:
-                execution_ids.append(exec_id)
-        return execution_ids
 
+        def _write(tx) -> List[str]:
+            written = []
+            for start in range(0, len(rows), chunk_size):
+                result = tx.run(query, decision_id=decision_id, rows=rows[start:start + chunk_size])
+                written.extend(record["execution_id"] for record in result)
+            return written
+
+        try:
+            with self._driver.session() as session:
+                return session.execute_write(_write)
+        except Exception as e:
+            logger.error(f"Error saving agent execution batch for decision {decision_id}: {e}")
+
+        return []
@@ -8,16 +8,29 @@ Padrão: Factory Pattern + Strategy Pattern
 Resiliência: Fallback automático, retry com backoff
 """
 
+import asyncio
 import logging
+import math
 import os
-from typing import Optional, Dict, Any
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, Dict, Any, List
 from enum import Enum
 from abc import ABC, abstractmethod
 
 from pydantic import BaseModel, Field
 
+from src.llm.response_cache import LLMResponseCache, get_default_cache, make_cache_key
+from src.metrics import LLM_ROUTER_HEDGES, LLM_ROUTER_REQUESTS
+from src.utils.error_handling import CircuitBreaker, CircuitBreakerOpenError
+from src.utils.single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
+# Compartilhado entre providers criados pela factory: prompts equivalentes
+# disparados ao mesmo tempo por execuções distintas viram uma única chamada.
+_PROVIDER_FLIGHT = SingleFlight("llm_provider")
+
 
 class LLMProviderType(str, Enum):
     """Tipos de providers de LLM."""
@@ -440,19 +453,372 @@ class GitHubModelsProvider(BaseLLMProvider):
             return False
 
 
+class CachedLLMProvider(BaseLLMProvider):
+    """Decorator de provider que consulta o LLMResponseCache antes do backend.
+    
+    A chave é (provider, modelo, temperatura, prompt normalizado) mais os
+    kwargs da chamada. Passe `use_cache=False` para forçar uma chamada real.
+    """
+    
+    def __init__(self, provider: BaseLLMProvider, cache: LLMResponseCache):
+        """Inicializa wrapper.
+        
+        Args:
+            provider: Provider real
+            cache: Cache de respostas compartilhado
+        """
+        super().__init__(provider.config)
+        self.provider = provider
+        self.cache = cache
+    
+    def _key(self, prompt: str, **kwargs) -> str:
+        temperature = kwargs.pop("temperature", self.config.temperature)
+        return make_cache_key(self.config.provider.value, self.config.model, temperature, prompt, **kwargs)
+    
+    async def generate(self, prompt: str, use_cache: bool = True, **kwargs) -> str:
+        """Gera resposta, servindo do cache quando possível."""
+        key = self._key(prompt, **kwargs)
+        return await self.cache.get_or_generate(
+            key, lambda: self.provider.generate(prompt, **kwargs), use_cache=use_cache
+        )
+    
+    async def generate_with_context(self,
+                                   prompt: str,
+                                   context: str,
+                                   use_cache: bool = True,
+                                   **kwargs) -> str:
+        """Gera resposta com contexto, servindo do cache quando possível."""
+        key = self._key(f"Contexto:\n{context}\n\nPergunta:\n{prompt}", **kwargs)
+        return await self.cache.get_or_generate(
+            key, lambda: self.provider.generate_with_context(prompt, context, **kwargs), use_cache=use_cache
+        )
+    
+    async def health_check(self) -> bool:
+        """Delegado ao provider real (nunca cacheado)."""
+        return await self.provider.health_check()
+
+
+class CoalescingLLMProvider(BaseLLMProvider):
+    """Decorator de provider com single-flight.
+    
+    Chamadas concorrentes com a mesma chave (provider, modelo, temperatura,
+    prompt normalizado e kwargs) compartilham uma única chamada ao provider
+    interno; N chamadores custam uma requisição.
+    """
+    
+    def __init__(self, provider: BaseLLMProvider, flight: Optional[SingleFlight] = None):
+        """Inicializa wrapper.
+        
+        Args:
+            provider: Provider interno (real ou com cache)
+            flight: Grupo single-flight (padrão: grupo compartilhado do processo)
+        """
+        super().__init__(provider.config)
+        self.provider = provider
+        self.flight = flight or _PROVIDER_FLIGHT
+    
+    def _key(self, kind: str, prompt: str, **kwargs) -> tuple:
+        temperature = kwargs.pop("temperature", self.config.temperature)
+        return (kind, make_cache_key(self.config.provider.value, self.config.model, temperature, prompt, **kwargs))
+    
+    async def generate(self, prompt: str, **kwargs) -> str:
+        """Gera resposta, juntando-se a uma chamada idêntica em andamento."""
+        key = self._key("generate", prompt, **kwargs)
+        return await self.flight.do(key, lambda: self.provider.generate(prompt, **kwargs))
+    
+    async def generate_with_context(self,
+                                   prompt: str,
+                                   context: str,
+                                   **kwargs) -> str:
+        """Gera resposta com contexto, juntando-se a uma chamada idêntica em andamento."""
+        key = self._key("context", f"Contexto:\n{context}\n\nPergunta:\n{prompt}", **kwargs)
+        return await self.flight.do(
+            key, lambda: self.provider.generate_with_context(prompt, context, **kwargs)
+        )
+    
+    async def health_check(self) -> bool:
+        """Delegado ao provider interno."""
+        return await self.provider.health_check()
+
+
+class _BackendStats:
+    """Janela móvel de latências e resultados de um backend do router.
+    
+    Resultados expiram após `max_age` segundos: um backend rebaixado por
+    erros não recebe tráfego para limpar a própria janela, então a idade é
+    o que o devolve à rotação depois de uma falha transitória.
+    """
+    
+    def __init__(self, window: int, max_age: float):
+        self.latencies: deque = deque(maxlen=window)
+        self.outcomes: deque = deque(maxlen=window)
+        self.max_age = max_age
+    
+    def record(self, ok: bool, latency: Optional[float] = None) -> None:
+        self.outcomes.append((time.monotonic(), ok))
+        if ok and latency is not None:
+            self.latencies.append(latency)
+    
+    def record_cancelled(self, elapsed: float) -> None:
+        # Perdeu a corrida do hedge: o tempo decorrido é um limite inferior
+        # da latência, então entra na janela para que o p95 reflita a lentidão.
+        self.latencies.append(elapsed)
+    
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.max_age
+        while self.outcomes and self.outcomes[0][0] < cutoff:
+            self.outcomes.popleft()
+    
+    @property
+    def p95(self) -> float:
+        """p95 da janela (0.0 sem amostras, para que backends novos sejam explorados)."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+    
+    @property
+    def samples(self) -> int:
+        self._expire()
+        return len(self.outcomes)
+    
+    @property
+    def error_rate(self) -> float:
+        self._expire()
+        if not self.outcomes:
+            return 0.0
+        return 1.0 - sum(ok for _, ok in self.outcomes) / len(self.outcomes)
+
+
+class RoutingLLMProvider(BaseLLMProvider):
+    """Router sensível a latência entre vários providers.
+    
+    Para cada backend mantém p95 de latência e taxa de erro numa janela
+    móvel, além de um CircuitBreaker próprio. Cada requisição vai para o
+    backend saudável mais rápido; backends com breaker HALF_OPEN vão à
+    frente da fila como chamadas de teste. Se o escolhido não responder em
+    `hedge_delay_seconds`, uma segunda requisição (hedge) é enviada ao
+    próximo da fila e vence a primeira resposta bem-sucedida. Em caso de
+    erro, o próximo backend é tentado imediatamente.
+    """
+    
+    def __init__(self,
+                 backends: List[BaseLLMProvider],
+                 names: Optional[List[str]] = None,
+                 hedge_delay_seconds: Optional[float] = None,
+                 window: int = 100,
+                 max_error_rate: float = 0.5,
+                 error_window_seconds: float = 60.0,
+                 failure_threshold: int = 5,
+                 recovery_timeout: float = 30.0):
+        """Inicializa router.
+        
+        Args:
+            backends: Providers em ordem de preferência (desempate)
+            names: Nomes dos backends (padrão: provider:modelo)
+            hedge_delay_seconds: Atraso antes do hedge (None desabilita)
+            window: Tamanho da janela móvel de latência/erros
+            max_error_rate: Acima disso o backend só é usado como último recurso
+            error_window_seconds: Idade máxima dos resultados na taxa de erro
+            failure_threshold: Falhas consecutivas para abrir o breaker
+            recovery_timeout: Segundos até o breaker tentar HALF_OPEN
+        """
+        if not backends:
+            raise ValueError("RoutingLLMProvider requer ao menos um backend")
+        super().__init__(backends[0].config)
+        self.backends = list(backends)
+        self.names = names or [f"{b.config.provider.value}:{b.config.model}" for b in backends]
+        if len(self.names) != len(self.backends):
+            raise ValueError("names deve ter o mesmo tamanho de backends")
+        self.hedge_delay_seconds = hedge_delay_seconds
+        self.max_error_rate = max_error_rate
+        self.stats = [_BackendStats(window, error_window_seconds) for _ in backends]
+        self.breakers = [
+            CircuitBreaker(name, failure_threshold=failure_threshold, recovery_timeout=recovery_timeout)
+            for name in self.names
+        ]
+    
+    def ranked(self) -> List[int]:
+        """Índices dos backends disponíveis, do mais para o menos preferido.
+        
+        Backends HALF_OPEN vêm primeiro: só fecham o breaker após
+        `half_open_max_calls` sucessos, e o failover cobre a chamada se o
+        teste falhar.
+        """
+        states = [breaker.state for breaker in self.breakers]
+        available = [i for i, state in enumerate(states) if state != CircuitBreaker.OPEN]
+        return sorted(
+            available,
+            key=lambda i: (
+                states[i] != CircuitBreaker.HALF_OPEN,
+                self.stats[i].error_rate > self.max_error_rate,
+                self.stats[i].p95,
+                i,
+            ),
+        )
+    
+    def backend_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Snapshot de p95, taxa de erro e estado do breaker por backend."""
+        return {
+            name: {
+                "p95_seconds": stats.p95,
+                "error_rate": stats.error_rate,
+                "samples": stats.samples,
+                "breaker": breaker.state,
+            }
+            for name, stats, breaker in zip(self.names, self.stats, self.breakers)
+        }
+    
+    async def _call(self, index: int, call: Callable[[BaseLLMProvider], Awaitable[str]]) -> str:
+        name = self.names[index]
+        start = time.perf_counter()
+        try:
+            result = await call(self.backends[index])
+        except asyncio.CancelledError:
+            self.stats[index].record_cancelled(time.perf_counter() - start)
+            LLM_ROUTER_REQUESTS.labels(backend=name, outcome="cancelled").inc()
+            raise
+        except Exception:
+            self.stats[index].record(False)
+            self.breakers[index].record_failure()
+            LLM_ROUTER_REQUESTS.labels(backend=name, outcome="error").inc()
+            raise
+        self.stats[index].record(True, time.perf_counter() - start)
+        self.breakers[index].record_success()
+        LLM_ROUTER_REQUESTS.labels(backend=name, outcome="success").inc()
+        return result
+    
+    async def _route(self, call: Callable[[BaseLLMProvider], Awaitable[str]]) -> str:
+        queue = self.ranked()
+        if not queue:
+            raise CircuitBreakerOpenError("Todos os backends de LLM estão com o circuit breaker OPEN")
+        
+        pending: Dict[asyncio.Task, int] = {}
+        last_exc: Optional[BaseException] = None
+        
+        def launch() -> None:
+            index = queue.pop(0)
+            pending[asyncio.ensure_future(self._call(index, call))] = index
+        
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if queue and len(pending) == 1 and self.hedge_delay_seconds is not None:
+                    timeout = self.hedge_delay_seconds
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                
+                if not done:
+                    # Primário lento: dispara o hedge no próximo backend
+                    LLM_ROUTER_HEDGES.inc()
+                    self.logger.info(f"Hedge: {self.names[queue[0]]} após {self.hedge_delay_seconds}s")
+                    launch()
+                    continue
+                
+                for task in done:
+                    index = pending.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    last_exc = task.exception()
+                    self.logger.warning(f"Backend {self.names[index]} falhou: {last_exc}")
+                
+                if not pending and queue:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        raise last_exc
+    
+    async def generate(self, prompt: str, **kwargs) -> str:
+        """Gera resposta no backend saudável mais rápido."""
+        return await self._route(lambda backend: backend.generate(prompt, **kwargs))
+    
+    async def generate_with_context(self,
+                                   prompt: str,
+                                   context: str,
+                                   **kwargs) -> str:
+        """Gera resposta com contexto no backend saudável mais rápido."""
+        return await self._route(lambda backend: backend.generate_with_context(prompt, context, **kwargs))
+    
+    async def health_check(self) -> bool:
+        """Saudável se algum backend com breaker fechado responder."""
+        for index in self.ranked():
+            try:
+                if await self.backends[index].health_check():
+                    return True
+            except Exception as e:
+                self.logger.warning(f"Health check de {self.names[index]} falhou: {e}")
+        return False
+
+
 class LLMFactory:
     """Factory para criar providers de LLM."""
     
     @staticmethod
-    def create_provider(config: Optional[LLMConfig] = None) -> BaseLLMProvider:
+    def create_provider(config: Optional[LLMConfig] = None,
+                        cache: Optional[LLMResponseCache] = None,
+                        use_cache: bool = True,
+                        coalesce: bool = True) -> BaseLLMProvider:
         """Cria provider baseado na configuração.
         
         Args:
             config: Configuração (opcional, lê de env se None)
+            cache: Cache de respostas (padrão: cache do processo, ver LLM_CACHE_*)
+            use_cache: False para devolver o provider sem cache
+            coalesce: False para não compartilhar chamadas idênticas em andamento
         
         Returns:
             Provider instanciado
         """
+        return LLMFactory._wrap(LLMFactory._create_backend(config), cache, use_cache, coalesce)
+    
+    @staticmethod
+    def create_router(configs: Optional[List[LLMConfig]] = None,
+                      backends: Optional[List[BaseLLMProvider]] = None,
+                      hedge_delay_seconds: Optional[float] = None,
+                      cache: Optional[LLMResponseCache] = None,
+                      use_cache: bool = True,
+                      coalesce: bool = True,
+                      **router_kwargs) -> BaseLLMProvider:
+        """Cria um RoutingLLMProvider sobre vários providers.
+        
+        Args:
+            configs: Configurações dos backends, em ordem de preferência
+            backends: Providers já instanciados (alternativa a configs)
+            hedge_delay_seconds: Atraso do hedge (padrão: LLM_HEDGE_DELAY_SECONDS, vazio desabilita)
+            cache: Cache de respostas (padrão: cache do processo)
+            use_cache: False para não cachear respostas
+            coalesce: False para não compartilhar chamadas idênticas em andamento
+            **router_kwargs: Repassados a RoutingLLMProvider (window, max_error_rate, ...)
+        
+        Returns:
+            Provider roteado
+        """
+        if backends is None:
+            backends = [LLMFactory._create_backend(c) for c in configs or []]
+        if hedge_delay_seconds is None and os.getenv("LLM_HEDGE_DELAY_SECONDS"):
+            hedge_delay_seconds = float(os.getenv("LLM_HEDGE_DELAY_SECONDS"))
+        router = RoutingLLMProvider(backends, hedge_delay_seconds=hedge_delay_seconds, **router_kwargs)
+        return LLMFactory._wrap(router, cache, use_cache, coalesce)
+    
+    @staticmethod
+    def _wrap(provider: BaseLLMProvider,
+              cache: Optional[LLMResponseCache],
+              use_cache: bool,
+              coalesce: bool) -> BaseLLMProvider:
+        """Aplica cache de respostas e single-flight ao provider."""
+        if use_cache:
+            cache = cache or get_default_cache()
+            if cache is not None:
+                provider = CachedLLMProvider(provider, cache)
+        if coalesce:
+            provider = CoalescingLLMProvider(provider)
+        return provider
+    
+    @staticmethod
+    def _create_backend(config: Optional[LLMConfig] = None) -> BaseLLMProvider:
+        """Instancia o provider real descrito pela configuração."""
         if config is None:
             # Ler de variáveis de ambiente
             provider_type = os.getenv("LLM_PROVIDER", "ollama").lower()
@@ -0,0 +1,319 @@
+"""
+LLM Response Cache - Cache de respostas de LLM por prompt normalizado
+
+Quando o mesmo alerta re-dispara, DecisionEngine, PrometheusAnalyzer e o
+PlaybookGeneratorAgent montam prompts quase idênticos (mudam só timestamps e
+IDs). As respostas são cacheadas por:
+
+    (provider, modelo, temperatura, sha256 do prompt normalizado)
+
+A normalização colapsa espaços e mascara timestamps ISO, UUIDs e hashes hex
+longos, então contextos que diferem apenas nesses campos compartilham a
+entrada.
+
+Camadas:
+- LRU em memória com TTL e tamanho máximo;
+- tier SQLite opcional (LLM_CACHE_DB), que sobrevive a restarts.
+
+Hit rate (por tier) e latência economizada são exportados via `src.metrics`.
+Cada chamada pode desligar o cache com `use_cache=False`.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.metrics import LLM_CACHE_ENTRIES, LLM_CACHE_REQUESTS, LLM_CACHE_SAVED_SECONDS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "256"))
+DEFAULT_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "900"))
+DEFAULT_DB_PATH = os.getenv("LLM_CACHE_DB") or None
+
+_VOLATILE_PATTERNS = [
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?"), "<ts>"),
+    (re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"), "<uuid>"),
+    (re.compile(r"\b[0-9a-f]{16,}\b"), "<hex>"),
+]
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Remove variações irrelevantes (timestamps, IDs, espaços) do prompt."""
+    for pattern, placeholder in _VOLATILE_PATTERNS:
+        prompt = pattern.sub(placeholder, prompt)
+    return _WHITESPACE.sub(" ", prompt).strip()
+
+
+def make_cache_key(
+    provider: str,
+    model: str,
+    temperature: Optional[float],
+    prompt: str,
+    **params: Any
+) -> str:
+    """Chave do cache: hash de (provider, modelo, temperatura, prompt normalizado).
+
+    Parâmetros extras da chamada (ex.: max_tokens) entram na chave para que
+    respostas geradas com configurações diferentes não se misturem.
+    """
+    digest = hashlib.sha256()
+    header = json.dumps([provider, model, temperature, params or None], sort_keys=True, default=str)
+    digest.update(header.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_prompt(prompt).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class _SQLiteTier:
+    """Tier persistente: uma tabela (key, response, expires_at, latency)."""
+
+    PRUNE_EVERY = 100
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_response_cache ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, latency REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._puts = 0
+        self.prune()
+
+    def get(self, key: str, now: float) -> Optional[Tuple[str, float, float]]:
+        row = self._conn.execute(
+            "SELECT response, expires_at, latency FROM llm_response_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] <= now:
+            return None
+        return row[0], row[1], row[2]
+
+    def put(self, key: str, response: str, expires_at: float, latency: float) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO llm_response_cache (key, response, expires_at, latency) VALUES (?, ?, ?, ?)",
+            (key, response, expires_at, latency),
+        )
+        self._conn.commit()
+        self._puts += 1
+        if self._puts % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self) -> None:
+        self._conn.execute("DELETE FROM llm_response_cache WHERE expires_at <= ?", (time.time(),))
+        self._conn.commit()
+
+    def clear(self) -> None:
+        self._conn.execute("DELETE FROM llm_response_cache")
+        self._conn.commit()
+
+
+class LLMResponseCache:
+    """Cache de respostas de LLM (LRU em memória + SQLite opcional).
+
+    Args:
+        max_entries: Capacidade do LRU em memória.
+        ttl_seconds: Tempo de vida de cada resposta.
+        db_path: Arquivo SQLite do tier persistente; desabilitado quando None.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_SIZE,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        db_path: Optional[str] = DEFAULT_DB_PATH,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # key -> (response, expires_at, latency da chamada original)
+        self._memory: "OrderedDict[str, Tuple[str, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk: Optional[_SQLiteTier] = None
+        if db_path:
+            try:
+                self._disk = _SQLiteTier(db_path)
+            except Exception as e:
+                logger.warning(f"[LLM_CACHE] SQLite tier unavailable at {db_path}: {e}")
+        self.stats: Dict[str, float] = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "saved_seconds": 0.0}
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get(self, key: str) -> Optional[str]:
+        """Retorna a resposta cacheada (ou None) e contabiliza o hit/miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[1] <= now:
+                del self._memory[key]
+                entry = None
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._record_hit("memory", entry[2])
+                return entry[0]
+            LLM_CACHE_REQUESTS.labels(tier="memory", result="miss").inc()
+
+            if self._disk is not None:
+                try:
+                    entry = self._disk.get(key, now)
+                except Exception as e:
+                    logger.warning(f"[LLM_CACHE] SQLite read failed: {e}")
+                    entry = None
+                if entry is not None:
+                    self._remember(key, entry)
+                    self._record_hit("disk", entry[2])
+                    return entry[0]
+                LLM_CACHE_REQUESTS.labels(tier="disk", result="miss").inc()
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key: str, response: str, latency_seconds: float = 0.0) -> None:
+        """Armazena uma resposta recém-gerada em todos os tiers habilitados."""
+        entry = (response, time.time() + self.ttl_seconds, latency_seconds)
+        with self._lock:
+            self._remember(key, entry)
+            if self._disk is not None:
+                try:
+                    self._disk.put(key, *entry)
+                except Exception as e:
+                    logger.warning(f"[LLM_CACHE] Failed to persist response: {e}")
+
+    def clear(self) -> None:
+        """Esvazia todos os tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._disk is not None:
+                self._disk.clear()
+            LLM_CACHE_ENTRIES.set(0)
+
+    async def get_or_generate(
+        self,
+        key: str,
+        generate: Callable[[], Awaitable[str]],
+        use_cache: bool = True,
+    ) -> str:
+        """Retorna do cache ou chama `generate()` e cacheia o resultado.
+
+        Com `use_cache=False` o cache é ignorado na leitura e na escrita.
+        Respostas vazias não são cacheadas.
+        """
+        if not use_cache:
+            return await generate()
+
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        start = time.perf_counter()
+        response = await generate()
+        if response:
+            self.put(key, response, time.perf_counter() - start)
+        return response
+
+    def _remember(self, key: str, entry: Tuple[str, float, float]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+        LLM_CACHE_ENTRIES.set(len(self._memory))
+
+    def _record_hit(self, tier: str, latency: float) -> None:
+        self.stats[f"{tier}_hits"] += 1
+        self.stats["saved_seconds"] += latency
+        LLM_CACHE_REQUESTS.labels(tier=tier, result="hit").inc()
+        LLM_CACHE_SAVED_SECONDS.inc(latency)
+
+
+async def cached_stream(
+    cache: Optional[LLMResponseCache],
+    key: str,
+    events: Callable[[], AsyncIterator[Dict[str, Any]]],
+    use_cache: bool = True,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Cache para providers `Model.stream` (eventos contentBlockDelta).
+
+    Num hit, emite a resposta inteira como um único delta. Num miss, repassa
+    os eventos de `events()` e cacheia o texto concatenado ao final do stream
+    (streams interrompidos não são cacheados).
+    """
+    if cache is None or not use_cache:
+        async for event in events():
+            yield event
+        return
+
+    cached = cache.get(key)
+    if cached is not None:
+        yield {"contentBlockDelta": {"contentBlockIndex": 0, "delta": {"text": cached}}}
+        return
+
+    start = time.perf_counter()
+    parts = []
+    async for event in events():
+        delta = event.get("contentBlockDelta", {}).get("delta", {}) if isinstance(event, dict) else {}
+        text = delta.get("text") if isinstance(delta, dict) else None
+        if text:
+            parts.append(text)
+        yield event
+    if parts:
+        cache.put(key, "".join(parts), time.perf_counter() - start)
+
+
+def messages_prompt(messages: Any, system_prompt: Optional[str]) -> str:
+    """Texto estável de (system_prompt, messages) para a chave do cache."""
+    return json.dumps([system_prompt, list(messages)], sort_keys=True, default=str)
+
+
+async def cached_model_stream(
+    cache: Optional[LLMResponseCache],
+    provider: str,
+    model: str,
+    messages: Any,
+    system_prompt: Optional[str],
+    events: Callable[[], AsyncIterator[Dict[str, Any]]],
+    use_cache: bool = True,
+) -> AsyncIterator[Dict[str, Any]]:
+    """`cached_stream` com a chave de um `Model.stream(messages, system_prompt)`.
+
+    Compartilhado pelos providers; a chave só é calculada com o cache ativo.
+    """
+    if cache is None or not use_cache:
+        async for event in events():
+            yield event
+        return
+
+    key = make_cache_key(provider, model, None, messages_prompt(messages, system_prompt))
+    async for event in cached_stream(cache, key, events):
+        yield event
+
+
+_default_cache: Optional[LLMResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[LLMResponseCache]:
+    """Cache compartilhado do processo, configurado por LLM_CACHE_*.
+
+    Retorna None quando LLM_CACHE_SIZE=0 (cache desabilitado).
+    """
+    global _default_cache
+    if DEFAULT_CACHE_SIZE <= 0:
+        return None
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = LLMResponseCache()
+    return _default_cache
@@ -68,6 +68,96 @@ DB_QUERY_DURATION = Histogram(
     ['database', 'operation']
 )
 
+# Alert Intake Metrics (main.py webhook receiver)
+INTAKE_QUEUE_DEPTH = Gauge(
+    'strands_intake_queue_depth',
+    'Number of alerts waiting in the intake queue'
+)
+
+INTAKE_ACTIVE_WORKERS = Gauge(
+    'strands_intake_active_workers',
+    'Number of intake workers currently executing a swarm run'
+)
+
+INTAKE_ALERTS_TOTAL = Counter(
+    'strands_intake_alerts_total',
+    'Total number of alerts handled by the intake queue',
+    ['outcome']  # accepted, rejected, succeeded, failed, cancelled
+)
+
+INTAKE_QUEUE_WAIT = Histogram(
+    'strands_intake_queue_wait_seconds',
+    'Time an alert spent queued before a worker picked it up',
+    buckets=[0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 15, 30, 60, 120, 300]
+)
+
+INTAKE_PROCESSING_TIME = Histogram(
+    'strands_intake_processing_seconds',
+    'Time spent executing the swarm run for a queued alert',
+    ['status'],
+    buckets=[0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600]
+)
+
+# Embedding Cache Metrics
+EMBEDDING_CACHE_REQUESTS = Counter(
+    'strands_embedding_cache_requests_total',
+    'Embedding cache lookups by tier and result',
+    ['tier', 'result']  # tier: memory, disk / result: hit, miss
+)
+
+EMBEDDING_CACHE_ENTRIES = Gauge(
+    'strands_embedding_cache_entries',
+    'Number of vectors held in the in-memory embedding cache'
+)
+
+# LLM Response Cache Metrics
+LLM_CACHE_REQUESTS = Counter(
+    'strands_llm_cache_requests_total',
+    'LLM response cache lookups by tier and result',
+    ['tier', 'result']  # tier: memory, disk / result: hit, miss
+)
+
+LLM_CACHE_SAVED_SECONDS = Counter(
+    'strands_llm_cache_saved_seconds_total',
+    'LLM latency avoided by cache hits (latency of the original call)'
+)
+
+LLM_CACHE_ENTRIES = Gauge(
+    'strands_llm_cache_entries',
+    'Number of responses held in the in-memory LLM response cache'
+)
+
+# LLM Router Metrics
+LLM_ROUTER_REQUESTS = Counter(
+    'strands_llm_router_requests_total',
+    'Backend calls issued by the LLM router',
+    ['backend', 'outcome']  # outcome: success, error, cancelled (lost a hedge race)
+)
+
+LLM_ROUTER_HEDGES = Counter(
+    'strands_llm_router_hedges_total',
+    'Hedged requests sent because the primary backend exceeded the hedge delay'
+)
+
+# Prometheus Range Cache Metrics
+PROMETHEUS_RANGE_CACHE_REQUESTS = Counter(
+    'strands_prometheus_range_cache_requests_total',
+    'Range queries served by the incremental range cache',
+    ['result']  # hit (no fetch), partial (head/tail fetched), miss (full fetch)
+)
+
+PROMETHEUS_RANGE_CACHE_SAMPLES = Gauge(
+    'strands_prometheus_range_cache_samples',
+    'Samples held in the Prometheus range cache'
+)
+
+# Single-flight Metrics
+SINGLE_FLIGHT_CALLS = Counter(
+    'strands_single_flight_calls_total',
+    'Calls through a single-flight group by role',
+    ['group', 'role']  # role: leader (hit the backend), follower (shared an in-flight result)
+)
+
 def init_metrics(app):
     """Initialize metrics endpoint for FastAPI app."""
     from prometheus_client import make_asgi_app
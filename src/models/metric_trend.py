@@ -5,11 +5,14 @@ Represents the analysis of a specific metric over time.
 Used to determine if a metric is degrading, stable, or recovering.
 """
 
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import IntEnum
-from typing import TYPE_CHECKING
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional, Sequence, Union
 
-from pydantic import BaseModel, ConfigDict, Field
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field, computed_field, model_validator
+from pydantic.json_schema import SkipJsonSchema
 
 if TYPE_CHECKING:
     from enum import Enum as _StrEnum
@@ -47,6 +50,141 @@ class DataPoint(BaseModel):
         frozen = True
 
 
+def _epoch(ts: datetime) -> float:
+    # Naive datetimes are treated as UTC, like the rest of the metrics path
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+class TimeSeries:
+    """
+    Columnar time series: epoch-second timestamps, values and an outlier mask.
+
+    Backed by three NumPy arrays so the Prometheus -> TrendAnalyzer ->
+    MetricTrend path never builds per-sample objects. It still behaves as a
+    read-only sequence of DataPoint (len, truthiness, iteration, indexing),
+    materializing points only when they are actually read.
+    """
+
+    __slots__ = ("timestamps", "values", "outliers")
+
+    def __init__(
+        self,
+        timestamps: Optional[Sequence[float]] = None,
+        values: Optional[Sequence[float]] = None,
+        outliers: Optional[Sequence[bool]] = None,
+    ):
+        self.timestamps = np.asarray(timestamps if timestamps is not None else (), dtype=np.float64)
+        self.values = np.asarray(values if values is not None else (), dtype=np.float64)
+        if self.timestamps.shape != self.values.shape:
+            raise ValueError(
+                f"timestamps and values differ in length: {self.timestamps.size} != {self.values.size}"
+            )
+        if outliers is None:
+            self.outliers = np.zeros(self.values.shape, dtype=bool)
+        else:
+            self.outliers = np.asarray(outliers, dtype=bool)
+
+    @classmethod
+    def empty(cls) -> "TimeSeries":
+        return cls()
+
+    @classmethod
+    def from_points(cls, points: Iterable[Union[DataPoint, dict]]) -> "TimeSeries":
+        """Build from DataPoint objects (or their dict form)."""
+        points = [p if isinstance(p, DataPoint) else DataPoint(**p) for p in points]
+        return cls(
+            [_epoch(p.timestamp) for p in points],
+            [p.value for p in points],
+            [p.is_outlier for p in points],
+        )
+
+    @classmethod
+    def from_samples(cls, samples: Sequence[Sequence[Any]]) -> "TimeSeries":
+        """Build from Prometheus ``[[timestamp, "value"], ...]`` pairs."""
+        if len(samples) == 0:
+            return cls()
+        arr = np.asarray(samples, dtype=np.float64).reshape(-1, 2)
+        return cls(arr[:, 0], arr[:, 1])
+
+    @classmethod
+    def concat(cls, series: Sequence["TimeSeries"]) -> "TimeSeries":
+        """Concatenate and sort by timestamp (stable, so equal timestamps keep their order)."""
+        if not series:
+            return cls()
+        ts = np.concatenate([s.timestamps for s in series])
+        order = np.argsort(ts, kind="stable")
+        return cls(
+            ts[order],
+            np.concatenate([s.values for s in series])[order],
+            np.concatenate([s.outliers for s in series])[order],
+        )
+
+    @classmethod
+    def coerce(cls, data: Union["TimeSeries", Iterable[Any], None]) -> "TimeSeries":
+        """Accept a TimeSeries or any iterable of DataPoint."""
+        if isinstance(data, TimeSeries):
+            return data
+        return cls.from_points(data or [])
+
+    def __len__(self) -> int:
+        return int(self.values.size)
+
+    def __bool__(self) -> bool:
+        return self.values.size > 0
+
+    def __iter__(self) -> Iterator[DataPoint]:
+        return iter(self.to_points())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TimeSeries(self.timestamps[index], self.values[index], self.outliers[index])
+        return self._point(int(np.arange(self.values.size)[index]))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, TimeSeries):
+            return (
+                np.array_equal(self.timestamps, other.timestamps)
+                and np.array_equal(self.values, other.values, equal_nan=True)
+                and np.array_equal(self.outliers, other.outliers)
+            )
+        if isinstance(other, (list, tuple)):
+            return self.to_points() == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"TimeSeries(n={len(self)}, outliers={int(self.outliers.sum())})"
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + self.values.nbytes + self.outliers.nbytes
+
+    def copy(self) -> "TimeSeries":
+        return TimeSeries(self.timestamps.copy(), self.values.copy(), self.outliers.copy())
+
+    def with_outliers(self, mask: np.ndarray) -> "TimeSeries":
+        """Same samples with a new outlier mask (arrays are shared, not copied)."""
+        return TimeSeries(self.timestamps, self.values, mask)
+
+    def between(self, start: float, end: float) -> "TimeSeries":
+        """Samples with start <= timestamp <= end (epoch seconds)."""
+        i = int(np.searchsorted(self.timestamps, start, side="left"))
+        j = int(np.searchsorted(self.timestamps, end, side="right"))
+        return self[i:j]
+
+    def to_points(self) -> list[DataPoint]:
+        """Materialize DataPoint objects (API boundary only)."""
+        return [self._point(i) for i in range(self.values.size)]
+
+    def _point(self, i: int) -> DataPoint:
+        return DataPoint.model_construct(
+            timestamp=datetime.fromtimestamp(float(self.timestamps[i]), tz=timezone.utc),
+            value=float(self.values[i]),
+            is_outlier=bool(self.outliers[i]),
+        )
+
+
 class MetricTrend(BaseModel):
     """
     Analysis of a specific metric over time.
@@ -54,12 +192,18 @@ class MetricTrend(BaseModel):
     Created by TrendAnalyzer from Prometheus data.
     """
 
-    model_config = ConfigDict(frozen=True, extra="ignore")
+    model_config = ConfigDict(frozen=True, extra="ignore", arbitrary_types_allowed=True)
 
     metric_name: str
     trend_state: TrendState
     confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence of trend classification")
-    data_points: list[DataPoint] = Field(default_factory=list, description="Time-series data used")
+    # Excluded from dumps, so also left out of the JSON schema (data_points describes it)
+    series: SkipJsonSchema[TimeSeries] = Field(
+        default_factory=TimeSeries.empty,
+        exclude=True,
+        repr=False,
+        description="Columnar time-series data used (with outlier mask)",
+    )
 
     # Analysis metadata
     lookback_minutes: int = 15
@@ -74,6 +218,23 @@ class MetricTrend(BaseModel):
     time_window_seconds: int = 900
     fusion_method: str | None = None
 
+    @model_validator(mode="before")
+    @classmethod
+    def _series_from_data_points(cls, data: Any) -> Any:
+        """Accept the legacy ``data_points=[DataPoint, ...]`` argument."""
+        if isinstance(data, dict) and "data_points" in data:
+            data = dict(data)
+            points = data.pop("data_points")
+            if data.get("series") is None:
+                data["series"] = TimeSeries.coerce(points)
+        return data
+
+    @computed_field(description="Time-series data used", repr=False)
+    @cached_property
+    def data_points(self) -> list[DataPoint]:
+        """DataPoint view of `series`, materialized on first access or on serialization."""
+        return self.series.to_points()
+
     @property
     def is_actionable(self) -> bool:
         """Returns True if trend provides actionable insight."""
@@ -11,12 +11,17 @@ import asyncio
 from typing import Optional
 import json
 
+from src.utils.single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
+# Identical prompts issued concurrently share one Ollama request
+_GENERATE_FLIGHT = SingleFlight("ollama_generate")
+
 class OllamaClient:
     """Client for interacting with Ollama LLM."""
     
-    def __init__(self, base_url: str | None = None, model: str | None = None):
+    def __init__(self, base_url: str | None = None, model: str | None = None, coalesce: bool = True):
         # Resolve base_url: explicit param > OLLAMA_URL env > OLLAMA_HOST env > default localhost
         env_url = os.getenv("OLLAMA_URL")
         env_host = os.getenv("OLLAMA_HOST")
@@ -32,6 +37,7 @@ class OllamaClient:
         timeout_val = float(os.getenv("OLLAMA_TIMEOUT", "60"))
         self._retries = max(1, int(os.getenv("OLLAMA_RETRIES", "3")))
         self.client = httpx.AsyncClient(timeout=timeout_val)
+        self._coalesce = coalesce
         
     async def generate(
         self,
@@ -51,7 +57,25 @@ class OllamaClient:
             
         Returns:
             Generated text
+
+        Concurrent calls with the same prompt, system message and
+        temperature share a single request to Ollama.
         """
+        if not self._coalesce:
+            return await self._generate_once(prompt, system, temperature, stream)
+        key = (self.base_url, self.model, prompt, system, temperature, stream)
+        return await _GENERATE_FLIGHT.do(
+            key, lambda: self._generate_once(prompt, system, temperature, stream)
+        )
+
+    async def _generate_once(
+        self,
+        prompt: str,
+        system: Optional[str],
+        temperature: float,
+        stream: bool
+    ) -> str:
+        """Send one generate request (with retries) to Ollama."""
         payload = {
             "model": self.model,
             "prompt": prompt,
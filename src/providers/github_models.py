@@ -1,4 +1,5 @@
 from typing import Optional, Any, Dict, AsyncIterable, AsyncGenerator, Type, TypeVar, TypeAlias, TYPE_CHECKING
+import asyncio
 import os
 
 from strands.models import Model
@@ -13,6 +14,8 @@ else:  # pragma: no cover
     Messages: TypeAlias = Any
 from pydantic import BaseModel
 
+from src.llm.response_cache import cached_model_stream
+
 T = TypeVar("T", bound=BaseModel)
 
 
@@ -21,7 +24,7 @@ class MissingTokenError(RuntimeError):
 
 
 class GitHubModels(Model):
-    def __init__(self, endpoint: str = "https://models.github.ai/inference", model_name: str = "openai/gpt-5-mini", timeout: int = 30):
+    def __init__(self, endpoint: str = "https://models.github.ai/inference", model_name: str = "openai/gpt-5-mini", timeout: int = 30, response_cache: Any = None):
         token = os.environ.get("GITHUB_TOKEN")
         if not token:
             raise MissingTokenError("GITHUB_TOKEN not found in environment")
@@ -29,6 +32,8 @@ class GitHubModels(Model):
         self.endpoint = endpoint
         self.model_name = model_name
         self.timeout = timeout
+        # Optional src.llm.response_cache.LLMResponseCache; per-call opt-out via stream(..., use_cache=False)
+        self.response_cache = response_cache
 
         # Lazy import to keep file import-safe when SDK isn't installed
         try:
@@ -36,6 +41,20 @@ class GitHubModels(Model):
             self._client_cls: Any = ChatCompletionsClient  # type: ignore[assignment]
         except Exception:
             self._client_cls: Any = None  # type: ignore[assignment]
+        self._sdk_client_cls: Any = self._client_cls
+
+        try:
+            from azure.ai.inference.aio import ChatCompletionsClient as AsyncChatCompletionsClient  # type: ignore
+            self._async_client_cls: Any = AsyncChatCompletionsClient
+        except Exception:
+            self._async_client_cls = None
+
+        # One pooled client per provider instance (the async one per event loop,
+        # since its aiohttp session is bound to the loop that created it).
+        self._client: Any = None
+        self._client_owner: Any = None
+        self._async_client: Any = None
+        self._async_client_loop: Optional[asyncio.AbstractEventLoop] = None
 
     def get_config(self) -> Dict[str, Any]:
         return {"endpoint": self.endpoint, "model_name": self.model_name}
@@ -51,20 +70,45 @@ class GitHubModels(Model):
         async for ev in self.stream(prompt, system_prompt=system_prompt, **kwargs):
             yield ev  # type: ignore
 
-    def _get_client(self):
-        if self._client_cls is None:
-            raise RuntimeError("azure-ai-inference SDK not available; ensure azure-ai-inference is installed")
-
+    def _credential(self) -> Any:
         # azure-ai-inference typically expects an AzureKeyCredential; keep a string fallback
         # for compatibility with older SDKs and unit tests using fake clients.
         try:
             from azure.core.credentials import AzureKeyCredential  # type: ignore
 
-            credential: Any = AzureKeyCredential(self._token)
+            return AzureKeyCredential(self._token)
         except Exception:
-            credential = self._token
+            return self._token
+
+    def _get_client(self):
+        if self._client_cls is None:
+            raise RuntimeError("azure-ai-inference SDK not available; ensure azure-ai-inference is installed")
 
-        return self._client_cls(self.endpoint, credential=credential)
+        if self._client is None or self._client_owner is not self._client_cls:
+            self._client = self._client_cls(self.endpoint, credential=self._credential())
+            self._client_owner = self._client_cls
+        return self._client
+
+    def _use_async_client(self) -> bool:
+        # A custom `_client_cls` (older SDKs, unit-test fakes) keeps the
+        # synchronous request path, which then runs in a worker thread.
+        return self._async_client_cls is not None and self._client_cls is self._sdk_client_cls
+
+    def _get_async_client(self):
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._async_client = self._async_client_cls(self.endpoint, credential=self._credential())
+            self._async_client_loop = loop
+        return self._async_client
+
+    async def aclose(self) -> None:
+        """Close the pooled clients (connections are otherwise reused across calls)."""
+        client, self._async_client, self._async_client_loop = self._async_client, None, None
+        if client is not None:
+            await client.close()
+        if self._client is not None and hasattr(self._client, "close"):
+            self._client.close()
+        self._client = None
 
     def _make_request(self, client, chat_messages):
         try:
@@ -87,13 +131,16 @@ class GitHubModels(Model):
                 "Tried: complete, get_chat_response, create_chat_completion"
             )
         except Exception as e:
-            msg = str(e)
-            if "401" in msg or "403" in msg or "permission" in msg.lower():
-                raise PermissionError(
-                    "Permission error when calling GitHub Models. Ensure GITHUB_TOKEN has the required scope (e.g. 'models:use') and is valid. Original: "
-                    + msg
-                ) from e
-            raise
+            self._raise_translated(e)
+
+    def _raise_translated(self, e: Exception):
+        msg = str(e)
+        if "401" in msg or "403" in msg or "permission" in msg.lower():
+            raise PermissionError(
+                "Permission error when calling GitHub Models. Ensure GITHUB_TOKEN has the required scope (e.g. 'models:use') and is valid. Original: "
+                + msg
+            ) from e
+        raise e
 
     def _build_chat_messages(self, messages: Messages, system_prompt: Optional[str]) -> list:
         """Small helper to assemble chat messages payload (reduces complexity in stream)."""
@@ -242,24 +289,70 @@ class GitHubModels(Model):
         return text if isinstance(text, str) else None
 
     async def stream(self, messages: Messages, tool_specs=None, system_prompt: Optional[str] = None, **kwargs) -> AsyncIterable[StreamEvent]:
-        # Synchronous provider: call the SDK synchronously via thread or simple blocking call
-
-        client = self._get_client()
+        use_cache = kwargs.pop("use_cache", True)
+        async for ev in cached_model_stream(
+            self.response_cache,
+            "github_models",
+            self.model_name,
+            messages,
+            system_prompt,
+            lambda: self._stream_uncached(messages, system_prompt=system_prompt, **kwargs),
+            use_cache=use_cache,
+        ):
+            yield ev
+
+    async def _stream_uncached(self, messages: Messages, system_prompt: Optional[str] = None, **kwargs) -> AsyncIterable[StreamEvent]:
         chat_messages = self._build_chat_messages(messages, system_prompt)
-        response = self._make_request(client, chat_messages)
+
+        if self._use_async_client():
+            async for ev in self._stream_async(chat_messages):
+                yield ev
+            return
+
+        # Synchronous SDK/fake client: run the blocking call off the event loop
+        response = await asyncio.to_thread(self._make_request, self._get_client(), chat_messages)
         assistant_text = self._parse_response(response)
 
         if assistant_text is None:
             raise RuntimeError("Could not parse assistant text from GitHub Models response")
         # Log truncated assistant text for debugging (avoid extremely large logs)
-        # Log truncated assistant text for debugging (avoid extremely large logs)
         self._log_preview(assistant_text)
 
         # Yield a StreamEvent with contentBlockDelta
-        yield {
+        yield self._delta_event(assistant_text)
+
+    async def _stream_async(self, chat_messages: list) -> AsyncIterable[StreamEvent]:
+        """Yield one contentBlockDelta per streamed token chunk."""
+        client = self._get_async_client()
+        try:
+            response = await client.complete(
+                model=self.model_name,
+                messages=chat_messages,
+                stream=True,
+                timeout=self.timeout
+            )
+        except Exception as e:
+            self._raise_translated(e)
+
+        parts = []
+        async for update in response:
+            for choice in getattr(update, "choices", None) or []:
+                delta = getattr(choice, "delta", None)
+                text = getattr(delta, "content", None) if delta is not None else None
+                if text:
+                    parts.append(text)
+                    yield self._delta_event(text)
+
+        if not parts:
+            raise RuntimeError("Could not parse assistant text from GitHub Models response")
+        self._log_preview("".join(parts))
+
+    @staticmethod
+    def _delta_event(text: str) -> StreamEvent:
+        return {
             "contentBlockDelta": {
                 "contentBlockIndex": 0,
-                "delta": {"text": assistant_text}
+                "delta": {"text": text}
             }
         }
 
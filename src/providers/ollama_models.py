@@ -16,6 +16,8 @@ else:  # pragma: no cover
     Messages: TypeAlias = Any
 from pydantic import BaseModel
 
+from src.llm.response_cache import cached_model_stream
+
 T = TypeVar("T", bound=BaseModel)
 
 
@@ -29,11 +31,13 @@ class OllamaModels(Model):
     responses and yield incremental text deltas.
     """
 
-    def __init__(self, host: str = "http://localhost:11434", model_id: str = "llama3.1", timeout: int = 30, streaming: bool = False):
+    def __init__(self, host: str = "http://localhost:11434", model_id: str = "llama3.1", timeout: int = 30, streaming: bool = False, response_cache: Any = None):
         self.host = host.rstrip("/")
         self.model_id = model_id
         self.timeout = timeout
         self.streaming = streaming
+        # Optional src.llm.response_cache.LLMResponseCache; per-call opt-out via stream(..., use_cache=False)
+        self.response_cache = response_cache
 
         # lazy import httpx to keep module import-safe in test environments
         try:
@@ -120,6 +124,19 @@ class OllamaModels(Model):
         return None
 
     async def stream(self, messages: Messages, tool_specs=None, system_prompt: Optional[str] = None, **kwargs) -> AsyncIterable[StreamEvent]:
+        use_cache = kwargs.pop("use_cache", True)
+        async for ev in cached_model_stream(
+            self.response_cache,
+            "ollama_models",
+            self.model_id,
+            messages,
+            system_prompt,
+            lambda: self._stream_uncached(messages, system_prompt=system_prompt, **kwargs),
+            use_cache=use_cache,
+        ):
+            yield ev
+
+    async def _stream_uncached(self, messages: Messages, system_prompt: Optional[str] = None, **kwargs) -> AsyncIterable[StreamEvent]:
         # Build prompt
         prompt = self._make_prompt_from_messages(messages, system_prompt)
 
@@ -11,6 +11,8 @@ Constitution Principle II: Determinismo.
 from src.rules.correlation_rules import (
     CorrelationEngine,
     CorrelationConfig,
+    ClusterUpdate,
+    StreamingCorrelator,
     correlate_alerts,
 )
 from src.rules.trend_rules import (
@@ -19,6 +21,7 @@ from src.rules.trend_rules import (
     TrendRules,
     analyze_metric_trend,
 )
+from src.rules.online_trend import StreamingTrendDetector
 from src.rules.decision_rules import (
     DecisionRules,
     RuleEngine,
@@ -34,11 +37,14 @@ from src.rules.decision_rules import (
 __all__ = [
     "CorrelationEngine",
     "CorrelationConfig",
+    "ClusterUpdate",
+    "StreamingCorrelator",
     "correlate_alerts",
     "TrendAnalyzer",
     "TrendConfig",
     "TrendRules",
     "analyze_metric_trend",
+    "StreamingTrendDetector",
     "DecisionRules",
     "RuleEngine",
     "RuleResult",
@@ -3,12 +3,18 @@ Correlation Rules - Alert Clustering Logic
 
 Implements deterministic rules for grouping related alerts.
 Constitution Principle II: Rules execute BEFORE any LLM invocation.
+
+CorrelationEngine groups a complete batch; StreamingCorrelator takes alerts
+one at a time and emits AlertCluster updates as clusters grow and close.
 """
 
+import heapq
+import itertools
 import logging
-from collections import defaultdict
+from collections import Counter, defaultdict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Hashable, Optional
 
 from src.models.alert import NormalizedAlert
 from src.models.cluster import AlertCluster
@@ -19,6 +25,9 @@ logger = logging.getLogger(__name__)
 # Default configuration
 DEFAULT_TIME_WINDOW_MINUTES = 5
 DEFAULT_MIN_CORRELATION_SCORE = 0.5
+DEFAULT_MAX_CLUSTER_SIZE = 1000
+
+SEVERITY_ORDER = {"critical": 3, "warning": 2, "info": 1}
 
 
 class CorrelationConfig:
@@ -92,7 +101,7 @@ class CorrelationEngine:
         
         # Service-based clusters for alerts not in fingerprint groups
         processed_fingerprints = set(fingerprint_groups.keys())
-        for service, group_alerts in service_groups.items():
+        for group_alerts in service_groups:
             # Filter out alerts already in fingerprint groups
             remaining_alerts = [
                 a for a in group_alerts 
@@ -124,26 +133,31 @@ class CorrelationEngine:
     
     def _group_by_service_time(
         self, alerts: list[NormalizedAlert]
-    ) -> dict[str, list[NormalizedAlert]]:
-        """Group alerts by service within time window."""
-        groups: dict[str, list[NormalizedAlert]] = defaultdict(list)
+    ) -> list[list[NormalizedAlert]]:
+        """
+        Group alerts by service within time window.
+        
+        An alert arriving more than the window after the previous alert of
+        its service starts a new group for that service.
+        """
+        groups: list[list[NormalizedAlert]] = []
         
         if not self._config.group_by_service:
             return groups
         
         time_window = timedelta(minutes=self._config.time_window_minutes)
+        open_groups: dict[str, list[NormalizedAlert]] = {}
         
         for alert in alerts:
-            key = alert.service
+            group = open_groups.get(alert.service)
             
             # Check if this alert fits within time window of existing group
-            if groups[key]:
-                last_alert_time = groups[key][-1].timestamp
-                if alert.timestamp - last_alert_time <= time_window:
-                    groups[key].append(alert)
-                # else: Start new group implicitly on next iteration
+            if group is not None and alert.timestamp - group[-1].timestamp <= time_window:
+                group.append(alert)
             else:
-                groups[key].append(alert)
+                group = [alert]
+                open_groups[alert.service] = group
+                groups.append(group)
         
         return groups
     
@@ -153,18 +167,9 @@ class CorrelationEngine:
         
         Same fingerprint = high confidence (0.9-1.0).
         """
-        if len(alerts) <= 1:
-            return 1.0
-        
-        # Check temporal proximity for bonus
         timestamps = [a.timestamp for a in alerts]
         time_span = (max(timestamps) - min(timestamps)).total_seconds()
-        
-        # Base score + temporal bonus
-        base_score = 0.9
-        temporal_bonus = 0.1 if time_span <= 300 else 0.05  # 5-minute window
-        
-        return min(1.0, base_score + temporal_bonus)
+        return _fingerprint_score(len(alerts), time_span)
     
     def _calculate_service_score(self, alerts: list[NormalizedAlert]) -> float:
         """
@@ -172,24 +177,197 @@ class CorrelationEngine:
         
         Same service = moderate confidence (0.6-0.8).
         """
-        if len(alerts) <= 1:
-            return 0.7
-        
-        # Factors: severity consistency, temporal proximity
-        severities = [a.severity for a in alerts]
-        severity_consistency = len(set(severities)) == 1
-        
         timestamps = [a.timestamp for a in alerts]
         time_span = (max(timestamps) - min(timestamps)).total_seconds()
-        temporal_tight = time_span <= 180  # 3-minute window
+        return _service_score(len(alerts), len({a.severity for a in alerts}), time_span)
+
+
+def _fingerprint_score(alert_count: int, time_span: float) -> float:
+    """Score of a fingerprint group from its size and time span (seconds)."""
+    if alert_count <= 1:
+        return 1.0
+    
+    # Base score + temporal bonus
+    base_score = 0.9
+    temporal_bonus = 0.1 if time_span <= 300 else 0.05  # 5-minute window
+    
+    return min(1.0, base_score + temporal_bonus)
+
+
+def _service_score(alert_count: int, distinct_severities: int, time_span: float) -> float:
+    """Score of a service group from its size, severity mix and time span (seconds)."""
+    if alert_count <= 1:
+        return 0.7
+    
+    # Factors: severity consistency, temporal proximity
+    severity_consistency = distinct_severities == 1
+    temporal_tight = time_span <= 180  # 3-minute window
+    
+    base_score = 0.6
+    if severity_consistency:
+        base_score += 0.1
+    if temporal_tight:
+        base_score += 0.1
+    
+    return min(0.85, base_score)
+
+
+@dataclass(frozen=True)
+class ClusterUpdate:
+    """A cluster emitted by StreamingCorrelator.
+    
+    `cluster` is the same AlertCluster object across updates (same
+    cluster_id); `alert` is the alert that was just added (None when the
+    cluster is closed by expiry or flush).
+    """
+    
+    cluster: AlertCluster
+    alert: Optional[NormalizedAlert]
+    closed: bool
+
+
+class _OpenCluster:
+    """Running state of a cluster that can still accept alerts."""
+    
+    __slots__ = ("cluster", "kind", "first", "last", "services", "severities", "version")
+    
+    def __init__(self, kind: str):
+        self.cluster: Optional[AlertCluster] = None
+        self.kind = kind
+        self.first: Optional[datetime] = None
+        self.last: Optional[datetime] = None
+        self.services: Counter = Counter()
+        self.severities: Counter = Counter()
+        # Sequence number of this cluster's live heap entry
+        self.version = -1
+    
+    def add(self, alert: NormalizedAlert) -> None:
+        self.first = alert.timestamp if self.first is None else min(self.first, alert.timestamp)
+        self.last = alert.timestamp if self.last is None else max(self.last, alert.timestamp)
+        self.services[alert.service] += 1
+        self.severities[alert.severity] += 1
+        
+        count = self.cluster.alert_count + 1 if self.cluster is not None else 1
+        time_span = (self.last - self.first).total_seconds()
+        if self.kind == "fingerprint":
+            score = _fingerprint_score(count, time_span)
+        else:
+            score = _service_score(count, len(self.severities), time_span)
         
-        base_score = 0.6
-        if severity_consistency:
-            base_score += 0.1
-        if temporal_tight:
-            base_score += 0.1
+        if self.cluster is None:
+            self.cluster = AlertCluster.from_alerts([alert], correlation_score=score)
+            return
         
-        return min(0.85, base_score)
+        # Same computed properties as AlertCluster.from_alerts, kept incrementally
+        cluster = self.cluster
+        cluster.alerts.append(alert)
+        cluster.alert_count = count
+        cluster.correlation_score = score
+        cluster.primary_service = max(self.services, key=lambda k: self.services[k])
+        if SEVERITY_ORDER.get(alert.severity.lower(), 0) > SEVERITY_ORDER.get(
+            cluster.primary_severity.lower(), 0
+        ):
+            cluster.primary_severity = alert.severity
+
+
+class StreamingCorrelator:
+    """
+    Incremental, sliding-window version of CorrelationEngine.
+    
+    Alerts are accepted one at a time. Open clusters are indexed by
+    fingerprint (or by service when fingerprint grouping is disabled) and
+    their close deadlines (last alert + window) are kept in a heap, so each
+    alert costs O(log n). A cluster closes once event time moves past its
+    deadline, or when it reaches `max_cluster_size`; closed clusters are
+    emitted and forgotten, which bounds memory by the alerts of one window.
+    
+    Args:
+        config: Correlation configuration (time window, grouping criteria).
+        max_cluster_size: Alerts after which a cluster is closed and a new one opened.
+    """
+    
+    def __init__(
+        self,
+        config: Optional[CorrelationConfig] = None,
+        max_cluster_size: int = DEFAULT_MAX_CLUSTER_SIZE,
+    ):
+        self._config = config or CorrelationConfig()
+        self._window = timedelta(minutes=self._config.time_window_minutes)
+        self._max_cluster_size = max(1, max_cluster_size)
+        self._open: dict[Hashable, _OpenCluster] = {}
+        # (deadline, seq, key); an entry is stale unless seq is its cluster's version.
+        # seq is global, so entries of a closed cluster never match a new one under the same key
+        self._deadlines: list[tuple[datetime, int, Hashable]] = []
+        self._seq = itertools.count()
+        self._watermark: Optional[datetime] = None
+    
+    def __len__(self) -> int:
+        """Number of open clusters."""
+        return len(self._open)
+    
+    @property
+    def open_clusters(self) -> list[AlertCluster]:
+        return [state.cluster for state in self._open.values()]
+    
+    def add(self, alert: NormalizedAlert) -> list[ClusterUpdate]:
+        """
+        Add one alert.
+        
+        Returns:
+            Clusters closed because event time moved past their window,
+            followed by the update of the cluster `alert` joined or opened.
+        """
+        updates = self.advance(alert.timestamp)
+        
+        key, kind = self._key(alert)
+        state = self._open.get(key)
+        if state is not None and alert.timestamp < state.first - self._window:
+            # Late alert from well before this cluster: do not stretch it backwards
+            state = None
+            key = (key, next(self._seq))
+        if state is None:
+            state = _OpenCluster(kind)
+            self._open[key] = state
+        
+        state.add(alert)
+        updates.append(ClusterUpdate(state.cluster, alert, closed=False))
+        
+        if state.cluster.alert_count >= self._max_cluster_size:
+            updates.append(self._close(key))
+        else:
+            state.version = next(self._seq)
+            heapq.heappush(self._deadlines, (state.last + self._window, state.version, key))
+        return updates
+    
+    def advance(self, now: datetime) -> list[ClusterUpdate]:
+        """Move event time to `now` and close every cluster whose window has passed."""
+        if self._watermark is None or now > self._watermark:
+            self._watermark = now
+        
+        closed = []
+        while self._deadlines and self._deadlines[0][0] < self._watermark:
+            _, seq, key = heapq.heappop(self._deadlines)
+            state = self._open.get(key)
+            if state is not None and state.version == seq:
+                closed.append(self._close(key))
+        return closed
+    
+    def flush(self) -> list[ClusterUpdate]:
+        """Close and emit every open cluster."""
+        closed = [self._close(key) for key in list(self._open)]
+        self._deadlines.clear()
+        return closed
+    
+    def _key(self, alert: NormalizedAlert) -> tuple[Hashable, str]:
+        if self._config.group_by_fingerprint:
+            return ("fingerprint", alert.fingerprint), "fingerprint"
+        if self._config.group_by_service:
+            return ("service", alert.service), "service"
+        return ("alert", next(self._seq)), "fingerprint"
+    
+    def _close(self, key: Hashable) -> ClusterUpdate:
+        state = self._open.pop(key)
+        return ClusterUpdate(state.cluster, None, closed=True)
 
 
 def correlate_alerts(
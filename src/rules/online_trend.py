@@ -0,0 +1,461 @@
+"""
+Online Trend Detection - Streaming trend state for monitored series.
+
+A MONITOR decision used to re-run the whole swarm on a timer, re-querying
+the full lookback window each time. StreamingTrendDetector instead keeps
+O(1)-per-sample rolling statistics for every watched series and reports
+back when the classified trend state changes (or, for callbacks watching
+with `every_poll`, on every dispatch):
+
+- Welford mean/variance and a co-moment for the least-squares slope/R²,
+  with O(1) removal of samples leaving the window
+- a windowed P² sketch (Jain & Chlamtac) estimating p95; a sample above
+  p95 (and mean + 2σ, which keeps tied values in) is dropped as an outlier
+  only if the next one falls back (a transient spike), so a genuine ramp
+  is not filtered away
+- classification through TrendAnalyzer's shared rules, so thresholds,
+  confidence tiers and reasoning match the batch path
+
+It is fed incrementally: either by subscribing to a PrometheusRangeCache
+(which hands over only newly fetched segments) or by `poll`, which queries
+watched expressions through PrometheusClient and its range cache.
+"""
+
+import asyncio
+import inspect
+import logging
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.models.metric_trend import MetricTrend, TimeSeries, TrendState
+from src.rules.trend_rules import TrendAnalyzer
+
+logger = logging.getLogger(__name__)
+
+# (trend, previous_state) -> None, sync or async
+TrendChangeCallback = Callable[[MetricTrend, Optional[TrendState]], Union[None, Awaitable[None]]]
+
+
+class P2Quantile:
+    """
+    P² streaming quantile estimator: five markers, O(1) memory and update.
+
+    Exact (linear interpolation) until five samples have been seen.
+    """
+
+    __slots__ = ("p", "count", "_q", "_n", "_np", "_dn")
+
+    def __init__(self, p: float = 0.95):
+        self.p = p
+        self.count = 0
+        self._q: List[float] = []
+        self._n = [0, 1, 2, 3, 4]
+        self._np = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+        self._dn = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        q, n = self._q, self._n
+        if self.count <= 5:
+            q.append(x)
+            q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._np[i] += self._dn[i]
+
+        # Adjust the three middle markers towards their desired positions
+        for i in range(1, 4):
+            d = self._np[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                s = 1 if d > 0 else -1
+                candidate = q[i] + s / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + s) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - s) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not q[i - 1] < candidate < q[i + 1]:
+                    candidate = q[i] + s * (q[i + s] - q[i]) / (n[i + s] - n[i])
+                q[i] = candidate
+                n[i] += s
+
+    def value(self) -> float:
+        if self.count == 0:
+            return math.nan
+        if self.count <= 5:
+            return float(np.percentile(self._q, self.p * 100))
+        return self._q[2]
+
+
+class WindowedQuantile:
+    """
+    Approximate quantile over the last `window` samples.
+
+    Two staggered P² sketches: the older one, which always covers between
+    half a window and a full window of the most recent samples, answers.
+    """
+
+    __slots__ = ("p", "window", "_older", "_newer")
+
+    def __init__(self, window: int, p: float = 0.95):
+        self.p = p
+        self.window = max(2, window)
+        self._older = P2Quantile(p)
+        self._newer: Optional[P2Quantile] = None
+
+    def add(self, x: float) -> None:
+        self._older.add(x)
+        if self._newer is not None:
+            self._newer.add(x)
+        elif self._older.count >= self.window // 2:
+            self._newer = P2Quantile(self.p)
+        if self._older.count >= self.window and self._newer is not None:
+            self._older, self._newer = self._newer, None
+
+    def value(self) -> float:
+        return self._older.value()
+
+
+class RollingTrendStats:
+    """
+    Sliding-window mean, variance and least-squares fit in O(1) per sample.
+
+    x is the ordinal of the sample among kept samples, as in the batch path
+    (which regresses filtered values against 0..n-1).
+    """
+
+    __slots__ = ("n", "mean_x", "mean_y", "m2_x", "m2_y", "c_xy")
+
+    def __init__(self):
+        self.n = 0
+        self.mean_x = self.mean_y = 0.0
+        self.m2_x = self.m2_y = self.c_xy = 0.0
+
+    def add(self, x: float, y: float) -> None:
+        self.n += 1
+        dx = x - self.mean_x
+        self.mean_x += dx / self.n
+        dy = y - self.mean_y
+        self.mean_y += dy / self.n
+        self.m2_x += dx * (x - self.mean_x)
+        self.m2_y += dy * (y - self.mean_y)
+        self.c_xy += dx * (y - self.mean_y)
+
+    def remove(self, x: float, y: float) -> None:
+        if self.n <= 1:
+            self.__init__()
+            return
+        dx = x - self.mean_x
+        dy = y - self.mean_y
+        self.n -= 1
+        self.mean_x -= dx / self.n
+        self.mean_y -= dy / self.n
+        self.m2_x = max(0.0, self.m2_x - dx * (x - self.mean_x))
+        self.m2_y = max(0.0, self.m2_y - dy * (y - self.mean_y))
+        self.c_xy -= (x - self.mean_x) * dy
+
+    @property
+    def slope(self) -> float:
+        return self.c_xy / self.m2_x if self.m2_x > 0 else 0.0
+
+    @property
+    def r_squared(self) -> float:
+        if self.m2_x <= 0 or self.m2_y <= 0:
+            return 0.0
+        return min(1.0, self.c_xy * self.c_xy / (self.m2_x * self.m2_y))
+
+    @property
+    def cv(self) -> float:
+        std_dev = math.sqrt(self.m2_y / self.n) if self.n else 0.0
+        if self.mean_y == 0:
+            return 0.0 if std_dev == 0 else math.inf
+        return std_dev / abs(self.mean_y)
+
+
+@dataclass
+class _WatchedSeries:
+    metric_name: str
+    sketch: WindowedQuantile
+    callbacks: List[TrendChangeCallback] = field(default_factory=list)
+    # Callbacks that also run on dispatches without a state change
+    every_poll: List[TrendChangeCallback] = field(default_factory=list)
+    threshold_value: Optional[float] = None
+    stats: RollingTrendStats = field(default_factory=RollingTrendStats)
+    # Valid samples in the window: [timestamp, x, value, kept]
+    window: Deque[list] = field(default_factory=deque)
+    kept: Deque[float] = field(default_factory=deque)
+    next_x: int = 0
+    # Newest sample was above p95 on arrival (spike unless the next one is too)
+    pending_above: bool = False
+    last_timestamp: float = -math.inf
+    state: Optional[TrendState] = None
+
+
+class StreamingTrendDetector:
+    """
+    Incremental trend classification for watched PromQL expressions.
+
+    Args:
+        analyzer: TrendAnalyzer whose thresholds and confidence rules are used.
+        client: PrometheusClient used by `poll` (optional when fed by a cache).
+        window_size: Valid samples kept per series (lookback / step).
+        step_seconds: Step used by `poll`.
+        range_cache: Range cache to subscribe to for incremental samples.
+    """
+
+    def __init__(
+        self,
+        analyzer: Optional[TrendAnalyzer] = None,
+        client: Optional[Any] = None,
+        window_size: int = 31,
+        step_seconds: int = 30,
+        range_cache: Optional[Any] = None,
+    ):
+        self._analyzer = analyzer or TrendAnalyzer()
+        self._client = client
+        self.window_size = max(5, window_size)
+        self.step_seconds = step_seconds
+        self._series: Dict[str, _WatchedSeries] = {}
+        self._pending: List[Tuple[str, Optional[TrendState], MetricTrend]] = []
+        self._lock = threading.Lock()
+        if range_cache is not None:
+            range_cache.subscribe(self.observe)
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def __contains__(self, expr: str) -> bool:
+        return expr in self._series
+
+    def watch(
+        self,
+        expr: str,
+        callback: Optional[TrendChangeCallback] = None,
+        metric_name: Optional[str] = None,
+        threshold_value: Optional[float] = None,
+        every_poll: bool = False,
+    ) -> None:
+        """
+        Start tracking `expr`; `callback` fires on every trend state change.
+
+        With `every_poll`, `callback` also runs on each dispatch without a
+        state change, with the current trend and `previous` equal to its state.
+        """
+        with self._lock:
+            series = self._series.get(expr)
+            if series is None:
+                series = _WatchedSeries(
+                    metric_name or expr,
+                    WindowedQuantile(self.window_size),
+                    threshold_value=threshold_value,
+                )
+                self._series[expr] = series
+            if callback is not None and callback not in series.callbacks:
+                series.callbacks.append(callback)
+                if every_poll:
+                    series.every_poll.append(callback)
+
+    def unwatch(self, expr: str, callback: Optional[TrendChangeCallback] = None) -> None:
+        """
+        Remove `callback` from `expr`, or every callback if None.
+
+        The series is dropped once no callbacks remain.
+        """
+        with self._lock:
+            series = self._series.get(expr)
+            if series is None:
+                return
+            if callback is not None:
+                if callback in series.callbacks:
+                    series.callbacks.remove(callback)
+                if callback in series.every_poll:
+                    series.every_poll.remove(callback)
+                if series.callbacks:
+                    return
+            del self._series[expr]
+            self._pending = [p for p in self._pending if p[0] != expr]
+
+    def observe(self, expr: str, samples: TimeSeries) -> Optional[MetricTrend]:
+        """
+        Feed samples of `expr`; only those newer than the last seen are used.
+
+        Returns:
+            The new MetricTrend if the trend state changed, else None.
+        """
+        with self._lock:
+            series = self._series.get(expr)
+            if series is None or not samples:
+                return None
+
+            fresh = samples.timestamps > series.last_timestamp
+            if not fresh.any():
+                return None
+            timestamps = samples.timestamps[fresh]
+            values = samples.values[fresh]
+            series.last_timestamp = float(timestamps[-1])
+
+            for ts, y in zip(timestamps.tolist(), values.tolist()):
+                if math.isfinite(y):
+                    self._push(series, ts, y)
+
+            state, confidence, reasoning = self._classify(series)
+            if state == series.state:
+                return None
+            previous, series.state = series.state, state
+            trend = self._snapshot(series, state, confidence, reasoning)
+            self._pending.append((expr, previous, trend))
+
+        logger.info(
+            f"Streaming trend for '{series.metric_name}': "
+            f"{previous.name if previous is not None else 'NONE'} -> {state.name}"
+        )
+        return trend
+
+    def trend(self, expr: str) -> Optional[MetricTrend]:
+        """Current MetricTrend of a watched expression."""
+        with self._lock:
+            series = self._series.get(expr)
+            if series is None:
+                return None
+            return self._snapshot(series, *self._classify(series))
+
+    async def poll(self, lookback_minutes: Optional[int] = None) -> List[MetricTrend]:
+        """
+        Query every watched expression (served incrementally by the range
+        cache) and dispatch callbacks for state changes.
+
+        Returns:
+            Trends whose state changed since the last dispatch.
+        """
+        if self._client is not None and self._series:
+            lookback = lookback_minutes or self._analyzer._config.lookback_minutes
+            end = datetime.now(timezone.utc)
+            start = end - timedelta(minutes=lookback)
+            exprs = list(self._series)
+            results = await asyncio.gather(
+                *(self._client.query_range_async(expr, start, end, self.step_seconds) for expr in exprs),
+                return_exceptions=True,
+            )
+            for expr, result in zip(exprs, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Streaming trend poll failed for '{expr}': {result}")
+                else:
+                    self.observe(expr, TimeSeries.coerce(result))
+        return await self.dispatch()
+
+    async def dispatch(self) -> List[MetricTrend]:
+        """
+        Run callbacks for pending state changes, and `every_poll` callbacks
+        of series without one.
+
+        Returns:
+            Trends whose state changed since the last dispatch.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+            changed = {expr for expr, _, _ in pending}
+            calls = [
+                (expr, previous, trend, list(self._series[expr].callbacks))
+                for expr, previous, trend in pending
+                if expr in self._series
+            ]
+            for expr, series in self._series.items():
+                if series.every_poll and expr not in changed:
+                    trend = self._snapshot(series, *self._classify(series))
+                    calls.append((expr, trend.trend_state, trend, list(series.every_poll)))
+
+        for expr, previous, trend, callbacks in calls:
+            for callback in callbacks:
+                try:
+                    result = callback(trend, previous)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    logger.error(f"Trend change callback failed for '{expr}': {e}")
+        return [trend for _, _, trend in pending]
+
+    def _push(self, series: _WatchedSeries, ts: float, y: float) -> None:
+        series.sketch.add(y)
+        stats = series.stats
+        # Same rule as TrendAnalyzer: p95 filtering only once there are >5 valid points
+        above = (
+            len(series.window) + 1 > 5
+            and stats.n > 0
+            and y > series.sketch.value()
+            and y - stats.mean_y > 2 * math.sqrt(stats.m2_y / stats.n)
+        )
+
+        if series.pending_above and not above:
+            # The previous sample was a transient spike: drop it from the fit
+            newest = series.window[-1]
+            series.stats.remove(newest[1], newest[2])
+            series.kept.pop()
+            series.next_x -= 1
+            newest[3] = False
+
+        # Tentatively kept until the next sample confirms or demotes it
+        x = series.next_x
+        series.next_x += 1
+        series.stats.add(x, y)
+        series.kept.append(y)
+        series.window.append([ts, x, y, True])
+        series.pending_above = above
+
+        if len(series.window) > self.window_size:
+            _, old_x, old_y, old_kept = series.window.popleft()
+            if old_kept:
+                series.stats.remove(old_x, old_y)
+                series.kept.popleft()
+
+    def _classify(self, series: _WatchedSeries) -> Tuple[TrendState, float, str]:
+        total_valid = len(series.window)
+        if total_valid < 5:
+            return TrendState.UNKNOWN, 0.0, "Insufficient data: <5 valid data points"
+        used = series.stats.n
+        if used < 5:
+            return (
+                TrendState.UNKNOWN,
+                0.0,
+                f"Insufficient filtered data: {used} points after p95 filtering",
+            )
+        first, last = series.kept[0], series.kept[-1]
+        percent_change = (last - first) / abs(first) if first != 0 else 0.0
+        stats = series.stats
+        return self._analyzer._classify_from_stats(
+            used, total_valid, percent_change, stats.slope, stats.r_squared, stats.cv
+        )
+
+    def _snapshot(
+        self, series: _WatchedSeries, state: TrendState, confidence: float, reasoning: str
+    ) -> MetricTrend:
+        window = series.window
+        data = TimeSeries(
+            [w[0] for w in window], [w[2] for w in window], [not w[3] for w in window]
+        )
+        return self._analyzer._build_trend(
+            series.metric_name,
+            data,
+            series.threshold_value,
+            state,
+            confidence,
+            reasoning,
+            data_points_used=series.stats.n,
+            outliers_removed=len(window) - series.stats.n,
+        )
@@ -8,14 +8,19 @@ Enhanced with p95 outlier filtering (FR-011) and confidence scoring (FR-005).
 """
 
 import logging
-from typing import Optional, Tuple
+from collections import defaultdict
+from typing import Optional, Tuple, Union
 
-from src.models.metric_trend import MetricTrend, TrendState, DataPoint
+import numpy as np
+
+from src.models.metric_trend import MetricTrend, TrendState, DataPoint, TimeSeries
 from src.utils.statistics import (
-    filter_outliers_p95,
     compute_linear_trend,
     compute_variance_coefficient,
-    validate_data_points,
+    finite_mask,
+    linear_trend_rows,
+    p95_keep_mask,
+    variance_coefficient_rows,
 )
 
 logger = logging.getLogger(__name__)
@@ -66,7 +71,7 @@ class TrendAnalyzer:
     def analyze(
         self,
         metric_name: str,
-        data_points: list[DataPoint],
+        data_points: Union[TimeSeries, list[DataPoint]],
         threshold_value: Optional[float] = None,
     ) -> MetricTrend:
         """
@@ -78,26 +83,31 @@ class TrendAnalyzer:
         3. Classify trend using linear regression
         4. Assign confidence based on data quality
 
+        Works on the columnar arrays throughout; outliers are recorded in the
+        series' bitmask instead of re-creating DataPoint objects.
+
         Args:
             metric_name: Name of the metric being analyzed.
-            data_points: Time-series data points (should be sorted by timestamp).
+            data_points: Time series (or DataPoints) sorted by timestamp.
             threshold_value: Optional threshold that triggered the alert.
 
         Returns:
             MetricTrend with classification, confidence, and outlier metadata.
         """
+        series = TimeSeries.coerce(data_points)
+
         # Extract values and validate
-        values = [dp.value for dp in data_points]
-        valid_values = validate_data_points(values)
+        finite = finite_mask(series.values)
+        valid_values = series.values[finite]
 
         # Check for minimum data points (FR-005)
-        if len(valid_values) < 5:
+        if valid_values.size < 5:
             logger.warning(
-                f"Insufficient data for {metric_name}: {len(valid_values)} points (need ≥5)"
+                f"Insufficient data for {metric_name}: {valid_values.size} points (need ≥5)"
             )
             return self._create_unknown_trend(
                 metric_name,
-                data_points,
+                series,
                 threshold_value,
                 reasoning="Insufficient data: <5 valid data points",
             )
@@ -105,63 +115,67 @@ class TrendAnalyzer:
         # Apply p95 outlier filtering (FR-011)
         # For very small datasets, skip outlier filtering to avoid removing
         # critical points that would make the set insufficient for analysis.
-        total_valid = len(valid_values)
+        total_valid = valid_values.size
         if total_valid <= 5:
             filtered_values = valid_values
-            outliers = []
+            outlier_mask = np.zeros(series.values.shape, dtype=bool)
         else:
-            filtered_values, outliers = filter_outliers_p95(valid_values)
+            keep, p95_threshold = p95_keep_mask(valid_values)
+            filtered_values = valid_values[keep]
+            outlier_mask = finite & (series.values > p95_threshold)
 
-        # Update DataPoint objects with outlier flag
-        filtered_data_points = self._mark_outliers(data_points, outliers)
+        # Record outliers in the bitmask
+        marked = series.with_outliers(outlier_mask)
 
         # Calculate trend classification
         trend_state, confidence, reasoning = self._classify_trend_internal(
-            filtered_values, len(valid_values)
+            filtered_values, total_valid
         )
 
-        # Construct result with enhancement fields (FR-008)
+        return self._build_trend(
+            metric_name,
+            marked,
+            threshold_value,
+            trend_state,
+            confidence,
+            reasoning,
+            data_points_used=int(filtered_values.size),
+            outliers_removed=int(total_valid - filtered_values.size),
+        )
+
+    def _build_trend(
+        self,
+        metric_name: str,
+        series: TimeSeries,
+        threshold_value: Optional[float],
+        trend_state: TrendState,
+        confidence: float,
+        reasoning: str,
+        data_points_used: int,
+        outliers_removed: int,
+    ) -> MetricTrend:
+        """Construct result with enhancement fields (FR-008)."""
         return MetricTrend(
             metric_name=metric_name,
             trend_state=trend_state,
             confidence=confidence,
-            data_points=filtered_data_points,
+            series=series,
             lookback_minutes=self._config.lookback_minutes,
             threshold_value=threshold_value,
-            current_value=filtered_data_points[-1].value if filtered_data_points else None,
+            current_value=float(series.values[-1]) if series else None,
             # Enhancement fields
-            data_points_total=len(data_points),
-            data_points_used=len(filtered_values),
-            outliers_removed=len(outliers),
+            data_points_total=len(series),
+            data_points_used=data_points_used,
+            outliers_removed=outliers_removed,
             reasoning=reasoning,
             time_window_seconds=self._config.lookback_minutes * 60,
             fusion_method=None,  # Single-metric, no fusion
         )
 
-    def _mark_outliers(
-        self, data_points: list[DataPoint], outlier_values: list[float]
-    ) -> list[DataPoint]:
-        """Mark DataPoint objects as outliers based on filtered values."""
-        outlier_set = set(outlier_values)
-        marked_points = []
-
-        for dp in data_points:
-            is_outlier = dp.value in outlier_set
-            # Create new DataPoint with is_outlier flag
-            marked_points.append(
-                DataPoint(
-                    timestamp=dp.timestamp,
-                    value=dp.value,
-                    is_outlier=is_outlier,
-                )
-            )
-
-        return marked_points
-
     def _create_unknown_trend(
         self,
         metric_name: str,
-        data_points: list[DataPoint],
+        series: TimeSeries,
         threshold_value: Optional[float],
         reasoning: str,
     ) -> MetricTrend:
@@ -170,11 +184,11 @@ class TrendAnalyzer:
             metric_name=metric_name,
             trend_state=TrendState.UNKNOWN,
             confidence=0.0,
-            data_points=data_points,
+            series=series,
             lookback_minutes=self._config.lookback_minutes,
             threshold_value=threshold_value,
-            current_value=data_points[-1].value if data_points else None,
-            data_points_total=len(data_points),
+            current_value=float(series.values[-1]) if series else None,
+            data_points_total=len(series),
             data_points_used=0,
             outliers_removed=0,
             reasoning=reasoning,
@@ -183,7 +197,7 @@ class TrendAnalyzer:
         )
 
     def _classify_trend_internal(
-        self, values: list[float], total_valid_points: int
+        self, values: Union[np.ndarray, list[float]], total_valid_points: int
     ) -> tuple[TrendState, float, str]:
         """
         Classify trend using linear regression slope with tiered confidence.
@@ -210,12 +224,34 @@ class TrendAnalyzer:
         # Prefer relative percent change over the window for classification.
         # This aligns with human expectations (e.g., 15% increase => degrading).
         try:
-            first = values[0]
-            last = values[-1]
+            first = float(values[0])
+            last = float(values[-1])
             percent_change = (last - first) / abs(first) if first != 0 else 0.0
         except Exception:
             percent_change = 0.0
 
+        # Compute linear regression diagnostics for confidence scoring
+        slope, r_squared = compute_linear_trend(values)
+        cv = compute_variance_coefficient(values)
+
+        return self._classify_from_stats(
+            len(values), total_valid_points, percent_change, slope, r_squared, cv
+        )
+
+    def _classify_from_stats(
+        self,
+        points_used: int,
+        total_valid_points: int,
+        percent_change: float,
+        slope: float,
+        r_squared: float,
+        cv: float,
+    ) -> tuple[TrendState, float, str]:
+        """
+        Classification and confidence from precomputed series statistics.
+
+        Shared by the scalar and batched paths so both classify identically.
+        """
         if percent_change > self._config.degrading_threshold:
             trend_state = TrendState.DEGRADING
             direction = "increasing"
@@ -226,18 +262,14 @@ class TrendAnalyzer:
             trend_state = TrendState.STABLE
             direction = "stable"
 
-        # Compute linear regression diagnostics for confidence scoring
-        slope, r_squared = compute_linear_trend(values)
-        cv = compute_variance_coefficient(values)
-
         # Tiered confidence scoring (FR-005)
         base_confidence = r_squared  # Start with goodness-of-fit (0.0-1.0)
 
-        if len(values) >= 10:
+        if points_used >= 10:
             # High-quality data: boost confidence
             confidence = min(base_confidence + 0.15, 0.95)
             data_quality = "high (≥10 points)"
-        elif len(values) >= 5:
+        elif points_used >= 5:
             # Medium-quality data: cap confidence
             confidence = min(base_confidence, 0.70)
             data_quality = "medium (5-9 points)"
@@ -255,7 +287,7 @@ class TrendAnalyzer:
 
         # Boost confidence for STABLE classification: low CV and many points should be trustworthy
         if trend_state == TrendState.STABLE:
-            if len(values) >= 10:
+            if points_used >= 10:
                 confidence = max(confidence, min(0.95, 0.6 + (1 - min(cv, 1.0)) * 0.3))
             else:
                 confidence = max(confidence, min(0.75, 0.5 + (1 - min(cv, 1.0)) * 0.2))
@@ -266,7 +298,7 @@ class TrendAnalyzer:
             f"Confidence: {confidence:.2f} (R²={r_squared:.2f}, data_quality={data_quality}, "
             f"cv={cv:.2f}{variance_note}). "
             f"Thresholds: degrading={self._config.degrading_threshold}, recovering={self._config.recovering_threshold}. "
-            f"Points: {len(values)} used from {total_valid_points} valid."
+            f"Points: {points_used} used from {total_valid_points} valid."
         )
 
         return trend_state, confidence, reasoning
@@ -312,7 +344,7 @@ class TrendAnalyzer:
 
     def analyze_multiple(
         self,
-        metrics: dict[str, list[DataPoint]],
+        metrics: dict[str, Union[TimeSeries, list[DataPoint]]],
     ) -> dict[str, MetricTrend]:
         """
         Analyze multiple metrics at once.
@@ -325,6 +357,126 @@ class TrendAnalyzer:
         """
         return {name: self.analyze(name, points) for name, points in metrics.items()}
 
+    def analyze_many(
+        self,
+        metrics: dict[str, Union[TimeSeries, list[DataPoint]]],
+        threshold_values: Optional[dict[str, float]] = None,
+    ) -> dict[str, MetricTrend]:
+        """
+        Batched `analyze` for fleet-wide scans over thousands of series.
+
+        Series are stacked into 2D arrays and validated, p95-filtered and
+        fitted a whole block at a time. Rows are grouped by length rather than
+        padded, so each row goes through exactly the same NumPy reductions as
+        the scalar path and results (state, confidence, reasoning, outlier
+        mask) are identical to calling `analyze` on each series.
+
+        Args:
+            metrics: Dict mapping metric names to their time series.
+            threshold_values: Optional per-metric threshold that triggered the alert.
+
+        Returns:
+            Dict mapping metric names to their trend analysis, in input order.
+        """
+        threshold_values = threshold_values or {}
+        names = list(metrics)
+        series = [TimeSeries.coerce(metrics[name]) for name in names]
+        results: list[Optional[MetricTrend]] = [None] * len(names)
+
+        # Filtered rows waiting for classification, grouped by kept length:
+        # kept length -> list of (series indices, filtered block, valid counts)
+        pending: dict[int, list[tuple[np.ndarray, np.ndarray, np.ndarray]]] = defaultdict(list)
+        insufficient = invalid = 0
+
+        by_length: dict[int, list[int]] = defaultdict(list)
+        for i, s in enumerate(series):
+            by_length[len(s)].append(i)
+
+        for length, members in by_length.items():
+            members = np.asarray(members)
+            block = np.stack([series[i].values for i in members]).reshape(len(members), length)
+            finite = np.isfinite(block)
+            counts = finite.sum(axis=1)
+            invalid += int(block.size - counts.sum())
+            outlier_mask = np.zeros(block.shape, dtype=bool)
+
+            for valid in np.unique(counts):
+                rows = np.flatnonzero(counts == valid)
+                if valid < 5:
+                    # Check for minimum data points (FR-005)
+                    insufficient += rows.size
+                    for r in rows:
+                        i = members[r]
+                        results[i] = self._create_unknown_trend(
+                            names[i],
+                            series[i],
+                            threshold_values.get(names[i]),
+                            reasoning="Insufficient data: <5 valid data points",
+                        )
+                    continue
+
+                values = block[rows]
+                if valid < length:
+                    values = values[finite[rows]].reshape(rows.size, valid)
+
+                # Apply p95 outlier filtering (FR-011), skipped for very small datasets
+                if valid <= 5:
+                    keep = np.ones(values.shape, dtype=bool)
+                else:
+                    p95 = np.percentile(values, 95, axis=1, keepdims=True)
+                    keep = values <= p95
+                    outlier_mask[rows] = finite[rows] & (block[rows] > p95)
+
+                kept = keep.sum(axis=1)
+                for used in np.unique(kept):
+                    sub = np.flatnonzero(kept == used)
+                    filtered = values[sub][keep[sub]].reshape(sub.size, used)
+                    pending[int(used)].append((members[rows[sub]], filtered, np.full(sub.size, valid)))
+
+            # Record outliers in the bitmask (rows of one shared block)
+            for r, i in enumerate(members):
+                if results[i] is None:
+                    series[i] = series[i].with_outliers(outlier_mask[r])
+
+        for used, groups in pending.items():
+            indices = np.concatenate([g[0] for g in groups])
+            filtered = np.concatenate([g[1] for g in groups])
+            valid_counts = np.concatenate([g[2] for g in groups])
+
+            if used < 5:
+                stats = None
+            else:
+                first, last = filtered[:, 0], filtered[:, -1]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    percent_change = np.where(first != 0, (last - first) / np.abs(first), 0.0)
+                slopes, r_squared = linear_trend_rows(filtered)
+                cvs = variance_coefficient_rows(filtered)
+                stats = (percent_change, slopes, r_squared, cvs)
+
+            for row, i in enumerate(indices):
+                total_valid = int(valid_counts[row])
+                if stats is None:
+                    classification = self._classify_trend_internal(filtered[row], total_valid)
+                else:
+                    classification = self._classify_from_stats(
+                        used, total_valid, *(float(stat[row]) for stat in stats)
+                    )
+                results[i] = self._build_trend(
+                    names[i],
+                    series[i],
+                    threshold_values.get(names[i]),
+                    *classification,
+                    data_points_used=used,
+                    outliers_removed=total_valid - used,
+                )
+
+        if invalid:
+            logger.warning(f"Removed {invalid} invalid values (NaN/Inf) across {len(names)} series")
+        if insufficient:
+            logger.warning(f"Insufficient data for {insufficient}/{len(names)} series (need ≥5 points)")
+
+        return dict(zip(names, results))
+
 
 def fuse_trends(trends: list[tuple[TrendState, float]]) -> tuple[TrendState, float]:
     """
@@ -468,7 +620,7 @@ class TrendRules:
 
 def analyze_metric_trend(
     metric_name: str,
-    data_points: list[DataPoint],
+    data_points: Union[TimeSeries, list[DataPoint]],
     threshold_value: Optional[float] = None,
 ) -> MetricTrend:
     """
@@ -1,17 +1,33 @@
 """
 Runbook Embedding Service - Semantic Indexing of Operational Procedures
 Processes Markdown runbooks and stores them in Qdrant for semantic retrieval.
+
+Indexing is incremental: every point carries a hash of its embedded text, a
+file whose mtime and size are unchanged is skipped without being read, and
+only sections whose hash changed are re-embedded. Section IDs that no longer
+exist (shrunk or deleted runbooks) are removed. Changed sections are encoded
+in batches and upserted in bounded chunks, so memory does not grow with the
+size of the runbook tree.
+
+Search is hybrid: a local BM25 index (src/utils/bm25_index.py) is updated
+alongside every upsert and delete, and its ranking is fused with the Qdrant
+ranking by reciprocal-rank fusion, so exact tokens such as error codes and
+metric names are not lost to dense similarity. The BM25 index can be
+persisted (RUNBOOK_BM25_PATH) and then serves lexical results even before
+the model or Qdrant is available.
 """
 
 import os
+import asyncio
 import logging
 import hashlib
-from typing import List, Dict, Any, Optional
+import threading
+from typing import List, Dict, Any, Optional, Set, Tuple
 from pathlib import Path
 
 try:
     from qdrant_client import QdrantClient
-    from qdrant_client.models import Distance, VectorParams, PointStruct
+    from qdrant_client.models import Distance, VectorParams, PointStruct, PointIdsList
     QDRANT_AVAILABLE = True
 except ImportError:
     QDRANT_AVAILABLE = False
@@ -22,6 +38,9 @@ try:
 except ImportError:
     MODEL_AVAILABLE = False
 
+from src.tools.embedding_batcher import EmbeddingBatcher
+from src.utils.bm25_index import BM25Index, reciprocal_rank_fusion
+
 logger = logging.getLogger(__name__)
 
 class RunbookEmbeddingService:
@@ -34,18 +53,33 @@ class RunbookEmbeddingService:
     
     COLLECTION_NAME = "runbooks"
     VECTOR_SIZE = 384 # Matches all-MiniLM-L6-v2
+    CANDIDATES_PER_RESULT = 4 # Each retriever's depth before fusion, per requested result
     
     def __init__(
         self,
         runbooks_path: Optional[str] = None,
         qdrant_host: str = "localhost",
-        qdrant_port: int = 6333
+        qdrant_port: int = 6333,
+        encode_batch_size: int = 64,
+        upsert_batch_size: int = 256,
+        lexical_index_path: Optional[str] = None,
     ):
         self.runbooks_path = runbooks_path or os.getenv("RUNBOOKS_PATH", "/home/ubuntu/strands/docs")
         self._qdrant_host = qdrant_host
         self._qdrant_port = qdrant_port
+        self.encode_batch_size = max(1, encode_batch_size)
+        self.upsert_batch_size = max(1, upsert_batch_size)
         self._client = None
         self._model = None
+        self._batcher: Optional[EmbeddingBatcher] = None
+        # path -> {"stat": (mtime_ns, size) or None, "sections": {section_id: content_hash}}
+        self._manifest: Optional[Dict[str, Dict[str, Any]]] = None
+        self._index_lock = threading.Lock()
+        self.lexical_index_path = lexical_index_path or os.getenv("RUNBOOK_BM25_PATH") or None
+        self._lexical_index = (
+            BM25Index.load(self.lexical_index_path) if self.lexical_index_path else BM25Index()
+        )
+        self._lexical_dirty = False
         
         if QDRANT_AVAILABLE:
             try:
@@ -99,6 +133,9 @@ class RunbookEmbeddingService:
     def index_runbooks(self) -> Dict[str, int]:
         """
         Scan the runbooks directory and index all Markdown files with granular sections.
+
+        Only new or changed sections are embedded; sections and files that
+        disappeared since the last run are deleted from the collection.
         """
         if not self._model or not self._client:
             return {"indexed": 0, "errors": 1, "message": "Model or Qdrant not available"}
@@ -107,73 +144,301 @@ class RunbookEmbeddingService:
         if not path.exists():
             logger.warning(f"[RUNBOOK_SERVICE] Path {self.runbooks_path} does not exist")
             return {"indexed": 0, "errors": 1}
-            
-        indexed_count = 0
-        files = list(path.glob("**/*.md"))
-        
-        points = []
+
+        with self._index_lock:
+            return self._index_incremental(path)
+
+    def _index_incremental(self, path: Path) -> Dict[str, int]:
+        manifest = self._load_manifest()
+        files = sorted(path.glob("**/*.md"))
+        stats = {"indexed": 0, "total_files": len(files), "embedded": 0, "unchanged": 0, "deleted": 0, "errors": 0}
+
+        pending: List[Tuple[str, str, str, Dict[str, Any]]] = []
+        failed: Set[str] = set()
+        seen: Set[str] = set()
+
         for md_file in files:
+            key = str(md_file)
+            seen.add(key)
             try:
-                content = md_file.read_text(encoding="utf-8")
-                if not content.strip():
+                stat = md_file.stat()
+                entry = manifest.setdefault(key, {"stat": None, "sections": {}})
+                if entry["stat"] == (stat.st_mtime_ns, stat.st_size):
+                    stats["unchanged"] += len(entry["sections"])
+                    stats["indexed"] += 1 if entry["sections"] else 0
                     continue
-                
-                sections = self._parse_sections(content)
-                
-                for i, section in enumerate(sections):
+
+                content = md_file.read_text(encoding="utf-8")
+                current: Dict[str, str] = {}
+                for i, section in enumerate(self._parse_sections(content) if content.strip() else []):
                     # Granular context: Title + Content
                     text_to_embed = f"Runbook: {md_file.name} | Section: {section['title']}\n{section['content']}"
-                    
+
                     # Unique ID for the section
                     section_id = hashlib.md5(f"{md_file}:{i}".encode()).hexdigest()
-                    embedding = self._model.encode(text_to_embed).tolist()
-                    
-                    points.append(PointStruct(
-                        id=section_id,
-                        vector=embedding,
-                        payload={
-                            "file_name": md_file.name,
-                            "section_title": section["title"],
-                            "path": str(md_file),
-                            "content": section["content"],
-                            "full_context": text_to_embed
-                        }
-                    ))
-                indexed_count += 1
+                    content_hash = hashlib.sha256(text_to_embed.encode()).hexdigest()
+                    current[section_id] = content_hash
+                    if entry["sections"].get(section_id) == content_hash:
+                        stats["unchanged"] += 1
+                        continue
+
+                    pending.append((key, section_id, text_to_embed, {
+                        "file_name": md_file.name,
+                        "section_title": section["title"],
+                        "path": key,
+                        "content": section["content"],
+                        "full_context": text_to_embed,
+                        "content_hash": content_hash,
+                    }))
+                    if len(pending) >= self.upsert_batch_size:
+                        stats["embedded"] += self._flush_sections(pending, manifest, failed)
+
+                stale = [sid for sid in entry["sections"] if sid not in current]
+                stats["deleted"] += self._delete_sections(key, stale, manifest)
+                entry["pending_stat"] = (stat.st_mtime_ns, stat.st_size)
+                if current:
+                    stats["indexed"] += 1
             except Exception as e:
+                failed.add(key)
+                stats["errors"] += 1
                 logger.error(f"[RUNBOOK_SERVICE] Failed to index {md_file}: {e}")
-                
-        if points:
-            self._client.upsert(collection_name=self.COLLECTION_NAME, points=points)
-            
-        logger.info(f"[RUNBOOK_SERVICE] Indexed {indexed_count} runbooks (granularly) from {self.runbooks_path}")
-        return {"indexed": indexed_count, "total_files": len(files)}
+
+        if pending:
+            stats["embedded"] += self._flush_sections(pending, manifest, failed)
+
+        # Runbooks removed from disk
+        for key in [k for k in manifest if k not in seen]:
+            try:
+                stats["deleted"] += self._delete_sections(key, list(manifest[key]["sections"]), manifest)
+                del manifest[key]
+            except Exception as e:
+                stats["errors"] += 1
+                logger.error(f"[RUNBOOK_SERVICE] Failed to remove sections of {key}: {e}")
+
+        # A file is only skipped by stat next time once all its sections landed
+        for key, entry in manifest.items():
+            pending_stat = entry.pop("pending_stat", None)
+            if pending_stat is not None and key not in failed:
+                entry["stat"] = pending_stat
+
+        if self.lexical_index_path and (stats["embedded"] or stats["deleted"] or self._lexical_dirty):
+            try:
+                self._lexical_index.save(self.lexical_index_path)
+                self._lexical_dirty = False
+            except OSError as e:
+                logger.error(f"[RUNBOOK_SERVICE] Failed to persist BM25 index: {e}")
+
+        logger.info(
+            f"[RUNBOOK_SERVICE] Indexed {stats['indexed']} runbooks (granularly) from {self.runbooks_path}: "
+            f"{stats['embedded']} sections embedded, {stats['unchanged']} unchanged, {stats['deleted']} deleted"
+        )
+        return stats
+
+    def _flush_sections(
+        self,
+        pending: List[Tuple[str, str, str, Dict[str, Any]]],
+        manifest: Dict[str, Dict[str, Any]],
+        failed: Set[str],
+    ) -> int:
+        """Batch-encode and upsert queued sections, then clear the queue."""
+        batch, pending[:] = list(pending), []
+        try:
+            vectors: List[List[float]] = []
+            for start in range(0, len(batch), self.encode_batch_size):
+                texts = [text for _, _, text, _ in batch[start:start + self.encode_batch_size]]
+                vectors.extend(self._encode_batch(texts))
+
+            self._client.upsert(
+                collection_name=self.COLLECTION_NAME,
+                points=[
+                    PointStruct(id=section_id, vector=vector, payload=payload)
+                    for (_, section_id, _, payload), vector in zip(batch, vectors)
+                ],
+            )
+        except Exception as e:
+            failed.update(key for key, _, _, _ in batch)
+            logger.error(f"[RUNBOOK_SERVICE] Failed to upsert {len(batch)} sections: {e}")
+            return 0
+
+        for key, section_id, text, payload in batch:
+            manifest[key]["sections"][section_id] = payload["content_hash"]
+            self._lexical_index.add(section_id, text, self._lexical_payload(payload))
+        return len(batch)
+
+    def _delete_sections(self, key: str, section_ids: List[str], manifest: Dict[str, Dict[str, Any]]) -> int:
+        """Delete section points in upsert-sized chunks and forget them."""
+        for start in range(0, len(section_ids), self.upsert_batch_size):
+            chunk = section_ids[start:start + self.upsert_batch_size]
+            self._client.delete(
+                collection_name=self.COLLECTION_NAME,
+                points_selector=PointIdsList(points=chunk),
+            )
+            for section_id in chunk:
+                manifest[key]["sections"].pop(section_id, None)
+                self._lexical_index.remove(section_id)
+        return len(section_ids)
+
+    @staticmethod
+    def _lexical_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Fields kept next to the BM25 postings to render a lexical-only hit."""
+        return {k: payload.get(k) for k in ("file_name", "section_title", "path", "content")}
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Rebuild which sections are indexed (and their hashes) from Qdrant.
+
+        Runs once per process; later calls use the in-memory manifest. Points
+        indexed before hashes were stored get an empty hash and are re-embedded.
+        The BM25 index is reconciled with the collection at the same time.
+        """
+        if self._manifest is not None:
+            return self._manifest
+
+        manifest: Dict[str, Dict[str, Any]] = {}
+        offset = None
+        try:
+            while True:
+                records, offset = self._client.scroll(
+                    collection_name=self.COLLECTION_NAME,
+                    limit=self.upsert_batch_size,
+                    offset=offset,
+                    with_payload=["path", "content_hash"],
+                    with_vectors=False,
+                )
+                for record in records:
+                    payload = record.payload or {}
+                    entry = manifest.setdefault(payload.get("path", ""), {"stat": None, "sections": {}})
+                    entry["sections"][str(record.id).replace("-", "")] = payload.get("content_hash", "")
+                if offset is None:
+                    break
+        except Exception as e:
+            logger.warning(f"[RUNBOOK_SERVICE] Could not load index manifest, re-indexing everything: {e}")
+            manifest = {}
+
+        self._manifest = manifest
+        self._reconcile_lexical_index(manifest)
+        return manifest
+
+    def _reconcile_lexical_index(self, manifest: Dict[str, Dict[str, Any]]) -> None:
+        """Make the BM25 index hold exactly the sections stored in Qdrant."""
+        indexed = {sid for entry in manifest.values() for sid in entry["sections"]}
+        stale = [sid for sid in self._lexical_index.ids() if sid not in indexed]
+        for section_id in stale:
+            self._lexical_index.remove(section_id)
+
+        missing = [sid for sid in indexed if sid not in self._lexical_index]
+        try:
+            for start in range(0, len(missing), self.upsert_batch_size):
+                records = self._client.retrieve(
+                    collection_name=self.COLLECTION_NAME,
+                    ids=missing[start:start + self.upsert_batch_size],
+                    with_payload=True,
+                    with_vectors=False,
+                )
+                for record in records:
+                    payload = record.payload or {}
+                    self._lexical_index.add(
+                        str(record.id).replace("-", ""),
+                        payload.get("full_context", ""),
+                        self._lexical_payload(payload),
+                    )
+        except Exception as e:
+            logger.warning(f"[RUNBOOK_SERVICE] Could not rebuild BM25 index from Qdrant: {e}")
+        self._lexical_dirty = bool(stale or missing)
+
+    async def watch_runbooks(self, interval_seconds: float = 30.0, stop_event: Optional[asyncio.Event] = None) -> None:
+        """
+        Re-index the runbooks directory every `interval_seconds` until `stop_event` is set.
+
+        Each pass only stats unchanged files, so polling is cheap; indexing
+        runs in a worker thread.
+        """
+        stop_event = stop_event or asyncio.Event()
+        while not stop_event.is_set():
+            try:
+                result = await asyncio.to_thread(self.index_runbooks)
+                if result.get("embedded") or result.get("deleted"):
+                    logger.info(f"[RUNBOOK_SERVICE] Runbook changes indexed: {result}")
+            except Exception as e:
+                logger.error(f"[RUNBOOK_SERVICE] Runbook watch pass failed: {e}")
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=interval_seconds)
+            except asyncio.TimeoutError:
+                pass
 
     def search_procedures(self, query: str, limit: int = 3) -> List[Dict[str, Any]]:
         """
         Search for relevant procedures based on an incident description.
+
+        Dense and BM25 rankings are fused; with no model or Qdrant, only the
+        BM25 index is searched.
         """
         if not self._model or not self._client:
-            return []
+            return self._fuse([], self._lexical_index.search(query, limit), limit)
             
         query_vector = self._model.encode(query).tolist()
-        
+        return self._search_by_vector(query_vector, limit, query)
+
+    async def asearch_procedures(self, query: str, limit: int = 3) -> List[Dict[str, Any]]:
+        """
+        Async variant of search_procedures: the query is micro-batched with
+        concurrent searches and the Qdrant call runs in a worker thread.
+        """
+        if not self._model or not self._client:
+            return self._fuse([], self._lexical_index.search(query, limit), limit)
+
+        if self._batcher is None:
+            self._batcher = EmbeddingBatcher(self._encode_batch)
+        query_vector = await self._batcher.embed(query)
+        return await asyncio.to_thread(self._search_by_vector, query_vector, limit, query)
+
+    def _encode_batch(self, texts: List[str]) -> List[List[float]]:
+        """Single forward pass over a batch of texts (runs in a worker thread)."""
+        return self._model.encode(texts).tolist()
+
+    def _search_by_vector(
+        self, query_vector: List[float], limit: int, query: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Run the Qdrant similarity search, fused with BM25 when the query text is given."""
+        depth = limit * self.CANDIDATES_PER_RESULT if query else limit
         try:
             results = self._client.search(
                 collection_name=self.COLLECTION_NAME,
                 query_vector=query_vector,
-                limit=limit
+                limit=depth
             )
-            
-            return [
-                {
-                    "score": res.score,
-                    "file_name": res.payload.get("file_name"),
-                    "content": res.payload.get("full_content"),
-                    "path": res.payload.get("path")
-                }
-                for res in results
-            ]
+            dense = [(str(res.id).replace("-", ""), res.score, res.payload or {}) for res in results]
         except Exception as e:
             logger.error(f"[RUNBOOK_SERVICE] Search failed: {e}")
-            return []
+            dense = []
+
+        lexical = self._lexical_index.search(query, depth) if query else []
+        return self._fuse(dense, lexical, limit)
+
+    @staticmethod
+    def _fuse(
+        dense: List[Tuple[str, float, Dict[str, Any]]],
+        lexical: List[Tuple[str, float, Dict[str, Any]]],
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        """Reciprocal-rank fusion of (id, score, payload) rankings; score is the fused score."""
+        if not lexical:
+            fused = [(section_id, score) for section_id, score, _ in dense[:limit]]
+        else:
+            fused = reciprocal_rank_fusion(
+                [section_id for section_id, _, _ in dense],
+                [section_id for section_id, _, _ in lexical],
+            )[:limit]
+
+        payloads = {section_id: payload for section_id, _, payload in lexical}
+        payloads.update({section_id: payload for section_id, _, payload in dense})
+        return [
+            {
+                "score": score,
+                "file_name": payloads[section_id].get("file_name"),
+                "section_title": payloads[section_id].get("section_title"),
+                "content": payloads[section_id].get("content"),
+                "path": payloads[section_id].get("path")
+            }
+            for section_id, score in fused
+        ]
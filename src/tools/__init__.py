@@ -4,8 +4,11 @@ External integrations and low-level utilities.
 
 - qdrant_client.py: Vector database connection
 - embedding_client.py: Text to vector conversion
+- embedding_batcher.py: Async micro-batching of embedding requests
+- embedding_cache.py: Content-addressed LRU + on-disk embedding cache
 - grafana_mcp.py: Alert fetching (Phase 3)
 - prometheus_queries.py: PromQL builder (Phase 4)
+- prometheus_range_cache.py: Incremental step-aligned range query cache
 - github_mcp.py: Repository metadata (Phase 5)
 """
 
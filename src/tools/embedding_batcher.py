@@ -0,0 +1,145 @@
+"""
+Embedding Batcher - Async micro-batching for embedding requests.
+
+Concurrent callers each ask for one vector; the batcher gathers requests that
+arrive within a short window (``max_wait_ms``) or until ``max_batch_size``
+texts are pending, runs them through a single ``embed_batch`` forward pass in
+a worker thread, and resolves every caller's future with its own vector.
+
+The event loop never blocks on model inference, and throughput grows with
+concurrency because N requests cost one forward pass instead of N.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))
+DEFAULT_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5"))
+
+BatchEmbedFn = Callable[[List[str]], Sequence[Sequence[float]]]
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent single-text embed calls into batched forward passes.
+
+    Args:
+        embed_batch: Synchronous function embedding a list of texts, e.g.
+            ``EmbeddingClient.embed_batch`` or a SentenceTransformer ``encode``.
+        max_batch_size: Flush as soon as this many texts are pending.
+        max_wait_ms: Flush at most this long after the first pending text.
+        max_concurrent_batches: Forward passes allowed to run at the same time.
+    """
+
+    def __init__(
+        self,
+        embed_batch: BatchEmbedFn,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        max_concurrent_batches: int = 1,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self._embed_batch = embed_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self.stats: Dict[str, int] = {"requests": 0, "batches": 0, "texts_embedded": 0}
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed a single text, sharing a forward pass with concurrent callers."""
+        return await self._submit(text)
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Embed several texts; they join the current batch window together."""
+        if not texts:
+            return []
+        futures = [self._submit(text) for text in texts]
+        return list(await asyncio.gather(*futures))
+
+    async def close(self) -> None:
+        """Flush pending requests and wait for in-flight batches."""
+        if self._pending:
+            self._flush()
+        if self._inflight:
+            await asyncio.gather(*list(self._inflight), return_exceptions=True)
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._pending or self._inflight:
+                raise RuntimeError("EmbeddingBatcher is already in use by another event loop")
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_batches)
+            self._flush_handle = None
+        return loop
+
+    def _submit(self, text: str) -> asyncio.Future:
+        if not text or not text.strip():
+            raise ValueError("Cannot embed empty text")
+        loop = self._bind_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        self.stats["requests"] += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        while self._pending:
+            batch = self._pending[: self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size :]
+            task = self._loop.create_task(self._run_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        # Identical texts in one window (re-firing alerts) are embedded once.
+        unique_texts = list(dict.fromkeys(text for text, _ in batch))
+
+        async with self._semaphore:
+            try:
+                vectors = await self._loop.run_in_executor(None, self._embed_batch, unique_texts)
+            except Exception as e:
+                logger.error(f"[EMBED_BATCHER] Batch of {len(unique_texts)} texts failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+        if len(vectors) != len(unique_texts):
+            error = RuntimeError(
+                f"embed_batch returned {len(vectors)} vectors for {len(unique_texts)} texts"
+            )
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        self.stats["batches"] += 1
+        self.stats["texts_embedded"] += len(unique_texts)
+
+        by_text = {
+            text: vector.tolist() if hasattr(vector, "tolist") else list(vector)
+            for text, vector in zip(unique_texts, vectors)
+        }
+        for text, future in batch:
+            if not future.done():
+                future.set_result(list(by_text[text]))
@@ -0,0 +1,239 @@
+"""
+Embedding Cache - Content-addressed cache in front of EmbeddingClient.
+
+Alert texts built by `create_embedding_text` and `GraphAgent._generate_summary`
+repeat heavily (same alertname/service/severity re-firing), so vectors are
+cached by (model name, SHA-256 of the text):
+
+- a bounded in-memory LRU of float32 vectors;
+- an optional on-disk tier: one append-only, memory-mapped float32 matrix per
+  model plus a key file, so cached vectors survive restarts without loading
+  the whole store into RAM.
+
+Hits and misses per tier are exported to Prometheus (see `src.metrics`).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.metrics import EMBEDDING_CACHE_ENTRIES, EMBEDDING_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+DEFAULT_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR") or None
+
+
+def content_key(model_name: str, text: str) -> str:
+    """Content address of an embedding: hash of the model name and the text."""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class _DiskVectorStore:
+    """
+    Append-only float32 vector store for one model.
+
+    Layout in ``path``: ``meta.json`` (dimension), ``vectors.f32`` (a
+    ``capacity x dim`` memory-mapped matrix) and ``keys.txt`` (one content key
+    per line, line number == matrix row). A vector is flushed before its key
+    is appended, so a crash never leaves a key pointing at garbage.
+    """
+
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, path: Path, dim: int, max_entries: Optional[int] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        meta_file = self.path / "meta.json"
+        if meta_file.exists():
+            stored_dim = json.loads(meta_file.read_text())["dim"]
+            if stored_dim != dim:
+                raise ValueError(f"Disk cache at {path} has dim {stored_dim}, expected {dim}")
+        else:
+            meta_file.write_text(json.dumps({"dim": dim}))
+        self.dim = dim
+
+        self._vectors_file = self.path / "vectors.f32"
+        self._keys_file = self.path / "keys.txt"
+        self._rows: Dict[str, int] = {}
+
+        capacity = 0
+        if self._vectors_file.exists():
+            capacity = self._vectors_file.stat().st_size // (4 * dim)
+        if self._keys_file.exists():
+            with self._keys_file.open("r", encoding="utf-8") as fh:
+                for row, line in enumerate(fh):
+                    key = line.strip()
+                    if key and row < capacity:
+                        self._rows[key] = row
+        self._count = len(self._rows)
+        self._matrix: Optional[np.memmap] = None
+        if capacity:
+            self._matrix = np.memmap(self._vectors_file, dtype=np.float32, mode="r+", shape=(capacity, dim))
+        self._full_logged = False
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self._rows.get(key)
+        if row is None:
+            return None
+        return np.array(self._matrix[row], dtype=np.float32)
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        if key in self._rows:
+            return
+        if self.max_entries is not None and self._count >= self.max_entries:
+            if not self._full_logged:
+                logger.warning(f"[EMBED_CACHE] Disk store {self.path} full ({self.max_entries} vectors)")
+                self._full_logged = True
+            return
+        capacity = 0 if self._matrix is None else self._matrix.shape[0]
+        if self._count >= capacity:
+            self._grow(max(self.INITIAL_CAPACITY, capacity * 2))
+
+        row = self._count
+        self._matrix[row] = vector
+        self._matrix.flush()
+        with self._keys_file.open("a", encoding="utf-8") as fh:
+            fh.write(key + "\n")
+        self._rows[key] = row
+        self._count += 1
+
+    def _grow(self, new_capacity: int) -> None:
+        if self._matrix is not None:
+            self._matrix.flush()
+            del self._matrix
+        with self._vectors_file.open("ab") as fh:
+            fh.truncate(new_capacity * self.dim * 4)
+        self._matrix = np.memmap(
+            self._vectors_file, dtype=np.float32, mode="r+", shape=(new_capacity, self.dim)
+        )
+
+
+class EmbeddingCache:
+    """
+    Two-tier (memory LRU + optional memory-mapped disk) embedding cache.
+
+    Args:
+        max_entries: Capacity of the in-memory LRU.
+        cache_dir: Directory for the persistent tier; disabled when None.
+        max_disk_entries: Optional cap on vectors stored per model on disk.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_SIZE,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        max_disk_entries: Optional[int] = None,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_disk_entries = max_disk_entries
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._disk: Dict[str, _DiskVectorStore] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get(self, model_name: str, text: str) -> Optional[List[float]]:
+        """Return the cached vector for (model, text), or None on a miss."""
+        key = content_key(model_name, text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self._record("memory", "hit")
+                return vector.tolist()
+            self._record("memory", "miss")
+
+            store = self._disk_store(model_name)
+            if store is not None:
+                vector = store.get(key)
+                if vector is not None:
+                    self._remember(key, vector)
+                    self._record("disk", "hit")
+                    return vector.tolist()
+                self._record("disk", "miss")
+
+            self.stats["misses"] += 1
+            return None
+
+    def get_many(self, model_name: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Vectorised `get`: one entry per text, None for misses."""
+        return [self.get(model_name, text) for text in texts]
+
+    def put(self, model_name: str, text: str, vector: Sequence[float]) -> None:
+        """Store a freshly computed vector in every enabled tier."""
+        key = content_key(model_name, text)
+        array = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            self._remember(key, array)
+            store = self._disk_store(model_name, dim=array.shape[0])
+            if store is not None:
+                try:
+                    store.put(key, array)
+                except Exception as e:
+                    logger.warning(f"[EMBED_CACHE] Failed to persist vector: {e}")
+
+    def clear(self) -> None:
+        """Drop the in-memory tier (the disk tier is left untouched)."""
+        with self._lock:
+            self._memory.clear()
+            EMBEDDING_CACHE_ENTRIES.set(0)
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+        EMBEDDING_CACHE_ENTRIES.set(len(self._memory))
+
+    def _disk_store(self, model_name: str, dim: Optional[int] = None) -> Optional[_DiskVectorStore]:
+        if self.cache_dir is None:
+            return None
+        store = self._disk.get(model_name)
+        if store is not None:
+            return store
+
+        path = self.cache_dir / re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        if dim is None:
+            meta_file = path / "meta.json"
+            if not meta_file.exists():
+                return None
+            dim = json.loads(meta_file.read_text())["dim"]
+        try:
+            store = _DiskVectorStore(path, dim, self.max_disk_entries)
+        except Exception as e:
+            logger.warning(f"[EMBED_CACHE] Disk tier unavailable for {model_name}: {e}")
+            return None
+        self._disk[model_name] = store
+        logger.info(f"[EMBED_CACHE] Opened disk tier {path} ({len(store)} vectors)")
+        return store
+
+    def _record(self, tier: str, result: str) -> None:
+        """Per-tier lookup metric; `stats["misses"]` counts misses in every tier."""
+        if result == "hit":
+            self.stats[f"{tier}_hits"] += 1
+        EMBEDDING_CACHE_REQUESTS.labels(tier=tier, result=result).inc()
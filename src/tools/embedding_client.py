@@ -9,7 +9,11 @@ Research Decision: Local model for cost/latency (see research.md).
 
 import logging
 import os
-from typing import Optional
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from src.tools.embedding_batcher import EmbeddingBatcher
+from src.tools.embedding_cache import DEFAULT_CACHE_DIR, DEFAULT_CACHE_SIZE, EmbeddingCache
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +25,10 @@ VECTOR_DIM = 384
 DEFAULT_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "local")
 GITHUB_MODEL_NAME = os.getenv("GITHUB_MODEL_NAME", "openai/text-embedding-3-large")
 GITHUB_ENDPOINT = os.getenv("GITHUB_MODELS_ENDPOINT", "https://models.github.ai/inference")
+# Local model placement: "cpu", "cuda", "cuda:0", "mps"... (None lets the library decide)
+DEFAULT_DEVICE = os.getenv("EMBEDDING_DEVICE") or None
+# Intra-op threads used by torch for local inference (0 keeps the library default)
+DEFAULT_NUM_THREADS = int(os.getenv("EMBEDDING_NUM_THREADS", "0"))
 
 
 class EmbeddingModelError(Exception):
@@ -37,6 +45,13 @@ class EmbeddingClient:
       - "github": use GitHub-hosted models via `azure-ai-inference`
 
     The module avoids importing heavy local libs at import time; imports are lazy.
+    Local models are loaded once per (model name, device) and shared process-wide,
+    so weights are never reloaded on the request path. Call `warmup()` at startup
+    to pay the load cost before the first alert arrives.
+
+    Vectors are cached by (model name, text hash) in an `EmbeddingCache`
+    (env `EMBEDDING_CACHE_SIZE`, 0 disables; `EMBEDDING_CACHE_DIR` enables the
+    persistent tier), so re-firing alerts skip the model entirely.
     """
 
     _instance: Optional["EmbeddingClient"] = None
@@ -45,20 +60,99 @@ class EmbeddingClient:
     _provider: str
     _remote_client: Optional[object]
     _vector_dim: int
+    _device: Optional[str]
+    _num_threads: int
+    _batcher: Optional[EmbeddingBatcher]
+    _cache: Optional[EmbeddingCache]
+
+    # Process-wide cache of loaded local models, keyed by (model name, device)
+    _local_models: Dict[Tuple[str, Optional[str]], Any] = {}
+    _local_models_lock = threading.Lock()
 
-    def __new__(cls, model_name: str = DEFAULT_MODEL_NAME, provider: Optional[str] = None):
+    def __new__(
+        cls,
+        model_name: str = DEFAULT_MODEL_NAME,
+        provider: Optional[str] = None,
+        device: Optional[str] = None,
+        num_threads: Optional[int] = None,
+        cache_size: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+    ):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance._model_name = model_name
             cls._instance._provider = provider or DEFAULT_PROVIDER
             cls._instance._remote_client = None
             cls._instance._vector_dim = VECTOR_DIM
+            cls._instance._device = DEFAULT_DEVICE
+            cls._instance._num_threads = DEFAULT_NUM_THREADS
+            cls._instance._batcher = None
+            cls._instance._cache = (
+                EmbeddingCache(DEFAULT_CACHE_SIZE, DEFAULT_CACHE_DIR) if DEFAULT_CACHE_SIZE > 0 else None
+            )
         return cls._instance
 
-    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, provider: Optional[str] = None):
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL_NAME,
+        provider: Optional[str] = None,
+        device: Optional[str] = None,
+        num_threads: Optional[int] = None,
+        cache_size: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+    ):
         self._model_name = model_name
         if provider:
             self._provider = provider
+        if device:
+            self._device = device
+        if num_threads is not None:
+            self._num_threads = num_threads
+        if cache_size is not None or cache_dir is not None:
+            size = DEFAULT_CACHE_SIZE if cache_size is None else cache_size
+            self._cache = EmbeddingCache(size, cache_dir or DEFAULT_CACHE_DIR) if size > 0 else None
+
+    @classmethod
+    def clear_model_cache(cls) -> None:
+        """Drop all cached local models (mainly for tests)."""
+        with cls._local_models_lock:
+            cls._local_models.clear()
+
+    def _get_local_model(self):
+        """Return the cached SentenceTransformer for this client, loading it once."""
+        key = (self._model_name, self._device)
+        model = self._local_models.get(key)
+        if model is not None:
+            return model
+
+        with self._local_models_lock:
+            model = self._local_models.get(key)
+            if model is None:
+                if self._num_threads > 0:
+                    _set_torch_threads(self._num_threads)
+                logger.info(
+                    f"Loading local embedding model {self._model_name} "
+                    f"(device={self._device or 'auto'})"
+                )
+                if self._device:
+                    model = SentenceTransformer(self._model_name, device=self._device)
+                else:
+                    model = SentenceTransformer(self._model_name)
+                self._local_models[key] = model
+        return model
+
+    def warmup(self) -> None:
+        """
+        Load the model and run one throwaway embedding.
+
+        The first forward pass also allocates inference buffers, so warming up
+        keeps both costs off the first real alert.
+        """
+        if self._provider == "github":
+            self._ensure_remote_client()
+            return
+        self._embed_via_local("warmup")
+        logger.info(f"Embedding model {self._model_name} warmed up (dim={self._vector_dim})")
 
     def _ensure_remote_client(self):
         """Lazy-init GitHub Models client using azure-ai-inference SDK."""
@@ -102,7 +196,7 @@ class EmbeddingClient:
     def _embed_via_local(self, text: str) -> list[float]:
         """Generate embedding using local SentenceTransformer."""
         try:
-            result = SentenceTransformer(self._model_name).encode(text)
+            result = self._get_local_model().encode(text)
             emb = result.tolist() if hasattr(result, 'tolist') else list(result)
             self._vector_dim = len(emb)
             return emb
@@ -114,15 +208,22 @@ class EmbeddingClient:
         """Generate embedding for a single text."""
         if not text or not text.strip():
             raise ValueError("Cannot embed empty text")
+        if self._cache is not None:
+            cached = self._cache.get(self._model_name, text)
+            if cached is not None:
+                return cached
         try:
             if self._provider == "github":
-                return self._embed_via_github(text)
+                emb = self._embed_via_github(text)
             else:
-                return self._embed_via_local(text)
+                emb = self._embed_via_local(text)
         except EmbeddingModelError:
             raise
         except Exception as e:
             raise EmbeddingModelError(f"Failed to generate embedding: {e}") from e
+        if self._cache is not None:
+            self._cache.put(self._model_name, text, emb)
+        return emb
 
     def generate_embedding(self, text: str) -> list[float]:
         """Alias for embed() for backward compatibility."""
@@ -142,7 +243,7 @@ class EmbeddingClient:
     def _embed_with_local(self, texts: list[str]) -> list[list[float]]:
         """Embed texts using local SentenceTransformer."""
         try:
-            result = SentenceTransformer(self._model_name).encode(texts)
+            result = self._get_local_model().encode(texts)
             out = [row.tolist() if hasattr(row, 'tolist') else list(row) for row in result]
             if out:
                 self._vector_dim = len(out[0])
@@ -158,6 +259,21 @@ class EmbeddingClient:
         for i, text in enumerate(texts):
             if not text or not text.strip():
                 raise ValueError(f"Cannot embed empty text at index {i}")
+        if self._cache is None:
+            return self._embed_texts(texts)
+
+        # Only texts missing from the cache go through the model, once each.
+        results = self._cache.get_many(self._model_name, texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, results) if v is None))
+        if missing:
+            fresh = dict(zip(missing, self._embed_texts(missing)))
+            for text, emb in fresh.items():
+                self._cache.put(self._model_name, text, emb)
+            results = [v if v is not None else list(fresh[t]) for t, v in zip(texts, results)]
+        return results
+
+    def _embed_texts(self, texts: list[str]) -> list[list[float]]:
+        """Run the configured provider over a batch of texts."""
         try:
             if self._provider == "github":
                 return self._embed_with_github(texts)
@@ -168,6 +284,24 @@ class EmbeddingClient:
         except Exception as e:
             raise EmbeddingModelError(f"Failed to generate batch embeddings: {e}") from e
 
+    def _get_batcher(self) -> EmbeddingBatcher:
+        if self._batcher is None:
+            self._batcher = EmbeddingBatcher(self.embed_batch)
+        return self._batcher
+
+    async def aembed(self, text: str) -> list[float]:
+        """
+        Async embed for callers running on the event loop.
+
+        Concurrent calls are micro-batched into one `embed_batch` forward pass
+        executed off the loop (see `EmbeddingBatcher`).
+        """
+        return await self._get_batcher().embed(text)
+
+    async def aembed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Async counterpart of `embed_batch` sharing the micro-batching window."""
+        return await self._get_batcher().embed_many(texts)
+
     @property
     def vector_dimension(self) -> int:
         """Return the dimension of embedding vectors."""
@@ -179,6 +313,16 @@ class EmbeddingClient:
         return self._model_name
 
 
+def _set_torch_threads(num_threads: int) -> None:
+    """Limit torch intra-op parallelism for local inference, if torch is available."""
+    try:
+        import torch  # type: ignore
+
+        torch.set_num_threads(num_threads)
+    except Exception as e:
+        logger.warning(f"Could not set embedding thread count to {num_threads}: {e}")
+
+
 # Expose a minimal SentenceTransformer shim so other modules/tests that import
 # `from src.tools.embedding_client import SentenceTransformer` will not fail
 # when the optional `sentence-transformers` package is not installed.
@@ -187,7 +331,7 @@ try:
 except Exception:
     class SentenceTransformer:  # type: ignore
         """Minimal shim that raises a helpful error on use."""
-        def __init__(self, model_name: str):
+        def __init__(self, model_name: str, device: Optional[str] = None):
             raise RuntimeError(
                 "sentence-transformers is not installed. Install it to use local embeddings, "
                 "or set EMBEDDING_PROVIDER=github to use remote GitHub-hosted embeddings."
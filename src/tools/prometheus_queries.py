@@ -11,7 +11,7 @@ import asyncio
 import logging
 import time
 from datetime import datetime, timedelta, timezone
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 
 import httpx
 from tenacity import (
@@ -23,10 +23,16 @@ from tenacity import (
     before_sleep_log,
 )
 
-from src.models.metric_trend import DataPoint
+from src.models.metric_trend import DataPoint, TimeSeries
+from src.tools.prometheus_range_cache import PrometheusRangeCache, align_window, get_default_range_cache
+from src.utils.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Shared by every PrometheusClient so concurrent runs for the same service
+# (each with its own client) coalesce identical range queries.
+_RANGE_QUERY_FLIGHT = SingleFlight("prometheus_query_range")
+
 
 class PrometheusQueryError(Exception):
     """Raised when Prometheus query fails."""
@@ -124,6 +130,12 @@ class PrometheusClient:
     - 3 retries with delays: 1s, 2s, 4s
     - Retries on ConnectError and TimeoutException
     - Tracks retry count and query latency
+
+    Concurrent identical range queries (same expr, start/end second and step)
+    share one in-flight request unless `coalesce=False`.
+
+    Range queries go through an incremental PrometheusRangeCache: windows are
+    aligned to step boundaries and only the uncovered head/tail is fetched.
     """
 
     def __init__(
@@ -132,6 +144,9 @@ class PrometheusClient:
         default_step_seconds: int = 30,  # Changed from 60 to 30 per research
         timeout_seconds: float = 5.0,
         base_url: Optional[str] = None,
+        coalesce: bool = True,
+        range_cache: Optional[PrometheusRangeCache] = None,
+        use_range_cache: bool = True,
     ):
         """
         Initialize Prometheus client.
@@ -141,11 +156,16 @@ class PrometheusClient:
             default_step_seconds: Default step size for range queries (default: 30s).
             timeout_seconds: HTTP request timeout (default: 5s).
             base_url: Prometheus HTTP API base URL (for direct HTTP mode).
+            coalesce: Share in-flight identical range queries (default: True).
+            range_cache: Range cache to use (default: process-wide cache).
+            use_range_cache: False to always fetch the full window.
         """
         self._datasource_uid = datasource_uid
         self._default_step = default_step_seconds
         self._timeout = timeout_seconds
         self._base_url = base_url
+        self._coalesce = coalesce
+        self._range_cache = (range_cache or get_default_range_cache()) if use_range_cache else None
 
         # Track retry metadata
         self._last_retry_count = 0
@@ -210,23 +230,20 @@ class PrometheusClient:
         except Exception as e:
             raise PrometheusQueryError(f"Instant query failed: {e}") from e
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=4),  # 1s, 2s, 4s
-        retry=retry_if_exception_type((httpx.ConnectError, httpx.TimeoutException)),
-        before_sleep=before_sleep_log(logger, logging.WARNING),
-        reraise=True,
-    )
     async def query_range_async(
         self,
         expr: str,
         start: Optional[datetime] = None,
         end: Optional[datetime] = None,
         step_seconds: Optional[int] = None,
-    ) -> list[DataPoint]:
+    ) -> TimeSeries:
         """
         Execute a range query over a time window with retry logic.
 
+        Identical concurrent queries are coalesced into a single request;
+        every caller receives its own copy of the result series. With the
+        range cache enabled, start/end are aligned down to step boundaries.
+
         Args:
             expr: PromQL expression.
             start: Query start time (defaults to 15 minutes ago).
@@ -234,7 +251,7 @@ class PrometheusClient:
             step_seconds: Step size in seconds.
 
         Returns:
-            List of DataPoint objects ordered by timestamp.
+            TimeSeries ordered by timestamp (a sequence of DataPoint).
 
         Raises:
             PrometheusQueryError: If query fails after all retries.
@@ -246,6 +263,55 @@ class PrometheusClient:
         if step_seconds is None:
             step_seconds = self._default_step
 
+        if not self._coalesce:
+            return await self._query_range_cached(expr, start, end, step_seconds)
+
+        # The HTTP API receives whole seconds (whole steps when cached), so
+        # that is the coalescing grain
+        if self._range_cache is not None:
+            window = align_window(start, end, step_seconds)
+        else:
+            window = (int(start.timestamp()), int(end.timestamp()))
+        key = (self._base_url, self._datasource_uid, expr, *window, step_seconds)
+        data_points = await _RANGE_QUERY_FLIGHT.do(
+            key, lambda: self._query_range_cached(expr, start, end, step_seconds)
+        )
+        return data_points.copy()
+
+    async def _query_range_cached(
+        self,
+        expr: str,
+        start: datetime,
+        end: datetime,
+        step_seconds: int,
+    ) -> TimeSeries:
+        """Serve a range query from the range cache, fetching only what is missing."""
+        if self._range_cache is None:
+            return await self._query_range_with_retry(expr, start, end, step_seconds)
+        return await self._range_cache.query(
+            (self._base_url, self._datasource_uid, expr),
+            expr,
+            start,
+            end,
+            step_seconds,
+            self._query_range_with_retry,
+        )
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=1, max=4),  # 1s, 2s, 4s
+        retry=retry_if_exception_type((httpx.ConnectError, httpx.TimeoutException)),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        reraise=True,
+    )
+    async def _query_range_with_retry(
+        self,
+        expr: str,
+        start: datetime,
+        end: datetime,
+        step_seconds: int,
+    ) -> TimeSeries:
+        """Execute one range query against the backend (retried by tenacity)."""
         query_start_time = time.perf_counter()
 
         try:
@@ -289,18 +355,56 @@ class PrometheusClient:
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
                 logger.warning(f"Metric not found: {expr}")
-                return []  # Graceful degradation for missing metrics
+                return TimeSeries.empty()  # Graceful degradation for missing metrics
             raise PrometheusQueryError(f"HTTP {e.response.status_code}: {e}") from e
         except Exception as e:
             raise PrometheusQueryError(f"Range query failed: {e}") from e
 
+    async def series_async(
+        self,
+        matchers: List[str],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> list[dict]:
+        """
+        Fetch series metadata (label sets) matching any of the selectors.
+
+        Args:
+            matchers: Series selectors (sent as repeated ``match[]``).
+            start: Lookback start (defaults to 1 hour ago).
+            end: Lookback end (defaults to now).
+
+        Returns:
+            List of label dicts (including ``__name__``). Empty in MCP mode.
+
+        Raises:
+            PrometheusQueryError: If the request fails.
+        """
+        if not self._http_client or not matchers:
+            return []
+        if end is None:
+            end = datetime.now(timezone.utc)
+        if start is None:
+            start = end - timedelta(hours=1)
+
+        try:
+            response = await self._http_client.get(
+                "/api/v1/series",
+                params=[("match[]", m) for m in matchers]
+                + [("start", int(start.timestamp())), ("end", int(end.timestamp()))],
+            )
+            response.raise_for_status()
+            return response.json().get("data", [])
+        except Exception as e:
+            raise PrometheusQueryError(f"Series query failed: {e}") from e
+
     def query_range(
         self,
         expr: str,
         start: Optional[datetime] = None,
         end: Optional[datetime] = None,
         step_seconds: Optional[int] = None,
-    ) -> list[DataPoint]:
+    ) -> TimeSeries:
         """
         Execute a range query over a time window (synchronous wrapper).
 
@@ -311,7 +415,7 @@ class PrometheusClient:
             step_seconds: Step size in seconds.
 
         Returns:
-            List of DataPoint objects ordered by timestamp.
+            TimeSeries ordered by timestamp.
         """
         # Synchronous wrapper for backward compatibility
         try:
@@ -361,24 +465,11 @@ class PrometheusClient:
 
         return data_points
 
-    def _parse_range_result(self, raw: dict) -> list[DataPoint]:
-        """Parse range query result to DataPoints."""
-        data_points = []
-
+    def _parse_range_result(self, raw: dict) -> TimeSeries:
+        """Parse range query result into a columnar TimeSeries (all series merged)."""
         result = raw.get("data", {}).get("result", [])
-        for item in result:
-            values = item.get("values", [])
-            for ts, val in values:
-                data_points.append(
-                    DataPoint(
-                        timestamp=datetime.fromtimestamp(float(ts), tz=timezone.utc),
-                        value=float(val),
-                    )
-                )
-
-        # Sort by timestamp
-        data_points.sort(key=lambda dp: dp.timestamp)
-        return data_points
+        # Sorted by timestamp (stable: samples of earlier series come first on ties)
+        return TimeSeries.concat([TimeSeries.from_samples(item.get("values", [])) for item in result])
 
 
 def build_service_cpu_query(service: str, rate_window: str = "5m") -> str:
@@ -413,13 +504,239 @@ def build_request_rate_query(service: str, rate_window: str = "5m") -> str:
     )
 
 
+def promql_candidates(service_id: str, metric_name: str) -> List[Tuple[str, str]]:
+    """
+    Candidate PromQL expressions for a metric, in preference order.
+
+    Returns:
+        (expr, series selector) pairs; the selector is what must exist in
+        ``/api/v1/series`` for the expression to return data.
+    """
+    candidates = [
+        # Direct metric name convention: {service}_{metric}
+        (f"{service_id}_{metric_name}", f"{service_id}_{metric_name}"),
+        # Alternate suffix convention: {service}_{metric}_usage
+        (f"{service_id}_{metric_name}_usage", f"{service_id}_{metric_name}_usage"),
+    ]
+
+    # For cpu/memory prefer label-based PromQL builders
+    if metric_name == "cpu":
+        candidates.append(
+            (build_service_cpu_query(service_id), f'container_cpu_usage_seconds_total{{service="{service_id}"}}')
+        )
+    elif metric_name == "memory":
+        candidates.append(
+            (build_service_memory_query(service_id), f'container_memory_usage_bytes{{service="{service_id}"}}')
+        )
+    return candidates
+
+
+class PromQLCandidateResolver:
+    """
+    Learns which candidate PromQL expression works per (service, metric).
+
+    - Positive cache: the expression that returned data is queried alone on
+      the next call (steady state: one query per metric).
+    - Negative cache: expressions that returned no data are skipped until
+      their TTL expires. Failures (connection errors) are not cached.
+    - Cold cache: all remaining candidates are queried concurrently; the
+      first one in preference order that has data wins and the others are
+      cancelled as soon as the outcome is decided.
+    - ``warm_from_series`` seeds both caches from ``/api/v1/series``.
+
+    Args:
+        positive_ttl_seconds: How long a resolved expression is trusted.
+        negative_ttl_seconds: How long an empty candidate is skipped.
+    """
+
+    def __init__(self, positive_ttl_seconds: float = 3600.0, negative_ttl_seconds: float = 300.0):
+        self.positive_ttl_seconds = positive_ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._resolved: Dict[tuple, Tuple[str, float]] = {}
+        self._negative: Dict[tuple, float] = {}
+        self.stats: Dict[str, int] = {"resolved_hits": 0, "cold_races": 0, "queries": 0}
+
+    @staticmethod
+    def _scope(client: "PrometheusClient") -> tuple:
+        return (client._base_url, client._datasource_uid)
+
+    def resolved(self, client: "PrometheusClient", service_id: str, metric_name: str) -> Optional[str]:
+        """Expression currently remembered for (service, metric), if any."""
+        entry = self._resolved.get((self._scope(client), service_id, metric_name))
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    def clear(self) -> None:
+        self._resolved.clear()
+        self._negative.clear()
+
+    def _remember(self, scope: tuple, service_id: str, metric_name: str, expr: str) -> None:
+        self._resolved[(scope, service_id, metric_name)] = (expr, time.monotonic() + self.positive_ttl_seconds)
+        self._negative.pop((scope, expr), None)
+
+    def _mark_empty(self, scope: tuple, expr: str) -> None:
+        self._negative[(scope, expr)] = time.monotonic() + self.negative_ttl_seconds
+
+    def _is_negative(self, scope: tuple, expr: str) -> bool:
+        expires = self._negative.get((scope, expr))
+        if expires is None:
+            return False
+        if expires <= time.monotonic():
+            del self._negative[(scope, expr)]
+            return False
+        return True
+
+    async def query(
+        self,
+        client: "PrometheusClient",
+        service_id: str,
+        metric_name: str,
+        start: datetime,
+        end: datetime,
+        step_seconds: int,
+    ) -> TimeSeries:
+        """Query a metric through its learned expression, racing candidates on a miss."""
+        scope = self._scope(client)
+
+        async def run(expr: str) -> TimeSeries:
+            self.stats["queries"] += 1
+            logger.debug(f"Trying PromQL '{expr}' for metric '{metric_name}'")
+            return await client.query_range_async(
+                expr=expr, start=start, end=end, step_seconds=step_seconds
+            )
+
+        known = self.resolved(client, service_id, metric_name)
+        if known is not None:
+            self.stats["resolved_hits"] += 1
+            try:
+                res = await run(known)
+            except Exception as e:
+                # Transient failure: keep the learned expression for next time
+                logger.warning(f"Candidate query '{known}' failed: {e}")
+                return TimeSeries.empty()
+            if res:
+                return res
+            # The learned expression went dry: forget it and re-resolve
+            del self._resolved[(scope, service_id, metric_name)]
+            self._mark_empty(scope, known)
+
+        candidates = [
+            expr for expr, _ in promql_candidates(service_id, metric_name)
+            if not self._is_negative(scope, expr)
+        ]
+        if not candidates:
+            return TimeSeries.empty()
+
+        self.stats["cold_races"] += 1
+        tasks = [asyncio.ensure_future(run(expr)) for expr in candidates]
+        outcomes: Dict[int, object] = {}
+        winner: Optional[int] = None
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    await next_done
+                except Exception:
+                    pass
+                for i, task in enumerate(tasks):
+                    if i not in outcomes and task.done():
+                        outcomes[i] = task.exception() or task.result()
+                # Decided once every higher-preference candidate has finished
+                for i in range(len(tasks)):
+                    if i not in outcomes:
+                        break
+                    if not isinstance(outcomes[i], Exception) and len(outcomes[i]) > 0:
+                        winner = i
+                        break
+                if winner is not None or len(outcomes) == len(tasks):
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        last_exc: Exception | None = None
+        for i, outcome in outcomes.items():
+            if isinstance(outcome, Exception):
+                logger.warning(f"Candidate query '{candidates[i]}' failed: {outcome}")
+                last_exc = outcome
+            elif len(outcome) == 0:
+                self._mark_empty(scope, candidates[i])
+
+        if winner is not None:
+            res = outcomes[winner]
+            logger.debug(f"PromQL '{candidates[winner]}' returned {len(res)} points for '{metric_name}'")
+            self._remember(scope, service_id, metric_name, candidates[winner])
+            return res
+
+        # If all candidates failed or returned empty, return empty list (caller logs)
+        if last_exc:
+            logger.debug(f"All candidates for '{metric_name}' failed, last error: {last_exc}")
+        return TimeSeries.empty()
+
+    async def warm_from_series(
+        self,
+        client: "PrometheusClient",
+        service_ids: List[str],
+        metric_names: List[str],
+    ) -> int:
+        """
+        Seed the caches from Prometheus series metadata (one request).
+
+        For every (service, metric) the first candidate whose selector has
+        matching series is remembered; candidates without series are
+        negatively cached.
+
+        Returns:
+            Number of (service, metric) pairs resolved.
+        """
+        scope = self._scope(client)
+        plan = {
+            (service_id, metric_name): promql_candidates(service_id, metric_name)
+            for service_id in service_ids
+            for metric_name in metric_names
+        }
+        selectors = sorted({selector for candidates in plan.values() for _, selector in candidates})
+        series = await client.series_async(selectors)
+
+        present = set()
+        for labels in series:
+            name = labels.get("__name__")
+            present.add((name, None))
+            if "service" in labels:
+                present.add((name, labels["service"]))
+
+        resolved = 0
+        for (service_id, metric_name), candidates in plan.items():
+            found = False
+            for expr, selector in candidates:
+                name, _, rest = selector.partition("{")
+                exists = (name, service_id if rest else None) in present
+                if exists and not found:
+                    self._remember(scope, service_id, metric_name, expr)
+                    found = True
+                elif not exists:
+                    self._mark_empty(scope, expr)
+            resolved += found
+        logger.info(f"Warmed PromQL resolver from series metadata: {resolved}/{len(plan)} resolved")
+        return resolved
+
+
+_default_resolver = PromQLCandidateResolver()
+
+
+def get_default_resolver() -> PromQLCandidateResolver:
+    """Process-wide candidate resolver used by query_multiple_metrics."""
+    return _default_resolver
+
+
 async def query_multiple_metrics(
     client: PrometheusClient,
     service_id: str,
     metric_names: List[str],
     lookback_minutes: int = 15,
     step_seconds: int = 30,
-) -> Dict[str, List[DataPoint]]:
+    resolver: Optional[PromQLCandidateResolver] = None,
+) -> Dict[str, TimeSeries]:
     """
     Query multiple Prometheus metrics in parallel (FR-012 optimization).
 
@@ -432,11 +749,13 @@ async def query_multiple_metrics(
         metric_names: List of metric types to query (e.g., ["cpu", "memory", "error_rate"]).
         lookback_minutes: Time window for queries (default: 15 minutes).
         step_seconds: Step interval for range queries (default: 30 seconds).
+        resolver: Candidate resolver remembering the working PromQL per
+            (service, metric) (default: process-wide resolver).
 
     Returns:
-        Dictionary mapping metric_name to list of DataPoints.
+        Dictionary mapping metric_name to its TimeSeries.
         Exceptions from individual queries are caught and logged; failed metrics
-        return empty lists (graceful degradation).
+        return empty series (graceful degradation).
 
     Example:
         >>> client = PrometheusClient(base_url="http://prometheus:9090")
@@ -444,7 +763,7 @@ async def query_multiple_metrics(
         ...     client, "api-gateway", ["cpu_usage", "memory_usage", "error_rate"]
         ... )
         >>> results["cpu_usage"]
-        [DataPoint(timestamp=..., value=0.45), ...]
+        TimeSeries(n=31, outliers=0)
     """
     end_time = datetime.now(timezone.utc)
     start_time = end_time - timedelta(minutes=lookback_minutes)
@@ -455,52 +774,20 @@ async def query_multiple_metrics(
         f"(window={lookback_minutes}m, step={step_seconds}s)"
     )
 
-    async def try_candidates(metric_name: str) -> list[DataPoint]:
-        """Try a set of candidate PromQL expressions for a metric until one returns data."""
-        candidates: list[str] = []
+    resolver = resolver or get_default_resolver()
 
-        # Direct metric name convention: {service}_{metric}
-        candidates.append(f"{service_id}_{metric_name}")
-
-        # Alternate suffix convention: {service}_{metric}_usage
-        candidates.append(f"{service_id}_{metric_name}_usage")
-
-        # For cpu/memory prefer label-based PromQL builders
-        if metric_name == "cpu":
-            candidates.append(build_service_cpu_query(service_id))
-        elif metric_name == "memory":
-            candidates.append(build_service_memory_query(service_id))
-
-        last_exc: Exception | None = None
-        for expr in candidates:
-            try:
-                logger.debug(f"Trying PromQL '{expr}' for metric '{metric_name}'")
-                res = await client.query_range_async(
-                    expr=expr,
-                    start=start_time,
-                    end=end_time,
-                    step_seconds=step_seconds,
-                )
-                if res:
-                    logger.debug(f"PromQL '{expr}' returned {len(res)} points for '{metric_name}'")
-                    return res
-            except Exception as e:
-                logger.warning(f"Candidate query '{expr}' failed: {e}")
-                last_exc = e
-
-        # If all candidates failed or returned empty, return empty list (caller logs)
-        if last_exc:
-            logger.debug(f"All candidates for '{metric_name}' failed, last error: {last_exc}")
-        return []
+    async def try_candidates(metric_name: str) -> TimeSeries:
+        """Query the learned PromQL expression for a metric (racing candidates on a miss)."""
+        return await resolver.query(client, service_id, metric_name, start_time, end_time, step_seconds)
 
     # Launch all candidate attempts in parallel (one coroutine per metric)
     tasks = [try_candidates(metric_name) for metric_name in metric_names]
     results = await asyncio.gather(*tasks, return_exceptions=False)
 
     # Map results back to metric names
-    metric_data: Dict[str, List[DataPoint]] = {}
+    metric_data: Dict[str, TimeSeries] = {}
     for metric_name, result in zip(metric_names, results):
-        metric_data[metric_name] = result or []
+        metric_data[metric_name] = TimeSeries.coerce(result)
         logger.debug(f"Metric '{metric_name}': {len(metric_data[metric_name])} data points")
 
     return metric_data
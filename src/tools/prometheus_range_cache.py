@@ -0,0 +1,262 @@
+"""
+Prometheus Range Cache - Incremental, step-aligned cache of range queries.
+
+`query_multiple_metrics` asks for the same 15-60 minute windows of the same
+service over and over while an alert keeps firing. Prometheus evaluates a
+range query at ``start + k * step``, so once ``start``/``end`` are aligned
+to step boundaries every sample lands on a fixed grid and samples fetched
+earlier stay valid. The cache keeps, per (series key, step), the samples of
+one contiguous covered interval and only asks the backend for the missing
+head and/or tail of each new window.
+
+The newest ``overlap_steps`` cached samples are re-fetched with each tail to
+absorb late-arriving (still ingesting) data.
+
+Memory is bounded by a total sample budget and an entry count (LRU), and
+entries untouched for ``max_age_seconds`` are dropped.
+
+Listeners registered with `subscribe` receive every freshly fetched segment,
+so incremental consumers (e.g. StreamingTrendDetector) see only new samples.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.metrics import PROMETHEUS_RANGE_CACHE_REQUESTS, PROMETHEUS_RANGE_CACHE_SAMPLES
+from src.models.metric_trend import DataPoint, TimeSeries
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SAMPLES = int(os.getenv("PROMETHEUS_RANGE_CACHE_SAMPLES", "200000"))
+DEFAULT_MAX_AGE_SECONDS = float(os.getenv("PROMETHEUS_RANGE_CACHE_MAX_AGE_SECONDS", "3600"))
+
+RangeFetcher = Callable[[str, datetime, datetime, int], Awaitable[Union[TimeSeries, List[DataPoint]]]]
+RangeListener = Callable[[str, TimeSeries], None]
+
+
+def align_window(start: datetime, end: datetime, step_seconds: int) -> Tuple[int, int]:
+    """Align a window to step boundaries (both edges rounded down), in epoch seconds."""
+    s = int(start.timestamp()) // step_seconds * step_seconds
+    e = int(end.timestamp()) // step_seconds * step_seconds
+    return s, max(s, e)
+
+
+def _to_datetime(epoch: int) -> datetime:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc)
+
+
+class _CachedSeries:
+    """Samples of one contiguous covered interval [lo, hi], sorted by time."""
+
+    __slots__ = ("lo", "hi", "data", "last_access", "counted")
+
+    def __init__(self, lo: int, hi: int, data: TimeSeries):
+        self.lo = lo
+        self.hi = hi
+        self.data = data
+        self.last_access = time.monotonic()
+        # Samples charged to the cache budget when last stored
+        self.counted = 0
+
+    def slice(self, lo: int, hi: int) -> TimeSeries:
+        return self.data.between(lo, hi).copy()
+
+    def merge(self, lo: int, hi: int, fresh: TimeSeries) -> None:
+        """Replace the samples in [lo, hi] by `fresh` and extend coverage."""
+        ts = self.data.timestamps
+        i = int(np.searchsorted(ts, lo, side="left"))
+        j = int(np.searchsorted(ts, hi, side="right"))
+        self.data = TimeSeries.concat([self.data[:i], fresh, self.data[j:]])
+        self.lo = min(self.lo, lo)
+        self.hi = max(self.hi, hi)
+
+    def trim_before(self, lo: int) -> None:
+        if lo <= self.lo:
+            return
+        i = int(np.searchsorted(self.data.timestamps, lo, side="left"))
+        self.data = self.data[i:].copy()
+        self.lo = lo
+
+
+class PrometheusRangeCache:
+    """
+    Incremental cache of step-aligned range query results.
+
+    Every mutation happens between awaits under a lock, so one instance can
+    be shared by clients running on different event loops.
+
+    Args:
+        max_samples: Total samples kept across all entries (LRU beyond that).
+        max_entries: Maximum number of (series key, step) entries.
+        max_age_seconds: Entries not read for this long are dropped.
+        max_window_seconds: Coverage kept per entry; older samples are trimmed.
+        overlap_steps: Newest cached steps re-fetched with every tail fetch.
+    """
+
+    _STAT_NAMES = {"hit": "hits", "partial": "partial_hits", "miss": "misses"}
+
+    def __init__(
+        self,
+        max_samples: int = DEFAULT_MAX_SAMPLES,
+        max_entries: int = 1024,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+        max_window_seconds: int = 6 * 3600,
+        overlap_steps: int = 1,
+    ):
+        self.max_samples = max_samples
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.max_window_seconds = max_window_seconds
+        self.overlap_steps = max(0, overlap_steps)
+        self._entries: "OrderedDict[Hashable, _CachedSeries]" = OrderedDict()
+        self._samples = 0
+        self._lock = threading.Lock()
+        self._listeners: List[RangeListener] = []
+        self.stats: Dict[str, int] = {"hits": 0, "partial_hits": 0, "misses": 0, "fetched_samples": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def samples(self) -> int:
+        """Samples currently held across all entries."""
+        return self._samples
+
+    def subscribe(self, listener: RangeListener) -> None:
+        """Call ``listener(expr, samples)`` with every segment fetched from the backend."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener: RangeListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._samples = 0
+            PROMETHEUS_RANGE_CACHE_SAMPLES.set(0)
+
+    async def query(
+        self,
+        key: Hashable,
+        expr: str,
+        start: datetime,
+        end: datetime,
+        step_seconds: int,
+        fetch: RangeFetcher,
+    ) -> TimeSeries:
+        """
+        Serve [start, end] (aligned to `step_seconds`) from cache, fetching
+        only the parts of the window that are not covered yet.
+
+        Args:
+            key: Identifies the series (datasource + expr); the step is added here.
+            expr: PromQL expression passed to `fetch`.
+            start: Window start.
+            end: Window end.
+            step_seconds: Step size in seconds.
+            fetch: Coroutine fetching ``(expr, start, end, step)`` from the backend.
+
+        Returns:
+            TimeSeries of the aligned window, ordered by timestamp.
+        """
+        lo, hi = align_window(start, end, step_seconds)
+        entry_key = (key, step_seconds)
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(entry_key)
+
+        if entry is None or lo > entry.hi + step_seconds or hi < entry.lo - step_seconds:
+            # Nothing usable: fetch the whole window and start a new entry
+            points = TimeSeries.coerce(await fetch(expr, _to_datetime(lo), _to_datetime(hi), step_seconds))
+            with self._lock:
+                self._record("miss", len(points))
+                self._store(entry_key, _CachedSeries(lo, hi, points))
+            self._notify(expr, points)
+            return points.copy()
+
+        segments = []
+        if lo < entry.lo:
+            segments.append((lo, entry.lo - step_seconds))
+        if hi > entry.hi:
+            segments.append((max(lo, entry.hi + (1 - self.overlap_steps) * step_seconds), hi))
+
+        # Segments are merged into this entry even if it was evicted or
+        # replaced meanwhile: it stays self-consistent and is stored back below.
+        fetched = 0
+        for seg_lo, seg_hi in segments:
+            points = TimeSeries.coerce(
+                await fetch(expr, _to_datetime(seg_lo), _to_datetime(seg_hi), step_seconds)
+            )
+            fetched += len(points)
+            with self._lock:
+                entry.merge(seg_lo, seg_hi, points)
+            self._notify(expr, points)
+
+        with self._lock:
+            self._record("partial" if segments else "hit", fetched)
+            result = entry.slice(lo, hi)
+            entry.trim_before(entry.hi - self.max_window_seconds)
+            self._store(entry_key, entry)
+        return result
+
+    def _notify(self, expr: str, points: TimeSeries) -> None:
+        if not points:
+            return
+        for listener in list(self._listeners):
+            try:
+                listener(expr, points)
+            except Exception as e:
+                logger.warning(f"Range cache listener failed for '{expr}': {e}")
+
+    def _store(self, entry_key: Hashable, entry: _CachedSeries) -> None:
+        previous = self._entries.pop(entry_key, None)
+        if previous is not None:
+            self._samples -= previous.counted
+        entry.counted = len(entry.data)
+        entry.last_access = time.monotonic()
+        self._entries[entry_key] = entry
+        self._samples += entry.counted
+        while self._entries and (len(self._entries) > self.max_entries or self._samples > self.max_samples):
+            _, evicted = self._entries.popitem(last=False)
+            self._samples -= evicted.counted
+        PROMETHEUS_RANGE_CACHE_SAMPLES.set(self._samples)
+
+    def _expire(self) -> None:
+        deadline = time.monotonic() - self.max_age_seconds
+        while self._entries:
+            oldest_key, oldest = next(iter(self._entries.items()))
+            if oldest.last_access >= deadline:
+                break
+            del self._entries[oldest_key]
+            self._samples -= oldest.counted
+        PROMETHEUS_RANGE_CACHE_SAMPLES.set(self._samples)
+
+    def _record(self, result: str, fetched: int) -> None:
+        self.stats[self._STAT_NAMES[result]] += 1
+        self.stats["fetched_samples"] += fetched
+        PROMETHEUS_RANGE_CACHE_REQUESTS.labels(result=result).inc()
+
+
+_default_cache: Optional[PrometheusRangeCache] = None
+
+
+def get_default_range_cache() -> Optional[PrometheusRangeCache]:
+    """Process-wide range cache, sized by PROMETHEUS_RANGE_CACHE_*.
+
+    Returns None when PROMETHEUS_RANGE_CACHE_SAMPLES=0 (cache disabled).
+    """
+    global _default_cache
+    if DEFAULT_MAX_SAMPLES <= 0:
+        return None
+    if _default_cache is None:
+        _default_cache = PrometheusRangeCache()
+    return _default_cache
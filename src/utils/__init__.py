@@ -5,6 +5,8 @@ Cross-cutting utilities.
 - alert_normalizer.py: Schema validation for alerts
 - audit_logger.py: Immutable log writing
 - error_handling.py: Timeouts and retries
+- single_flight.py: Coalescing of identical in-flight async calls
+- log_templates.py: Drain-style log template mining
 """
 
 from src.utils.alert_normalizer import AlertNormalizer, normalize_alerts, AlertValidationError
@@ -19,6 +21,8 @@ from src.utils.error_handling import (
     classify_error,
     ErrorContext,
 )
+from src.utils.single_flight import SingleFlight
+from src.utils.log_templates import LogTemplate, LogTemplateMiner
 
 __all__ = [
     "AlertNormalizer",
@@ -34,4 +38,7 @@ __all__ = [
     "CircuitBreakerOpenError",
     "classify_error",
     "ErrorContext",
+    "SingleFlight",
+    "LogTemplate",
+    "LogTemplateMiner",
 ]
@@ -0,0 +1,190 @@
+"""
+In-Memory BM25 Index - Lexical search next to the vector stores
+
+Dense embeddings blur exact identifiers: error codes, metric names and pod
+names ("E1234", "http_requests_total", "checkout-7d9f8") score poorly
+against paraphrase-level similarity. This inverted index scores documents
+with Okapi BM25 over those tokens, and `reciprocal_rank_fusion` merges its
+ranking with a vector ranking without having to calibrate the two scores.
+
+Documents can be added, replaced and removed at any time: postings are
+updated in place and only the corpus statistics (document count, average
+length) are global. A query touches only the postings of its own terms.
+`save`/`load` write a JSON snapshot of the term counts per document.
+All operations take an internal lock, so searches from worker threads can
+run while documents are being added.
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.:/\-]*")
+_SEPARATORS = re.compile(r"[_.:/\-]+")
+SNAPSHOT_VERSION = 1
+
+
+def tokenize_terms(text: str) -> List[str]:
+    """
+    Lowercased terms of `text`.
+
+    Compound identifiers are kept whole and also split into their parts, so
+    "http_requests_total" matches both the exact metric and "requests".
+    """
+    terms: List[str] = []
+    for match in _TOKEN.finditer(text.lower()):
+        token = match.group().rstrip("_.:/-")
+        if not token:
+            continue
+        terms.append(token)
+        parts = [part for part in _SEPARATORS.split(token) if part]
+        if len(parts) > 1:
+            terms.extend(parts)
+    return terms
+
+
+def reciprocal_rank_fusion(*rankings: Sequence[str], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Merge ranked id lists: score(id) = sum of 1 / (k + rank) over the lists.
+
+    Args:
+        rankings: Ids ordered best first, one list per retriever.
+        k: Damping constant; 60 is the value from Cormack et al. (2009).
+
+    Returns:
+        (id, fused score) tuples, best first; ties keep first-seen order.
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+class BM25Index:
+    """
+    Incrementally updatable Okapi BM25 index.
+
+    Args:
+        k1: Term-frequency saturation.
+        b: Document-length normalization.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._doc_terms: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._payloads: Dict[str, Dict[str, Any]] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_terms
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return list(self._doc_terms)
+
+    def add(self, doc_id: str, text: str, payload: Optional[Dict[str, Any]] = None) -> None:
+        """Index `text` under `doc_id`, replacing any previous version."""
+        counts = dict(Counter(tokenize_terms(text)))
+        with self._lock:
+            self.remove(doc_id)
+            self._insert(doc_id, counts, payload or {})
+
+    def remove(self, doc_id: str) -> bool:
+        """Drop a document; False if it was not indexed."""
+        with self._lock:
+            counts = self._doc_terms.pop(doc_id, None)
+            if counts is None:
+                return False
+            for term in counts:
+                postings = self._postings[term]
+                del postings[doc_id]
+                if not postings:
+                    del self._postings[term]
+            self._total_length -= self._doc_lengths.pop(doc_id)
+            self._payloads.pop(doc_id, None)
+            return True
+
+    def search(self, query: str, top_k: int) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """Return up to top_k (id, BM25 score, payload) tuples, best first."""
+        terms = set(tokenize_terms(query))
+        with self._lock:
+            if not self._doc_terms or top_k <= 0:
+                return []
+
+            n_docs = len(self._doc_terms)
+            avg_length = self._total_length / n_docs or 1.0
+            scores: Dict[str, float] = defaultdict(float)
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1.0 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] += idf * tf * (self.k1 + 1.0) / (tf + norm)
+
+            best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+            return [(doc_id, score, self._payloads[doc_id]) for doc_id, score in best]
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write a snapshot atomically (temp file + rename)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            snapshot = {
+                "version": SNAPSHOT_VERSION,
+                "k1": self.k1,
+                "b": self.b,
+                "docs": {
+                    doc_id: {"terms": counts, "payload": self._payloads.get(doc_id, {})}
+                    for doc_id, counts in self._doc_terms.items()
+                },
+            }
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(snapshot), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "BM25Index":
+        """Load a snapshot written by `save`; an empty index if it is missing or unreadable."""
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        try:
+            snapshot = json.loads(path.read_text(encoding="utf-8"))
+            if snapshot.get("version") != SNAPSHOT_VERSION:
+                raise ValueError(f"unsupported snapshot version {snapshot.get('version')}")
+            index = cls(k1=snapshot["k1"], b=snapshot["b"])
+            for doc_id, doc in snapshot["docs"].items():
+                index._insert(doc_id, doc["terms"], doc["payload"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable BM25 snapshot {path}: {e}")
+            return cls()
+        return index
+
+    def _insert(self, doc_id: str, counts: Dict[str, int], payload: Dict[str, Any]) -> None:
+        for term, tf in counts.items():
+            self._postings[term][doc_id] = tf
+        self._doc_terms[doc_id] = counts
+        length = sum(counts.values())
+        self._doc_lengths[doc_id] = length
+        self._total_length += length
+        self._payloads[doc_id] = payload
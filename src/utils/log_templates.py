@@ -0,0 +1,214 @@
+"""
+Log Template Mining - Drain-style online clustering of log messages
+
+Identical stack traces from many pods differ only in their variable parts
+(timestamps, ids, addresses, line numbers). The miner masks those parts,
+routes each message through a fixed-depth prefix tree (token count first,
+then the leading tokens) and merges it into the most similar template in
+the leaf, replacing differing tokens with a wildcard. Each message costs
+O(depth + templates per leaf) instead of a comparison against every block
+seen so far.
+
+Multi-line messages keep their line structure: a newline is a token, so a
+template renders back to the same shape as its exemplar.
+
+Reference: He et al., "Drain: An Online Log Parsing Approach with Fixed
+Depth Tree" (ICWS 2017).
+"""
+
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+WILDCARD = "<*>"
+_NEWLINE = "\n"
+
+# Order matters: more specific patterns first
+_MASKS: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"), "<UUID>"),
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"), "<TS>"),
+    (re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"), "<IP>"),
+    (re.compile(r"\b0x[0-9a-fA-F]+\b"), "<HEX>"),
+    (re.compile(r"\b(?=[0-9a-fA-F]*\d)(?=[0-9a-fA-F]*[a-fA-F])[0-9a-fA-F]{8,}\b"), "<HEX>"),
+    (re.compile(r"(?<![A-Za-z<])[-+]?\d+(?:\.\d+)?"), "<NUM>"),
+]
+
+
+def mask_message(message: str) -> str:
+    """Replace variable parts of a log message with typed placeholders."""
+    for pattern, placeholder in _MASKS:
+        message = pattern.sub(placeholder, message)
+    return message
+
+
+def tokenize(message: str) -> List[str]:
+    """Masked whitespace tokens, with a newline token between lines."""
+    tokens: List[str] = []
+    for line in mask_message(message).split("\n"):
+        if tokens:
+            tokens.append(_NEWLINE)
+        tokens.extend(line.split())
+    return tokens
+
+
+@dataclass
+class LogTemplate:
+    """A cluster of log messages sharing one template."""
+
+    template_id: int
+    tokens: List[str]
+    exemplar: str
+    count: int = 0
+
+    @property
+    def template(self) -> str:
+        """Template text with the exemplar's line structure."""
+        return "\n".join(
+            " ".join(line) for line in _split_lines(self.tokens)
+        )
+
+    def similarity(self, tokens: List[str]) -> Tuple[float, int]:
+        """(fraction of positions matching exactly, wildcard count)."""
+        same = wildcards = 0
+        for ours, theirs in zip(self.tokens, tokens):
+            if ours == WILDCARD:
+                wildcards += 1
+            elif ours == theirs:
+                same += 1
+        return same / len(tokens) if tokens else 1.0, wildcards
+
+    def merge(self, tokens: List[str]) -> None:
+        """Generalize positions where `tokens` differs from the template."""
+        self.tokens = [
+            ours if ours == theirs else WILDCARD
+            for ours, theirs in zip(self.tokens, tokens)
+        ]
+
+
+def _split_lines(tokens: List[str]) -> List[List[str]]:
+    lines: List[List[str]] = [[]]
+    for token in tokens:
+        if token == _NEWLINE:
+            lines.append([])
+        else:
+            lines[-1].append(token)
+    return lines
+
+
+@dataclass
+class _Node:
+    children: Dict[str, "_Node"] = field(default_factory=dict)
+    template_ids: List[int] = field(default_factory=list)
+
+
+class LogTemplateMiner:
+    """
+    Online Drain template miner.
+
+    Args:
+        depth: Prefix tree depth, counting the token-count level and the leaf;
+            messages are routed by their first `depth - 2` tokens.
+        similarity_threshold: Minimum fraction of matching tokens to join a template.
+        max_children: Children per tree node before new tokens route to a wildcard branch.
+        max_templates: Templates kept; the least recently matched one is evicted beyond it.
+    """
+
+    def __init__(
+        self,
+        depth: int = 4,
+        similarity_threshold: float = 0.4,
+        max_children: int = 100,
+        max_templates: int = 1000,
+    ):
+        if depth < 3:
+            raise ValueError("depth must be at least 3")
+        self.depth = depth
+        self.similarity_threshold = similarity_threshold
+        self.max_children = max_children
+        self.max_templates = max_templates
+        self._root: Dict[int, _Node] = {}
+        self._templates: "OrderedDict[int, LogTemplate]" = OrderedDict()
+        self._leaves: Dict[int, _Node] = {}
+        self._next_id = 1
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    @property
+    def next_id(self) -> int:
+        """Id the next new template will get; lower ids already existed."""
+        return self._next_id
+
+    @property
+    def templates(self) -> List[LogTemplate]:
+        """Templates from least to most recently matched."""
+        return list(self._templates.values())
+
+    def get(self, template_id: int) -> Optional[LogTemplate]:
+        return self._templates.get(template_id)
+
+    def add(self, message: str) -> LogTemplate:
+        """Assign `message` to a template, creating or generalizing one."""
+        tokens = tokenize(message)
+        leaf = self._leaf(tokens)
+
+        template = self._best_match(leaf, tokens)
+        if template is None:
+            template = LogTemplate(template_id=self._next_id, tokens=tokens, exemplar=message)
+            self._next_id += 1
+            self._templates[template.template_id] = template
+            self._leaves[template.template_id] = leaf
+            leaf.template_ids.append(template.template_id)
+            self._evict()
+        else:
+            template.merge(tokens)
+            self._templates.move_to_end(template.template_id)
+
+        template.count += 1
+        return template
+
+    def _leaf(self, tokens: List[str]) -> _Node:
+        node = self._root.get(len(tokens))
+        if node is None:
+            node = self._root[len(tokens)] = _Node()
+
+        for token in tokens[: self.depth - 2]:
+            if token == _NEWLINE:
+                break
+            key = WILDCARD if _has_variable(token) else token
+            child = node.children.get(key)
+            if child is None:
+                if len(node.children) >= self.max_children:
+                    key = WILDCARD
+                    child = node.children.get(key)
+                if child is None:
+                    child = node.children[key] = _Node()
+            node = child
+        return node
+
+    def _best_match(self, leaf: _Node, tokens: List[str]) -> Optional[LogTemplate]:
+        best, best_key = None, (-1.0, -1)
+        for template_id in leaf.template_ids:
+            template = self._templates[template_id]
+            similarity, wildcards = template.similarity(tokens)
+            # Prefer the more specific template on ties
+            key = (similarity, -wildcards)
+            if key > best_key:
+                best, best_key = template, key
+        if best is not None and best_key[0] >= self.similarity_threshold:
+            return best
+        return None
+
+    def _evict(self) -> None:
+        while len(self._templates) > self.max_templates:
+            template_id, _ = self._templates.popitem(last=False)
+            self._leaves.pop(template_id).template_ids.remove(template_id)
+            logger.debug(f"Evicted log template {template_id}")
+
+
+def _has_variable(token: str) -> bool:
+    return token.startswith("<") and token.endswith(">") or any(c.isdigit() for c in token)
@@ -0,0 +1,83 @@
+"""
+Single-flight - Coalescing of identical in-flight async calls
+
+During an alert storm many concurrent runs for the same service issue the
+same PromQL range query or the same LLM prompt at once. A SingleFlight group
+lets the first caller for a key (the leader) run the backend call while
+every concurrent caller with the same key awaits the same future, so N
+callers cost one request. The entry is dropped as soon as the call settles:
+this is coalescing, not caching.
+
+The shared call runs as its own task, so a cancelled caller never cancels
+the request the others are waiting on. Groups are safe to share across
+event loops; each loop gets its own in-flight table.
+"""
+
+import asyncio
+import logging
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+from src.metrics import SINGLE_FLIGHT_CALLS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Group of coalesced async calls keyed by a hashable key.
+
+    Args:
+        name: Label used in logs and the strands_single_flight_calls_total metric.
+    """
+
+    def __init__(self, name: str = "default"):
+        self.name = name
+        self._inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Task]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.stats: Dict[str, int] = {"leaders": 0, "followers": 0}
+
+    def inflight(self) -> int:
+        """Number of calls currently in flight on the running loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return 0
+        return len(self._inflight.get(loop, {}))
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `fn()` once per key among concurrent callers.
+
+        The leader's result (or exception) is delivered to every caller
+        that joined while the call was in flight.
+        """
+        loop = asyncio.get_running_loop()
+        calls = self._inflight.get(loop)
+        if calls is None:
+            calls = self._inflight[loop] = {}
+
+        task = calls.get(key)
+        if task is not None:
+            self.stats["followers"] += 1
+            SINGLE_FLIGHT_CALLS.labels(group=self.name, role="follower").inc()
+            logger.debug("[SINGLE_FLIGHT] %s: joined in-flight call for %r", self.name, key)
+            return await asyncio.shield(task)
+
+        task = loop.create_task(fn())
+        calls[key] = task
+        task.add_done_callback(lambda t: self._forget(calls, key, t))
+        self.stats["leaders"] += 1
+        SINGLE_FLIGHT_CALLS.labels(group=self.name, role="leader").inc()
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _forget(calls: Dict[Hashable, Any], key: Hashable, task: asyncio.Task) -> None:
+        if calls.get(key) is task:
+            del calls[key]
+        # Mark the exception as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
@@ -42,21 +42,33 @@ def filter_outliers_p95(data_points: List[float]) -> Tuple[List[float], List[flo
     
     # Convert to numpy array for efficient computation
     arr = np.array(data_points)
+    keep, _ = p95_keep_mask(arr)
     
-    # Compute p95 threshold using linear interpolation
-    p95_threshold = np.percentile(arr, 95)
+    return arr[keep].tolist(), arr[~keep].tolist()
+
+
+def p95_keep_mask(values: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Array form of `filter_outliers_p95`: mask of values at or below p95.
     
-    # Split into filtered data and outliers
-    filtered = arr[arr <= p95_threshold].tolist()
-    outliers = arr[arr > p95_threshold].tolist()
+    Args:
+        values: Finite metric values
+    
+    Returns:
+        Tuple of (keep_mask, p95_threshold)
+    """
+    # Compute p95 threshold using linear interpolation
+    p95_threshold = np.percentile(values, 95)
+    keep = values <= p95_threshold
     
-    if outliers:
+    removed = int(keep.size - np.count_nonzero(keep))
+    if removed:
         logger.info(
-            f"p95 filtering: removed {len(outliers)} outliers "
-            f"(threshold={p95_threshold:.2f}, max outlier={max(outliers):.2f})"
+            f"p95 filtering: removed {removed} outliers "
+            f"(threshold={p95_threshold:.2f}, max outlier={float(values[~keep].max()):.2f})"
         )
     
-    return filtered, outliers
+    return keep, float(p95_threshold)
 
 
 def compute_linear_trend(data_points: List[float]) -> Tuple[float, float]:
@@ -77,22 +89,39 @@ def compute_linear_trend(data_points: List[float]) -> Tuple[float, float]:
     if len(data_points) < 2:
         raise ValueError(f"Need at least 2 points for trend, got {len(data_points)}")
     
-    # Create time index (0, 1, 2, ...)
-    x = np.arange(len(data_points))
-    y = np.array(data_points)
+    slopes, r_squared = linear_trend_rows(np.asarray(data_points, dtype=np.float64)[np.newaxis])
     
-    # Linear regression using least squares
-    coefficients = np.polyfit(x, y, deg=1)
-    slope = coefficients[0]
+    return float(slopes[0]), float(r_squared[0])
+
+
+def linear_trend_rows(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Row-wise form of `compute_linear_trend` for a 2D array of equal-length series.
+    
+    Closed-form least squares against the index 0..n-1. `compute_linear_trend`
+    runs through here too, so a series gets the same slope and R² whether it
+    is analyzed alone or as a row of a batch.
+    
+    Args:
+        values: Array of shape (series, points), points >= 2
+    
+    Returns:
+        Tuple of (slopes, r_squared) arrays, one entry per row
+    """
+    x = np.arange(values.shape[1], dtype=np.float64)
+    x -= x.mean()
+    y = values - values.mean(axis=1, keepdims=True)
+    
+    slopes = (y * x).sum(axis=1) / (x * x).sum()
     
     # Compute R² (coefficient of determination)
-    y_pred = np.poly1d(coefficients)(x)
-    ss_res = np.sum((y - y_pred) ** 2)  # Residual sum of squares
-    ss_tot = np.sum((y - np.mean(y)) ** 2)  # Total sum of squares
+    ss_res = ((y - slopes[:, np.newaxis] * x) ** 2).sum(axis=1)  # Residual sum of squares
+    ss_tot = (y ** 2).sum(axis=1)  # Total sum of squares
     
-    r_squared = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_squared = np.where(ss_tot > 0, 1 - ss_res / ss_tot, 0.0)
     
-    return float(slope), float(r_squared)
+    return slopes, r_squared
 
 
 def compute_variance_coefficient(data_points: List[float]) -> float:
@@ -114,17 +143,27 @@ def compute_variance_coefficient(data_points: List[float]) -> float:
     if len(data_points) < 2:
         raise ValueError(f"Need at least 2 points for variance, got {len(data_points)}")
     
-    arr = np.array(data_points)
-    mean = np.mean(arr)
+    return float(variance_coefficient_rows(np.asarray(data_points, dtype=np.float64)[np.newaxis])[0])
+
+
+def variance_coefficient_rows(values: np.ndarray) -> np.ndarray:
+    """
+    Row-wise form of `compute_variance_coefficient` for a 2D array of series.
+    
+    Args:
+        values: Array of shape (series, points), points >= 2
     
-    if mean == 0:
-        # Handle zero mean case (all values are zero)
-        return 0.0 if np.std(arr) == 0 else float('inf')
+    Returns:
+        Coefficient of variation per row
+    """
+    mean = values.mean(axis=1)
+    std_dev = values.std(axis=1)
     
-    std_dev = np.std(arr)
-    cv = std_dev / abs(mean)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cv = std_dev / np.abs(mean)
     
-    return float(cv)
+    # Handle zero mean case (all values are zero)
+    return np.where(mean == 0, np.where(std_dev == 0, 0.0, np.inf), cv)
 
 
 def validate_data_points(data_points: List[float]) -> List[float]:
@@ -144,14 +183,24 @@ def validate_data_points(data_points: List[float]) -> List[float]:
         return []
     
     arr = np.array(data_points)
-    valid_mask = np.isfinite(arr)
-    valid_data = arr[valid_mask].tolist()
+    return arr[finite_mask(arr)].tolist()
+
+
+def finite_mask(values: np.ndarray) -> np.ndarray:
+    """
+    Array form of `validate_data_points`: mask of finite values.
+    
+    Logs:
+        Warning if any invalid values are present
+    """
+    valid_mask = np.isfinite(values)
+    valid_count = int(np.count_nonzero(valid_mask))
     
-    invalid_count = len(data_points) - len(valid_data)
+    invalid_count = values.size - valid_count
     if invalid_count > 0:
         logger.warning(
             f"Removed {invalid_count} invalid values (NaN/Inf) from data "
-            f"({len(valid_data)}/{len(data_points)} valid)"
+            f"({valid_count}/{values.size} valid)"
         )
     
-    return valid_data
+    return valid_mask
@@ -0,0 +1,137 @@
+"""
+In-Memory Vector Index - Vectorized cosine similarity search
+
+Backs the offline fallback of GraphAgent when Qdrant is unavailable.
+Vectors are L2-normalized once on insert and kept in a contiguous float32
+matrix that grows geometrically, so a search is a single matrix-vector
+product followed by an `argpartition` top-k instead of O(N*D) Python work.
+
+For large stores an int8-quantized mode keeps one int8 code per dimension
+plus a float32 scale per row (~4x less memory); scores are then approximate
+to roughly 1e-2.
+"""
+
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryVectorIndex:
+    """
+    Append-only cosine similarity index.
+
+    Args:
+        dim: Vector dimension (inferred from the first vector when None).
+        quantize: Store rows as int8 codes instead of float32.
+        initial_capacity: Rows allocated up front; capacity doubles when full.
+    """
+
+    def __init__(self, dim: Optional[int] = None, quantize: bool = False, initial_capacity: int = 256):
+        self.dim = dim
+        self.quantize = quantize
+        self._initial_capacity = max(1, initial_capacity)
+        self._size = 0
+        self._matrix: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._ids: List[str] = []
+        self._payloads: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the vector storage."""
+        if self._matrix is None:
+            return 0
+        return self._matrix.nbytes + (self._scales.nbytes if self._scales is not None else 0)
+
+    def add(self, item_id: str, vector: Sequence[float], payload: Optional[Dict[str, Any]] = None) -> None:
+        """Normalize and append a vector (amortized O(D))."""
+        row = self._normalize(vector)
+        self._ensure_capacity(self._size + 1)
+
+        if self.quantize:
+            max_abs = float(np.max(np.abs(row))) if row.size else 0.0
+            scale = max_abs / 127.0 if max_abs > 0 else 1.0
+            self._matrix[self._size] = np.round(row / scale).astype(np.int8)
+            self._scales[self._size] = scale
+        else:
+            self._matrix[self._size] = row
+
+        self._ids.append(item_id)
+        self._payloads.append(payload or {})
+        self._rows[item_id] = self._size
+        self._size += 1
+
+    def search(
+        self,
+        query: Sequence[float],
+        top_k: int,
+        min_similarity: float = -1.0
+    ) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """
+        Return up to top_k (id, cosine similarity, payload) tuples with
+        similarity >= min_similarity, best first.
+        """
+        if self._size == 0 or top_k <= 0:
+            return []
+
+        q = self._normalize(query)
+        if self.quantize:
+            scores = (self._matrix[: self._size] @ q) * self._scales[: self._size]
+        else:
+            scores = self._matrix[: self._size] @ q
+
+        candidates = np.flatnonzero(scores >= min_similarity)
+        if candidates.size == 0:
+            return []
+        if candidates.size > top_k:
+            part = np.argpartition(-scores[candidates], top_k - 1)[:top_k]
+            candidates = candidates[part]
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        return [(self._ids[i], float(scores[i]), self._payloads[i]) for i in order]
+
+    def score_ids(self, query: Sequence[float], item_ids: Sequence[str]) -> Dict[str, float]:
+        """Cosine similarity of the query to specific items (latest row per id); unknown ids are skipped."""
+        rows = [self._rows[item_id] for item_id in item_ids if item_id in self._rows]
+        if not rows:
+            return {}
+        q = self._normalize(query)
+        scores = self._matrix[rows] @ q
+        if self.quantize:
+            scores = scores * self._scales[rows]
+        return {self._ids[row]: float(score) for row, score in zip(rows, scores)}
+
+    def _normalize(self, vector: Sequence[float]) -> np.ndarray:
+        row = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if self.dim is None:
+            self.dim = row.shape[0]
+        elif row.shape[0] != self.dim:
+            raise ValueError(f"Expected vector of dimension {self.dim}, got {row.shape[0]}")
+        norm = float(np.linalg.norm(row))
+        if norm == 0.0:
+            # Zero vectors have similarity 0 with everything
+            return np.zeros(self.dim, dtype=np.float32)
+        return row / norm
+
+    def _ensure_capacity(self, needed: int) -> None:
+        capacity = 0 if self._matrix is None else self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(self._initial_capacity, capacity * 2, needed)
+        dtype = np.int8 if self.quantize else np.float32
+        matrix = np.zeros((new_capacity, self.dim), dtype=dtype)
+        if self._matrix is not None:
+            matrix[: self._size] = self._matrix[: self._size]
+        self._matrix = matrix
+
+        if self.quantize:
+            scales = np.ones(new_capacity, dtype=np.float32)
+            if self._scales is not None:
+                scales[: self._size] = self._scales[: self._size]
+            self._scales = scales
@@ -164,7 +164,23 @@ class SwarmConfig(BaseSettings):
         default="llm_agent",
         description="LLM agent identifier"
     )
-    
+    intake_workers: int = Field(
+        default=4,
+        description="Number of concurrent swarm runs consuming the alert intake queue"
+    )
+    intake_queue_size: int = Field(
+        default=256,
+        description="Maximum number of alerts buffered in the intake queue"
+    )
+    intake_enqueue_timeout_seconds: float = Field(
+        default=5.0,
+        description="How long a webhook call waits for queue space before answering 503"
+    )
+    streaming_trends: bool = Field(
+        default=True,
+        description="Follow MONITOR decisions with the streaming trend detector instead of re-running the swarm on a timer"
+    )
+
     model_config = SettingsConfigDict(
         env_prefix="SWARM_",
         case_sensitive=False
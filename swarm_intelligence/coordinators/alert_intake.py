@@ -0,0 +1,249 @@
+"""
+Alert Intake Queue - bounded, concurrent ingestion for the webhook receiver.
+
+Alertmanager delivers alerts in batches and keeps firing during an incident
+storm. Instead of rejecting everything that arrives while a swarm run is in
+flight, every alert of a webhook payload is enqueued on a bounded asyncio
+queue and consumed by a fixed pool of workers, each of which drives one
+``SwarmRunCoordinator.aexecute_plan`` run at a time.
+
+Backpressure is applied on queue depth, per payload: below the high
+watermark, and with room for all of its alerts, a payload is enqueued
+immediately; otherwise the webhook call waits (up to
+``enqueue_timeout_seconds``) for workers to drain the queue, which slows the
+sender down. Only when the queue stays saturated for the whole timeout is the
+payload rejected with ``IntakeRejected``, with none of its alerts enqueued, so
+the caller can answer 503 with a ``Retry-After`` header and let Alertmanager
+redeliver the group.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.metrics import (
+    INTAKE_ACTIVE_WORKERS,
+    INTAKE_ALERTS_TOTAL,
+    INTAKE_PROCESSING_TIME,
+    INTAKE_QUEUE_DEPTH,
+    INTAKE_QUEUE_WAIT,
+)
+
+logger = logging.getLogger(__name__)
+
+# handler(payload, alert, alert_id) -> run_id
+AlertHandler = Callable[[Dict[str, Any], Dict[str, Any], str], Awaitable[str]]
+
+# Worker status -> INTAKE_ALERTS_TOTAL outcome
+_OUTCOMES = {"success": "succeeded", "failure": "failed", "cancelled": "cancelled"}
+
+
+class IntakeRejected(Exception):
+    """Raised when an alert cannot be enqueued before the backpressure timeout."""
+
+    def __init__(self, message: str, retry_after_seconds: int):
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
+
+
+@dataclass
+class IntakeItem:
+    """A single alert waiting for a worker."""
+
+    alert_id: str
+    alert_name: str
+    payload: Dict[str, Any]
+    alert: Dict[str, Any]
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class AlertIntakeQueue:
+    """
+    Bounded asyncio queue with a pool of concurrent swarm workers.
+
+    Each alert in a webhook payload becomes one queue item; ``handler`` is
+    awaited once per item by whichever worker picks it up.
+    """
+
+    def __init__(
+        self,
+        handler: AlertHandler,
+        max_workers: int = 4,
+        max_queue_size: int = 256,
+        enqueue_timeout_seconds: float = 5.0,
+        high_watermark: float = 0.8,
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+        if max_queue_size < 1:
+            raise ValueError("max_queue_size must be >= 1")
+
+        self.handler = handler
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.enqueue_timeout_seconds = enqueue_timeout_seconds
+        self.high_watermark = min(max_queue_size, max(1, int(max_queue_size * high_watermark)))
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._drained: Optional[asyncio.Condition] = None
+        self._workers: List[asyncio.Task] = []
+        self._active = 0
+        self._stats: Dict[str, int] = {
+            "accepted": 0,
+            "rejected": 0,
+            "succeeded": 0,
+            "failed": 0,
+        }
+        self.last_execution: Optional[Dict[str, Any]] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def start(self) -> None:
+        """Create the queue on the running loop and spawn the worker pool."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._drained = asyncio.Condition()
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"alert-intake-{i}")
+            for i in range(self.max_workers)
+        ]
+        logger.info(
+            f"[INTAKE] Started {self.max_workers} workers "
+            f"(queue size={self.max_queue_size}, high watermark={self.high_watermark})"
+        )
+
+    async def stop(self, drain: bool = True) -> None:
+        """Stop the worker pool, optionally waiting for queued alerts first."""
+        if not self.running:
+            return
+        if drain and self._queue is not None:
+            await self._queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info("[INTAKE] Stopped workers")
+
+    async def submit(self, payload: Dict[str, Any]) -> List[str]:
+        """
+        Fan out every alert of an Alertmanager payload onto the queue.
+
+        Returns the alert IDs assigned to the enqueued alerts. The payload is
+        admitted as a whole: either every alert is enqueued or, if the queue
+        stays saturated past the enqueue timeout, none is and
+        ``IntakeRejected`` is raised, so a redelivery does not run any alert twice.
+        """
+        if not self.running:
+            raise RuntimeError("AlertIntakeQueue.start() must be called before submit()")
+
+        alerts = payload.get("alerts") or [{}]
+        batch_id = uuid.uuid4().hex[:8]
+        timestamp_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+
+        items: List[IntakeItem] = []
+        for index, alert in enumerate(alerts):
+            labels = alert.get("labels", {}) if isinstance(alert, dict) else {}
+            items.append(IntakeItem(
+                alert_id=f"alert-{timestamp_ms}-{batch_id}-{index}",
+                alert_name=labels.get("alertname", "unknown"),
+                payload=payload,
+                alert=alert if isinstance(alert, dict) else {},
+            ))
+
+        await self._admit(items)
+        for item in items:
+            if self._queue.full():
+                # Only for payloads larger than the whole queue: already admitted, so wait
+                await self._queue.put(item)
+            else:
+                self._queue.put_nowait(item)
+            self._stats["accepted"] += 1
+            INTAKE_ALERTS_TOTAL.labels(outcome="accepted").inc()
+            INTAKE_QUEUE_DEPTH.set(self._queue.qsize())
+        return [item.alert_id for item in items]
+
+    def _has_room(self, count: int) -> bool:
+        depth = self._queue.qsize()
+        return depth < self.high_watermark and depth + min(count, self.max_queue_size) <= self.max_queue_size
+
+    async def _admit(self, items: List[IntakeItem]) -> None:
+        """Wait until the whole payload fits, or reject it."""
+        if self._has_room(len(items)):
+            return
+
+        logger.warning(
+            f"[INTAKE] Queue depth {self._queue.qsize()} has no room for {len(items)} alerts "
+            f"(high watermark {self.high_watermark}), applying backpressure to {items[0].alert_name}"
+        )
+        try:
+            async with self._drained:
+                await asyncio.wait_for(
+                    self._drained.wait_for(lambda: self._has_room(len(items))),
+                    timeout=self.enqueue_timeout_seconds,
+                )
+        except asyncio.TimeoutError:
+            self._stats["rejected"] += len(items)
+            INTAKE_ALERTS_TOTAL.labels(outcome="rejected").inc(len(items))
+            raise IntakeRejected(
+                f"Intake queue above high watermark ({self.high_watermark} alerts)",
+                retry_after_seconds=max(1, int(self.enqueue_timeout_seconds)),
+            )
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            item: IntakeItem = await self._queue.get()
+            INTAKE_QUEUE_DEPTH.set(self._queue.qsize())
+            async with self._drained:
+                self._drained.notify_all()
+            INTAKE_QUEUE_WAIT.observe(time.monotonic() - item.enqueued_at)
+
+            self._active += 1
+            INTAKE_ACTIVE_WORKERS.set(self._active)
+            started = time.monotonic()
+            status = "success"
+            try:
+                run_id = await self.handler(item.payload, item.alert, item.alert_id)
+                self._stats["succeeded"] += 1
+                self.last_execution = {
+                    "run_id": run_id,
+                    "alert": item.alert_name,
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                }
+            except asyncio.CancelledError:
+                status = "cancelled"
+                raise
+            except Exception as e:
+                status = "failure"
+                self._stats["failed"] += 1
+                logger.error(
+                    f"[INTAKE] Worker {worker_id} failed processing {item.alert_id}: {e}",
+                    exc_info=True,
+                )
+            finally:
+                self._active -= 1
+                INTAKE_ACTIVE_WORKERS.set(self._active)
+                INTAKE_PROCESSING_TIME.labels(status=status).observe(time.monotonic() - started)
+                INTAKE_ALERTS_TOTAL.labels(outcome=_OUTCOMES[status]).inc()
+                self._queue.task_done()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Snapshot of queue state for health endpoints."""
+        return {
+            "queue_depth": self.depth,
+            "max_queue_size": self.max_queue_size,
+            "active_workers": self._active,
+            "max_workers": self.max_workers,
+            **self._stats,
+            "last_execution": self.last_execution,
+        }
@@ -39,6 +39,9 @@ from swarm_intelligence.policy.confidence_policy import (
     DefaultConfidencePolicy,
 )
 from src.deduplication.distributed_deduplicator import DistributedEventDeduplicator, DeduplicationAction
+from src.models.metric_trend import MetricTrend, TrendState
+from src.rules.online_trend import StreamingTrendDetector
+from src.rules.trend_rules import TrendRules
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +59,7 @@ class SwarmRunCoordinator:
         confidence_service: ConfidenceService,
         llm_agent_id: Optional[str] = "llm_agent",
         deduplicator: Optional[DistributedEventDeduplicator] = None,
+        trend_detector: Optional[StreamingTrendDetector] = None,
     ):
         self.execution_controller = execution_controller
         self.retry_controller = retry_controller
@@ -68,6 +72,9 @@ class SwarmRunCoordinator:
         self.scheduler = AsyncIOScheduler()
         self.scheduler.start()
         self.monitor_states: Dict[str, MonitorState] = {}
+        # Com um detector de tendência, MONITOR acompanha a série em streaming
+        # em vez de reexecutar o swarm periodicamente
+        self.trend_detector = trend_detector
         
         # Cache em memória para o Console Operacional (em produção usar Redis/DB)
         self._execution_history: Dict[str, Dict[str, Any]] = {}
@@ -113,23 +120,17 @@ class SwarmRunCoordinator:
             severity = alert.data.get("severity", "warning")
             service = alert.data.get("service", "unknown")
             
-            # Try to acquire a distributed lock to prevent race conditions
-            lock_name = f"swarm_run:{source_id}"
-            if self.deduplicator.acquire_lock(lock_name):
-                try:
-                    action, existing_run_id = self.deduplicator.check_duplicate(
-                        source_id=source_id,
-                        event_data=alert.data,
-                        severity=severity,
-                        source_system=alert.data.get("source", "grafana")
-                    )
-                    
-                    if action == DeduplicationAction.UPDATE_EXISTING:
-                        # In a real scenario, we might want to attach this alert to the existing run
-                        self.metrics.record_dedup("update_existing")
-                        pass 
-                finally:
-                    self.deduplicator.release_lock(lock_name)
+            # check_duplicate is atomic in Redis (one MULTI/EXEC), no lock needed
+            action, existing_run_id = self.deduplicator.check_duplicate(
+                source_id=source_id,
+                event_data=alert.data,
+                severity=severity,
+                source_system=alert.data.get("source", "grafana")
+            )
+            
+            if action == DeduplicationAction.UPDATE_EXISTING:
+                # In a real scenario, we might want to attach this alert to the existing run
+                self.metrics.record_dedup("update_existing")
 
         # Use a local RNG to avoid modifying global random state
         if master_seed is None:
@@ -289,8 +290,8 @@ class SwarmRunCoordinator:
                 source_id=alert.alert_id,
                 execution_id=run_id,
                 event_data=alert.data,
-                severity=alert.data.get("severity"),
-                source_system=alert.data.get("source")
+                severity=alert.data.get("severity", "warning"),
+                source_system=alert.data.get("source", "grafana")
             )
 
         return swarm_run, all_retry_attempts, all_retry_decisions
@@ -350,31 +351,103 @@ class SwarmRunCoordinator:
             state = MonitorState(run_id=run_id, original_alert_id=alert.alert_id)
             self.monitor_states[run_id] = state
 
+        expr = policy.metadata.get("promql") or alert.data.get("expr")
+        if self.trend_detector is not None and expr and state.recheck_count < policy.max_rechecks:
+            self._watch_monitored_series(domain, plan, alert, run_id, policy, state, expr)
+            return
+
         if state.recheck_count < policy.max_rechecks:
-            state.recheck_count += 1
-            state.last_recheck_timestamp = datetime.now(timezone.utc).timestamp()
-            
-            delay = policy.recheck_after_minutes
-            next_run_time = datetime.now(timezone.utc) + timedelta(minutes=delay)
-            
-            logger.info(f"Decision is MONITOR. Scheduling re-check #{state.recheck_count} for run {run_id} in {delay} minutes.")
-            
-            self.scheduler.add_job(
-                self.aexecute_plan,
-                'date',
-                run_date=next_run_time,
-                args=[domain, plan, alert, f"{run_id}_recheck_{state.recheck_count}"],
-                kwargs={"master_seed": random.randint(0, 1000000)}
-            )
+            self._schedule_recheck(domain, plan, alert, run_id, state, policy.recheck_after_minutes)
         else:
             logger.warning(f"Max re-checks reached for run {run_id}. Triggering escalation: {policy.escalation_action}")
             await self._trigger_escalation(run_id, policy.escalation_action)
 
+    def _schedule_recheck(self, domain: Domain, plan: SwarmPlan, alert: Alert, run_id: str, state: MonitorState, delay: float):
+        """Agenda uma reexecução completa do swarm."""
+        state.recheck_count += 1
+        state.last_recheck_timestamp = datetime.now(timezone.utc).timestamp()
+        next_run_time = datetime.now(timezone.utc) + timedelta(minutes=delay)
+
+        logger.info(f"Decision is MONITOR. Scheduling re-check #{state.recheck_count} for run {run_id} in {delay} minutes.")
+
+        self.scheduler.add_job(
+            self.aexecute_plan,
+            'date',
+            run_date=next_run_time,
+            args=[domain, plan, alert, f"{run_id}_recheck_{state.recheck_count}"],
+            kwargs={"master_seed": random.randint(0, 1000000)}
+        )
+
+    def _watch_monitored_series(
+        self,
+        domain: Domain,
+        plan: SwarmPlan,
+        alert: Alert,
+        run_id: str,
+        policy: MonitorPolicy,
+        state: MonitorState,
+        expr: str,
+    ):
+        """
+        Acompanha a série do alerta no StreamingTrendDetector.
+
+        TrendRules decide escalonamento ou auto-close a cada poll; o swarm só
+        é reexecutado quando o estado muda e as regras não decidem. Sem
+        decisão, cada `recheck_after_minutes` conta como um re-check e, após
+        `max_rechecks`, a execução é escalonada como no caminho por timer.
+        """
+        detector = self.trend_detector
+        recheck_seconds = policy.recheck_after_minutes * 60
+        state.last_recheck_timestamp = datetime.now(timezone.utc).timestamp()
+
+        async def escalate(reason: str):
+            state.is_active = False
+            detector.unwatch(expr, on_trend_update)
+            logger.warning(f"{reason} for run {run_id}. Triggering escalation: {policy.escalation_action}")
+            await self._trigger_escalation(run_id, policy.escalation_action)
+
+        async def on_trend_update(trend: MetricTrend, previous: Optional[TrendState]):
+            if not state.is_active:
+                return
+            if TrendRules.should_escalate([trend]):
+                await escalate(f"Streaming trend is {trend.trend_state.name}")
+            elif TrendRules.can_auto_close([trend]):
+                state.is_active = False
+                detector.unwatch(expr, on_trend_update)
+                logger.info(f"Streaming trend for run {run_id} is {trend.trend_state.name}. Auto-closing MONITOR.")
+                if run_id in self._execution_history:
+                    self._execution_history[run_id]["status"] = "AUTO_CLOSED"
+            elif previous not in (None, TrendState.UNKNOWN, trend.trend_state):
+                # Estado mudou sem decisão das regras: reavaliar com o swarm
+                detector.unwatch(expr, on_trend_update)
+                if state.recheck_count < policy.max_rechecks:
+                    self._schedule_recheck(domain, plan, alert, run_id, state, 0)
+                else:
+                    await escalate("Max re-checks reached")
+            else:
+                now = datetime.now(timezone.utc).timestamp()
+                if now - state.last_recheck_timestamp >= recheck_seconds:
+                    state.recheck_count += 1
+                    state.last_recheck_timestamp = now
+                    if state.recheck_count >= policy.max_rechecks:
+                        await escalate("Max re-checks reached without a trend decision")
+
+        detector.watch(expr, on_trend_update, metric_name=alert.data.get("alertname", expr), every_poll=True)
+        logger.info(f"Decision is MONITOR. Watching '{expr}' for run {run_id} instead of re-running the swarm.")
+
+        if self.scheduler.get_job("streaming_trend_poll") is None:
+            self.scheduler.add_job(
+                detector.poll,
+                'interval',
+                seconds=detector.step_seconds,
+                id="streaming_trend_poll",
+            )
+
     async def _trigger_escalation(self, run_id: str, action: EscalationAction):
         """Executa a ação de escalonamento quando o limite de MONITOR é atingido."""
         if run_id in self._execution_history:
             self._execution_history[run_id]["status"] = "ESCALATED"
-            self._execution_history[run_id]["metadata"]["escalation_action"] = action
+            self._execution_history[run_id].setdefault("metadata", {})["escalation_action"] = action
         
         # Aqui poderíamos disparar um alerta real, abrir um ticket ou forçar uma ação humana
         logger.error(f"ESCALATION TRIGGERED for {run_id}: {action}")
@@ -0,0 +1,95 @@
+"""
+Tests for pagination, filters and field projection on /api/incidents and
+/api/decisions.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import server_fastapi
+from src.graph.neo4j_repo import encode_cursor
+
+
+class FakeRepo:
+    def __init__(self):
+        self.calls = []
+
+    def get_incidents_page(self, **kwargs):
+        self.calls.append(kwargs)
+        if kwargs.get("cursor") == "bad":
+            raise ValueError("Invalid cursor: 'bad'")
+        items = [{
+            "decision_id": "d-1",
+            "summary": "High CPU on api",
+            "full_summary": "High CPU on api",
+            "status": "PROPOSED",
+            "created_at": "2025-01-01T00:00:00+00:00",
+            "severity": "critical",
+            "execution_count": 2,
+        }]
+        return items, encode_cursor("2025-01-01T00:00:00+00:00", "d-1")
+
+    def get_decisions_page(self, **kwargs):
+        self.calls.append(kwargs)
+        return [{"decision_id": "d-1", "summary": "s", "created_at": "2025-01-01T00:00:00"}], None
+
+
+@pytest.fixture
+def fake_repo(monkeypatch):
+    repo = FakeRepo()
+    monkeypatch.setattr(server_fastapi, "repo", repo)
+    return repo
+
+
+@pytest.fixture
+def client():
+    return TestClient(server_fastapi.app)
+
+
+def test_incidents_page_filters_and_cursor_header(client, fake_repo):
+    response = client.get(
+        "/api/incidents",
+        params={"limit": 10, "status": "PROPOSED", "service": "api", "since": "2025-01-01T00:00:00Z"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Next-Cursor"] == encode_cursor("2025-01-01T00:00:00+00:00", "d-1")
+    assert response.json()[0]["id"] == "d-1"
+    call = fake_repo.calls[0]
+    assert call["limit"] == 10
+    assert call["status"] == "PROPOSED"
+    assert call["service"] == "api"
+    assert call["created_after"] == "2025-01-01T00:00:00+00:00"
+
+
+def test_time_filters_are_normalized_to_utc(client, fake_repo):
+    response = client.get(
+        "/api/decisions",
+        params={"since": "2024-01-01T10:00:00+02:00", "until": "2024-01-01T12:00:00"},
+    )
+
+    assert response.status_code == 200
+    call = fake_repo.calls[0]
+    assert call["created_after"] == "2024-01-01T08:00:00+00:00"
+    assert call["created_before"] == "2024-01-01T12:00:00+00:00"
+
+
+def test_incidents_fields_projection(client, fake_repo):
+    response = client.get("/api/incidents", params={"fields": "id,alert_name,unknown"})
+
+    assert response.json() == [{"id": "d-1", "alert_name": "High CPU on api..."}]
+
+
+def test_incidents_invalid_cursor_and_time(client, fake_repo):
+    assert client.get("/api/incidents", params={"cursor": "bad"}).status_code == 400
+    assert client.get("/api/incidents", params={"until": "yesterday"}).status_code == 400
+    assert client.get("/api/incidents", params={"limit": 0}).status_code == 422
+
+
+def test_decisions_last_page_has_no_cursor(client, fake_repo):
+    response = client.get("/api/decisions", params={"severity": "critical", "fields": "decision_id"})
+
+    assert response.status_code == 200
+    assert "X-Next-Cursor" not in response.headers
+    assert response.json() == [{"decision_id": "d-1"}]
+    assert fake_repo.calls[0]["severity"] == "critical"
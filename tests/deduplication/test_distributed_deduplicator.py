@@ -0,0 +1,120 @@
+"""
+Testes - Distributed Event Deduplicator
+
+Usa fakeredis como servidor Redis em memória.
+"""
+
+import pytest
+
+from src.deduplication.distributed_deduplicator import (
+    DistributedEventDeduplicator,
+    DeduplicationAction,
+)
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class CountingRedis:
+    """Proxy que conta round trips (comandos diretos + execuções de pipeline)."""
+
+    def __init__(self, client):
+        self._client = client
+        self.round_trips = 0
+
+    def pipeline(self, *args, **kwargs):
+        pipe = self._client.pipeline(*args, **kwargs)
+        original_execute = pipe.execute
+
+        def execute(*a, **kw):
+            self.round_trips += 1
+            return original_execute(*a, **kw)
+
+        pipe.execute = execute
+        return pipe
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if callable(attr):
+            def call(*args, **kwargs):
+                self.round_trips += 1
+                return attr(*args, **kwargs)
+            return call
+        return attr
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def redis_client(server):
+    return CountingRedis(fakeredis.FakeStrictRedis(server=server, decode_responses=True))
+
+
+@pytest.fixture
+def deduplicator(redis_client):
+    return DistributedEventDeduplicator(ttl_minutes=30, redis_client=redis_client)
+
+
+class TestDistributedEventDeduplicator:
+
+    def test_first_event_is_new_and_claims_key(self, deduplicator, redis_client):
+        action, exec_id = deduplicator.check_duplicate("alert_1", {}, severity="critical")
+
+        assert action == DeduplicationAction.NEW_EXECUTION
+        assert exec_id is None
+        assert redis_client.round_trips == 1
+        entry = deduplicator.get_entry("alert_1", severity="critical")
+        assert entry["event_count"] == "1"
+
+    def test_duplicate_returns_registered_execution(self, deduplicator, redis_client):
+        deduplicator.check_duplicate("alert_1", {})
+        deduplicator.register_execution("alert_1", "run_1", {})
+        redis_client.round_trips = 0
+
+        action, exec_id = deduplicator.check_duplicate("alert_1", {})
+
+        assert action == DeduplicationAction.UPDATE_EXISTING
+        assert exec_id == "run_1"
+        assert redis_client.round_trips == 1
+        assert deduplicator.get_entry("alert_1")["event_count"] == "2"
+
+    def test_ttl_is_set_and_renewed(self, deduplicator, redis_client):
+        deduplicator.check_duplicate("alert_1", {})
+        key = deduplicator.generate_deduplication_key("alert_1")
+
+        assert 0 < redis_client.ttl(key) <= 30 * 60
+
+    def test_two_instances_share_state(self, server):
+        a = DistributedEventDeduplicator(redis_client=fakeredis.FakeStrictRedis(server=server, decode_responses=True))
+        b = DistributedEventDeduplicator(redis_client=fakeredis.FakeStrictRedis(server=server, decode_responses=True))
+
+        assert a.check_duplicate("alert_1", {})[0] == DeduplicationAction.NEW_EXECUTION
+        assert b.check_duplicate("alert_1", {})[0] == DeduplicationAction.UPDATE_EXISTING
+
+    def test_batch_check_is_one_round_trip(self, deduplicator, redis_client):
+        deduplicator.check_duplicate("alert_0", {})
+        deduplicator.register_execution("alert_0", "run_0", {})
+        redis_client.round_trips = 0
+
+        results = deduplicator.check_duplicates_batch([
+            {"source_id": "alert_0"},
+            {"source_id": "alert_1", "severity": "critical"},
+            {"source_id": "alert_1", "severity": "critical"},
+            {"source_id": "alert_2"},
+        ])
+
+        assert redis_client.round_trips == 1
+        assert results == [
+            (DeduplicationAction.UPDATE_EXISTING, "run_0"),
+            (DeduplicationAction.NEW_EXECUTION, None),
+            (DeduplicationAction.UPDATE_EXISTING, None),
+            (DeduplicationAction.NEW_EXECUTION, None),
+        ]
+
+    def test_redis_errors_fall_back_to_new_execution(self, deduplicator, redis_client):
+        key = deduplicator.generate_deduplication_key("alert_1")
+        redis_client.set(key, "legacy-json-string")  # WRONGTYPE for hash ops
+
+        assert deduplicator.check_duplicate("alert_1", {}) == (DeduplicationAction.NEW_EXECUTION, None)
@@ -13,6 +13,7 @@ from src.deduplication.event_deduplicator import (
     DeduplicationAction,
     DeduplicationPolicy,
     DeduplicationEntry,
+    ThreadSafeEventDeduplicator,
 )
 from src.controllers.swarm_coordinator import (
     SwarmCoordinator,
@@ -206,6 +207,30 @@ class TestEventDeduplicator:
         # Cache deve ter no máximo 3 entradas
         assert len(deduplicator.cache) <= 3
     
+    def test_cache_eviction_is_lru(self, deduplicator):
+        """Testa que a evicção remove a entrada menos recentemente vista."""
+        deduplicator.max_cache_size = 2
+        key_0 = deduplicator.register_execution("alert_0", "exec_0", {})
+        key_1 = deduplicator.register_execution("alert_1", "exec_1", {})
+        
+        # alert_0 volta a disparar e passa a ser a mais recente
+        deduplicator.check_duplicate("alert_0", {})
+        key_2 = deduplicator.register_execution("alert_2", "exec_2", {})
+        
+        assert list(deduplicator.cache) == [key_0, key_2]
+        assert key_1 not in deduplicator.cache
+    
+    def test_cleanup_removes_only_expired_prefix(self, deduplicator):
+        """Testa que a limpeza remove as entradas expiradas do início."""
+        deduplicator.ttl_minutes = 1
+        keys = [deduplicator.register_execution(f"alert_{i}", f"exec_{i}", {}) for i in range(4)]
+        for key in keys[:2]:
+            deduplicator.cache[key].last_seen = datetime.now(timezone.utc) - timedelta(minutes=5)
+        
+        deduplicator.check_duplicate("alert_new", {})
+        
+        assert list(deduplicator.cache) == keys[2:]
+    
     def test_clear_cache(self, deduplicator):
         """Testa limpeza de cache."""
         # Registrar eventos
@@ -224,6 +249,27 @@ class TestEventDeduplicator:
         assert len(deduplicator.cache) == 0
 
 
+class TestThreadSafeEventDeduplicator:
+    """Testes para ThreadSafeEventDeduplicator."""
+    
+    def test_check_and_register_is_atomic(self):
+        """Apenas uma thread deve iniciar execução para o mesmo evento."""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        deduplicator = ThreadSafeEventDeduplicator(ttl_minutes=30, max_cache_size=100)
+        
+        def worker(i):
+            return deduplicator.check_and_register("alert_123", f"exec_{i}", {"severity": "high"})
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(worker, range(200)))
+        
+        new = [r for r in results if r[0] == DeduplicationAction.NEW_EXECUTION]
+        assert len(new) == 1
+        assert all(exec_id == new[0][1] for _, exec_id in results)
+        assert deduplicator.get_cache_stats()["total_events_seen"] == 200
+
+
 class TestSwarmCoordinator:
     """Testes para SwarmCoordinator."""
     
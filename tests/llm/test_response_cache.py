@@ -0,0 +1,237 @@
+"""
+Testes - LLM Response Cache
+
+Testa chaves normalizadas, TTL, evicção LRU, tier SQLite e os wrappers de
+provider.
+"""
+
+import asyncio
+
+import pytest
+
+from src.llm import response_cache
+from src.llm.provider_factory import BaseLLMProvider, CachedLLMProvider, LLMConfig, LLMProviderType
+from src.llm.response_cache import (
+    LLMResponseCache,
+    cached_model_stream,
+    cached_stream,
+    make_cache_key,
+    normalize_prompt,
+)
+
+
+class TestCacheKey:
+
+    def test_normalize_masks_volatile_fields(self):
+        a = "Alert HighCPU at 2025-01-01T10:00:00Z id=3f2b6c1e-8a4d-4e1f-9b2a-0c1d2e3f4a5b\n\n  service api"
+        b = "Alert HighCPU at 2025-02-03T11:22:33.123+00:00 id=0a1b2c3d-4e5f-4a6b-8c7d-9e0f1a2b3c4d service   api"
+
+        assert normalize_prompt(a) == normalize_prompt(b)
+        assert "<ts>" in normalize_prompt(a) and "<uuid>" in normalize_prompt(a)
+
+    def test_key_depends_on_provider_model_temperature(self):
+        base = make_cache_key("ollama", "llama3", 0.7, "prompt")
+
+        assert base == make_cache_key("ollama", "llama3", 0.7, "  prompt ")
+        assert base != make_cache_key("openai", "llama3", 0.7, "prompt")
+        assert base != make_cache_key("ollama", "llama3.1", 0.7, "prompt")
+        assert base != make_cache_key("ollama", "llama3", 0.2, "prompt")
+        assert base != make_cache_key("ollama", "llama3", 0.7, "prompt", max_tokens=10)
+
+
+class TestLLMResponseCache:
+
+    def test_hit_miss_and_saved_latency(self):
+        cache = LLMResponseCache(max_entries=4, db_path=None)
+
+        assert cache.get("k") is None
+        cache.put("k", "answer", latency_seconds=1.5)
+
+        assert cache.get("k") == "answer"
+        assert cache.stats["memory_hits"] == 1
+        assert cache.stats["misses"] == 1
+        assert cache.stats["saved_seconds"] == pytest.approx(1.5)
+
+    def test_ttl_expiry(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+        cache = LLMResponseCache(ttl_seconds=60, db_path=None)
+        cache.put("k", "answer")
+
+        now[0] += 59
+        assert cache.get("k") == "answer"
+        now[0] += 2
+        assert cache.get("k") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        cache = LLMResponseCache(max_entries=2, db_path=None)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+
+    def test_sqlite_tier_survives_restart(self, tmp_path):
+        db = str(tmp_path / "llm" / "cache.db")
+        first = LLMResponseCache(max_entries=1, db_path=db)
+        first.put("a", "1", latency_seconds=2.0)
+        first.put("b", "2")  # evicts "a" from memory, still on disk
+
+        assert first.get("a") == "1"
+        restarted = LLMResponseCache(max_entries=4, db_path=db)
+        assert restarted.get("b") == "2"
+        assert restarted.stats["disk_hits"] == 1
+        restarted.get("b")
+        assert restarted.stats["memory_hits"] == 1
+
+    def test_lookup_metrics_are_recorded_per_tier(self, tmp_path):
+        from src.metrics import LLM_CACHE_REQUESTS
+
+        def counts():
+            return {
+                (tier, result): LLM_CACHE_REQUESTS.labels(tier=tier, result=result)._value.get()
+                for tier in ("memory", "disk")
+                for result in ("hit", "miss")
+            }
+
+        db = str(tmp_path / "cache.db")
+        LLMResponseCache(max_entries=4, db_path=db).put("stored", "1")
+        cache = LLMResponseCache(max_entries=4, db_path=db)
+        before = counts()
+
+        cache.get("stored")  # memory miss, disk hit
+        cache.get("stored")  # memory hit
+        cache.get("absent")  # memory miss, disk miss
+
+        after = counts()
+        assert {k: after[k] - before[k] for k in after} == {
+            ("memory", "hit"): 1,
+            ("memory", "miss"): 2,
+            ("disk", "hit"): 1,
+            ("disk", "miss"): 1,
+        }
+        assert cache.stats["misses"] == 1
+
+    def test_get_or_generate_opt_out(self):
+        cache = LLMResponseCache(db_path=None)
+        calls = []
+
+        async def generate():
+            calls.append(1)
+            return "fresh"
+
+        async def run():
+            await cache.get_or_generate("k", generate)
+            await cache.get_or_generate("k", generate)
+            await cache.get_or_generate("k", generate, use_cache=False)
+
+        asyncio.run(run())
+        assert len(calls) == 2
+
+
+class StubProvider(BaseLLMProvider):
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.prompts = []
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        self.prompts.append(prompt)
+        return f"answer {len(self.prompts)}"
+
+    async def generate_with_context(self, prompt: str, context: str, **kwargs) -> str:
+        return await self.generate(f"{context}|{prompt}", **kwargs)
+
+    async def health_check(self) -> bool:
+        return True
+
+
+class TestCachedLLMProvider:
+
+    @pytest.fixture
+    def stub(self):
+        return StubProvider(LLMConfig(provider=LLMProviderType.OLLAMA, model="llama3"))
+
+    def test_repeated_prompt_served_from_cache(self, stub):
+        provider = CachedLLMProvider(stub, LLMResponseCache(db_path=None))
+
+        async def run():
+            first = await provider.generate("alert at 2025-01-01T00:00:00Z")
+            second = await provider.generate("alert at 2025-01-01T00:05:00Z")
+            third = await provider.generate("alert at 2025-01-01T00:05:00Z", temperature=0.1)
+            fourth = await provider.generate("alert at 2025-01-01T00:05:00Z", use_cache=False)
+            ctx = [await provider.generate_with_context("q", "ctx") for _ in range(2)]
+            return first, second, third, fourth, ctx
+
+        first, second, third, fourth, ctx = asyncio.run(run())
+        assert first == second == "answer 1"
+        assert third == "answer 2"
+        assert fourth == "answer 3"
+        assert ctx == ["answer 4", "answer 4"]
+
+
+def test_cached_stream_replays_full_text():
+    cache = LLMResponseCache(db_path=None)
+    produced = []
+
+    async def events():
+        produced.append(1)
+        for part in ("Hel", "lo"):
+            yield {"contentBlockDelta": {"contentBlockIndex": 0, "delta": {"text": part}}}
+
+    async def collect():
+        return [ev["contentBlockDelta"]["delta"]["text"] async for ev in cached_stream(cache, "k", events)]
+
+    assert asyncio.run(collect()) == ["Hel", "lo"]
+    assert asyncio.run(collect()) == ["Hello"]
+    assert len(produced) == 1
+
+
+def test_cached_model_stream_keys_by_provider_model_and_messages():
+    cache = LLMResponseCache(db_path=None)
+    produced = []
+
+    def events():
+        async def gen():
+            produced.append(1)
+            yield {"contentBlockDelta": {"contentBlockIndex": 0, "delta": {"text": f"answer {len(produced)}"}}}
+        return gen()
+
+    async def collect(provider="github_models", content="High CPU", use_cache=True):
+        messages = [{"role": "user", "content": [{"text": content}]}]
+        stream = cached_model_stream(cache, provider, "gpt", messages, "system", events, use_cache=use_cache)
+        return [ev["contentBlockDelta"]["delta"]["text"] async for ev in stream]
+
+    assert asyncio.run(collect()) == ["answer 1"]
+    assert asyncio.run(collect()) == ["answer 1"]
+    assert asyncio.run(collect(provider="ollama_models")) == ["answer 2"]
+    assert asyncio.run(collect(content="High memory")) == ["answer 3"]
+    assert asyncio.run(collect(use_cache=False)) == ["answer 4"]
+    assert len(produced) == 4
+
+
+def test_prometheus_analyzer_does_not_cache_fallback_answers(monkeypatch):
+    import prometheus_analyzer
+
+    cache = LLMResponseCache(db_path=None)
+    monkeypatch.setattr(prometheus_analyzer, "get_default_cache", lambda: cache)
+    monkeypatch.setenv("OLLAMA_MODEL", "primary")
+    analyzer = prometheus_analyzer.PrometheusAnalyzer("http://prometheus", "http://ollama")
+    # Primeira chamada respondida por um modelo de fallback, as seguintes pelo primário
+    models = iter(["fallback", "primary"])
+    answered_by = []
+
+    async def uncached(metrics_summary):
+        answered_by.append(next(models))
+        return {"status": "success", "analysis": "ok", "model": answered_by[-1]}
+
+    monkeypatch.setattr(analyzer, "_analyze_with_llm_uncached", uncached)
+    results = [asyncio.run(analyzer.analyze_with_llm({})) for _ in range(3)]
+
+    assert [r["model"] for r in results] == ["fallback", "primary", "primary"]
+    assert results[2].get("cached") is True
+    assert len(answered_by) == 2
@@ -0,0 +1,64 @@
+"""
+Benchmark: BM25 query latency over runbook-sized corpora.
+
+Indexes 5k synthetic runbook sections (service names, metric names, error
+codes and filler prose) and measures query latency for short incident-style
+queries, plus the cost of an incremental update and of a disk snapshot.
+"""
+
+import random
+import time
+
+import pytest
+
+from src.utils.bm25_index import BM25Index
+
+pytestmark = pytest.mark.performance
+
+SECTIONS = 5_000
+QUERIES = 500
+WORDS = (
+    "restart rollout pod node drain cordon scale replica failover promote rotate certificate "
+    "latency saturation memory cpu disk queue backlog consumer lag timeout retry backoff "
+    "gateway database cache connection pool exhausted throttled evicted crashloop oom"
+).split()
+
+
+def _section(rng, i):
+    service = f"svc-{rng.randrange(200)}"
+    metric = f"{rng.choice(['http', 'grpc', 'db'])}_{rng.choice(['requests', 'errors', 'latency'])}_total"
+    words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120)))
+    return f"Runbook: {service}.md | Section: step {i}\nOn E{rng.randrange(10_000):04d} check {metric}. {words}"
+
+
+def test_bm25_queries_run_in_milliseconds(tmp_path):
+    rng = random.Random(5)
+    index = BM25Index()
+    start = time.perf_counter()
+    for i in range(SECTIONS):
+        index.add(str(i), _section(rng, i), {"n": i})
+    build_seconds = time.perf_counter() - start
+
+    queries = [
+        f"svc-{rng.randrange(200)} E{rng.randrange(10_000):04d} {rng.choice(WORDS)} {rng.choice(WORDS)}"
+        for _ in range(QUERIES)
+    ]
+    start = time.perf_counter()
+    for query in queries:
+        index.search(query, top_k=12)
+    per_query_ms = (time.perf_counter() - start) / QUERIES * 1000
+
+    start = time.perf_counter()
+    index.add("17", _section(rng, 17))
+    update_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    index.save(tmp_path / "bm25.json")
+    loaded = BM25Index.load(tmp_path / "bm25.json")
+    snapshot_seconds = time.perf_counter() - start
+
+    print(
+        f"\n{SECTIONS:,} sections | build {build_seconds:.2f}s | query {per_query_ms:.2f} ms | "
+        f"update {update_ms:.3f} ms | save+load {snapshot_seconds:.2f}s"
+    )
+    assert len(loaded) == SECTIONS
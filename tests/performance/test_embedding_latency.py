@@ -0,0 +1,71 @@
+"""
+Micro-benchmark: p50/p99 embed latency with and without the local model cache.
+
+The fake model simulates the cost profile of SentenceTransformer: loading
+weights is expensive, a single forward pass is cheap. "Before" reproduces the
+old behaviour (a fresh model per embed), "after" uses the cached model. The
+vector cache is disabled so every call reaches the model.
+"""
+
+import statistics
+import time
+
+import pytest
+
+from src.tools import embedding_client
+
+pytestmark = pytest.mark.performance
+
+LOAD_SECONDS = 0.005
+ENCODE_SECONDS = 0.0002
+ITERATIONS = 200
+
+
+class SlowLoadingModel:
+    def __init__(self, model_name, device=None):
+        time.sleep(LOAD_SECONDS)
+
+    def encode(self, texts):
+        time.sleep(ENCODE_SECONDS)
+        return [0.1] * 384
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _measure(client, clear_each_call):
+    samples = []
+    for i in range(ITERATIONS):
+        if clear_each_call:
+            embedding_client.EmbeddingClient.clear_model_cache()
+        start = time.perf_counter()
+        client.embed(f"HighCPU | Service: api-{i % 10} | Severity: critical")
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(embedding_client, "SentenceTransformer", SlowLoadingModel)
+    monkeypatch.setattr(embedding_client.EmbeddingClient, "_instance", None)
+    embedding_client.EmbeddingClient.clear_model_cache()
+    yield embedding_client.EmbeddingClient(model_name="bench-model", provider="local", cache_size=0)
+    embedding_client.EmbeddingClient.clear_model_cache()
+
+
+def test_embed_latency_with_model_cache(client):
+    before = _measure(client, clear_each_call=True)
+
+    client.warmup()
+    after = _measure(client, clear_each_call=False)
+
+    before_p50, before_p99 = _percentile(before, 50), _percentile(before, 99)
+    after_p50, after_p99 = _percentile(after, 50), _percentile(after, 99)
+    print(
+        f"\nembed latency before: p50={before_p50 * 1000:.2f}ms p99={before_p99 * 1000:.2f}ms"
+        f"\nembed latency after:  p50={after_p50 * 1000:.2f}ms p99={after_p99 * 1000:.2f}ms"
+        f"\nmean speedup: {statistics.mean(before) / statistics.mean(after):.1f}x"
+    )
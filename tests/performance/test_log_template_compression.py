@@ -0,0 +1,76 @@
+"""
+Benchmark: evidence size of LogInspectorAgent with log template mining.
+
+Forty pods of one service each log the same handful of failures (a Java
+stack trace, a timeout and a rejected request) with different timestamps,
+ids and durations. Per-pod verbatim evidence grows with pods x blocks;
+template evidence holds one exemplar per distinct failure.
+"""
+
+import json
+import random
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.agents.analysis.log_inspector import LogInspectorAgent
+
+pytestmark = pytest.mark.performance
+
+PODS = 40
+BLOCKS_PER_POD = 50
+
+
+def _pod_log(rng, pod):
+    lines = []
+    for i in range(BLOCKS_PER_POD):
+        ts = f"2025-01-01T10:{i // 60:02d}:{i % 60:02d}.{rng.randrange(1000):03d}Z"
+        lines.append(f"{ts} INFO handled request {rng.randrange(10**6)}")
+        kind = i % 3
+        if kind == 0:
+            lines.append(f"{ts} ERROR Unhandled exception in order {rng.randrange(10**6)}")
+            lines.append("java.lang.IllegalStateException: inventory negative")
+            for depth in range(12):
+                lines.append(f"    at com.shop.Inventory.reserve${depth}(Inventory.java:{100 + rng.randrange(50)})")
+        elif kind == 1:
+            lines.append(f"{ts} ERROR Timeout calling payments after {rng.randrange(1000, 9000)}ms pod={pod}")
+        else:
+            lines.append(f"{ts} ERROR request {rng.randrange(10**6)} rejected by 10.0.{rng.randrange(255)}.{rng.randrange(255)}:8443")
+    return "\n".join(lines).encode("utf-8")
+
+
+def test_template_evidence_is_orders_of_magnitude_smaller():
+    rng = random.Random(11)
+    logs = {f"shop-{p}": _pod_log(rng, f"shop-{p}") for p in range(PODS)}
+
+    with patch("src.agents.analysis.log_inspector.config.load_incluster_config"), \
+         patch("src.agents.analysis.log_inspector.client.CoreV1Api") as api_cls:
+        api = api_cls.return_value
+        pods = []
+        for name in logs:
+            pod = MagicMock()
+            pod.metadata.name = name
+            pods.append(pod)
+        api.read_namespaced_service.return_value.spec.selector = {"app": "shop"}
+        api.list_namespaced_pod.return_value.items = pods
+        api.read_namespaced_pod_log.side_effect = lambda name, **kwargs: logs[name]
+
+        agent = LogInspectorAgent(max_error_blocks=PODS * BLOCKS_PER_POD)
+        start = time.perf_counter()
+        result = agent.get_pod_logs("shop")
+        elapsed = time.perf_counter() - start
+
+    verbatim = {name: agent._parse_logs(log.decode("utf-8")) for name, log in logs.items()}
+    verbatim_bytes = len(json.dumps(verbatim))
+    template_bytes = len(json.dumps(result["evidence"]))
+    blocks = sum(len(blocks) for blocks in verbatim.values())
+
+    print(
+        f"\n{PODS} pods x {BLOCKS_PER_POD} blocks | verbatim evidence {verbatim_bytes / 1024:.0f} KiB | "
+        f"{len(result['evidence'])} templates, {template_bytes / 1024:.1f} KiB "
+        f"({verbatim_bytes / template_bytes:.0f}x smaller) | {blocks / elapsed:,.0f} blocks/s"
+    )
+    assert sum(ev["count"] for ev in result["evidence"]) == blocks
+    assert len(result["evidence"]) <= 5
+    assert verbatim_bytes > 100 * template_bytes
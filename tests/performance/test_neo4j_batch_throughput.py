@@ -0,0 +1,75 @@
+"""
+Benchmark: rows/sec of save_agent_executions_batch vs. the per-row path.
+
+The fake driver charges a fixed round-trip latency per statement plus a small
+per-row server cost, which is the cost profile that matters for Bolt writes:
+the per-row path pays one session and one round trip per execution, the
+UNWIND path pays one round trip per chunk inside a single transaction.
+"""
+
+import time
+
+import pytest
+
+from src.graph.neo4j_repo import Neo4jRepository
+
+pytestmark = pytest.mark.performance
+
+ROUND_TRIP_SECONDS = 0.001
+PER_ROW_SECONDS = 0.00001
+ROWS = 500
+
+
+class _Result(list):
+    def single(self):
+        return self[0] if self else None
+
+
+class LatencyTx:
+    def run(self, query, parameters=None, **params):
+        params = {**(parameters or {}), **params}
+        rows = params.get("rows") or [params]
+        time.sleep(ROUND_TRIP_SECONDS + PER_ROW_SECONDS * len(rows))
+        return _Result({"execution_id": row["execution_id"]} for row in rows)
+
+
+class LatencySession(LatencyTx):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_write(self, work):
+        return work(LatencyTx())
+
+
+class LatencyDriver:
+    def session(self):
+        return LatencySession()
+
+
+def _per_row(repo, executions):
+    return [repo.save_agent_execution("decision-1", e) for e in executions]
+
+
+def _rows_per_second(fn, repo, executions):
+    start = time.perf_counter()
+    written = fn(repo, executions)
+    elapsed = time.perf_counter() - start
+    assert len(written) == len(executions)
+    return len(executions) / elapsed
+
+
+def test_unwind_batch_throughput():
+    repo = Neo4jRepository()
+    repo._driver = LatencyDriver()
+    executions = [{"agent_id": f"agent-{i % 5}"} for i in range(ROWS)]
+
+    per_row = _rows_per_second(_per_row, repo, executions)
+    batched = _rows_per_second(
+        lambda r, e: r.save_agent_executions_batch("decision-1", e, chunk_size=100), repo, executions
+    )
+
+    print(f"\nper-row: {per_row:,.0f} rows/s | UNWIND batch: {batched:,.0f} rows/s "
+          f"({batched / per_row:.1f}x)")
@@ -10,6 +10,8 @@ from src.cache_middleware import CacheMiddleware
 from src.async_task_manager import AsyncTaskManager
 from fastapi import FastAPI, Request, Response
 
+pytestmark = pytest.mark.performance
+
 # Mock FastAPI app for middleware testing
 app = FastAPI()
 
@@ -0,0 +1,86 @@
+"""
+Benchmark: memory and throughput of the columnar TimeSeries on 10k series.
+
+Parses 10k Prometheus range results (31 samples each, a 15 minute window at
+30s step) and runs TrendAnalyzer over every series. The baseline is the old
+representation: one pydantic DataPoint per sample, built once while parsing
+and again while marking outliers. The columnar path keeps three NumPy arrays
+per series and only materializes DataPoints on demand.
+"""
+
+import gc
+import logging
+import random
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import pytest
+
+from src.models.metric_trend import DataPoint
+from src.rules.trend_rules import TrendAnalyzer
+from src.tools.prometheus_queries import PrometheusClient
+
+pytestmark = pytest.mark.performance
+
+SERIES = 10_000
+SAMPLES = 31
+T0 = 1_700_000_000
+
+
+def _raw_results():
+    rng = random.Random(7)
+    results = []
+    for _ in range(SERIES):
+        base = rng.uniform(10, 100)
+        slope = rng.uniform(-1, 1)
+        values = [[T0 + 30 * i, str(base + slope * i + rng.gauss(0, 1))] for i in range(SAMPLES)]
+        results.append({"data": {"result": [{"metric": {}, "values": values}]}})
+    return results
+
+
+def _parse_legacy(raw):
+    points = [
+        DataPoint(timestamp=datetime.fromtimestamp(float(ts), tz=timezone.utc), value=float(val))
+        for item in raw["data"]["result"]
+        for ts, val in item["values"]
+    ]
+    points.sort(key=lambda dp: dp.timestamp)
+    return points
+
+
+def _measure(parse, raws):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    parsed = [parse(raw) for raw in raws]
+    parse_seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return parsed, parse_seconds, peak
+
+
+def test_timeseries_memory_and_throughput():
+    logging.getLogger("src.rules.trend_rules").setLevel(logging.ERROR)
+    logging.getLogger("src.utils.statistics").setLevel(logging.ERROR)
+    raws = _raw_results()
+    client = PrometheusClient(base_url="http://prometheus:9090")
+    analyzer = TrendAnalyzer()
+
+    legacy, legacy_parse, legacy_peak = _measure(_parse_legacy, raws)
+    columnar, columnar_parse, columnar_peak = _measure(client._parse_range_result, raws)
+
+    start = time.perf_counter()
+    for i, series in enumerate(columnar):
+        analyzer.analyze(f"m{i}", series)
+    analyze_seconds = time.perf_counter() - start
+
+    print(
+        f"\n{SERIES:,} series x {SAMPLES} samples | "
+        f"list[DataPoint]: {legacy_peak / 2**20:.1f} MiB, parse {legacy_parse:.2f}s | "
+        f"TimeSeries: {columnar_peak / 2**20:.1f} MiB, parse {columnar_parse:.2f}s | "
+        f"analyze {SERIES / analyze_seconds:,.0f} series/s"
+    )
+    assert [dp.value for dp in columnar[0]] == [dp.value for dp in legacy[0]]
+    # Allocation sizes, not timings: independent of machine speed
+    assert columnar_peak * 2 < legacy_peak
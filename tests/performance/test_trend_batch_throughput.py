@@ -0,0 +1,55 @@
+"""
+Benchmark: TrendAnalyzer.analyze_many vs. per-series analyze on 10k series.
+
+The scalar path runs percentile, regression and CV once per series; the
+batched path runs each of them once per block of equal-length series. Both
+must produce identical classifications.
+"""
+
+import logging
+import time
+
+import numpy as np
+import pytest
+
+from src.models.metric_trend import TimeSeries
+from src.rules.trend_rules import TrendAnalyzer
+
+pytestmark = pytest.mark.performance
+
+SERIES = 10_000
+SAMPLES = 31
+
+
+def _fleet():
+    rng = np.random.default_rng(11)
+    timestamps = np.arange(SAMPLES) * 30.0
+    base = rng.uniform(10, 100, (SERIES, 1))
+    slope = rng.uniform(-1, 1, (SERIES, 1))
+    values = base + slope * np.arange(SAMPLES) + rng.normal(0, 1, (SERIES, SAMPLES))
+    values[rng.random(values.shape) < 0.002] = np.nan
+    return {f"svc{i}_cpu": TimeSeries(timestamps, values[i]) for i in range(SERIES)}
+
+
+def test_analyze_many_speedup():
+    logging.getLogger("src.rules.trend_rules").setLevel(logging.ERROR)
+    logging.getLogger("src.utils.statistics").setLevel(logging.ERROR)
+    metrics = _fleet()
+    analyzer = TrendAnalyzer()
+
+    start = time.perf_counter()
+    scalar = analyzer.analyze_multiple(metrics)
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = analyzer.analyze_many(metrics)
+    batched_seconds = time.perf_counter() - start
+
+    print(
+        f"\n{SERIES:,} series: analyze_multiple {SERIES / scalar_seconds:,.0f} series/s | "
+        f"analyze_many {SERIES / batched_seconds:,.0f} series/s | "
+        f"speedup {scalar_seconds / batched_seconds:.1f}x"
+    )
+    for name, trend in scalar.items():
+        assert batched[name].trend_state == trend.trend_state
+        assert batched[name].confidence == trend.confidence
@@ -63,5 +63,211 @@ async def test_monitor_scheduling():
     
     print("✅ Escalation triggered after max rechecks.")
 
+
+
+@pytest.mark.asyncio
+async def test_monitor_streaming_escalates_without_rerun():
+    import numpy as np
+    from src.models.metric_trend import TimeSeries
+    from src.rules.online_trend import StreamingTrendDetector
+
+    detector = StreamingTrendDetector(window_size=20)
+    coordinator = SwarmRunCoordinator(
+        execution_controller=MagicMock(),
+        retry_controller=MagicMock(),
+        decision_controller=MagicMock(),
+        confidence_service=MagicMock(),
+        trend_detector=detector,
+    )
+    domain = Domain(id="test", name="Test", description="Test", risk_level=RiskLevel.MEDIUM)
+    plan = SwarmPlan(objective="Test", steps=[])
+    alert = Alert(alert_id="alert_456", data={"alertname": "HighLatency", "expr": "latency_p99"})
+    decision = Decision(
+        summary="Monitoring incident",
+        action_proposed="MONITOR",
+        confidence=0.8,
+        supporting_evidence=[],
+        monitor_policy=MonitorPolicy(recheck_after_minutes=1, max_rechecks=2),
+    )
+    coordinator._trigger_escalation = AsyncMock()
+
+    await coordinator._handle_monitor_decision(domain, plan, alert, "run_2", decision)
+
+    # Streaming watch plus the poll job, no swarm re-run scheduled
+    assert "latency_p99" in detector
+    assert [job.id for job in coordinator.scheduler.get_jobs()] == ["streaming_trend_poll"]
+
+    # Too few points: UNKNOWN, neither escalated nor closed
+    detector.observe("latency_p99", TimeSeries(np.arange(3) * 30.0, [100.0, 101.0, 100.0]))
+    await detector.dispatch()
+    coordinator._trigger_escalation.assert_not_called()
+    assert coordinator.monitor_states["run_2"].is_active
+
+    detector.observe("latency_p99", TimeSeries((np.arange(20) + 3) * 30.0, [100.0 + 8 * i for i in range(20)]))
+    await detector.dispatch()
+    coordinator._trigger_escalation.assert_awaited_once_with("run_2", EscalationAction.HUMAN_INTERVENTION)
+    assert "latency_p99" not in detector
+    assert not coordinator.monitor_states["run_2"].is_active
+    assert coordinator.scheduler.get_jobs()[0].id == "streaming_trend_poll"
+
+
+@pytest.mark.asyncio
+async def test_monitor_streaming_auto_closes_stable_series():
+    import numpy as np
+    from src.models.metric_trend import TimeSeries
+    from src.rules.online_trend import StreamingTrendDetector
+
+    detector = StreamingTrendDetector(window_size=20)
+    coordinator = SwarmRunCoordinator(
+        execution_controller=MagicMock(),
+        retry_controller=MagicMock(),
+        decision_controller=MagicMock(),
+        confidence_service=MagicMock(),
+        trend_detector=detector,
+    )
+    domain = Domain(id="test", name="Test", description="Test", risk_level=RiskLevel.MEDIUM)
+    plan = SwarmPlan(objective="Test", steps=[])
+    alert = Alert(alert_id="alert_789", data={"alertname": "HighCPU"})
+    decision = Decision(
+        summary="Monitoring incident",
+        action_proposed="MONITOR",
+        confidence=0.8,
+        supporting_evidence=[],
+        monitor_policy=MonitorPolicy(metadata={"promql": "cpu_usage"}),
+    )
+    coordinator._execution_history["run_3"] = {"status": "FINISHED"}
+
+    await coordinator._handle_monitor_decision(domain, plan, alert, "run_3", decision)
+    detector.observe("cpu_usage", TimeSeries(np.arange(20) * 30.0, [0.5 + 0.01 * (i % 2) for i in range(20)]))
+    await detector.dispatch()
+
+    assert coordinator._execution_history["run_3"]["status"] == "AUTO_CLOSED"
+    assert "cpu_usage" not in detector
+    assert coordinator.monitor_states["run_3"].recheck_count == 0
+
+
+def _streaming_coordinator(detector):
+    return SwarmRunCoordinator(
+        execution_controller=MagicMock(),
+        retry_controller=MagicMock(),
+        decision_controller=MagicMock(),
+        confidence_service=MagicMock(),
+        trend_detector=detector,
+    )
+
+
+def _monitor_decision(**policy):
+    return Decision(
+        summary="Monitoring incident",
+        action_proposed="MONITOR",
+        confidence=0.8,
+        supporting_evidence=[],
+        monitor_policy=MonitorPolicy(**policy),
+    )
+
+
+@pytest.mark.asyncio
+async def test_monitor_streaming_escalates_when_confidence_rises_without_state_change():
+    import numpy as np
+    from src.models.metric_trend import TimeSeries, TrendState
+    from src.rules.online_trend import StreamingTrendDetector
+
+    detector = StreamingTrendDetector(window_size=20)
+    coordinator = _streaming_coordinator(detector)
+    coordinator._trigger_escalation = AsyncMock()
+    domain = Domain(id="test", name="Test", description="Test", risk_level=RiskLevel.MEDIUM)
+    plan = SwarmPlan(objective="Test", steps=[])
+    alert = Alert(alert_id="alert_900", data={"alertname": "Latency", "expr": "latency"})
+
+    # Steep relative growth: DEGRADING, with the high-variance penalty keeping
+    # confidence below the 0.9 escalation tier
+    detector.watch("latency")
+    detector.observe("latency", TimeSeries(np.arange(20) * 30.0, [1.0 + 0.5 * i for i in range(20)]))
+    assert detector.trend("latency").trend_state == TrendState.DEGRADING
+    assert detector.trend("latency").confidence < 0.9
+
+    await coordinator._handle_monitor_decision(domain, plan, alert, "run_9", _monitor_decision(max_rechecks=5))
+    await detector.dispatch()
+    coordinator._trigger_escalation.assert_not_called()
+
+    # Same growth continues: the state never changes but confidence rises
+    state = coordinator.monitor_states["run_9"]
+    for i in range(20, 60):
+        assert detector.trend("latency").trend_state == TrendState.DEGRADING
+        detector.observe("latency", TimeSeries([i * 30.0], [1.0 + 0.5 * i]))
+        await detector.dispatch()
+        if not state.is_active:
+            break
+    assert i > 20
+
+    coordinator._trigger_escalation.assert_awaited_once_with("run_9", EscalationAction.HUMAN_INTERVENTION)
+    assert state.recheck_count == 0
+
+
+@pytest.mark.asyncio
+async def test_monitor_streaming_escalates_after_policy_rechecks():
+    import numpy as np
+    from src.models.metric_trend import TimeSeries
+    from src.rules.online_trend import StreamingTrendDetector
+
+    detector = StreamingTrendDetector(window_size=20)
+    coordinator = _streaming_coordinator(detector)
+    coordinator._trigger_escalation = AsyncMock()
+    domain = Domain(id="test", name="Test", description="Test", risk_level=RiskLevel.MEDIUM)
+    plan = SwarmPlan(objective="Test", steps=[])
+    alert = Alert(alert_id="alert_901", data={"alertname": "Queue", "expr": "queue_depth"})
+
+    await coordinator._handle_monitor_decision(
+        domain, plan, alert, "run_10", _monitor_decision(recheck_after_minutes=5, max_rechecks=2)
+    )
+    state = coordinator.monitor_states["run_10"]
+    # Never enough data for the rules to decide
+    detector.observe("queue_depth", TimeSeries(np.arange(3) * 30.0, [10.0, 11.0, 10.0]))
+
+    for expected in (1, 2):
+        state.last_recheck_timestamp -= 5 * 60
+        await detector.dispatch()
+        assert state.recheck_count == expected
+
+    coordinator._trigger_escalation.assert_awaited_once_with("run_10", EscalationAction.HUMAN_INTERVENTION)
+    assert not state.is_active
+    assert "queue_depth" not in detector
+
+
+@pytest.mark.asyncio
+async def test_monitor_streaming_runs_on_same_expr_are_independent():
+    import numpy as np
+    from src.models.metric_trend import TimeSeries
+    from src.rules.online_trend import StreamingTrendDetector
+
+    detector = StreamingTrendDetector(window_size=20)
+    coordinator = _streaming_coordinator(detector)
+    coordinator._trigger_escalation = AsyncMock()
+    domain = Domain(id="test", name="Test", description="Test", risk_level=RiskLevel.MEDIUM)
+    plan = SwarmPlan(objective="Test", steps=[])
+    alert = Alert(alert_id="alert_902", data={"alertname": "Errors", "expr": "error_rate"})
+
+    await coordinator._handle_monitor_decision(
+        domain, plan, alert, "run_a", _monitor_decision(recheck_after_minutes=5, max_rechecks=1)
+    )
+    await coordinator._handle_monitor_decision(
+        domain, plan, alert, "run_b", _monitor_decision(recheck_after_minutes=5, max_rechecks=3)
+    )
+    detector.observe("error_rate", TimeSeries(np.arange(3) * 30.0, [10.0, 10.1, 10.0]))
+
+    # run_a hits its deadline and escalates; run_b keeps watching
+    coordinator.monitor_states["run_a"].last_recheck_timestamp -= 5 * 60
+    await detector.dispatch()
+    coordinator._trigger_escalation.assert_awaited_once_with("run_a", EscalationAction.HUMAN_INTERVENTION)
+    assert "error_rate" in detector
+    assert coordinator.monitor_states["run_b"].is_active
+
+    detector.observe("error_rate", TimeSeries((np.arange(20) + 3) * 30.0, [10.0 + 0.5 * i for i in range(20)]))
+    await detector.dispatch()
+    assert coordinator._trigger_escalation.await_count == 2
+    coordinator._trigger_escalation.assert_awaited_with("run_b", EscalationAction.HUMAN_INTERVENTION)
+    assert "error_rate" not in detector
+
+
 if __name__ == "__main__":
     asyncio.run(test_monitor_scheduling())
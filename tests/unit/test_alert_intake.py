@@ -0,0 +1,204 @@
+"""
+Unit tests for AlertIntakeQueue (concurrent, queue-backed webhook intake).
+"""
+
+import asyncio
+
+import pytest
+
+from swarm_intelligence.coordinators.alert_intake import AlertIntakeQueue, IntakeRejected
+
+
+def _payload(*names):
+    return {
+        "status": "firing",
+        "alerts": [{"labels": {"alertname": name, "service": "api"}} for name in names],
+    }
+
+
+@pytest.mark.asyncio
+async def test_every_alert_in_batch_is_processed():
+    seen = []
+
+    async def handler(payload, alert, alert_id):
+        seen.append((alert["labels"]["alertname"], alert_id))
+        return f"run-{alert_id}"
+
+    intake = AlertIntakeQueue(handler, max_workers=2, max_queue_size=10)
+    await intake.start()
+    alert_ids = await intake.submit(_payload("A", "B", "C"))
+    await intake.stop(drain=True)
+
+    assert len(alert_ids) == 3
+    assert len(set(alert_ids)) == 3
+    assert sorted(name for name, _ in seen) == ["A", "B", "C"]
+    stats = intake.get_stats()
+    assert stats["accepted"] == 3
+    assert stats["succeeded"] == 3
+    assert stats["last_execution"] is not None
+
+
+@pytest.mark.asyncio
+async def test_workers_run_concurrently():
+    running = 0
+    peak = 0
+
+    async def handler(payload, alert, alert_id):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return alert_id
+
+    intake = AlertIntakeQueue(handler, max_workers=4, max_queue_size=16)
+    await intake.start()
+    await intake.submit(_payload(*[f"alert-{i}" for i in range(8)]))
+    await intake.stop(drain=True)
+
+    assert peak == 4
+
+
+@pytest.mark.asyncio
+async def test_handler_failure_does_not_stop_worker():
+    async def handler(payload, alert, alert_id):
+        if alert["labels"]["alertname"] == "boom":
+            raise RuntimeError("swarm failed")
+        return alert_id
+
+    intake = AlertIntakeQueue(handler, max_workers=1, max_queue_size=4)
+    await intake.start()
+    await intake.submit(_payload("boom", "ok"))
+    await intake.stop(drain=True)
+
+    stats = intake.get_stats()
+    assert stats["failed"] == 1
+    assert stats["succeeded"] == 1
+
+
+@pytest.mark.asyncio
+async def test_backpressure_waits_for_free_slot():
+    release = asyncio.Event()
+
+    async def handler(payload, alert, alert_id):
+        await release.wait()
+        return alert_id
+
+    intake = AlertIntakeQueue(
+        handler, max_workers=1, max_queue_size=2, enqueue_timeout_seconds=1.0, high_watermark=0.5
+    )
+    await intake.start()
+    await intake.submit(_payload("first"))
+    await asyncio.sleep(0)  # let the worker pick it up
+
+    # Queue has room, but depth is at the watermark: the call blocks until space frees.
+    await intake.submit(_payload("second"))
+    submit = asyncio.create_task(intake.submit(_payload("third")))
+    await asyncio.sleep(0.05)
+    assert not submit.done()
+
+    release.set()
+    await asyncio.wait_for(submit, timeout=1.0)
+    await intake.stop(drain=True)
+    assert intake.get_stats()["succeeded"] == 3
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_stays_full():
+    release = asyncio.Event()
+
+    async def handler(payload, alert, alert_id):
+        await release.wait()
+        return alert_id
+
+    intake = AlertIntakeQueue(handler, max_workers=1, max_queue_size=1, enqueue_timeout_seconds=0.05)
+    await intake.start()
+    await intake.submit(_payload("running"))
+    await asyncio.sleep(0)
+    await intake.submit(_payload("queued"))
+
+    with pytest.raises(IntakeRejected) as exc_info:
+        await intake.submit(_payload("overflow"))
+    assert exc_info.value.retry_after_seconds >= 1
+    assert intake.get_stats()["rejected"] == 1
+
+    release.set()
+    await intake.stop(drain=True)
+
+
+@pytest.mark.asyncio
+async def test_rejected_payload_enqueues_none_of_its_alerts():
+    release = asyncio.Event()
+    seen = []
+
+    async def handler(payload, alert, alert_id):
+        await release.wait()
+        seen.append(alert["labels"]["alertname"])
+        return alert_id
+
+    intake = AlertIntakeQueue(handler, max_workers=1, max_queue_size=3, enqueue_timeout_seconds=0.05)
+    await intake.start()
+    await intake.submit(_payload("running"))
+    await asyncio.sleep(0)
+    await intake.submit(_payload("queued"))
+
+    # Room for one more alert, not for the whole group
+    with pytest.raises(IntakeRejected):
+        await intake.submit(_payload("a", "b", "c"))
+    assert intake.depth == 1
+    assert intake.get_stats()["rejected"] == 3
+
+    release.set()
+    await intake.stop(drain=True)
+    assert seen == ["running", "queued"]
+
+
+@pytest.mark.asyncio
+async def test_payload_larger_than_queue_is_admitted_whole():
+    async def handler(payload, alert, alert_id):
+        await asyncio.sleep(0)
+        return alert_id
+
+    intake = AlertIntakeQueue(handler, max_workers=2, max_queue_size=2)
+    await intake.start()
+    alert_ids = await intake.submit(_payload(*[f"alert-{i}" for i in range(5)]))
+    await intake.stop(drain=True)
+
+    assert len(alert_ids) == 5
+    assert intake.get_stats()["succeeded"] == 5
+
+
+@pytest.mark.asyncio
+async def test_cancelled_run_is_not_counted_as_success():
+    from src.metrics import INTAKE_ALERTS_TOTAL
+
+    started = asyncio.Event()
+
+    async def handler(payload, alert, alert_id):
+        started.set()
+        await asyncio.sleep(10)
+        return alert_id
+
+    def count(outcome):
+        return INTAKE_ALERTS_TOTAL.labels(outcome=outcome)._value.get()
+
+    succeeded, cancelled = count("succeeded"), count("cancelled")
+    intake = AlertIntakeQueue(handler, max_workers=1, max_queue_size=2)
+    await intake.start()
+    await intake.submit(_payload("slow"))
+    await started.wait()
+    await intake.stop(drain=False)
+
+    assert count("succeeded") == succeeded
+    assert count("cancelled") == cancelled + 1
+    assert intake.get_stats()["succeeded"] == 0
+
+
+@pytest.mark.asyncio
+async def test_submit_requires_start():
+    async def handler(payload, alert, alert_id):
+        return alert_id
+
+    intake = AlertIntakeQueue(handler)
+    with pytest.raises(RuntimeError):
+        await intake.submit(_payload("A"))
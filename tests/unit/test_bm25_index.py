@@ -0,0 +1,82 @@
+"""
+Unit tests for the BM25 index, reciprocal-rank fusion and hybrid decision search.
+"""
+
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from src.agents.graph_agent import GraphAgent
+from src.utils.bm25_index import BM25Index, reciprocal_rank_fusion, tokenize_terms
+
+
+def test_tokenize_keeps_identifiers_and_their_parts():
+    terms = tokenize_terms("Pod checkout-7d9f8 hit E4031 on http_requests_total.")
+    assert "checkout-7d9f8" in terms and "checkout" in terms
+    assert "e4031" in terms
+    assert "http_requests_total" in terms and "requests" in terms
+
+
+def test_exact_token_ranks_first_and_updates_are_incremental():
+    index = BM25Index()
+    index.add("a", "database connection pool exhausted on orders")
+    index.add("b", "error E4031 from payment gateway, retry with backoff")
+    index.add("c", "payment gateway latency high")
+
+    assert index.search("E4031 payment", top_k=2)[0][0] == "b"
+
+    index.add("b", "payment gateway certificate expired")
+    assert index.search("E4031", top_k=3) == []
+    assert index.remove("a") and not index.remove("a")
+    assert len(index) == 2
+
+
+def test_snapshot_round_trip(tmp_path):
+    index = BM25Index()
+    index.add("a", "restart kafka broker", {"file_name": "kafka.md"})
+    index.add("b", "rotate TLS certificate", {"file_name": "tls.md"})
+    index.save(tmp_path / "bm25.json")
+
+    loaded = BM25Index.load(tmp_path / "bm25.json")
+    assert loaded.search("kafka", 1) == index.search("kafka", 1)
+    assert loaded.search("kafka", 1)[0][2] == {"file_name": "kafka.md"}
+    assert len(BM25Index.load(tmp_path / "missing.json")) == 0
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion(["a", "b", "c"], ["c", "d"])
+    assert [item_id for item_id, _ in fused][:2] == ["c", "a"]
+    assert fused[0][1] == pytest.approx(1 / 63 + 1 / 61)
+
+
+def test_graph_agent_hybrid_search_promotes_exact_token_match():
+    agent = GraphAgent()
+    rng = np.random.default_rng(0)
+    query = rng.standard_normal(GraphAgent.VECTOR_SIZE)
+
+    def near(distance):
+        v = query + distance * rng.standard_normal(GraphAgent.VECTOR_SIZE)
+        return v.tolist()
+
+    ids = {}
+    for name, distance, summary in [
+        ("close1", 0.1, "Service: api | Symptoms: slow responses"),
+        ("close2", 0.2, "Service: api | Symptoms: timeouts"),
+        ("close3", 0.3, "Service: api | Symptoms: high latency"),
+        ("exact", 0.6, "Service: api | Symptoms: error E4031 from payment gateway"),
+    ]:
+        ids[name] = str(uuid4())
+        agent._memory_store.add(ids[name], near(distance), {"summary": summary})
+        agent._lexical_index.add(ids[name], summary, {"summary": summary})
+
+    dense_only = agent._search_similar(query.tolist(), top_k=2, min_similarity=0.5)
+    hybrid = agent._search_similar(query.tolist(), top_k=2, min_similarity=0.5, query_text="payment E4031")
+
+    assert [str(e.decision_id) for e in dense_only] == [ids["close1"], ids["close2"]]
+    assert ids["exact"] in [str(e.decision_id) for e in hybrid]
+    assert all(e.similarity_score >= 0.5 for e in hybrid)
+
+    # The cosine threshold still applies to lexical matches
+    strict = agent._search_similar(query.tolist(), top_k=2, min_similarity=0.95, query_text="payment E4031")
+    assert ids["exact"] not in [str(e.decision_id) for e in strict]
@@ -18,6 +18,7 @@ from src.utils.alert_normalizer import AlertNormalizer, AlertValidationError
 from src.rules.correlation_rules import (
     CorrelationEngine,
     CorrelationConfig,
+    StreamingCorrelator,
     correlate_alerts,
 )
 
@@ -259,6 +260,105 @@ class TestCorrelationEngine:
             assert 0.5 <= cluster.correlation_score <= 1.0
 
 
+    def test_service_grouping_keeps_alerts_after_gap(self, base_timestamp):
+        """Test that an alert beyond the window starts a new service group instead of being dropped."""
+        alerts = [
+            _normalized(base_timestamp, "fp-001", "svc"),
+            _normalized(base_timestamp + timedelta(minutes=2), "fp-002", "svc"),
+            _normalized(base_timestamp + timedelta(minutes=30), "fp-003", "svc"),
+        ]
+        config = CorrelationConfig(time_window_minutes=5, group_by_fingerprint=False)
+        clusters = CorrelationEngine(config).correlate(alerts)
+        
+        assert [c.alert_count for c in clusters] == [2, 1]
+
+
+def _normalized(timestamp, fingerprint, service, severity="warning"):
+    return NormalizedAlert(
+        timestamp=timestamp,
+        fingerprint=fingerprint,
+        service=service,
+        severity=severity,
+        description=f"{service} alert",
+        validation_status=ValidationStatus.VALID,
+    )
+
+
+class TestStreamingCorrelator:
+    """Tests for the incremental StreamingCorrelator."""
+    
+    def test_emits_updates_and_closes_after_window(self, base_timestamp):
+        """Test clusters grow in place and close once event time passes the window."""
+        correlator = StreamingCorrelator(CorrelationConfig(time_window_minutes=5))
+        
+        first = correlator.add(_normalized(base_timestamp, "fp-001", "api"))
+        second = correlator.add(
+            _normalized(base_timestamp + timedelta(minutes=2), "fp-001", "api", "critical")
+        )
+        
+        assert [u.closed for u in first + second] == [False, False]
+        cluster = second[0].cluster
+        assert cluster is first[0].cluster
+        assert cluster.alert_count == 2
+        assert cluster.primary_severity == "critical"
+        assert cluster.correlation_score == 1.0
+        
+        later = correlator.add(_normalized(base_timestamp + timedelta(minutes=10), "fp-002", "db"))
+        assert later[0].closed and later[0].cluster is cluster
+        assert len(correlator) == 1
+        assert [u.cluster.primary_service for u in correlator.flush()] == ["db"]
+        assert len(correlator) == 0
+    
+    def test_matches_batch_service_grouping(self, base_timestamp):
+        """Test that streaming service clusters equal the batch result."""
+        alerts = [
+            _normalized(base_timestamp + timedelta(minutes=m), f"fp-{i}", svc, sev)
+            for i, (m, svc, sev) in enumerate([
+                (0, "api", "warning"), (1, "db", "critical"), (3, "api", "critical"),
+                (20, "api", "warning"), (21, "db", "warning"), (40, "api", "info"),
+            ])
+        ]
+        config = CorrelationConfig(time_window_minutes=5, group_by_fingerprint=False)
+        
+        correlator = StreamingCorrelator(config)
+        closed = [u.cluster for a in alerts for u in correlator.add(a) if u.closed]
+        closed += [u.cluster for u in correlator.flush()]
+        batch = CorrelationEngine(config).correlate(alerts)
+        
+        def summary(clusters):
+            return sorted(
+                ([a.fingerprint for a in c.alerts], c.correlation_score, c.primary_severity)
+                for c in clusters
+            )
+        
+        assert summary(closed) == summary(batch)
+    
+    def test_max_cluster_size_bounds_open_cluster(self, base_timestamp):
+        """Test a flapping fingerprint is split once it reaches max_cluster_size."""
+        correlator = StreamingCorrelator(max_cluster_size=3)
+        updates = [
+            u
+            for i in range(7)
+            for u in correlator.add(_normalized(base_timestamp + timedelta(seconds=i), "fp-flap", "api"))
+        ]
+        
+        assert [u.cluster.alert_count for u in updates if u.closed] == [3, 3]
+        assert correlator.open_clusters[0].alert_count == 1
+    
+    def test_reopened_cluster_ignores_deadlines_of_closed_one(self, base_timestamp):
+        """Test heap entries of a size-closed cluster do not close its successor early."""
+        correlator = StreamingCorrelator(CorrelationConfig(time_window_minutes=5), max_cluster_size=3)
+        for seconds in (0, 1, 2):
+            correlator.add(_normalized(base_timestamp + timedelta(seconds=seconds), "fp-flap", "api"))
+        correlator.add(_normalized(base_timestamp + timedelta(minutes=4), "fp-flap", "api"))
+        
+        # The new cluster's deadline is 4 + 5 = 9 minutes
+        assert correlator.advance(base_timestamp + timedelta(minutes=5, seconds=30)) == []
+        assert correlator.open_clusters[0].alert_count == 1
+        closed = correlator.advance(base_timestamp + timedelta(minutes=9, seconds=1))
+        assert [u.cluster.alert_count for u in closed] == [1]
+
+
 class TestAlertCluster:
     """Tests for AlertCluster model."""
     
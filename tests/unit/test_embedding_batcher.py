@@ -0,0 +1,108 @@
+"""
+Unit tests for EmbeddingBatcher (async micro-batching of embed calls).
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.tools.embedding_batcher import EmbeddingBatcher
+
+
+class RecordingEncoder:
+    """Batch encoder that records every forward pass and the thread it ran on."""
+
+    def __init__(self, delay: float = 0.0):
+        self.batches = []
+        self.threads = []
+        self.delay = delay
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        self.threads.append(threading.get_ident())
+        if self.delay:
+            time.sleep(self.delay)
+        return [[float(len(t)), float(i)] for i, t in enumerate(texts)]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_forward_pass():
+    encoder = RecordingEncoder()
+    batcher = EmbeddingBatcher(encoder, max_batch_size=64, max_wait_ms=20)
+
+    texts = [f"alert {i}" for i in range(10)]
+    vectors = await asyncio.gather(*(batcher.embed(t) for t in texts))
+
+    assert len(encoder.batches) == 1
+    assert encoder.batches[0] == texts
+    assert [v[0] for v in vectors] == [float(len(t)) for t in texts]
+
+
+@pytest.mark.asyncio
+async def test_flushes_when_batch_size_reached():
+    encoder = RecordingEncoder()
+    batcher = EmbeddingBatcher(encoder, max_batch_size=4, max_wait_ms=10_000)
+
+    vectors = await asyncio.wait_for(
+        batcher.embed_many([f"text {i}" for i in range(8)]), timeout=1.0
+    )
+
+    assert len(vectors) == 8
+    assert [len(b) for b in encoder.batches] == [4, 4]
+
+
+@pytest.mark.asyncio
+async def test_duplicate_texts_embedded_once():
+    encoder = RecordingEncoder()
+    batcher = EmbeddingBatcher(encoder, max_wait_ms=5)
+
+    a, b, c = await asyncio.gather(
+        batcher.embed("HighCPU api"), batcher.embed("HighCPU api"), batcher.embed("OOM db")
+    )
+
+    assert encoder.batches == [["HighCPU api", "OOM db"]]
+    assert a == b
+    assert a is not b
+
+
+@pytest.mark.asyncio
+async def test_encoder_runs_off_the_event_loop():
+    encoder = RecordingEncoder(delay=0.05)
+    batcher = EmbeddingBatcher(encoder, max_wait_ms=1)
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    tick_task = asyncio.create_task(ticker())
+    await batcher.embed("slow")
+    tick_task.cancel()
+
+    assert encoder.threads[0] != threading.get_ident()
+    assert ticks >= 3
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_every_caller():
+    def failing(texts):
+        raise RuntimeError("model exploded")
+
+    batcher = EmbeddingBatcher(failing, max_wait_ms=1)
+    results = await asyncio.gather(
+        batcher.embed("a"), batcher.embed("b"), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_empty_text_rejected():
+    batcher = EmbeddingBatcher(RecordingEncoder())
+    with pytest.raises(ValueError):
+        await batcher.embed("   ")
@@ -0,0 +1,132 @@
+"""
+Unit tests for EmbeddingCache and its integration with EmbeddingClient.
+"""
+
+import pytest
+
+from src.tools import embedding_client
+from src.tools.embedding_cache import EmbeddingCache, content_key
+
+
+def test_content_key_depends_on_model_and_text():
+    assert content_key("m1", "text") == content_key("m1", "text")
+    assert content_key("m1", "text") != content_key("m2", "text")
+    assert content_key("m1", "text") != content_key("m1", "other")
+
+
+def test_memory_hit_and_miss_counters():
+    cache = EmbeddingCache(max_entries=10)
+
+    assert cache.get("model", "HighCPU api") is None
+    cache.put("model", "HighCPU api", [0.5, 0.25, 1.0])
+
+    assert cache.get("model", "HighCPU api") == [0.5, 0.25, 1.0]
+    assert cache.get("other-model", "HighCPU api") is None
+    assert cache.stats == {"memory_hits": 1, "disk_hits": 0, "misses": 2}
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("m", "a", [1.0])
+    cache.put("m", "b", [2.0])
+    cache.get("m", "a")  # a becomes most recently used
+    cache.put("m", "c", [3.0])
+
+    assert len(cache) == 2
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") == [1.0]
+    assert cache.get("m", "c") == [3.0]
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    first = EmbeddingCache(max_entries=4, cache_dir=str(tmp_path))
+    for i in range(1500):  # forces the memory-mapped matrix to grow
+        first.put("model/v1", f"text {i}", [float(i), float(i) / 2])
+
+    restarted = EmbeddingCache(max_entries=4, cache_dir=str(tmp_path))
+    assert restarted.get("model/v1", "text 0") == [0.0, 0.0]
+    assert restarted.get("model/v1", "text 1499") == [1499.0, 749.5]
+    assert restarted.get("model/v1", "never stored") is None
+    assert restarted.stats["disk_hits"] == 2
+
+    # A disk hit is promoted to the memory tier.
+    restarted.get("model/v1", "text 0")
+    assert restarted.stats["memory_hits"] == 1
+
+
+def test_lookup_metrics_are_recorded_per_tier(tmp_path):
+    from src.metrics import EMBEDDING_CACHE_REQUESTS
+
+    def counts():
+        return {
+            (tier, result): EMBEDDING_CACHE_REQUESTS.labels(tier=tier, result=result)._value.get()
+            for tier in ("memory", "disk")
+            for result in ("hit", "miss")
+        }
+
+    EmbeddingCache(max_entries=4, cache_dir=str(tmp_path)).put("m", "stored", [1.0])
+    cache = EmbeddingCache(max_entries=4, cache_dir=str(tmp_path))
+    before = counts()
+
+    cache.get("m", "stored")  # memory miss, disk hit
+    cache.get("m", "stored")  # memory hit
+    cache.get("m", "absent")  # memory miss, disk miss
+
+    after = counts()
+    assert {k: after[k] - before[k] for k in after} == {
+        ("memory", "hit"): 1,
+        ("memory", "miss"): 2,
+        ("disk", "hit"): 1,
+        ("disk", "miss"): 1,
+    }
+    assert cache.stats == {"memory_hits": 1, "disk_hits": 1, "misses": 1}
+
+
+def test_disk_tier_respects_entry_cap(tmp_path):
+    cache = EmbeddingCache(max_entries=1, cache_dir=str(tmp_path), max_disk_entries=2)
+    for i in range(5):
+        cache.put("m", f"t{i}", [float(i)])
+
+    restarted = EmbeddingCache(max_entries=1, cache_dir=str(tmp_path))
+    assert restarted.get("m", "t1") == [1.0]
+    assert restarted.get("m", "t2") is None
+
+
+class CountingModel:
+    calls = []
+
+    def __init__(self, model_name, device=None):
+        pass
+
+    def encode(self, texts):
+        CountingModel.calls.append(texts)
+        if isinstance(texts, str):
+            return [float(len(texts)), 1.0]
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+@pytest.fixture
+def cached_client(monkeypatch):
+    CountingModel.calls = []
+    monkeypatch.setattr(embedding_client, "SentenceTransformer", CountingModel)
+    monkeypatch.setattr(embedding_client.EmbeddingClient, "_instance", None)
+    embedding_client.EmbeddingClient.clear_model_cache()
+    yield embedding_client.EmbeddingClient(model_name="cache-model", provider="local", cache_size=16)
+    embedding_client.EmbeddingClient.clear_model_cache()
+
+
+def test_client_embed_uses_cache(cached_client):
+    first = cached_client.embed("Alert: HighCPU | Service: api")
+    second = cached_client.embed("Alert: HighCPU | Service: api")
+
+    assert first == second
+    assert len(CountingModel.calls) == 1
+
+
+def test_client_embed_batch_only_encodes_misses(cached_client):
+    cached_client.embed("known")
+    vectors = cached_client.embed_batch(["known", "new-1", "new-2", "new-1"])
+
+    assert CountingModel.calls[-1] == ["new-1", "new-2"]
+    assert [v[0] for v in vectors] == [5.0, 5.0, 5.0, 5.0]
+    assert vectors[1] == vectors[3]
@@ -0,0 +1,79 @@
+"""
+Unit tests for EmbeddingClient local model caching.
+"""
+
+import pytest
+
+from src.tools import embedding_client
+
+
+class FakeSentenceTransformer:
+    """Stand-in for sentence_transformers.SentenceTransformer that counts loads."""
+
+    loads = []
+
+    def __init__(self, model_name, device=None):
+        FakeSentenceTransformer.loads.append((model_name, device))
+        self.model_name = model_name
+
+    def encode(self, texts):
+        if isinstance(texts, str):
+            return [float(len(texts)), 1.0, 0.0]
+        return [[float(len(t)), 1.0, 0.0] for t in texts]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    FakeSentenceTransformer.loads = []
+    monkeypatch.setattr(embedding_client, "SentenceTransformer", FakeSentenceTransformer)
+    monkeypatch.setattr(embedding_client.EmbeddingClient, "_instance", None)
+    embedding_client.EmbeddingClient.clear_model_cache()
+    yield embedding_client.EmbeddingClient(model_name="fake-model", provider="local", cache_size=0)
+    embedding_client.EmbeddingClient.clear_model_cache()
+
+
+def test_model_loaded_once_across_calls(client):
+    client.embed("cpu high on api")
+    client.embed("memory high on api")
+    client.embed_batch(["a", "b", "c"])
+
+    assert FakeSentenceTransformer.loads == [("fake-model", None)]
+
+
+def test_model_shared_across_client_instances(client):
+    client.embed("first")
+    embedding_client.EmbeddingClient(model_name="fake-model").embed("second")
+
+    assert len(FakeSentenceTransformer.loads) == 1
+
+
+def test_models_cached_per_name_and_device(client):
+    client.embed("first")
+    embedding_client.EmbeddingClient(model_name="other-model").embed("second")
+    embedding_client.EmbeddingClient(model_name="other-model", device="cpu").embed("third")
+
+    assert FakeSentenceTransformer.loads == [
+        ("fake-model", None),
+        ("other-model", None),
+        ("other-model", "cpu"),
+    ]
+
+
+def test_warmup_loads_model_and_sets_dimension(client):
+    client.warmup()
+
+    assert len(FakeSentenceTransformer.loads) == 1
+    assert client.vector_dimension == 3
+    client.embed("after warmup")
+    assert len(FakeSentenceTransformer.loads) == 1
+
+
+def test_missing_library_raises_embedding_error(client, monkeypatch):
+    def _missing(*args, **kwargs):
+        raise RuntimeError("sentence-transformers is not installed")
+
+    monkeypatch.setattr(embedding_client, "SentenceTransformer", _missing)
+    embedding_client.EmbeddingClient.clear_model_cache()
+
+    with pytest.raises(embedding_client.EmbeddingModelError):
+        client.embed("anything")
@@ -169,3 +169,155 @@ def test_messages_array_with_nested_objects(monkeypatch):
         assert ev["contentBlockDelta"]["delta"]["text"] == "Nested text response"
 
     asyncio.run(run5())
+
+
+class FakeModelsEndpoint:
+    """Local aiohttp server speaking the chat/completions SSE protocol."""
+
+    def __init__(self, parts, chunk_delay=0.0):
+        self.parts = parts
+        self.chunk_delay = chunk_delay
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.connections = set()
+        self.url = None
+        self._runner = None
+
+    async def _handler(self, request):
+        from aiohttp import web
+        import json
+
+        self.requests += 1
+        peer = request.transport.get_extra_info("peername") if request.transport else None
+        self.connections.add(peer)
+        body = await request.json()
+        assert body["stream"] is True
+
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await resp.prepare(request)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            for part in self.parts:
+                chunk = {
+                    "id": "chunk", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                    "choices": [{"index": 0, "delta": {"role": "assistant", "content": part}, "finish_reason": None}],
+                }
+                await resp.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                await asyncio.sleep(self.chunk_delay)
+            await resp.write(b"data: [DONE]\n\n")
+        finally:
+            self.in_flight -= 1
+        return resp
+
+    async def __aenter__(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_post("/{tail:.*}", self._handler)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._runner.cleanup()
+
+
+async def _collect(provider, prompt="Hi"):
+    deltas = []
+    async for ev in provider.stream([{"role": "user", "content": prompt}]):  # type: ignore[arg-type]
+        deltas.append(ev["contentBlockDelta"]["delta"]["text"])
+    return deltas
+
+
+def test_async_client_streams_incremental_deltas(monkeypatch):
+    pytest.importorskip("azure.ai.inference.aio")
+    monkeypatch.setenv("GITHUB_TOKEN", "fake-token")
+
+    async def run():
+        async with FakeModelsEndpoint(["{\"decision", "_state\": ", "\"OBSERVE\"}"]) as server:
+            provider = GitHubModels(endpoint=server.url)
+            try:
+                first = await _collect(provider)
+                client = provider._async_client
+                second = await _collect(provider)
+                assert provider._async_client is client  # pooled, not rebuilt per call
+            finally:
+                await provider.aclose()
+        assert first == ["{\"decision", "_state\": ", "\"OBSERVE\"}"]
+        assert "".join(second) == "{\"decision_state\": \"OBSERVE\"}"
+        assert server.requests == 2
+        assert len(server.connections) == 1  # keep-alive connection reused
+
+    asyncio.run(run())
+
+
+def test_concurrent_streams_overlap_on_event_loop(monkeypatch):
+    pytest.importorskip("azure.ai.inference.aio")
+    monkeypatch.setenv("GITHUB_TOKEN", "fake-token")
+
+    async def run():
+        async with FakeModelsEndpoint(["a", "b", "c", "d"], chunk_delay=0.05) as server:
+            provider = GitHubModels(endpoint=server.url)
+            ticks = 0
+
+            async def heartbeat():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            beat = asyncio.create_task(heartbeat())
+            try:
+                results = await asyncio.gather(*(_collect(provider, f"q{i}") for i in range(5)))
+            finally:
+                beat.cancel()
+                await provider.aclose()
+
+        assert all("".join(r) == "abcd" for r in results)
+        # All five streams were open at the endpoint at the same time.
+        assert server.peak_in_flight == 5
+        # The loop kept running while the requests were in flight.
+        assert ticks >= 10
+
+    asyncio.run(run())
+
+
+def test_sync_fake_client_runs_off_event_loop(monkeypatch):
+    monkeypatch.setenv("GITHUB_TOKEN", "fake-token")
+    import threading
+    import time
+
+    calling_threads = []
+    in_flight = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    class SlowClient:
+        def __init__(self, endpoint, credential):
+            pass
+
+        def get_chat_response(self, model, messages, timeout):
+            calling_threads.append(threading.get_ident())
+            with lock:
+                in_flight["now"] += 1
+                in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            time.sleep(0.1)
+            with lock:
+                in_flight["now"] -= 1
+            return DummyResponse(text="ok")
+
+    provider = GitHubModels()
+    provider._client_cls = SlowClient  # type: ignore[assignment]
+
+    async def run():
+        return await asyncio.gather(*(_collect(provider) for _ in range(4)))
+
+    results = asyncio.run(run())
+    assert results == [["ok"]] * 4
+    assert threading.get_ident() not in calling_threads
+    assert in_flight["peak"] == 4
@@ -0,0 +1,59 @@
+"""
+Unit tests for the indexed semantica GraphBuilder.
+"""
+
+import pytest
+
+from semantica.kg import GraphBuilder
+
+
+@pytest.fixture
+def graph():
+    g = GraphBuilder()
+    g.add_entity("svc-auth", "Service", {"name": "auth-service", "tier": 1})
+    g.add_entity("svc-pay", "Service", {"name": "payment-service", "tier": 1})
+    g.add_entity("svc-web", "Service", {"name": "web", "tier": 2, "tags": ["edge"]})
+    g.add_entity("d1", "Decision", {"service": "auth-service", "state": "ESCALATE", "summary": "auth-service login failures E401"})
+    g.add_entity("d2", "Decision", {"service": "payment-service", "state": "OBSERVE", "summary": "payment gateway timeouts"})
+    g.add_relationship("d1", "svc-auth", "FOR_SERVICE")
+    g.add_relationship("d2", "svc-pay", "FOR_SERVICE")
+    g.add_relationship("svc-web", "svc-auth", "DEPENDS_ON")
+    g.add_relationship("svc-auth", "svc-pay", "DEPENDS_ON")
+    return g
+
+
+def test_query_uses_type_and_property_indexes(graph):
+    assert [r["id"] for r in graph.query("Service", {"tier": 1})] == ["svc-auth", "svc-pay"]
+    assert graph.query("Service", {"tier": 1}, limit=1)[0]["name"] == "auth-service"
+    assert [r["id"] for r in graph.query("Service", {"tags": ["edge"]})] == ["svc-web"]
+    assert [r["id"] for r in graph.query("Service", {"missing": None})] == ["svc-auth", "svc-pay", "svc-web"]
+    assert graph.query("Decision", {"service": "web"}) == []
+    assert graph.query("Unknown") == []
+
+
+def test_replacing_an_entity_reindexes_it(graph):
+    graph.add_entity("svc-pay", "Service", {"name": "payments", "tier": 2})
+
+    assert [r["id"] for r in graph.query("Service", {"tier": 1})] == ["svc-auth"]
+    assert [r["id"] for r in graph.semantic_search("payment")] == ["d2"]
+    assert graph.graph["svc-pay"]["properties"]["name"] == "payments"
+
+
+def test_semantic_search_requires_all_tokens_and_ranks_by_score(graph):
+    results = graph.semantic_search("auth service")
+    assert [r["id"] for r in results] == ["d1", "svc-auth"]
+    assert results[0]["score"] > results[1]["score"]
+
+    assert [r["id"] for r in graph.semantic_search("E401")] == ["d1"]
+    assert [r["id"] for r in graph.semantic_search("service", entity_type="Service", limit=1)] == ["svc-auth"]
+    assert graph.semantic_search("auth gateway") == []
+
+
+def test_adjacency_lists_support_traversal(graph):
+    assert [r["target"] for r in graph.get_relationships("svc-auth", "DEPENDS_ON")] == ["svc-pay"]
+    assert [r["source"] for r in graph.get_relationships("svc-auth", direction="in")] == ["d1", "svc-web"]
+    assert graph.neighbors("svc-web", "DEPENDS_ON", max_depth=2) == {"svc-auth": 1, "svc-pay": 2}
+    assert graph.neighbors("svc-pay", direction="both") == {"d2": 1, "svc-auth": 1}
+    assert len(graph.graph["relationships"]) == 4
+    with pytest.raises(ValueError):
+        graph.get_relationships("svc-auth", direction="sideways")
@@ -1,6 +1,13 @@
 
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
 from unittest.mock import MagicMock, patch
+from kubernetes import client
 from kubernetes.client.rest import ApiException
 
 from src.agents.analysis.log_inspector import LogInspectorAgent
@@ -53,8 +60,8 @@ def test_get_pod_logs_success(mock_k8s_client):
     # Assert
     assert result['hypothesis'] == "Errors detected in 1 of 2 pods for the service 'payment-service'."
     assert len(result['evidence']) == 1
-    assert result['evidence'][0]['pod_name'] == pod1_name
-    assert "ERROR: Database connection failed" in result['evidence'][0]['errors'][0]
+    assert result['evidence'][0]['pods'] == [pod1_name]
+    assert "ERROR: Database connection failed" in result['evidence'][0]['exemplar']
     assert pod1_name in result['suggested_action']
 
 def test_get_pod_logs_no_pods_found(mock_k8s_client):
@@ -101,8 +108,8 @@ def test_get_pod_logs_api_exception_on_log_read(mock_k8s_client):
     # Assert
     assert "Errors detected in 1 of 1 pods" in result['hypothesis']
     assert len(result['evidence']) == 1
-    assert result['evidence'][0]['pod_name'] == pod1_name
-    assert "Could not retrieve logs" in result['evidence'][0]['errors'][0]
+    assert result['evidence'][0]['pods'] == [pod1_name]
+    assert "Could not retrieve logs" in result['evidence'][0]['exemplar']
 
 @patch('src.agents.analysis.log_inspector.LogInspectorAgent._find_pods_by_service')
 def test_retry_logic_on_api_failure(mock_find_pods, mock_k8s_client):
@@ -125,3 +132,239 @@ def test_retry_logic_on_api_failure(mock_find_pods, mock_k8s_client):
 
     # Assert
     assert mock_find_pods.call_count == 3
+
+
+class _BrokenStream:
+    """Streaming response whose connection drops after the first chunk."""
+
+    def __init__(self, error):
+        self.error = error
+        self.released = False
+
+    def stream(self, amt):
+        yield b"ERROR first block\nINFO"
+        raise self.error
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        self.released = True
+
+
+def test_transport_error_mid_stream_is_reported_per_pod(mock_k8s_client):
+    """A dropped connection on one pod does not abort the other pods."""
+    from urllib3.exceptions import ProtocolError, ReadTimeoutError
+
+    mock_service = MagicMock()
+    mock_service.spec.selector = {"app": "svc"}
+    mock_k8s_client.read_namespaced_service.return_value = mock_service
+    pods = []
+    for name in ("svc-0", "svc-1", "svc-2"):
+        pod = MagicMock()
+        pod.metadata.name = name
+        pods.append(pod)
+    mock_k8s_client.list_namespaced_pod.return_value.items = pods
+    streams = {
+        "svc-0": _BrokenStream(ProtocolError("Connection broken: IncompleteRead")),
+        "svc-1": _BrokenStream(ReadTimeoutError(None, "/log", "Read timed out.")),
+    }
+
+    def read_log_side_effect(name, **kwargs):
+        return streams.get(name, b"ERROR healthy pod error\n")
+
+    mock_k8s_client.read_namespaced_pod_log.side_effect = read_log_side_effect
+    agent = LogInspectorAgent()
+    agent.v1 = mock_k8s_client
+
+    result = agent.get_pod_logs("svc")
+
+    assert result["hypothesis"] == "Errors detected in 3 of 3 pods for the service 'svc'."
+    exemplars = [ev["exemplar"] for ev in result["evidence"]]
+    assert any(e.startswith("ERROR healthy pod error") for e in exemplars)
+    assert any("Could not retrieve logs: " in e and "Connection broken" in e for e in exemplars)
+    assert any("Could not retrieve logs: " in e and "Read timed out" in e for e in exemplars)
+    assert all(stream.released for stream in streams.values())
+
+
+class _FakeKubeApi(BaseHTTPRequestHandler):
+    """Serves one service, its pods, and per-pod logs (with a fixed latency)."""
+
+    pod_logs = {}
+    latency = 0.0
+    log_requests = []
+    in_flight = 0
+    peak_in_flight = 0
+    _lock = threading.Lock()
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path.endswith("/services/svc"):
+            self._send_json({"kind": "Service", "apiVersion": "v1", "spec": {"selector": {"app": "svc"}}})
+        elif path.endswith("/pods"):
+            items = [{"metadata": {"name": name}} for name in self.pod_logs]
+            self._send_json({"kind": "PodList", "apiVersion": "v1", "metadata": {}, "items": items})
+        elif path.endswith("/log"):
+            pod = path.split("/")[-2]
+            cls = type(self)
+            with cls._lock:
+                cls.log_requests.append(pod)
+                cls.in_flight += 1
+                cls.peak_in_flight = max(cls.peak_in_flight, cls.in_flight)
+            time.sleep(self.latency)
+            with cls._lock:
+                cls.in_flight -= 1
+            body = self.pod_logs[pod].encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the reader stopped early
+        else:
+            self.send_error(404)
+
+    def _send_json(self, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_kube_api():
+    """Points a real CoreV1Api at a local fake API server."""
+    _FakeKubeApi.pod_logs, _FakeKubeApi.latency, _FakeKubeApi.log_requests = {}, 0.0, []
+    _FakeKubeApi.in_flight = _FakeKubeApi.peak_in_flight = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeKubeApi)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    configuration = client.Configuration(host=f"http://127.0.0.1:{server.server_port}")
+    configuration.connection_pool_maxsize = 16
+    api = client.CoreV1Api(client.ApiClient(configuration))
+    with patch('src.agents.analysis.log_inspector.config.load_incluster_config'), \
+         patch('src.agents.analysis.log_inspector.config.load_kube_config'):
+        yield api
+
+    server.shutdown()
+    server.server_close()
+
+
+def _agent(api, **kwargs):
+    agent = LogInspectorAgent(**kwargs)
+    agent.v1 = api
+    return agent
+
+
+def test_pod_logs_are_fetched_concurrently(fake_kube_api):
+    """Log reads overlap instead of paying each pod's latency in turn."""
+    _FakeKubeApi.pod_logs = {f"svc-{i}": f"INFO ok\nERROR pod {i} failed\n" for i in range(8)}
+    _FakeKubeApi.latency = 0.2
+
+    agent = _agent(fake_kube_api, max_workers=8)
+
+    result = agent.get_pod_logs("svc")
+
+    assert _FakeKubeApi.peak_in_flight == 8
+    # The same error from every pod collapses into one template
+    assert len(result["evidence"]) == 1
+    assert result["evidence"][0]["pods"] == [f"svc-{i}" for i in range(8)]
+    assert result["evidence"][0]["count"] == 8
+
+
+def test_stream_parsing_matches_batch_parser(fake_kube_api):
+    """Streamed parsing keeps multi-line stack traces intact."""
+    logs = (
+        "2025-01-01 INFO start\n"
+        "ERROR Traceback (most recent call last):\n"
+        '  File "app.py", line 1\n'
+        "ValueError: boom\n"
+        "2025-01-01 INFO recovered\n"
+        "CRITICAL out of memory"
+    )
+    _FakeKubeApi.pod_logs = {"svc-0": logs}
+    agent = _agent(fake_kube_api)
+
+    result = agent.get_pod_logs("svc")
+
+    assert [ev["exemplar"] for ev in result["evidence"]] == agent._parse_logs(logs)
+    assert len(result["evidence"]) == 2
+
+
+def test_per_pod_byte_and_line_caps(fake_kube_api):
+    """Huge logs are read only up to the configured caps."""
+    _FakeKubeApi.pod_logs = {
+        "svc-0": "INFO filler line\n" * 50_000 + "ERROR past the byte cap\n",
+        "svc-1": "INFO filler\n" * 200 + "ERROR past the line cap\n",
+        "svc-2": "ERROR early\n" + "INFO filler\n" * 50_000,
+    }
+    agent = _agent(fake_kube_api, max_bytes_per_pod=64 * 1024, max_lines_per_pod=100)
+
+    assert list(agent._iter_log_lines(b"a\nb\n")) == ["a", "b", ""]
+    result = agent.get_pod_logs("svc")
+
+    assert [ev["pods"] for ev in result["evidence"]] == [["svc-2"]]
+    assert result["evidence"][0]["exemplar"].startswith("ERROR early")
+
+
+def test_collection_stops_once_enough_error_blocks(fake_kube_api):
+    """Pods are not read once max_error_blocks blocks have been collected."""
+    _FakeKubeApi.pod_logs = {f"svc-{i}": "ERROR a\nERROR b\nERROR c\n" * 100 for i in range(6)}
+
+    result = _agent(fake_kube_api, max_workers=1, max_error_blocks=5).get_pod_logs("svc")
+
+    assert sum(ev["count"] for ev in result["evidence"]) == 5
+    assert _FakeKubeApi.log_requests == ["svc-0"]
+
+
+def test_templates_are_cached_per_service_across_runs(mock_k8s_client):
+    """Repeated stack traces become one evidence entry, recurring on the next run."""
+    mock_service = MagicMock()
+    mock_service.spec.selector = {"app": "checkout"}
+    mock_k8s_client.read_namespaced_service.return_value = mock_service
+    pods = []
+    for i in range(3):
+        pod = MagicMock()
+        pod.metadata.name = f"checkout-{i}"
+        pods.append(pod)
+    mock_k8s_client.list_namespaced_pod.return_value.items = pods
+
+    def read_log_side_effect(name, **kwargs):
+        i = int(name.rsplit("-", 1)[1])
+        return (
+            f"2025-01-01T10:00:0{i}Z INFO request {i}\n"
+            f"2025-01-01T10:00:0{i}Z ERROR Timeout calling payments after {i * 100}ms\n"
+            f"    at client.call (client.js:{40 + i})\n"
+            f"2025-01-01T10:00:0{i}Z ERROR order {i}17 rejected: card declined\n"
+        ).encode("utf-8")
+
+    mock_k8s_client.read_namespaced_pod_log.side_effect = read_log_side_effect
+    agent = LogInspectorAgent()
+    agent.v1 = mock_k8s_client
+
+    first = agent.get_pod_logs("checkout")
+    second = agent.get_pod_logs("checkout")
+
+    assert first["hypothesis"] == "Errors detected in 3 of 3 pods for the service 'checkout'."
+    assert [(ev["count"], len(ev["pods"])) for ev in first["evidence"]] == [(3, 3), (3, 3)]
+    assert "ERROR Timeout calling payments after <NUM>ms" in first["evidence"][0]["template"]
+    assert not any(ev["recurring"] for ev in first["evidence"])
+    assert [ev["template_id"] for ev in second["evidence"]] == [ev["template_id"] for ev in first["evidence"]]
+    assert all(ev["recurring"] for ev in second["evidence"])
+
+    mock_k8s_client.read_namespaced_pod_log.side_effect = None
+    mock_k8s_client.read_namespaced_pod_log.return_value = b"ERROR disk full on /var/data\n"
+    alert = MagicMock()
+    alert.service = "checkout"
+    result = asyncio.run(agent.analyze(alert))
+    assert len(result.evidence) == 1
+    assert result.evidence[0].description.startswith("Log template #3: 3x in 3 pod(s)")
+    assert result.evidence[0].description.endswith("ERROR disk full on /var/data\n")
@@ -0,0 +1,53 @@
+"""
+Unit tests for the Drain-style log template miner.
+"""
+
+from src.utils.log_templates import WILDCARD, LogTemplateMiner, mask_message
+
+
+def test_mask_message_replaces_variable_parts():
+    masked = mask_message(
+        "2025-01-01T10:00:00Z ERROR pod-3 at 0x7f3a from 10.0.0.1:8080 "
+        "req 3f2a9c1b7e8d took 1.5s id 123e4567-e89b-12d3-a456-426614174000"
+    )
+    assert masked == "<TS> ERROR pod-<NUM> at <HEX> from <IP> req <HEX> took <NUM>s id <UUID>"
+
+
+def test_similar_messages_share_a_generalized_template():
+    miner = LogTemplateMiner()
+    a = miner.add("ERROR user alice not found in shard 3")
+    b = miner.add("ERROR user bob not found in shard 7")
+    c = miner.add("ERROR connection refused")
+
+    assert a is b and a.count == 2
+    assert a.template == f"ERROR user {WILDCARD} not found in shard <NUM>"
+    assert a.exemplar == "ERROR user alice not found in shard 3"
+    assert c is not a and len(miner) == 2
+
+
+def test_stack_traces_keep_line_structure():
+    miner = LogTemplateMiner()
+    trace = (
+        "ERROR Traceback (most recent call last):\n"
+        '  File "app.py", line {}, in handler\n'
+        "KeyError: 'order-{}'"
+    )
+    first = miner.add(trace.format(12, 1))
+    second = miner.add(trace.format(12, 2))
+
+    assert first is second
+    assert first.template.split("\n")[1] == 'File "app.py", line <NUM>, in handler'
+    assert first.template.count("\n") == 2
+
+
+def test_least_recently_matched_template_is_evicted():
+    miner = LogTemplateMiner(max_templates=2)
+    disk = miner.add("ERROR disk full")
+    miner.add("ERROR connection refused by upstream")
+    miner.add("ERROR disk full")
+    miner.add("CRITICAL out of memory killing process now")
+
+    assert len(miner) == 2
+    assert miner.get(disk.template_id) is disk
+    assert miner.next_id == 4
+    assert [t.template for t in miner.templates] == ["ERROR disk full", "CRITICAL out of memory killing process now"]
@@ -0,0 +1,229 @@
+"""
+Unit tests for Neo4jRepository query paths, using a fake driver.
+"""
+
+import pytest
+
+from src.graph.neo4j_repo import Neo4jRepository, decode_cursor, encode_cursor
+
+
+class FakeTx:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def run(self, query, **params):
+        self.calls.append((query, params))
+        return [{"execution_id": row["execution_id"]} for row in params["rows"]]
+
+
+class FakeResult(list):
+    def single(self):
+        return self[0] if self else None
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_write(self, work):
+        self.driver.transactions += 1
+        return work(FakeTx(self.driver.calls))
+
+    def run(self, query, params=None, **kwargs):
+        self.driver.session_runs.append((query, {**(params or {}), **kwargs}))
+        return FakeResult(self.driver.records)
+
+
+class FakeDriver:
+    def __init__(self):
+        self.calls = []
+        self.transactions = 0
+        self.session_runs = []
+        self.records = []
+
+    def session(self):
+        return FakeSession(self)
+
+
+def _repo():
+    repo = Neo4jRepository()
+    repo._driver = FakeDriver()
+    return repo
+
+
+def test_batch_uses_one_transaction_and_one_statement_per_chunk():
+    repo = _repo()
+    executions = [{"agent_id": f"agent-{i}", "execution_id": f"exec-{i}"} for i in range(7)]
+
+    ids = repo.save_agent_executions_batch("decision-1", executions, chunk_size=3)
+
+    assert ids == [f"exec-{i}" for i in range(7)]
+    assert repo._driver.transactions == 1
+    assert [len(params["rows"]) for _, params in repo._driver.calls] == [3, 3, 1]
+    query, params = repo._driver.calls[0]
+    assert "UNWIND $rows AS row" in query
+    assert params["decision_id"] == "decision-1"
+    assert repo._driver.session_runs == []
+
+
+def test_batch_rows_use_same_defaults_as_single_write():
+    repo = _repo()
+    repo.save_agent_executions_batch("decision-1", [{"agent_id": "metrics"}])
+
+    row = repo._driver.calls[0][1]["rows"][0]
+    assert row["agent_name"] == "metrics"
+    assert row["agent_version"] == "1.0"
+    assert row["logic_hash"] == "undefined"
+    assert row["status"] == "completed"
+    assert row["confidence"] == 0.5
+    assert row["error"] is None
+    assert row["execution_id"]
+
+
+def test_batch_chunk_size_from_env(monkeypatch):
+    monkeypatch.setenv("NEO4J_BATCH_CHUNK_SIZE", "2")
+    repo = _repo()
+    repo.save_agent_executions_batch("decision-1", [{} for _ in range(5)])
+
+    assert [len(params["rows"]) for _, params in repo._driver.calls] == [2, 2, 1]
+
+
+def test_empty_batch_skips_driver():
+    repo = _repo()
+    assert repo.save_agent_executions_batch("decision-1", []) == []
+    assert repo._driver.transactions == 0
+
+
+def test_create_agent_execution_uses_agent_config():
+    repo = _repo()
+    repo._driver.records = [{"execution_id": "exec-1"}]
+
+    execution_id = repo.create_agent_execution(
+        "decision-1", "metrics", {"duration_ms": 42, "output_flags": ["a", "b"]}
+    )
+
+    query, params = repo._driver.session_runs[0]
+    assert execution_id == "exec-1"
+    assert params["agent_name"] == "metrics"
+    assert params["duration_ms"] == 42
+    assert params["output_flags"] == "a|b"
+    assert params["status"] == "pending"
+    assert params["execution_id"]
+    for name in ("started_at", "completed_at", "input_params", "memory_mb", "model_version"):
+        assert f"${name}" in query and name in params
+
+
+def test_single_write_uses_shared_row_defaults():
+    repo = _repo()
+    repo._driver.records = [{"execution_id": "exec-1"}]
+
+    assert repo.save_agent_execution("decision-1", {"agent_id": "metrics"}) == "exec-1"
+
+    _, params = repo._driver.session_runs[0]
+    assert params["decision_id"] == "decision-1"
+    assert params["agent_name"] == "metrics"
+    assert params["status"] == "completed"
+    assert params["timestamp"]
+
+
+def test_get_incident_is_a_point_lookup():
+    repo = _repo()
+    repo._driver.records = [{
+        "decision_id": "decision-1",
+        "summary": "x" * 150,
+        "status": "PROPOSED",
+        "created_at": "2025-01-01T00:00:00+00:00",
+        "risk": "low",
+        "service": "api",
+        "severity": "critical",
+        "execution_count": 3,
+    }]
+
+    incident = repo.get_incident("decision-1")
+
+    query, params = repo._driver.session_runs[0]
+    assert "MATCH (d:DecisionCandidate {decision_id: $decision_id})" in query
+    assert params == {"decision_id": "decision-1"}
+    assert incident["execution_count"] == 3
+    assert incident["full_summary"] == "x" * 150
+    assert incident["summary"].endswith("...")
+
+
+def test_get_incident_missing_returns_none():
+    repo = _repo()
+    assert repo.get_incident("nope") is None
+
+
+def test_ensure_schema_creates_decision_id_constraint():
+    repo = _repo()
+    repo.ensure_schema()
+
+    statements = [query for query, _ in repo._driver.session_runs]
+    assert any("REQUIRE d.decision_id IS UNIQUE" in q for q in statements)
+
+
+def _incident_record(i):
+    return {
+        "decision_id": f"d-{i:03d}",
+        "summary": f"incident {i}",
+        "status": "PROPOSED",
+        "created_at": f"2025-01-01T00:{i:02d}:00+00:00",
+        "risk": "low",
+        "service": "api",
+        "severity": "critical",
+        "execution_count": 0,
+    }
+
+
+def test_incidents_page_returns_cursor_when_more_rows():
+    repo = _repo()
+    repo._driver.records = [_incident_record(i) for i in (9, 8, 7)]
+
+    items, cursor = repo.get_incidents_page(limit=2, status="PROPOSED", service="api")
+
+    query, params = repo._driver.session_runs[0]
+    assert params["limit"] == 3
+    assert "d.status = $status" in query and "a.service = $service" in query
+    assert "$severity" not in query
+    assert "ORDER BY d.created_at DESC, d.decision_id DESC" in query
+    assert [i["decision_id"] for i in items] == ["d-009", "d-008"]
+    assert decode_cursor(cursor) == ("2025-01-01T00:08:00+00:00", "d-008")
+
+
+def test_filtered_page_filters_alerts_before_ordering():
+    repo = _repo()
+    repo.get_decisions_page(limit=2, severity="critical", service="api")
+
+    query, _ = repo._driver.session_runs[0]
+    lines = [line.strip() for line in query.splitlines() if line.strip()]
+    where = lines.index("WHERE a.severity = $severity AND a.service = $service")
+    assert lines[where - 1] == "WITH d, a"
+    assert lines[where + 1] == "WITH d, head(collect(a)) AS a"
+    assert lines[where + 2] == "ORDER BY d.created_at DESC, d.decision_id DESC"
+    assert lines[where + 3] == "LIMIT $limit"
+
+
+def test_incidents_page_applies_cursor_and_ends_without_cursor():
+    repo = _repo()
+    repo._driver.records = [_incident_record(7)]
+
+    items, cursor = repo.get_incidents_page(
+        limit=2, cursor=encode_cursor("2025-01-01T00:08:00+00:00", "d-008")
+    )
+
+    _, params = repo._driver.session_runs[0]
+    assert params["cursor_created_at"] == "2025-01-01T00:08:00+00:00"
+    assert params["cursor_id"] == "d-008"
+    assert len(items) == 1
+    assert cursor is None
+
+
+def test_decode_cursor_rejects_garbage():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
@@ -0,0 +1,134 @@
+"""
+Unit tests for the streaming trend detector used by proactive MONITOR runs.
+"""
+
+import asyncio
+import math
+from datetime import datetime, timezone
+
+import numpy as np
+
+from src.models.metric_trend import TimeSeries, TrendState
+from src.rules.online_trend import P2Quantile, RollingTrendStats, StreamingTrendDetector
+from src.tools.prometheus_range_cache import PrometheusRangeCache
+from src.utils.statistics import compute_linear_trend, compute_variance_coefficient
+
+STEP = 30
+
+
+def _series(values, start=0):
+    return TimeSeries((np.arange(len(values)) + start) * STEP, values)
+
+
+def test_p2_quantile_tracks_p95():
+    rng = np.random.default_rng(5)
+    data = rng.normal(100, 10, 5_000)
+    sketch = P2Quantile(0.95)
+    for x in data:
+        sketch.add(float(x))
+
+    assert abs(sketch.value() - np.percentile(data, 95)) < 1.0
+
+
+def test_rolling_stats_match_batch_over_sliding_window():
+    rng = np.random.default_rng(9)
+    values = rng.normal(50, 5, 200) + 0.3 * np.arange(200)
+    stats, window = RollingTrendStats(), 31
+    for i, y in enumerate(values):
+        stats.add(i, float(y))
+        if i >= window:
+            stats.remove(i - window, float(values[i - window]))
+
+    slope, r_squared = compute_linear_trend(values[-window:])
+    assert math.isclose(stats.slope, slope, rel_tol=1e-9)
+    assert math.isclose(stats.r_squared, r_squared, rel_tol=1e-9)
+    assert math.isclose(stats.cv, compute_variance_coefficient(values[-window:]), rel_tol=1e-9)
+
+
+def test_detector_reports_only_state_changes():
+    detector = StreamingTrendDetector(window_size=20)
+    changes = []
+    detector.watch("cpu", lambda trend, previous: changes.append((previous, trend.trend_state)))
+
+    stable = [100.0 + (i % 2) for i in range(20)]
+    assert detector.observe("cpu", _series(stable)).trend_state == TrendState.STABLE
+    # Re-delivered samples and more of the same do not re-trigger
+    assert detector.observe("cpu", _series(stable)) is None
+    assert detector.observe("cpu", _series([100.0, 101.0], start=20)) is None
+
+    rising = detector.observe("cpu", _series([100.0 + 5 * i for i in range(20)], start=22))
+    assert rising.trend_state == TrendState.DEGRADING
+    assert rising.data_points_total == 20
+
+    asyncio.run(detector.dispatch())
+    assert changes == [(None, TrendState.STABLE), (TrendState.STABLE, TrendState.DEGRADING)]
+
+
+def test_every_poll_callback_runs_on_each_dispatch():
+    detector = StreamingTrendDetector(window_size=20)
+    changes, polls = [], []
+    detector.watch("cpu", lambda trend, previous: changes.append(previous))
+    detector.watch("cpu", lambda trend, previous: polls.append((previous, trend.trend_state)), every_poll=True)
+
+    detector.observe("cpu", _series([100.0 + (i % 2) for i in range(20)]))
+    asyncio.run(detector.dispatch())
+    asyncio.run(detector.dispatch())
+
+    assert changes == [None]
+    assert polls == [(None, TrendState.STABLE), (TrendState.STABLE, TrendState.STABLE)]
+
+
+def test_unwatch_callback_keeps_other_watchers():
+    detector = StreamingTrendDetector(window_size=20)
+    first, second = [], []
+    on_first = lambda trend, previous: first.append(trend.trend_state)
+    on_second = lambda trend, previous: second.append(trend.trend_state)
+    detector.watch("cpu", on_first)
+    detector.watch("cpu", on_second)
+
+    detector.unwatch("cpu", on_first)
+    detector.observe("cpu", _series([100.0 + (i % 2) for i in range(20)]))
+    asyncio.run(detector.dispatch())
+
+    assert "cpu" in detector
+    assert first == [] and second == [TrendState.STABLE]
+
+    detector.unwatch("cpu", on_second)
+    assert "cpu" not in detector
+
+
+def test_detector_is_fed_by_range_cache():
+    cache = PrometheusRangeCache()
+    detector = StreamingTrendDetector(range_cache=cache)
+    detector.watch("up")
+    epoch = int(datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp())
+
+    async def backend(expr, start, end, step):
+        s, e = int(start.timestamp()), int(end.timestamp())
+        return TimeSeries(np.arange(s, e + 1, step), np.full((e - s) // step + 1, 1.0))
+
+    def query(lo, hi):
+        start = datetime.fromtimestamp(epoch + lo, tz=timezone.utc)
+        end = datetime.fromtimestamp(epoch + hi, tz=timezone.utc)
+        return asyncio.run(cache.query(("ds", "up"), "up", start, end, STEP, backend))
+
+    query(0, 900)
+    query(300, 1200)
+
+    trend = detector.trend("up")
+    assert trend.trend_state == TrendState.STABLE
+    assert trend.series.timestamps[-1] == epoch + 1200
+
+
+def test_transient_spike_is_dropped_but_ramp_is_kept():
+    detector = StreamingTrendDetector(window_size=30)
+    detector.watch("lat")
+    detector.observe("lat", _series([100.0 + (i % 3) for i in range(20)] + [5_000.0, 101.0]))
+
+    trend = detector.trend("lat")
+    assert trend.outliers_removed == 1
+    assert trend.series.outliers.tolist()[-2:] == [True, False]
+    assert trend.trend_state == TrendState.STABLE
+
+    detector.observe("lat", _series([110.0 + 10 * i for i in range(10)], start=22))
+    assert detector.trend("lat").trend_state == TrendState.DEGRADING
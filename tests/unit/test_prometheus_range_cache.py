@@ -0,0 +1,166 @@
+"""
+Unit tests for PrometheusRangeCache and its use under
+PrometheusClient.query_range_async.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from src.models.metric_trend import DataPoint
+from src.tools import prometheus_range_cache
+from src.tools.prometheus_queries import PrometheusClient
+from src.tools.prometheus_range_cache import PrometheusRangeCache, align_window
+
+STEP = 30
+T0 = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class GridBackend:
+    """Fake Prometheus: one sample per step whose value is its epoch second."""
+
+    def __init__(self, version: int = 0):
+        self.calls = []
+        self.version = version
+
+    async def __call__(self, expr, start, end, step):
+        s, e = int(start.timestamp()), int(end.timestamp())
+        self.calls.append((expr, s, e))
+        return [
+            DataPoint(timestamp=datetime.fromtimestamp(t, tz=timezone.utc), value=float(t + self.version))
+            for t in range(s, e + 1, step)
+        ]
+
+
+def _query(cache, backend, start, end, expr="up"):
+    return asyncio.run(cache.query(("ds", expr), expr, start, end, STEP, backend))
+
+
+def _epochs(points):
+    return [int(p.timestamp.timestamp()) for p in points]
+
+
+def test_align_window_rounds_down_to_step():
+    start = T0 + timedelta(seconds=7)
+    end = T0 + timedelta(minutes=15, seconds=29)
+
+    assert align_window(start, end, STEP) == (int(T0.timestamp()), int(T0.timestamp()) + 900)
+
+
+def test_repeat_window_is_served_without_fetch():
+    cache, backend = PrometheusRangeCache(), GridBackend()
+    first = _query(cache, backend, T0, T0 + timedelta(minutes=15, seconds=10))
+    second = _query(cache, backend, T0 + timedelta(seconds=5), T0 + timedelta(minutes=15, seconds=20))
+
+    assert len(backend.calls) == 1
+    assert first == second and len(first) == 31
+    assert cache.stats["hits"] == 1
+
+
+def test_sliding_window_fetches_only_tail():
+    cache, backend = PrometheusRangeCache(overlap_steps=1), GridBackend()
+    _query(cache, backend, T0, T0 + timedelta(minutes=15))
+    moved = _query(cache, backend, T0 + timedelta(minutes=2), T0 + timedelta(minutes=17))
+
+    base = int(T0.timestamp())
+    assert backend.calls[-1] == ("up", base + 900, base + 1020)
+    assert _epochs(moved) == list(range(base + 120, base + 1021, STEP))
+    assert cache.stats["partial_hits"] == 1
+
+
+def test_overlap_refreshes_late_samples():
+    cache, backend = PrometheusRangeCache(overlap_steps=1), GridBackend()
+    _query(cache, backend, T0, T0 + timedelta(minutes=5))
+    backend.version = 1000
+    points = _query(cache, backend, T0, T0 + timedelta(minutes=6))
+
+    base = int(T0.timestamp())
+    values = {int(p.timestamp.timestamp()): p.value for p in points}
+    assert values[base + 270] == base + 270  # untouched history
+    assert values[base + 300] == base + 1300  # last cached step re-fetched
+    assert len(points) == len(set(values))
+
+
+def test_head_extension_and_disjoint_window():
+    cache, backend = PrometheusRangeCache(), GridBackend()
+    _query(cache, backend, T0 + timedelta(minutes=10), T0 + timedelta(minutes=20))
+    wider = _query(cache, backend, T0, T0 + timedelta(minutes=20))
+
+    base = int(T0.timestamp())
+    assert backend.calls[-1] == ("up", base, base + 600 - STEP)
+    assert _epochs(wider) == list(range(base, base + 1201, STEP))
+
+    _query(cache, backend, T0 + timedelta(hours=3), T0 + timedelta(hours=3, minutes=5))
+    assert backend.calls[-1] == ("up", base + 3 * 3600, base + 3 * 3600 + 300)
+
+
+def test_sample_budget_evicts_least_recently_used():
+    cache, backend = PrometheusRangeCache(max_samples=70), GridBackend()
+    window = (T0, T0 + timedelta(minutes=15))  # 31 samples
+    _query(cache, backend, *window, expr="a")
+    _query(cache, backend, *window, expr="b")
+    _query(cache, backend, *window, expr="a")
+    _query(cache, backend, *window, expr="c")
+
+    assert len(cache) == 2 and cache.samples == 62
+    calls = len(backend.calls)
+    _query(cache, backend, *window, expr="a")
+    assert len(backend.calls) == calls
+    _query(cache, backend, *window, expr="b")
+    assert len(backend.calls) == calls + 1
+
+
+def test_entries_expire_by_age(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(prometheus_range_cache.time, "monotonic", lambda: now[0])
+    cache, backend = PrometheusRangeCache(max_age_seconds=60), GridBackend()
+    _query(cache, backend, T0, T0 + timedelta(minutes=5))
+
+    now[0] += 61
+    _query(cache, backend, T0, T0 + timedelta(minutes=5), expr="other")
+    assert len(cache) == 1 and cache.samples == 11
+    _query(cache, backend, T0, T0 + timedelta(minutes=5))
+    assert cache.stats["misses"] == 3
+
+
+def test_client_requests_only_missing_tail():
+    params = []
+
+    async def handler(request):
+        s, e = int(request.url.params["start"]), int(request.url.params["end"])
+        params.append((s, e))
+        values = [[t, "1"] for t in range(s, e + 1, STEP)]
+        return httpx.Response(200, json={"data": {"result": [{"values": values}]}})
+
+    client = PrometheusClient(base_url="http://prometheus.test", range_cache=PrometheusRangeCache())
+    client._http_client = httpx.AsyncClient(
+        base_url="http://prometheus.test", transport=httpx.MockTransport(handler)
+    )
+
+    async def run():
+        first = await client.query_range_async("up", T0, T0 + timedelta(minutes=15), STEP)
+        second = await client.query_range_async(
+            "up", T0 + timedelta(minutes=1), T0 + timedelta(minutes=16), STEP
+        )
+        return first, second
+
+    first, second = asyncio.run(run())
+    base = int(T0.timestamp())
+    assert params == [(base, base + 900), (base + 900, base + 960)]
+    assert len(first) == len(second) == 31
+
+
+def test_parse_range_result_merges_series_in_time_order():
+    client = PrometheusClient(base_url="http://prometheus.test")
+    base = int(T0.timestamp())
+    raw = {"data": {"result": [
+        {"metric": {"pod": "a"}, "values": [[base + 30, "2"], [base + 90, "4"]]},
+        {"metric": {"pod": "b"}, "values": [[base, "1"], [base + 60, "3"]]},
+    ]}}
+
+    series = client._parse_range_result(raw)
+
+    assert series.timestamps.tolist() == [base, base + 30, base + 60, base + 90]
+    assert [p.value for p in series] == [1.0, 2.0, 3.0, 4.0]
+    assert [int(p.timestamp.timestamp()) for p in series] == series.timestamps.tolist()
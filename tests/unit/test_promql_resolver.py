@@ -0,0 +1,127 @@
+"""
+Unit tests for PromQLCandidateResolver and query_multiple_metrics.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from src.models.metric_trend import DataPoint
+from src.tools.prometheus_queries import (
+    PromQLCandidateResolver,
+    build_service_cpu_query,
+    query_multiple_metrics,
+)
+
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+POINTS = [DataPoint(timestamp=NOW, value=1.0)]
+
+
+class FakePrometheus:
+    """Answers range queries from a table of expr -> (delay, result or exception)."""
+
+    _base_url = "http://prometheus.test"
+    _datasource_uid = None
+
+    def __init__(self, table, series=None):
+        self.table = table
+        self.series = series or []
+        self.queries = []
+        self.series_calls = []
+        self.inflight = 0
+        self.max_inflight = 0
+
+    async def query_range_async(self, expr, start=None, end=None, step_seconds=None):
+        self.queries.append(expr)
+        self.inflight += 1
+        self.max_inflight = max(self.max_inflight, self.inflight)
+        try:
+            delay, result = self.table.get(expr, (0.0, []))
+            await asyncio.sleep(delay)
+            if isinstance(result, Exception):
+                raise result
+            return list(result)
+        finally:
+            self.inflight -= 1
+
+    async def series_async(self, matchers, start=None, end=None):
+        self.series_calls.append(matchers)
+        return self.series
+
+
+def _query(resolver, client, service="api", metric="cpu"):
+    return asyncio.run(resolver.query(client, service, metric, NOW - timedelta(minutes=15), NOW, 30))
+
+
+def test_cold_race_prefers_candidate_order_then_one_query():
+    client = FakePrometheus({
+        "api_cpu": (0.0, []),
+        "api_cpu_usage": (0.03, POINTS),
+        build_service_cpu_query("api"): (0.0, POINTS),
+    })
+    resolver = PromQLCandidateResolver()
+
+    assert _query(resolver, client) == POINTS
+    assert client.max_inflight == 3
+    assert resolver.resolved(client, "api", "cpu") == "api_cpu_usage"
+
+    client.queries.clear()
+    assert _query(resolver, client) == POINTS
+    assert client.queries == ["api_cpu_usage"]
+
+
+def test_negative_cache_skips_empty_candidates_on_reresolve():
+    builder = build_service_cpu_query("api")
+    client = FakePrometheus({"api_cpu_usage": (0.0, POINTS), builder: (0.0, POINTS)})
+    resolver = PromQLCandidateResolver()
+    _query(resolver, client)
+
+    # The learned expression goes dry: it is forgotten and the race only
+    # includes candidates that were not negatively cached
+    client.table["api_cpu_usage"] = (0.0, [])
+    client.queries.clear()
+    assert _query(resolver, client) == POINTS
+    assert client.queries == ["api_cpu_usage", builder]
+    assert resolver.resolved(client, "api", "cpu") == builder
+
+
+def test_failures_are_not_negatively_cached():
+    client = FakePrometheus({"api_memory": (0.0, ConnectionError("down"))})
+    resolver = PromQLCandidateResolver()
+
+    assert _query(resolver, client, metric="memory") == []
+    client.queries.clear()
+    _query(resolver, client, metric="memory")
+    assert client.queries == ["api_memory"]
+
+
+def test_negative_entries_expire():
+    client = FakePrometheus({})
+    resolver = PromQLCandidateResolver(negative_ttl_seconds=0.0)
+    _query(resolver, client, metric="latency")
+    client.queries.clear()
+    _query(resolver, client, metric="latency")
+    assert client.queries == ["api_latency", "api_latency_usage"]
+
+
+def test_warm_from_series_gives_one_query_per_metric():
+    client = FakePrometheus(
+        {build_service_cpu_query("api"): (0.0, POINTS), "api_error_rate": (0.0, POINTS)},
+        series=[
+            {"__name__": "container_cpu_usage_seconds_total", "service": "api", "pod": "api-1"},
+            {"__name__": "container_cpu_usage_seconds_total", "service": "web"},
+            {"__name__": "api_error_rate"},
+        ],
+    )
+    resolver = PromQLCandidateResolver()
+
+    resolved = asyncio.run(resolver.warm_from_series(client, ["api"], ["cpu", "memory", "error_rate"]))
+    assert resolved == 2
+    assert len(client.series_calls) == 1
+
+    results = asyncio.run(
+        query_multiple_metrics(client, "api", ["cpu", "memory", "error_rate"], resolver=resolver)
+    )
+    assert results["cpu"] == POINTS and results["error_rate"] == POINTS
+    assert results["memory"] == []
+    # memory has no series at all, so every candidate is negatively cached
+    assert sorted(client.queries) == sorted([build_service_cpu_query("api"), "api_error_rate"])
@@ -0,0 +1,157 @@
+"""
+Unit tests for incremental runbook indexing in RunbookEmbeddingService.
+"""
+
+import asyncio
+import hashlib
+import os
+
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient
+
+import src.services.runbook_embedding_service as runbook_module
+from src.services.runbook_embedding_service import RunbookEmbeddingService
+
+
+class _CountingModel:
+    """Deterministic stand-in for SentenceTransformer that records encode calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts) if isinstance(texts, list) else texts)
+        rows = [texts] if isinstance(texts, str) else texts
+        out = np.zeros((len(rows), RunbookEmbeddingService.VECTOR_SIZE), dtype=np.float32)
+        for i, text in enumerate(rows):
+            seed = int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
+            out[i] = np.random.default_rng(seed).standard_normal(out.shape[1])
+        return out[0] if isinstance(texts, str) else out
+
+    @property
+    def encoded(self):
+        return sum(len(call) for call in self.calls)
+
+
+@pytest.fixture
+def runbooks(tmp_path, monkeypatch):
+    monkeypatch.setattr(runbook_module, "QDRANT_AVAILABLE", False)
+    monkeypatch.setattr(runbook_module, "MODEL_AVAILABLE", False)
+    client = QdrantClient(":memory:")
+
+    def make_service(**kwargs):
+        service = RunbookEmbeddingService(runbooks_path=str(tmp_path), **kwargs)
+        service._client = client
+        service._model = _CountingModel()
+        service._ensure_collection()
+        return service
+
+    return tmp_path, client, make_service
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+    # Force a visible mtime change even on coarse filesystem clocks
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def _count(client):
+    return client.count(RunbookEmbeddingService.COLLECTION_NAME).count
+
+
+def test_reindex_only_embeds_changed_sections(runbooks):
+    root, client, make_service = runbooks
+    _write(root / "db.md", "# Restart\nkubectl rollout restart\n# Failover\npromote replica\n")
+    _write(root / "cache.md", "# Flush\nredis-cli flushall\n")
+    service = make_service(encode_batch_size=2)
+
+    first = service.index_runbooks()
+    assert first["embedded"] == 3 and first["indexed"] == 2
+    assert [len(call) for call in service._model.calls] == [2, 1]
+    assert _count(client) == 3
+
+    # Untouched tree: nothing is read or embedded
+    service._model.calls.clear()
+    second = service.index_runbooks()
+    assert second["embedded"] == 0 and second["unchanged"] == 3
+    assert service._model.calls == []
+
+    # One edited section, one removed section, one removed file
+    _write(root / "db.md", "# Restart\nkubectl rollout restart deploy/db\n")
+    (root / "cache.md").unlink()
+    third = service.index_runbooks()
+    assert third["embedded"] == 1 and third["deleted"] == 2
+    assert _count(client) == 1
+
+
+def test_manifest_is_rebuilt_from_qdrant_after_restart(runbooks):
+    root, client, make_service = runbooks
+    _write(root / "db.md", "# Restart\nkubectl rollout restart\n# Failover\npromote replica\n")
+    make_service().index_runbooks()
+
+    # A fresh process has no stat cache but finds the content hashes in Qdrant
+    restarted = make_service()
+    result = restarted.index_runbooks()
+    assert result["embedded"] == 0 and result["unchanged"] == 2
+    assert restarted._model.calls == []
+
+
+def test_upserts_are_chunked(runbooks, monkeypatch):
+    root, client, make_service = runbooks
+    _write(root / "big.md", "".join(f"# Step {i}\ndo thing {i}\n" for i in range(10)))
+    service = make_service(upsert_batch_size=4)
+    sizes = []
+    original = client.upsert
+    monkeypatch.setattr(client, "upsert", lambda **kw: sizes.append(len(kw["points"])) or original(**kw))
+
+    assert service.index_runbooks()["embedded"] == 10
+    assert sizes == [4, 4, 2]
+
+
+def test_watch_picks_up_new_runbooks(runbooks):
+    root, client, make_service = runbooks
+    service = make_service()
+
+    async def scenario():
+        stop = asyncio.Event()
+        watcher = asyncio.create_task(service.watch_runbooks(interval_seconds=0.05, stop_event=stop))
+        await asyncio.sleep(0.1)
+        _write(root / "new.md", "# Drain\nkubectl drain node\n")
+        for _ in range(100):
+            if _count(client):
+                break
+            await asyncio.sleep(0.02)
+        stop.set()
+        await watcher
+
+    asyncio.run(scenario())
+    assert _count(client) == 1
+
+
+def test_hybrid_search_finds_exact_error_code(runbooks, tmp_path_factory):
+    root, client, make_service = runbooks
+    _write(root / "db.md", "# Restart\nkubectl rollout restart deploy/db\n# Failover\npromote replica\n")
+    _write(root / "payments.md", "# Gateway errors\nOn E4031 rotate the gateway API key\n")
+    bm25_path = tmp_path_factory.mktemp("bm25") / "runbooks.json"
+    service = make_service(lexical_index_path=str(bm25_path))
+
+    def search(collection_name, query_vector, limit):
+        return client.query_points(collection_name, query=query_vector, limit=limit).points
+
+    client.search = search
+    service.index_runbooks()
+
+    results = service.search_procedures("gateway failing with E4031", limit=1)
+    assert results[0]["file_name"] == "payments.md"
+    assert "rotate the gateway API key" in results[0]["content"]
+
+    # The persisted BM25 index serves lexical results without a model or Qdrant
+    offline = RunbookEmbeddingService(runbooks_path=str(root), lexical_index_path=str(bm25_path))
+    assert offline.search_procedures("E4031", limit=1)[0]["section_title"] == "Gateway errors"
+
+    # Deleted sections leave the lexical index too
+    (root / "payments.md").unlink()
+    service.index_runbooks()
+    assert all(r["file_name"] != "payments.md" for r in service.search_procedures("E4031", limit=3))
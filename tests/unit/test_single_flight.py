@@ -0,0 +1,179 @@
+"""
+Unit tests for SingleFlight and the coalesced Prometheus, Ollama and LLM
+provider call paths.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from src.llm.provider_factory import BaseLLMProvider, CoalescingLLMProvider, LLMConfig, LLMProviderType
+from src.ollama_client import OllamaClient
+from src.tools.prometheus_queries import PrometheusClient
+from src.utils.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def backend():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", backend) for _ in range(20)))
+
+    assert asyncio.run(run()) == ["value"] * 20
+    assert len(calls) == 1
+    assert flight.stats == {"leaders": 1, "followers": 19}
+
+
+def test_settled_calls_are_not_cached():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def backend():
+        calls.append(1)
+        return len(calls)
+
+    async def run():
+        return [await flight.do("k", backend) for _ in range(3)]
+
+    assert asyncio.run(run()) == [1, 2, 3]
+
+
+def test_exception_is_shared():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def backend():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", backend) for _ in range(5)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flight = SingleFlight("test")
+
+    async def backend():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        leader = asyncio.create_task(flight.do("k", backend))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("k", backend))
+        await asyncio.sleep(0)
+        leader.cancel()
+        result = await follower
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return result
+
+    assert asyncio.run(run()) == "done"
+
+
+def _prometheus_with_transport(handler, **kwargs):
+    client = PrometheusClient(base_url="http://prometheus.test", use_range_cache=False, **kwargs)
+    client._http_client = httpx.AsyncClient(
+        base_url="http://prometheus.test", transport=httpx.MockTransport(handler)
+    )
+    return client
+
+
+def test_prometheus_range_queries_coalesce():
+    requests = []
+
+    async def handler(request):
+        requests.append(request.url.params["query"])
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"data": {"result": [{"values": [[1700000000, "1.5"]]}]}})
+
+    end = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    start = end - timedelta(minutes=15)
+
+    async def run(client):
+        results = await asyncio.gather(
+            *(client.query_range_async("up", start, end, 30) for _ in range(10)),
+            client.query_range_async("down", start, end, 30),
+        )
+        results[0].values[0] = -1.0  # each caller owns its copy
+        return results
+
+    results = asyncio.run(run(_prometheus_with_transport(handler)))
+    assert sorted(requests) == ["down", "up"]
+    assert results[0].values[0] == -1.0
+    assert all(r.values[0] == 1.5 for r in results[1:])
+
+    requests.clear()
+    asyncio.run(run(_prometheus_with_transport(handler, coalesce=False)))
+    assert len(requests) == 11
+
+
+def test_ollama_generate_coalesces():
+    requests = []
+
+    async def handler(request):
+        requests.append(request.content)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"response": "summary"})
+
+    client = OllamaClient(base_url="http://ollama.test", model="mistral")
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def run():
+        return await asyncio.gather(
+            *(client.generate("summarize", temperature=0.3) for _ in range(8)),
+            client.generate("summarize", temperature=0.9),
+        )
+
+    assert asyncio.run(run()) == ["summary"] * 9
+    assert len(requests) == 2
+
+
+class SlowProvider(BaseLLMProvider):
+
+    def __init__(self):
+        super().__init__(LLMConfig(provider=LLMProviderType.OLLAMA, model="llama3"))
+        self.calls = 0
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return f"answer to {prompt}"
+
+    async def generate_with_context(self, prompt: str, context: str, **kwargs) -> str:
+        return await self.generate(f"{context}|{prompt}", **kwargs)
+
+    async def health_check(self) -> bool:
+        return True
+
+
+def test_coalescing_provider_shares_equivalent_prompts():
+    backend = SlowProvider()
+    provider = CoalescingLLMProvider(backend, SingleFlight("test"))
+
+    async def run():
+        return await asyncio.gather(
+            provider.generate("alert at 2025-01-01T00:00:00Z"),
+            provider.generate("alert at 2025-01-01T00:00:07Z"),
+            provider.generate("alert at 2025-01-01T00:00:07Z", temperature=0.1),
+            provider.generate_with_context("q", "ctx"),
+            provider.generate_with_context("q", "ctx"),
+        )
+
+    results = asyncio.run(run())
+    assert results[0] == results[1]
+    assert results[3] == results[4]
+    assert backend.calls == 3
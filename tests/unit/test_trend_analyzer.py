@@ -10,7 +10,7 @@ Tests:
 import pytest
 from datetime import datetime, timedelta
 
-from src.models.metric_trend import MetricTrend, TrendState, DataPoint
+from src.models.metric_trend import MetricTrend, TrendState, DataPoint, TimeSeries
 from src.rules.trend_rules import (
     TrendAnalyzer,
     TrendConfig,
@@ -167,6 +167,32 @@ class TestTrendAnalyzer:
         assert results["memory"].trend_state == TrendState.RECOVERING
         assert results["requests"].trend_state == TrendState.STABLE
 
+    def test_analyze_many_matches_scalar(self, base_time):
+        """Test batched analysis is identical to analyzing each series alone."""
+        import numpy as np
+        rng = np.random.default_rng(3)
+        metrics = {}
+        for i, n in enumerate([0, 3, 5, 6, 10, 31, 31, 31, 61]):
+            values = rng.normal(100, 25, n) + rng.uniform(-3, 3) * np.arange(n)
+            if n > 10:
+                values[[2, 7]] = [np.nan, 5_000.0]  # invalid value and spike
+            metrics[f"m{i}"] = TimeSeries(np.arange(n) * 30.0, values)
+        metrics["zeros"] = TimeSeries(np.arange(10) * 30.0, np.zeros(10))
+        
+        analyzer = TrendAnalyzer()
+        batched = analyzer.analyze_many(metrics, threshold_values={"m5": 150.0})
+        
+        assert list(batched) == list(metrics)
+        assert batched["m5"].threshold_value == 150.0
+        for name, series in metrics.items():
+            scalar = analyzer.analyze(name, series, 150.0 if name == "m5" else None)
+            result = batched[name]
+            assert result.trend_state == scalar.trend_state
+            assert result.confidence == scalar.confidence
+            assert result.reasoning == scalar.reasoning
+            assert result.series == scalar.series
+            assert result.outliers_removed == scalar.outliers_removed
+
 
 # ============================================================================
 # TrendRules Tests
@@ -372,3 +398,64 @@ class TestMetricTrendModel:
         )
         
         assert trend.is_actionable is False
+
+
+# ============================================================================
+# Columnar TimeSeries Tests
+# ============================================================================
+
+class TestTimeSeries:
+    """Tests for the array-backed TimeSeries carried through the metrics path."""
+    
+    def test_round_trip_from_points(self, degrading_data):
+        """Test DataPoints survive the columnar representation."""
+        series = TimeSeries.from_points(degrading_data)
+        
+        assert len(series) == 10
+        assert [dp.value for dp in series] == [dp.value for dp in degrading_data]
+        assert series[-1].value == 190
+        assert not series.outliers.any()
+    
+    def test_from_samples_and_concat_sorted(self):
+        """Test Prometheus sample pairs are parsed and merged in time order."""
+        a = TimeSeries.from_samples([[30, "3"], [10, "1"]])
+        b = TimeSeries.from_samples([[20, "2"]])
+        merged = TimeSeries.concat([a, b])
+        
+        assert merged.timestamps.tolist() == [10.0, 20.0, 30.0]
+        assert merged.values.tolist() == [1.0, 2.0, 3.0]
+    
+    def test_analyze_records_outliers_in_mask(self, base_time):
+        """Test analyze() flags the p95 spike in the bitmask without copying samples."""
+        values = [100 + i for i in range(19)] + [10_000]
+        series = TimeSeries.from_points(
+            DataPoint(timestamp=base_time + timedelta(minutes=i), value=v)
+            for i, v in enumerate(values)
+        )
+        result = TrendAnalyzer().analyze("spiky", series)
+        
+        assert result.outliers_removed == 1
+        assert result.series.outliers.tolist() == [False] * 19 + [True]
+        assert result.series.values is series.values
+        assert result.data_points[-1].is_outlier is True
+    
+    def test_metric_trend_serializes_data_points(self, degrading_data):
+        """Test DataPoints are materialized at the API boundary only."""
+        trend = TrendAnalyzer().analyze("cpu", degrading_data)
+        dumped = trend.model_dump()
+        
+        assert "series" not in dumped
+        assert len(dumped["data_points"]) == 10
+        assert MetricTrend.model_validate(dumped).series == trend.series
+    
+    def test_metric_trend_json_schema_generates(self):
+        """Test the arbitrary-typed series field does not break schema generation."""
+        from pydantic import BaseModel
+        
+        class TrendResponse(BaseModel):
+            trends: list[MetricTrend]
+        
+        schema = MetricTrend.model_json_schema(mode="serialization")
+        assert "series" not in schema["properties"]
+        assert "data_points" in schema["properties"]
+        assert "MetricTrend" in TrendResponse.model_json_schema()["$defs"]
@@ -0,0 +1,94 @@
+"""
+Unit tests for InMemoryVectorIndex and the GraphAgent in-memory fallback.
+"""
+
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from src.agents.graph_agent import GraphAgent
+from src.utils.vector_index import InMemoryVectorIndex
+
+
+def _brute_force(vectors, query, top_k, min_similarity):
+    q = np.asarray(query, dtype=np.float64)
+    scored = []
+    for i, v in enumerate(vectors):
+        v = np.asarray(v, dtype=np.float64)
+        denom = np.linalg.norm(v) * np.linalg.norm(q)
+        sim = float(v @ q / denom) if denom else 0.0
+        if sim >= min_similarity:
+            scored.append((str(i), sim))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored[:top_k]
+
+
+def test_matches_brute_force_cosine():
+    rng = np.random.default_rng(7)
+    vectors = rng.normal(size=(500, 32))
+    query = rng.normal(size=32)
+
+    index = InMemoryVectorIndex(initial_capacity=8)
+    for i, v in enumerate(vectors):
+        index.add(str(i), v, {"row": i})
+
+    got = index.search(query, top_k=10, min_similarity=0.1)
+    expected = _brute_force(vectors, query, 10, 0.1)
+
+    assert [item_id for item_id, _, _ in got] == [item_id for item_id, _ in expected]
+    for (_, score, _), (_, exp_score) in zip(got, expected):
+        assert score == pytest.approx(exp_score, abs=1e-5)
+    assert got[0][2]["row"] == int(got[0][0])
+
+
+def test_min_similarity_and_top_k():
+    index = InMemoryVectorIndex(dim=2)
+    index.add("same", [1.0, 0.0])
+    index.add("close", [1.0, 0.1])
+    index.add("orthogonal", [0.0, 1.0])
+    index.add("zero", [0.0, 0.0])
+
+    assert [h[0] for h in index.search([1.0, 0.0], top_k=5, min_similarity=0.5)] == ["same", "close"]
+    assert [h[0] for h in index.search([1.0, 0.0], top_k=1)] == ["same"]
+    assert index.search([1.0, 0.0], top_k=0) == []
+
+
+def test_dimension_mismatch_raises():
+    index = InMemoryVectorIndex(dim=3)
+    with pytest.raises(ValueError):
+        index.add("x", [1.0, 2.0])
+
+
+def test_quantized_mode_is_close_and_smaller():
+    rng = np.random.default_rng(3)
+    vectors = rng.normal(size=(300, 64))
+    query = vectors[42] + rng.normal(scale=0.1, size=64)
+
+    exact = InMemoryVectorIndex()
+    quantized = InMemoryVectorIndex(quantize=True)
+    for i, v in enumerate(vectors):
+        exact.add(str(i), v)
+        quantized.add(str(i), v)
+
+    exact_hits = exact.search(query, top_k=5)
+    quantized_hits = quantized.search(query, top_k=5)
+
+    assert quantized_hits[0][0] == "42"
+    assert quantized_hits[0][1] == pytest.approx(exact_hits[0][1], abs=2e-2)
+    assert quantized.nbytes < exact.nbytes / 3
+
+
+def test_graph_agent_memory_fallback_returns_semantic_evidence():
+    agent = GraphAgent()
+    decision_id = str(uuid4())
+    embedding = agent._fallback_embedding("Service: api | Severity: critical")
+    agent._memory_store.add(decision_id, embedding, {"summary": "restart api pods"})
+    agent._memory_store.add(str(uuid4()), [-x for x in embedding], {"summary": "unrelated"})
+
+    evidence = agent._search_memory(embedding, top_k=3, min_similarity=0.7)
+
+    assert len(evidence) == 1
+    assert str(evidence[0].decision_id) == decision_id
+    assert evidence[0].similarity_score == pytest.approx(1.0, abs=1e-5)
+    assert evidence[0].summary == "restart api pods"